@@ -32,3 +32,13 @@ class AIProvider(ABC):
     @abstractmethod
     def general_chat_completion(self, user_query: str) -> dict:
         pass
+
+    @abstractmethod
+    def check_content_match_batch(self, criteria: str, excerpts: list[tuple[str, str]]) -> dict:
+        """
+        Decides for many files at once whether their content matches `criteria`.
+        `excerpts` is a list of (file_path, text_excerpt). Returns {"verdicts": {file_path: bool}}
+        (files the model gave no verdict for are omitted), plus "errors": [str] if some requests failed,
+        or {"error": str} if none succeeded.
+        """
+        pass
@@ -6,11 +6,27 @@
 # Ensure the corresponding _SETTINGS dictionary below is correctly configured.
 AI_PROVIDER = "ollama" 
 
+# --- HTTP Transport Settings ---
+# Every AI provider connector sends its requests through one pooled, kept-alive session.
+# Refused or reset connections and the RETRY_STATUSES answers are retried RETRIES times, waiting
+# BACKOFF_FACTOR * 2^n seconds between attempts (or what the server's Retry-After asks for).
+HTTP_SETTINGS = {
+    "POOL_CONNECTIONS": 4,          # Hosts whose connection pools are kept
+    "POOL_MAXSIZE": 10,             # Connections kept per host (at least the provider's concurrency)
+    "RETRIES": 3,
+    "BACKOFF_FACTOR": 0.5,
+    "RETRY_STATUSES": [502, 503, 504]
+}
+
 # --- Ollama Settings ---
 # Used if AI_PROVIDER is "ollama"
 OLLAMA_SETTINGS = {
     "BASE_URL": "http://localhost:11434", # Default Ollama API URL
-    "MODEL": "gemma3:1b" # Default Ollama model
+    "MODEL": "gemma3:1b", # Default Ollama model
+    "MAX_CONCURRENT_REQUESTS": 2,   # Parallel requests for batched relevance checks (match OLLAMA_NUM_PARALLEL)
+    "RELEVANCE_BATCH_SIZE": 10,     # File excerpts packed into one relevance prompt
+    "RELEVANCE_EXCERPT_CHARS": 1500, # Characters of each file shown to the model
+    "STREAM_RESPONSES": True        # Show summaries, answers and chat replies as they are generated
 }
 
 # --- OpenRouter Settings ---
@@ -37,6 +53,190 @@ OPENAI_SETTINGS = {
     "MODEL": "gpt-3.5-turbo" # Example: "gpt-4", "gpt-3.5-turbo"
 }
 
+# --- Local State Directory ---
+# Indexes and caches built by the assistant are kept here.
+# Relative paths are resolved against the project root (the folder containing this file).
+STATE_DIR = ".sam_state"
+
+# --- Metadata Index Settings ---
+# A persistent SQLite index of file names, types, sizes and modification times.
+# Searches answer from the index and only rescan directories whose mtime changed.
+INDEX_SETTINGS = {
+    "ENABLED": True,            # Use the index to answer searches
+    "DB_FILENAME": "metadata_index.sqlite3"
+}
+
+# --- Content Index Settings ---
+# Trigram index used to narrow "files containing '...'" searches. It is filled and kept
+# current (by file mtime) as content searches run, so repeated searches skip unchanged files.
+CONTENT_INDEX_SETTINGS = {
+    "ENABLED": True,
+    "DB_FILENAME": "content_index.sqlite3"
+}
+
+# --- Directory Walker Settings ---
+# Recursive search, listing and organization list directories in parallel.
+WALKER_SETTINGS = {
+    "MAX_WORKERS": 8            # Threads listing directories concurrently (raise for NFS/network shares)
+}
+
+# --- Ignore Rules ---
+# Searches, the metadata index, duplicate detection and the watcher skip paths matched by these
+# .gitignore-style patterns and by ignore files found in the walked folders (a ".samignore" in any
+# folder, and ".gitignore" files if HONOR_GITIGNORE). Folder listings and storage reports show everything.
+IGNORE_SETTINGS = {
+    "ENABLED": True,
+    "IGNORE_FILES": [".samignore"],
+    "HONOR_GITIGNORE": True,
+    "EXCLUDE_PATTERNS": [       # Patterns without a "/" match names at any depth; a trailing "/" means folders only
+        "node_modules/", "__pycache__/", "venv/", "site-packages/", "bower_components/",
+        "*.pyc", "*.pyo", "Thumbs.db", "desktop.ini"
+    ]
+}
+
+# --- Search Settings ---
+# Results are shown as they are found; the search stops once DEFAULT_RESULT_LIMIT matches were
+# found unless the request asks for a different limit. Topic ("about '...'") searches can also be
+# checked by the AI provider; without the semantic index that check is used instead of a phrase match.
+SEARCH_SETTINGS = {
+    "DEFAULT_RESULT_LIMIT": 1000,
+    "LLM_RELEVANCE_FILTER": False,  # Let the AI provider confirm topic-search results (batched, several files per request)
+    "LLM_RELEVANCE_MAX_FILES": 200, # Most files sent to the AI provider for one topic search
+    # Time budget per search; when it runs out the results so far are shown and "continue search"
+    # resumes where it stopped. 0 or None means no limit.
+    "MAX_SECONDS": 120,
+    # Fuzzy name search ("files named ~'quartely report'"); plain name searches that find nothing fall back to it
+    "FUZZY_FALLBACK": True,
+    "FUZZY_TOP_K": 20,                  # Best-scoring names returned
+    "FUZZY_MIN_SCORE": 0.45,            # Similarity (0-1) below this is not a match
+    "FUZZY_MIN_GRAM_OVERLAP": 0.3,      # Share of the query's trigrams a name must contain to be scored
+    "FUZZY_MAX_CANDIDATE_NAMES": 20000  # Distinct names fetched from the metadata index per search
+}
+
+# --- Content Grep Settings ---
+# Plain-text files are searched as raw bytes through a memory map, so there is no size cutoff.
+CONTENT_GREP_SETTINGS = {
+    "CHUNK_BYTES": 16 * 1024 * 1024,   # Size of each mapped window
+    "MAX_MATCHES_PER_FILE": 20,        # Line matches recorded per file in search results
+    "SNIPPET_CONTEXT": 60              # Characters of context kept on each side of a match
+}
+
+# --- Semantic Index Settings ---
+# Local TF-IDF index (needs numpy) that answers "files about '...'" and "files like '...'" searches
+# without an LLM call per file. Filled incrementally as topic searches run.
+SEMANTIC_INDEX_SETTINGS = {
+    "ENABLED": True,
+    "DIR_NAME": "semantic_index",
+    "N_FEATURES": 2 ** 18,      # Hashed vocabulary size; changing it rebuilds the index
+    "TOP_K": 20,                # Results returned by a topic search
+    "MIN_SCORE": 0.05,          # Cosine similarity below this is not considered related
+    "MAX_SEGMENTS": 8           # Appended segments kept before they are merged into one
+}
+
+# --- Filesystem Watcher Settings ---
+# While the assistant runs, changes under the watched roots are applied to the indexes as they
+# happen (inotify on Linux, periodic mtime refresh elsewhere), so searches never start with a rescan.
+WATCHER_SETTINGS = {
+    "ENABLED": True,
+    "ROOTS": [],                    # Folders to watch; empty means every folder already in the metadata index
+    "WATCH_INDEXED_ROOTS": True,    # Watch indexed folders when ROOTS is empty
+    "USE_INOTIFY": True,            # Set False to always poll
+    "POLL_INTERVAL_SECONDS": 30     # Polling fallback period
+}
+
+# --- Duplicate Finder Settings ---
+# Files are grouped by size, then by a hash of their first and last PARTIAL_HASH_BYTES, and only
+# the files still tied are hashed in full (BLAKE2b).
+DUPLICATE_SETTINGS = {
+    "MIN_SIZE_BYTES": 1,                # Empty files are not reported as duplicates
+    "PARTIAL_HASH_BYTES": 64 * 1024,    # Bytes hashed at each end of a file in the second stage
+    "HASH_CHUNK_BYTES": 16 * 1024 * 1024,
+    "HASH_WORKERS": 4                   # Threads hashing files concurrently
+}
+
+# --- Storage Report Settings ---
+# "storage report" walks a whole tree once and shows where the space goes.
+STORAGE_REPORT_SETTINGS = {
+    "TOP_N": 15,                # Largest files and folders listed
+    "INCLUDE_HIDDEN": True      # Hidden files and folders use disk space too
+}
+
+# --- Archive Settings ---
+# Searches can look inside .zip and .tar(.gz/.bz2/.xz) archives ("... including archives", or always
+# with SEARCH_INSIDE). Members are read as streams and never extracted to disk; a match is shown as
+# "archive.zip!/inner/path" and can be summarized or asked about like a normal file.
+ARCHIVE_SETTINGS = {
+    "SEARCH_INSIDE": False,                     # Descend into archives on every search
+    "MAX_MEMBER_SCAN_BYTES": 8 * 1024 * 1024,   # Most bytes of one text member grepped by a content search
+    "MAX_MEMBER_READ_BYTES": 32 * 1024 * 1024   # Largest member read for summarize / ask
+}
+
+# --- Search Cache Settings ---
+# Results of recent searches are kept for the session and reused while the searched folders (and,
+# for content searches, the examined files) are unchanged. "show more results" pages through them.
+SEARCH_CACHE_SETTINGS = {
+    "ENABLED": True,
+    "MAX_ENTRIES": 32,          # Searches remembered; the least recently used is dropped first
+    "PAGE_SIZE": 50             # Results shown by "show more results" when no count is given
+}
+
+# --- Large File Settings ---
+# Summaries and questions send at most 20000 characters of a file to the AI provider. Longer files are
+# sampled: "spread" takes the beginning, MIDDLE_WINDOWS evenly spaced parts of the middle and the end;
+# "head" takes only the beginning. Plain text files are read part by part, never loaded whole.
+LARGE_FILE_SETTINGS = {
+    "SAMPLING": "spread",
+    "MIDDLE_WINDOWS": 3
+}
+
+# --- PDF Extraction Settings ---
+# PDFs are parsed in batches of PAGES_PER_TASK pages. Reading a whole PDF of at least PARALLEL_MIN_PAGES
+# pages spreads the batches over MAX_WORKERS worker processes (None: one less than the CPU count, at
+# most 4; below 2 everything runs in the main process). Questions about "page 40" parse only that page.
+PDF_SETTINGS = {
+    "PAGES_PER_TASK": 16,
+    "PARALLEL_MIN_PAGES": 48,
+    "MAX_WORKERS": None,
+    "START_METHOD": "spawn"     # multiprocessing start method of the workers
+}
+
+# --- Extraction Worker Settings ---
+# Content searches and the content/semantic indexes parse PDFs and Office documents in separate worker
+# processes, each file under a time and memory limit. A file that times out or crashes its worker is
+# skipped for the rest of the session (until it changes) instead of stalling the search.
+EXTRACTION_WORKER_SETTINGS = {
+    "ENABLED": True,
+    "MAX_WORKERS": None,        # None: one per CPU, at most 4
+    "TIMEOUT_SECONDS": 30,      # Per file
+    "MEMORY_LIMIT_MB": 1024,    # Per worker address space (Unix)
+    "BATCH_SIZE": 16,           # Documents collected by a content search before they are sent to the workers
+    "START_METHOD": "spawn"
+}
+
+# --- Extraction Cache Settings ---
+# Text extracted from PDFs, DOCX files and archive members is cached by file identity (device, inode,
+# size, mtime), in memory and compressed in the state directory, so summarizing, asking about and
+# searching the same document parse it once. "cache stats" and "cache clear" inspect and empty it.
+EXTRACTION_CACHE_SETTINGS = {
+    "ENABLED": True,
+    "MEMORY_MAX_BYTES": 64 * 1024 * 1024,   # Text kept in memory; least recently used is dropped first
+    "DISK_ENABLED": True,
+    "DISK_MAX_BYTES": 512 * 1024 * 1024,    # Compressed text kept in STATE_DIR/DIR_NAME
+    "DIR_NAME": "extraction_cache",
+    "COMPRESSION_LEVEL": 6                  # zlib level for the disk tier
+}
+
+# --- Content Sniffing Settings ---
+# Content search and extraction look at the first HEAD_BYTES of a file to tell its real type:
+# binaries and images with text-like extensions are skipped, text files with unknown extensions are
+# grepped, and misnamed PDFs or DOCX files reach the right parser. Verdicts are remembered in the
+# metadata index (when enabled) until the file's size or mtime changes.
+SNIFF_SETTINGS = {
+    "ENABLED": True,
+    "HEAD_BYTES": 4096,
+    "MAX_CACHED_VERDICTS": 200000   # Verdicts kept in memory before the cache is reset
+}
+
 # --- Old Ollama Global Settings (Commented out as they are now in OLLAMA_SETTINGS) ---
 # OLLAMA_API_BASE_URL = "http://localhost:11434"
 # OLLAMA_MODEL = "gemma3:1b"
@@ -1,26 +1,26 @@
 import os
 import shutil
-import docx
-import re
-from rich.progress import Progress
+
+# Content reading is kept for older callers; python/extractors is the single extractor registry
+# (same formats and limits as summarize, ask and search, with parsers loaded on first use).
+from python import extractors
+from python.fs_utils import MAX_SEARCH_CONTENT_SIZE
 
 # --- Core File Reading Functions ---
 def read_text_file(filepath: str) -> (str | None):
-    try:
-        if not (os.path.exists(filepath) and os.path.isfile(filepath)): return None
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
-    except Exception: return None
+    if not (os.path.exists(filepath) and os.path.isfile(filepath)): return None
+    text, _, error = extractors.extract_text(filepath, ".txt")
+    return None if error else text
 
-def extract_text_from_pdf(filepath: str) -> (str | None): # Placeholder
-    return "PDF parsing not yet fully implemented. Only the filepath was acknowledged."
+def extract_text_from_pdf(filepath: str) -> (str | None):
+    if not (os.path.exists(filepath) and os.path.isfile(filepath)): return None
+    text, _, error = extractors.extract_text(filepath, ".pdf")
+    return None if error else text
 
 def extract_text_from_docx(filepath: str) -> (str | None):
-    try:
-        if not (os.path.exists(filepath) and os.path.isfile(filepath)): return None
-        doc = docx.Document(filepath)
-        return '\n'.join([para.text for para in doc.paragraphs])
-    except Exception: return None
+    if not (os.path.exists(filepath) and os.path.isfile(filepath)): return None
+    text, _, error = extractors.extract_text(filepath, ".docx")
+    return None if error else text
 
 # --- Content Retrieval for General Use (e.g., summarize, ask) ---
 def get_file_content(filepath: str, console=None) -> (str | None):
@@ -35,49 +35,23 @@ def get_file_content(filepath: str, console=None) -> (str | None):
         return None
 
     _, extension = os.path.splitext(filepath.lower())
-    content = None
-    try:
-        if extension in ['.txt', '.py', '.js', '.css', '.html', '.md', '.json', '.xml', '.log', '.ini', '.cfg', '.sh', '.bat']:
-            content = read_text_file(filepath)
-        elif extension == '.docx':
-            content = extract_text_from_docx(filepath)
-        elif extension == '.pdf':
-            content = extract_text_from_pdf(filepath)
-        else:
-            if console: console.print(f"[yellow]Unsupported file type for content extraction: {extension} for '{filepath}'[/yellow]")
-            return None
-        
-        if content is None and extension not in ['.pdf']:
-             if console: console.print(f"[yellow]Warning: Could not read content from '{filepath}' (empty or error).[/yellow]")
-    except Exception as e:
-        if console: console.print(f"[red]Error getting content from '{filepath}': {e}[/red]")
+    if extractors.get_extractor(filepath, extension) is None:
+        if console: console.print(f"[yellow]Unsupported file type for content extraction: {extension} for '{filepath}'[/yellow]")
+        return None
+    content, _, error = extractors.extract_text(filepath, extension)
+    if error:
+        if console: console.print(f"[yellow]Warning: Could not read content from '{filepath}': {error}[/yellow]")
+        return None
     return content
 
 # --- Content Retrieval Optimized for Searching ---
 def get_file_content_for_search(filepath: str, console) -> (str | None):
     if not (filepath and os.path.exists(filepath) and os.path.isfile(filepath)): return None
-    _, extension = os.path.splitext(filepath.lower())
-    content = None
-    MAX_SEARCH_CONTENT_SIZE = 100 * 1024  # 100KB
-    try:
-        if extension in ['.txt', '.py', '.js', '.css', '.html', '.md', '.json', '.xml', '.log', '.ini', '.cfg', '.sh', '.bat']:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(MAX_SEARCH_CONTENT_SIZE)
-        elif extension == '.docx':
-            doc = docx.Document(filepath)
-            full_text_list = [para.text for para in doc.paragraphs]
-            temp_content = ""
-            for para_text in full_text_list:
-                if len(temp_content) + len(para_text) + 1 > MAX_SEARCH_CONTENT_SIZE:
-                    needed = MAX_SEARCH_CONTENT_SIZE - len(temp_content) -1
-                    if needed > 0 : temp_content += "\n" + para_text[:needed]
-                    break
-                temp_content += "\n" + para_text
-            content = temp_content.lstrip("\n")
-        # elif extension == '.pdf': # Actual PDF parsing for search would go here
-            # pass
-    except Exception as e:
-        if console: console.print(f"[yellow]Warning (search read): Could not get content from '{os.path.basename(filepath)}': {str(e)[:50]}...[/yellow]")
+    content, _, error = extractors.extract_text(filepath, max_chars=MAX_SEARCH_CONTENT_SIZE)
+    if error:
+        if console and extractors.get_extractor(filepath) is not None:
+            console.print(f"[yellow]Warning (search read): Could not get content from '{os.path.basename(filepath)}': {error[:50]}...[/yellow]")
+        return None
     return content
 
 # --- File and Folder Operations ---
@@ -139,85 +113,11 @@ def move_item(source_path: str, destination_path: str, console=None) -> bool:
     return False
 
 def search_files_recursive(start_path: str, criteria: str, llm_connector, console) -> list:
-    found_items = []
-    criteria_lower = criteria.lower()
-    abs_start_path = os.path.abspath(start_path)
-
-    search_type_keywords = {
-        "image": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
-        "picture": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
-        "photo": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
-        "video": ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm'],
-        "audio": ['.mp3', '.wav', '.ogg', '.aac', '.flac', '.m4a'],
-        "document": ['.pdf', '.doc', '.docx', '.odt', '.txt', '.rtf', '.ppt', '.pptx', '.xls', '.xlsx', '.csv', '.md', '.tex'],
-        "pdf": [".pdf"], "word document": [".doc", ".docx"], "text file": [".txt", ".md", ".log", ".rtf"],
-        "spreadsheet": [".xls", ".xlsx", ".ods", ".csv"], "presentation": [".ppt", ".pptx", ".odp"],
-        "python script": [".py", ".pyw"], "javascript file": [".js", ".mjs"], "typescript file": [".ts", ".tsx"],
-        "html file": [".html", ".htm"], "css file": [".css", ".scss", ".less"],
-        "archive": [".zip", ".rar", ".tar", ".gz", ".7z", ".bz2"], "executable": [".exe", ".msi", ".dmg", ".app", ".deb", ".rpm"],
-        "code file": [".py",".js",".java",".c",".cpp",".cs",".go",".rs",".swift",".kt",".php",".rb",".pl",".sh",".bat"],
-    }
-    
-    target_extensions = None
-    content_search_term = None
-    llm_content_check_criteria = None
-
-    containing_match = re.search(r"containing\s+['\"](.+?)['\"]", criteria_lower)
-    if containing_match:
-        content_search_term = containing_match.group(1)
-        type_description = criteria_lower.split("containing", 1)[0].strip()
-    else:
-        type_description = criteria_lower
-
-    about_match = re.search(r"(?:about|related to|regarding|on the topic of)\s+['\"](.+?)['\"]", type_description)
-    if about_match:
-        llm_content_check_criteria = criteria # Pass original full criteria
-        type_description = type_description.split(about_match.group(0),1)[0].strip()
-    
-    if type_description and type_description not in ["files", "any files", "all files", "items"]:
-        for key, exts in search_type_keywords.items():
-            if key in type_description:
-                target_extensions = exts
-                break
-    
-    if not os.path.isdir(abs_start_path):
-        console.print(f"[red]Error: Search path '{abs_start_path}' is not a valid directory.[/red]")
-        return []
-    
-    with Progress(console=console, transient=True) as progress_bar:
-        search_task_id = progress_bar.add_task("[cyan]Scanning...", total=None)
-        for root, dirs, files in os.walk(abs_start_path, topdown=True):
-            dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('$')] # Skip hidden/system dirs
-            files = [f for f in files if not f.startswith('.')]
-            if progress_bar.finished: break
-            progress_bar.update(search_task_id, description=f"[cyan]Scanning: {os.path.basename(root)}")
-            
-            for filename in files:
-                if progress_bar.finished: break
-                filepath = os.path.join(root, filename)
-                _, ext = os.path.splitext(filename.lower())
-                if target_extensions and ext not in target_extensions: continue
-
-                item_info = {"name": filename, "type": "file", "path": filepath}
-                needs_content_check = content_search_term or llm_content_check_criteria
-                
-                if needs_content_check:
-                    content = get_file_content_for_search(filepath, console)
-                    if content:
-                        matched_by_simple_search = False
-                        if content_search_term and content_search_term in content.lower():
-                            found_items.append(item_info)
-                            matched_by_simple_search = True
-                        
-                        if llm_content_check_criteria and not matched_by_simple_search: # Only LLM check if not found by simple search
-                            progress_bar.update(search_task_id, description=f"[yellow]LLM check: {filename[:30]}...")
-                            if llm_connector.check_content_match(content, llm_content_check_criteria):
-                                found_items.append(item_info)
-                            progress_bar.update(search_task_id, description=f"[cyan]Scanning: {os.path.basename(root)}")
-                else:
-                    found_items.append(item_info)
-            progress_bar.update(search_task_id, advance=1) # Advance per directory processed
-        progress_bar.update(search_task_id, completed=True, description="[green]Search scan complete.")
+    # Kept for older callers; the query compiler and walker in python/fs_utils are the single search engine.
+    from python import fs_utils as search_engine
+    found_items, error = search_engine.search_files_recursive(start_path, criteria, llm_connector, console_for_progress=console)
+    if error and console:
+        console.print(f"[red]Error: {error}[/red]")
     return found_items
 
 # __main__ block for testing file_utils.py directly (optional)
@@ -2,6 +2,7 @@ import os
 import requests # Using requests for now, can be refactored to google.generativeai SDK
 import json
 from ai_provider import AIProvider
+import http_transport
 
 class GeminiConnector(AIProvider):
     def __init__(self, config: dict):
@@ -16,6 +17,7 @@ class GeminiConnector(AIProvider):
         self.model = config.get("MODEL", "gemini-pro") # Default to a common Gemini model
         # Example base URL, verify and update with the correct Gemini API endpoint
         self.base_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}" 
+        self.session = http_transport.create_session()
 
     def check_connection_and_model(self) -> tuple[bool, bool, list]:
         """
@@ -84,6 +86,13 @@ class GeminiConnector(AIProvider):
         # Placeholder: This method needs actual Gemini API integration.
         return {"error": "Gemini general_chat_completion not implemented"}
 
+    def check_content_match_batch(self, criteria: str, excerpts: list[tuple[str, str]]) -> dict:
+        """
+        Placeholder for batched content relevance checks using Gemini.
+        """
+        # Placeholder: This method needs actual Gemini API integration.
+        return {"error": "Gemini check_content_match_batch not implemented"}
+
 if __name__ == '__main__':
     # Example of how to initialize (requires API_KEY to be set as an env var or passed in config)
     # This is for local testing and might be removed or commented out later.
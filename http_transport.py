@@ -0,0 +1,45 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from config import HTTP_SETTINGS
+
+# Shared HTTP transport for the AI provider connectors: one requests.Session per connector, so
+# requests reuse kept-alive connections from a bounded pool instead of opening a new TCP (and TLS)
+# connection each time, and transient failures are retried with exponential backoff.
+
+
+class _RetryPolicy(Retry):
+    """
+    Retries refused or reset connections and RETRY_STATUSES answers (honouring Retry-After), but never
+    a request that timed out while the server was still working on it: generations are long and
+    repeating one would only double the wait.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if isinstance(error, ReadTimeoutError):
+            raise error
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def create_session(pool_maxsize: int | None = None, headers: dict | None = None) -> requests.Session:
+    """A session whose adapter keeps up to pool_maxsize connections per host and applies the retry policy."""
+    retries = int(HTTP_SETTINGS.get("RETRIES", 3))
+    retry_policy = _RetryPolicy(
+        total=retries, connect=retries, read=retries, other=0,
+        status=retries, status_forcelist=tuple(HTTP_SETTINGS.get("RETRY_STATUSES", (502, 503, 504))),
+        allowed_methods=frozenset(["GET", "POST"]), # LLM requests have no side effects worth guarding
+        backoff_factor=float(HTTP_SETTINGS.get("BACKOFF_FACTOR", 0.5)),
+        respect_retry_after_header=True,
+        raise_on_status=False, # The last error response is returned to the caller as usual
+    )
+    pool_size = max(int(pool_maxsize or 0), int(HTTP_SETTINGS.get("POOL_MAXSIZE", 10)))
+    adapter = HTTPAdapter(pool_connections=int(HTTP_SETTINGS.get("POOL_CONNECTIONS", 4)), pool_maxsize=pool_size,
+                          max_retries=retry_policy)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -16,6 +16,7 @@ from python import session_manager
 from python import direct_parsers
 from python import nlu_processor
 from python import action_handlers as action_handlers_module
+from python import fs_watcher
 # from python import path_resolver # path_resolver is likely used within nlu_processor
 
 import activity_logger # Corrected: activity_logger is top-level
@@ -69,6 +70,7 @@ def main():
 
     action_handlers_map = action_handlers_module.get_action_handler_map()
     MAX_CLARIFICATION_ATTEMPTS = 2
+    fs_watcher.start_watcher() # Keeps indexed folders current in the background
 
     try:
         while True:
@@ -288,11 +290,12 @@ def main():
                         
                         # --- REVISED Handler Call Logic ---
                         if processed_action_name in ["summarize_file", "ask_question_about_file", 
-                                                     "search_files", "general_chat", 
+                                                     "search_files", "continue_search", "general_chat", 
                                                      "propose_and_execute_organization", "redo_activity"]:
                             # These handlers are defined to take (connector, parameters) in action_handlers.py
                             handler_result = handler(connector, processed_parameters)
-                        elif processed_action_name in ["list_folder_contents", "move_item", "show_activity_log"]:
+                        elif processed_action_name in ["list_folder_contents", "move_item", "show_activity_log", "manage_index", "manage_cache",
+                                                       "find_duplicates", "storage_report", "show_more_results"]:
                             # These handlers are defined to take (parameters) in action_handlers.py
                             handler_result = handler(processed_parameters)
                         else:
@@ -345,6 +348,7 @@ def main():
         cli_ui.print_error(f"A critical error occurred in the main application loop: {str(e_main_loop)}","Critical Application Error")
         cli_ui.console.print_exception(show_locals=True)
     finally:
+        fs_watcher.stop_watcher()
         session_manager.save_session_context()
 
 if __name__ == '__main__':
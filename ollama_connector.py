@@ -3,15 +3,28 @@
 import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from ai_provider import AIProvider # Import AIProvider
+import http_transport
 # Removed: from config import OLLAMA_API_BASE_URL, OLLAMA_MODEL
 
+def _is_yes(value) -> bool:
+    """A model's boolean answer: true, or the string "true"/"yes" (any case). "false" and anything else are no."""
+    return value is True or (isinstance(value, str) and value.strip().lower() in ("true", "yes"))
+
 class OllamaConnector(AIProvider): # Inherit from AIProvider
     def __init__(self, config: dict): # Modified __init__ signature
         self.base_url = config.get("BASE_URL", "http://localhost:11434") # Extract from config
         self.model = config.get("MODEL", "gemma3:1b") # Extract from config
         self.api_generate_url = f"{self.base_url}/api/generate"
         self.api_tags_url = f"{self.base_url}/api/tags" # For checking model availability
+        self.max_concurrent_requests = max(1, int(config.get("MAX_CONCURRENT_REQUESTS", 2)))
+        self.relevance_batch_size = max(1, int(config.get("RELEVANCE_BATCH_SIZE", 10)))
+        self.relevance_excerpt_chars = int(config.get("RELEVANCE_EXCERPT_CHARS", 1500))
+        # Summaries, answers and chat replies are rendered token by token (see stream_llm_content)
+        self.stream_responses = bool(config.get("STREAM_RESPONSES", True))
+        # Kept-alive connections, enough for the concurrent relevance requests
+        self.session = http_transport.create_session(pool_maxsize=self.max_concurrent_requests)
 
     def check_connection_and_model(self) -> tuple[bool, bool, list]: # Added type hints
         """
@@ -20,11 +33,11 @@ class OllamaConnector(AIProvider): # Inherit from AIProvider
         """
         try:
             # Check base connection
-            response = requests.get(self.base_url, timeout=5)
+            response = self.session.get(self.base_url, timeout=5)
             response.raise_for_status() # Will raise an HTTPError if the HTTP request returned an unsuccessful status code
             
             # Check model availability
-            models_response = requests.get(self.api_tags_url, timeout=5)
+            models_response = self.session.get(self.api_tags_url, timeout=5)
             models_response.raise_for_status()
             
             available_models_data = models_response.json()
@@ -65,7 +78,7 @@ class OllamaConnector(AIProvider): # Inherit from AIProvider
         response_obj = None 
 
         try:
-            response_obj = requests.post(self.api_generate_url, data=json.dumps(payload), headers=headers, timeout=300) # 5 min timeout
+            response_obj = self.session.post(self.api_generate_url, data=json.dumps(payload), headers=headers, timeout=300) # 5 min timeout
             response_obj.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
             
             ollama_api_response = response_obj.json() # Parse the successful response
@@ -109,6 +122,51 @@ class OllamaConnector(AIProvider): # Inherit from AIProvider
              return {"error_type": "json_decode_error_api", "message": f"Failed to decode Ollama's main API response (not the LLM's JSON output). Error: {e}. Raw response: {response_obj.text[:300] if response_obj else 'N/A'}"}
 
 
+    def _stream_request_to_ollama(self, prompt_text: str):
+        """
+        Sends a streaming request to /api/generate and yields (text_piece, None) for each line of the
+        NDJSON reply as the model produces it, so the first words can be shown right away.
+        A failure, before or during the generation, ends the stream with ("", error_message).
+        Closing the generator early closes the response, which stops the download.
+        """
+        payload = {"model": self.model, "prompt": prompt_text, "stream": True}
+        headers = {"Content-Type": "application/json"}
+        try:
+            # The timeout applies between received chunks, not to the whole generation
+            with self.session.post(self.api_generate_url, data=json.dumps(payload), headers=headers, timeout=300, stream=True) as response_obj:
+                if response_obj.status_code >= 400:
+                    try:
+                        error_body_str = response_obj.json().get("error", "")
+                    except (ValueError, AttributeError):
+                        error_body_str = response_obj.text[:500]
+                    yield "", f"Ollama HTTP Error: {response_obj.status_code} {response_obj.reason}. Response body: {error_body_str}"
+                    return
+                for line in response_obj.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield "", f"Failed to decode a line of Ollama's streamed response. Error: {e}. Raw line: {line[:300]!r}"
+                        return
+                    if chunk.get("error"):
+                        yield "", f"Ollama error: {chunk['error']}"
+                        return
+                    if chunk.get("response"):
+                        yield chunk["response"], None
+                    if chunk.get("done"):
+                        return
+                yield "", "Ollama closed the stream before the generation finished."
+        except requests.exceptions.Timeout:
+            yield "", f"Ollama stopped sending tokens for 300 seconds. Prompt start: {prompt_text[:150]}..."
+        except requests.exceptions.RequestException as e:
+            yield "", f"Ollama Request Error: {e}."
+
+    def stream_llm_content(self, main_instruction: str, context_text: str = ""):
+        """Streaming counterpart of invoke_llm_for_content: yields (text_piece, error) as tokens arrive."""
+        full_prompt = f"{context_text}\n\n---\n\nUser Command: {main_instruction}" if context_text else main_instruction
+        yield from self._stream_request_to_ollama(full_prompt)
+
     def invoke_llm_for_content(self, main_instruction: str, context_text: str = "") -> str:
         """
         Generic LLM invocation for tasks like summarization, Q&A, where a text response is expected.
@@ -177,11 +235,15 @@ Always perform the following steps in your reasoning (which you will articulate
 3.  **Overall Ambiguity Check:** If, after deconstruction, critical information for *any step* is missing or highly ambiguous (and not resolved by chaining or context), set 'clarification_needed' to true and formulate a specific question.
 
 Available actions and their **strict parameter names**:
-- "summarize_file": Parameters: **"file_path"** (string).
+- "summarize_file": Parameters: **"file_path"** (string; a file inside an archive is written as "archive.zip!/inner/path").
 - "ask_question_about_file": Parameters: **"file_path"** (string, can be file or folder), **"question_text"** (string).
 - "list_folder_contents": Parameters: **"folder_path"** (string, e.g., user path, `__CURRENT_DIR__`, `__LAST_LISTED_FOLDER__`, or `__PREVIOUS_ACTION_RESULT_PATH__`).
 - "move_item": Parameters: **"source_path"** (string), **"destination_path"** (string).
-- "search_files": Parameters: **"search_criteria"** (string), **"search_path"** (string, the directory to search within; optional, e.g., user path, `__CURRENT_DIR__`, `__PREVIOUS_ACTION_RESULT_PATH__`).
+- "search_files": Parameters: **"search_criteria"** (string), **"search_path"** (string, the directory to search within; optional, e.g., user path, `__CURRENT_DIR__`, `__PREVIOUS_ACTION_RESULT_PATH__`), **"limit"** (integer, optional, e.g. 10 for "the first 10 pdfs").
+- "find_duplicates": Parameters: **"folder_path"** (string, the directory to check for duplicate files, e.g., user path, `__CURRENT_DIR__`), **"min_size"** (string, optional, e.g. "1mb" to ignore smaller files).
+- "storage_report": Parameters: **"folder_path"** (string, the directory whose disk usage to analyze, e.g., user path, `__CURRENT_DIR__`), **"top_n"** (integer, optional, how many of the largest files and folders to list).
+- "show_more_results": Parameters: **"count"** (integer, optional). Shows the next page of the previous search's results (e.g. "show more", "next 50 results").
+- "continue_search": Parameters: none. Continues the previous search that stopped at its time limit, from where it stopped (e.g. "continue search", "keep searching").
 - "propose_and_execute_organization": Parameters: **"target_path_or_context"** (string, the folder to organize), **"organization_goal"** (string, optional). This action is for organizing contents *within* a folder.
 - "show_activity_log": Parameters: **"count"** (integer, optional).
 - "redo_activity": Parameters: **"activity_identifier"** (string).
@@ -514,25 +576,93 @@ Your JSON plan (must be an array):
             return None
 
 
+    def _summary_instruction(self, file_path_for_context: str) -> str:
+        return f"Summarize the following content from the file '{os.path.basename(file_path_for_context)}'. Provide a concise summary."
+
+    def _question_instruction(self, question: str, file_path_for_context: str) -> str:
+        return f"Regarding the content of the file '{os.path.basename(file_path_for_context)}', answer the following question: {question}"
+
     def get_summary(self, file_content: str, file_path_for_context: str) -> dict:
         """Asks LLM to summarize the given text content."""
-        instruction = f"Summarize the following content from the file '{os.path.basename(file_path_for_context)}'. Provide a concise summary."
-        summary_text = self.invoke_llm_for_content(instruction, file_content)
+        summary_text = self.invoke_llm_for_content(self._summary_instruction(file_path_for_context), file_content)
         if summary_text.startswith("Error:"):
             return {"error": summary_text}
         return {"summary_text": summary_text}
 
+    def stream_summary(self, file_content: str, file_path_for_context: str):
+        """get_summary, streamed: yields (text_piece, error)."""
+        return self.stream_llm_content(self._summary_instruction(file_path_for_context), file_content)
+
     def ask_question_about_text(self, text_content: str, question: str, file_path_for_context: str) -> dict:
         """Asks LLM a question about the given text content."""
-        instruction = f"Regarding the content of the file '{os.path.basename(file_path_for_context)}', answer the following question: {question}"
-        answer_text = self.invoke_llm_for_content(instruction, text_content)
+        answer_text = self.invoke_llm_for_content(self._question_instruction(question, file_path_for_context), text_content)
         if answer_text.startswith("Error:"):
             return {"error": answer_text}
         return {"answer_text": answer_text}
 
+    def stream_answer(self, text_content: str, question: str, file_path_for_context: str):
+        """ask_question_about_text, streamed: yields (text_piece, error)."""
+        return self.stream_llm_content(self._question_instruction(question, file_path_for_context), text_content)
+
     def general_chat_completion(self, user_query: str) -> dict:
         """For general queries not fitting specific actions."""
         response_text = self.invoke_llm_for_content(user_query)
         if response_text.startswith("Error:"):
             return {"error": response_text}
         return {"response_text": response_text}
+
+    def stream_chat(self, user_query: str):
+        """general_chat_completion, streamed: yields (text_piece, error)."""
+        return self.stream_llm_content(user_query)
+
+    def _check_relevance_batch(self, criteria: str, batch: list[tuple[str, str]]) -> tuple[dict, str | None]:
+        """One JSON-mode request for a batch of (file_path, excerpt). Returns ({file_path: bool}, error)."""
+        file_blocks = []
+        for i, (file_path, excerpt) in enumerate(batch, start=1):
+            file_blocks.append(f"[F{i}] {os.path.basename(file_path)}\n{excerpt[:self.relevance_excerpt_chars]}")
+        prompt = f"""You are a file relevance classifier. For each file excerpt below, decide whether the file matches this search: "{criteria}".
+Judge only from the excerpt. Respond ONLY with a JSON object of this exact form, with one entry per file id:
+{{"results": [{{"id": "F1", "relevant": true}}, {{"id": "F2", "relevant": false}}]}}
+
+--- FILES ---
+""" + "\n\n".join(file_blocks)
+
+        response_data = self._send_request_to_ollama(prompt, is_json_mode=True)
+        if not response_data:
+            return {}, "No response from Ollama."
+        if not isinstance(response_data, dict): # JSON mode may return a bare list
+            return {}, f"Unexpected relevance response: {str(response_data)[:200]}"
+        if "error_type" in response_data:
+            return {}, response_data.get("message", "No response from Ollama.")
+        results = response_data.get("results")
+        if not isinstance(results, list):
+            return {}, f"Unexpected relevance response: {str(response_data)[:200]}"
+        verdicts = {}
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+            file_id = str(result.get("id", "")).strip().lstrip("[").rstrip("]").upper()
+            if file_id.startswith("F") and file_id[1:].isdigit() and 1 <= int(file_id[1:]) <= len(batch):
+                verdicts[batch[int(file_id[1:]) - 1][0]] = _is_yes(result.get("relevant"))
+        return verdicts, None
+
+    def check_content_match_batch(self, criteria: str, excerpts: list[tuple[str, str]]) -> dict:
+        """
+        Packs RELEVANCE_BATCH_SIZE excerpts into each prompt and runs the batches on at most
+        MAX_CONCURRENT_REQUESTS worker threads, so N files cost about N / batch_size requests.
+        """
+        if not excerpts:
+            return {"verdicts": {}}
+        batches = [excerpts[i:i + self.relevance_batch_size] for i in range(0, len(excerpts), self.relevance_batch_size)]
+        verdicts = {}
+        errors = []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(batches))) as executor:
+            for batch_verdicts, error in executor.map(lambda batch: self._check_relevance_batch(criteria, batch), batches):
+                verdicts.update(batch_verdicts)
+                if error:
+                    errors.append(error)
+        if errors and not verdicts:
+            return {"error": f"Relevance check failed: {errors[0]}"}
+        if errors:
+            return {"verdicts": verdicts, "errors": errors}
+        return {"verdicts": verdicts}
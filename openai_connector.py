@@ -2,6 +2,7 @@ import os
 import requests # Using requests for now, can be refactored to openai SDK
 import json
 from ai_provider import AIProvider
+import http_transport
 
 class OpenAIConnector(AIProvider):
     def __init__(self, config: dict):
@@ -19,6 +20,7 @@ class OpenAIConnector(AIProvider):
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.session = http_transport.create_session()
 
     def check_connection_and_model(self) -> tuple[bool, bool, list]:
         """
@@ -29,7 +31,7 @@ class OpenAIConnector(AIProvider):
         # Placeholder: This method needs actual OpenAI API integration.
         # Example: try to fetch models list
         # try:
-        #     response = requests.get(f"{self.base_url}/models", headers=self.headers, timeout=10)
+        #     response = self.session.get(f"{self.base_url}/models", headers=self.headers, timeout=10)
         #     if response.status_code == 200:
         #         models_data = response.json().get("data", [])
         #         model_found = any(m.get("id") == self.model for m in models_data)
@@ -95,6 +97,13 @@ class OpenAIConnector(AIProvider):
         # Placeholder: This method needs actual OpenAI API integration.
         return {"error": "OpenAI general_chat_completion not implemented"}
 
+    def check_content_match_batch(self, criteria: str, excerpts: list[tuple[str, str]]) -> dict:
+        """
+        Placeholder for batched content relevance checks using OpenAI.
+        """
+        # Placeholder: This method needs actual OpenAI API integration.
+        return {"error": "OpenAI check_content_match_batch not implemented"}
+
 if __name__ == '__main__':
     # Example of how to initialize (requires API_KEY to be set as an env var or passed in config)
     # This is for local testing and might be removed or commented out later.
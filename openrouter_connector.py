@@ -2,6 +2,7 @@ import os
 import requests
 import json
 from ai_provider import AIProvider
+import http_transport
 
 class OpenRouterConnector(AIProvider):
     def __init__(self, config: dict):
@@ -19,6 +20,7 @@ class OpenRouterConnector(AIProvider):
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.session = http_transport.create_session()
 
     def check_connection_and_model(self) -> tuple[bool, bool, list]:
         """
@@ -30,7 +32,7 @@ class OpenRouterConnector(AIProvider):
         # For example, fetching models (often doesn't require specifying one):
         # GET https://openrouter.ai/api/v1/models
         try:
-            response = requests.get(f"{self.base_url}/models", headers={"Authorization": f"Bearer {self.api_key}"}, timeout=10)
+            response = self.session.get(f"{self.base_url}/models", headers={"Authorization": f"Bearer {self.api_key}"}, timeout=10)
             if response.status_code == 200:
                 models_data = response.json().get("data", [])
                 if self.model: # If a model is specified, check if it's in the list
@@ -99,6 +101,13 @@ class OpenRouterConnector(AIProvider):
         # Placeholder: This method needs actual OpenRouter API integration.
         return {"error": "OpenRouter general_chat_completion not implemented"}
 
+    def check_content_match_batch(self, criteria: str, excerpts: list[tuple[str, str]]) -> dict:
+        """
+        Placeholder for batched content relevance checks using OpenRouter.
+        """
+        # Placeholder: This method needs actual OpenRouter API integration.
+        return {"error": "OpenRouter check_content_match_batch not implemented"}
+
 if __name__ == '__main__':
     # Example of how to initialize and test basic connection (requires API_KEY to be set as an env var or passed in config)
     # This is for local testing and might be removed or commented out later.
@@ -4,27 +4,22 @@ import os
 import shutil
 import time
 import json # For loading activity log if needed for redo
+import re
 import datetime # Added import for datetime
 
-# PDF and DOCX parsing
-try:
-    import fitz  # PyMuPDF
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
-
-try:
-    from docx import Document
-    PYTHON_DOCX_AVAILABLE = True
-except ImportError:
-    PYTHON_DOCX_AVAILABLE = False
-
 # Local project imports
 from . import cli_ui
 from . import cli_constants
 # from . import path_resolver # No longer directly called by handlers for resolve_path
 from . import fs_utils
+from . import fs_watcher
+from . import search_query
+from . import archive_reader
+from . import extraction_cache
+from . import extractors # PDF and DOCX parsers load on first use
+from . import content_sniffer
 import activity_logger # For logging results
+from config import SEARCH_SETTINGS, SEARCH_CACHE_SETTINGS, ARCHIVE_SETTINGS, LARGE_FILE_SETTINGS
 
 from rich.table import Table
 from rich.text import Text
@@ -32,68 +27,174 @@ from rich.live import Live
 from rich.spinner import Spinner
 from rich.panel import Panel
 from rich.box import ROUNDED
+from rich.console import Group
 
 # --- Configuration for Summarization ---
 MAX_CONTENT_LENGTH_FOR_SUMMARY = 20000  # Characters
 MAX_ITEMS_TO_DISPLAY_IN_LIST = 50
+# Bump when _extract_file_content changes its output, so cached extractions are not reused
+CONTENT_EXTRACTOR_VERSION = 1
+# "page 40", "pages 3-5", "pages 10 to 12" in a question about a paginated document
+PAGE_REFERENCE_PATTERN = re.compile(r"\bpages?\s+(\d+)(?:\s*(?:-|–|to|through)\s*(\d+))?", re.IGNORECASE)
+
+# === Helper for Streamed LLM Replies ===
+def _stream_method(connector, name: str):
+    """The connector's streaming variant of a reply (e.g. "stream_summary"), if it has one and streaming is on."""
+    if not getattr(connector, "stream_responses", False):
+        return None
+    return getattr(connector, name, None)
+
+def _render_llm_stream(stream, result_key: str, title: str, icon: str, spinner_text: str) -> dict:
+    """
+    Shows the (text_piece, error) pieces of a streamed LLM reply in a live panel as they arrive, with
+    the spinner standing in until the first token. Returns {result_key: full_text} or {"error": message},
+    like the non-streaming connector methods; a reply cut short by an error is printed as it stood.
+    """
+    text = ""
+    error = None
+    panel_title = f"[panel.title.info]{icon} {title}[/]"
+
+    def render(body):
+        return Panel(body, title=panel_title, border_style="panel.border.info", box=ROUNDED, padding=(1, 2))
+
+    # Transient: the finished reply is printed once in full afterwards, since a live region
+    # taller than the terminal cannot be redrawn; meanwhile only its last lines are shown.
+    with Live(render(Spinner("dots", text=spinner_text)), console=cli_ui.console, transient=True, refresh_per_second=12) as live:
+        try:
+            for piece, error in stream:
+                if error:
+                    break
+                text += piece
+                visible_lines = max(1, cli_ui.console.size.height - 6)
+                tail = "\n".join(text.lstrip().rsplit("\n", visible_lines)[-visible_lines:])
+                live.update(render(Text(tail[-visible_lines * cli_ui.console.size.width:])))
+        finally:
+            stream.close()
+
+    text = text.strip()
+    if error:
+        if text:
+            cli_ui.print_panel_message(f"{title} (incomplete)", text, "info", icon)
+        return {"error": error}
+    return {result_key: text}
 
 # === Helper for Content Extraction ===
-def _extract_file_content(resolved_path: str, file_extension: str) -> tuple[str, str, str | None]:
+def _extract_file_content(resolved_path: str, file_extension: str,
+                          pages: tuple[int, int] | None = None) -> tuple[str, str, str | None]:
     """
     Extracts content from a file based on its extension.
-    Assumes resolved_path is an absolute, existing file path.
+    Assumes resolved_path is an absolute, existing file path, or an "archive.zip!/inner/path" member
+    address, whose bytes are read from the archive into memory (never extracted to disk).
+    Parsed documents and archive members are served from the extraction cache while unchanged;
+    plain text files are cheaper to read again than to cache.
+    pages=(first, last) reads only those pages of a PDF (served from its cached page batches if possible).
     """
-    file_content = ""
-    content_source = "unknown"
-    error_message = None
+    is_member = archive_reader.split_member_path(resolved_path) is not None
+    kind = _sniffed_kind(resolved_path)
+    if content_sniffer.is_skipped(kind) and kind != "empty":
+        error_message = f"{os.path.basename(resolved_path)} appears to be a binary file ({kind}), so it has no text to extract."
+        cli_ui.print_warning(error_message, "Content Extraction Issue")
+        return "", "binary_file_skipped", error_message
+    mime_type = content_sniffer.mime_type_for(kind)
+    extractor = extractors.get_extractor(resolved_path, file_extension, mime_type)
+    if extractor is None or (isinstance(extractor, extractors.TextExtractor) and not is_member):
+        return _extract_file_content_uncached(resolved_path, file_extension, mime_type)
+    if pages is not None and isinstance(extractor, extractors.PdfExtractor):
+        return _extract_file_content_uncached(resolved_path, file_extension, mime_type, pages)
+    version = f"{CONTENT_EXTRACTOR_VERSION}.{extractor.name}-{extractor.version}"
+    cache_key = extraction_cache.make_key(resolved_path, "full", version)
+    cached = extraction_cache.lookup(resolved_path, "full", version, key=cache_key)
+    if cached is not None:
+        content_source, file_content = cached
+        return file_content, content_source, None
+    file_content, content_source, error_message = _extract_file_content_uncached(resolved_path, file_extension, mime_type)
+    if error_message is None:
+        extraction_cache.store(resolved_path, "full", version, content_source, file_content, key=cache_key)
+    return file_content, content_source, error_message
 
-    try:
-        if file_extension == ".pdf":
-            if not PYMUPDF_AVAILABLE:
-                error_message = "PyMuPDF library not found. Cannot parse .pdf files. Please run: pip install pymupdf"
-                return "", "pdf_parsing_skipped_dependency", error_message
-            content_source = "pdf_parsed"
-            doc = fitz.open(resolved_path)
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                file_content += page.get_text("text")
-            doc.close()
-            if not file_content.strip():
-                error_message = f"Extracted no text from PDF: {os.path.basename(resolved_path)}. The PDF might be image-based or protected."
-        
-        elif file_extension == ".docx":
-            if not PYTHON_DOCX_AVAILABLE:
-                error_message = "python-docx library not found. Cannot parse .docx files. Please run: pip install python-docx"
-                return "", "docx_parsing_skipped_dependency", error_message
-            content_source = "docx_parsed"
-            doc = Document(resolved_path)
-            for para in doc.paragraphs:
-                file_content += para.text + "\n"
-            if not file_content.strip():
-                error_message = f"Extracted no text from DOCX: {os.path.basename(resolved_path)}."
-
-        elif file_extension in [".txt", ".md", ".py", ".json", ".html", ".css", ".js", ".log", ".csv", ".xml", ".yaml", ".yml", ".sh", ".bat", ".ps1", ".c", ".cpp", ".java", ".go", ".rb", ".php"]:
-            content_source = f"{file_extension}_text_file_read"
-            with open(resolved_path, "r", encoding="utf-8", errors="ignore") as f:
-                file_content = f.read()
-            if not file_content.strip():
-                error_message = f"File {os.path.basename(resolved_path)} appears to be empty."
-        else:
-            content_source = "unsupported_type_no_extraction"
-            error_message = f"File type '{file_extension}' is not directly supported for content extraction."
+def _extract_file_content_uncached(resolved_path: str, file_extension: str, mime_type: str | None = None,
+                                   pages: tuple[int, int] | None = None) -> tuple[str, str, str | None]:
+    member_bytes = None
+    if archive_reader.split_member_path(resolved_path):
+        member_bytes, read_error = archive_reader.read_member(resolved_path, ARCHIVE_SETTINGS.get("MAX_MEMBER_READ_BYTES", 32 * 1024 * 1024))
+        if read_error:
+            cli_ui.print_warning(read_error, "Content Extraction Issue")
+            return "", "archive_read_error", read_error
 
-    except fitz.fitz.FitxError as e_pdf:
-        error_message = f"Error processing PDF file {os.path.basename(resolved_path)}: {e_pdf}. It might be corrupted or password-protected."
-        content_source = "pdf_processing_error"
+    try:
+        file_content, content_source, error_message = extractors.extract_text(resolved_path, file_extension, data=member_bytes, mime_type=mime_type,
+                                                                               pages=pages)
     except Exception as e_extraction:
+        file_content, content_source = "", "extraction_error"
         error_message = f"An unexpected error occurred during content extraction of {os.path.basename(resolved_path)}: {str(e_extraction)}"
-        content_source = "extraction_error"
+    if error_message is None and not file_content.strip():
+        if file_extension == ".pdf" and pages is not None:
+            error_message = f"Extracted no text from pages {pages[0]}-{pages[1]} of PDF: {os.path.basename(resolved_path)}. The PDF might have fewer pages, or they might be image-based."
+        elif file_extension == ".pdf":
+            error_message = f"Extracted no text from PDF: {os.path.basename(resolved_path)}. The PDF might be image-based or protected."
+        elif file_extension == ".docx":
+            error_message = f"Extracted no text from DOCX: {os.path.basename(resolved_path)}."
+        else:
+            error_message = f"File {os.path.basename(resolved_path)} appears to be empty."
 
     if error_message:
         cli_ui.print_warning(error_message, "Content Extraction Issue")
         
     return file_content, content_source, error_message
 
+def _sniffed_kind(resolved_path: str) -> str | None:
+    """What a file on disk contains, from its first bytes (see content_sniffer); None for archive members."""
+    if not content_sniffer.is_enabled() or archive_reader.split_member_path(resolved_path):
+        return None
+    return content_sniffer.sniff(resolved_path)
+
+
+def _requested_pages(question: str) -> tuple[int, int] | None:
+    """(first, last) page numbers referred to by a question ("what does page 40 say?"), or None."""
+    match = PAGE_REFERENCE_PATTERN.search(question or "")
+    if not match:
+        return None
+    first = int(match.group(1))
+    last = int(match.group(2)) if match.group(2) else first
+    return (first, last) if first <= last else (last, first)
+
+def _extract_content_for_llm(resolved_path: str, file_extension: str,
+                             pages: tuple[int, int] | None = None) -> tuple[str, str, str | None, bool]:
+    """
+    Text of a file for an LLM prompt, at most MAX_CONTENT_LENGTH_FOR_SUMMARY characters (plus markers).
+    Larger files are sampled as set by LARGE_FILE_SETTINGS; plain text files on disk are read window by
+    window with seek(), so memory use does not grow with the file size. `pages` limits PDFs to those pages.
+    Returns (content, content_source, error_message, truncated).
+    """
+    mode = LARGE_FILE_SETTINGS.get("SAMPLING", "spread")
+    middle_windows = LARGE_FILE_SETTINGS.get("MIDDLE_WINDOWS", 3)
+    kind = _sniffed_kind(resolved_path)
+    extractor = extractors.get_extractor(resolved_path, file_extension, content_sniffer.mime_type_for(kind))
+    if isinstance(extractor, extractors.TextExtractor) and not content_sniffer.is_skipped(kind) \
+            and not archive_reader.split_member_path(resolved_path):
+        content_source = f"{file_extension}_text_file_read"
+        try:
+            file_content, truncated = extractors.read_text_sample(resolved_path, MAX_CONTENT_LENGTH_FOR_SUMMARY, middle_windows, mode)
+        except OSError as e:
+            error_message = f"Could not read {os.path.basename(resolved_path)}: {e}"
+            cli_ui.print_warning(error_message, "Content Extraction Issue")
+            return "", "extraction_error", error_message, False
+        error_message = None
+        if not file_content.strip():
+            error_message = f"File {os.path.basename(resolved_path)} appears to be empty."
+            cli_ui.print_warning(error_message, "Content Extraction Issue")
+        return file_content, content_source, error_message, truncated
+
+    file_content, content_source, error_message = _extract_file_content(resolved_path, file_extension, pages)
+    file_content, truncated = extractors.sample_text(file_content, MAX_CONTENT_LENGTH_FOR_SUMMARY, middle_windows, mode)
+    return file_content, content_source, error_message, truncated
+
+def _print_sampling_notice(purpose: str):
+    if LARGE_FILE_SETTINGS.get("SAMPLING", "spread") == "head":
+        cli_ui.print_info(f"Content was truncated for LLM {purpose} due to length.", "Content Truncation")
+    else:
+        cli_ui.print_info(f"The file is long; the LLM {purpose} is based on its beginning, evenly spaced parts of the middle and its end.", "Content Sampled")
+
 
 # === Action Handlers ===
 # IMPORTANT ASSUMPTION: All path parameters (file_path, folder_path, search_path, etc.)
@@ -115,7 +216,7 @@ def handle_summarize_file(connector, parameters: dict):
         return
 
     # nlu_processor should have ensured this is a file. Handler can re-verify if critical.
-    if not os.path.isfile(resolved_path):
+    if not os.path.isfile(resolved_path) and not archive_reader.member_exists(resolved_path):
         cli_ui.print_error(f"Provided path is not a file: {resolved_path}", "File Error")
         activity_logger.update_last_activity_status("failure", f"Path is not a file: {resolved_path}")
         return
@@ -123,7 +224,7 @@ def handle_summarize_file(connector, parameters: dict):
     file_extension = os.path.splitext(resolved_path)[1].lower()
     cli_ui.console.print(f"{cli_constants.ICONS.get('file','📄')} Attempting to summarize: [filepath]{resolved_path}[/filepath]")
 
-    file_content, content_source, extraction_error = _extract_file_content(resolved_path, file_extension)
+    file_content, content_source, extraction_error, truncated = _extract_content_for_llm(resolved_path, file_extension)
 
     if not file_content.strip() and extraction_error:
         llm_input_content = f"I attempted to summarize the file at path '{resolved_path}'. It is a '{file_extension}' file. However, I encountered an issue extracting its content. The error was: '{extraction_error}'. Can you provide a generic statement or acknowledge this based on the filename and type, or ask the user for more information if needed?"
@@ -132,13 +233,17 @@ def handle_summarize_file(connector, parameters: dict):
     else:
         llm_input_content = file_content
 
-    if len(llm_input_content) > MAX_CONTENT_LENGTH_FOR_SUMMARY:
-        llm_input_content = llm_input_content[:MAX_CONTENT_LENGTH_FOR_SUMMARY] + "\n\n[Content truncated due to length]"
-        cli_ui.print_info("Content was truncated for LLM summary due to length.", "Content Truncation")
+    if truncated:
+        _print_sampling_notice("summary")
 
     summary_spinner_text = f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Asking LLM to summarize '{os.path.basename(resolved_path)}' ({content_source})...[/spinner_style]"
-    with Live(Spinner("dots", text=summary_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
-        summary_result = connector.get_summary(llm_input_content, resolved_path)
+    stream_summary = _stream_method(connector, "stream_summary")
+    if stream_summary:
+        summary_result = _render_llm_stream(stream_summary(llm_input_content, resolved_path), "summary_text",
+                                            "LLM Summary", cli_constants.ICONS.get('summary','📝'), summary_spinner_text)
+    else:
+        with Live(Spinner("dots", text=summary_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
+            summary_result = connector.get_summary(llm_input_content, resolved_path)
 
     if summary_result and summary_result.get("summary_text"):
         cli_ui.print_panel_message("LLM Summary", summary_result["summary_text"], "info", cli_constants.ICONS.get('summary','📝'))
@@ -164,7 +269,7 @@ def handle_ask_question_about_file(connector, parameters: dict):
         activity_logger.update_last_activity_status("failure", "Missing resolved file_path or question.")
         return
 
-    if not os.path.isfile(resolved_path):
+    if not os.path.isfile(resolved_path) and not archive_reader.member_exists(resolved_path):
         cli_ui.print_error(f"Provided path is not a file: {resolved_path}", "File Error")
         activity_logger.update_last_activity_status("failure", f"Path for Q&A is not a file: {resolved_path}")
         return
@@ -172,7 +277,11 @@ def handle_ask_question_about_file(connector, parameters: dict):
     file_extension = os.path.splitext(resolved_path)[1].lower()
     cli_ui.console.print(f"{cli_constants.ICONS.get('question','❓')} Finding answer for '{question[:50]}...' in [filepath]{resolved_path}[/filepath]")
 
-    file_content, content_source, extraction_error = _extract_file_content(resolved_path, file_extension)
+    pages = _requested_pages(question) if isinstance(extractors.get_extractor(resolved_path, file_extension), extractors.PdfExtractor) else None
+    if pages:
+        page_label = f"page {pages[0]}" if pages[0] == pages[1] else f"pages {pages[0]}-{pages[1]}"
+        cli_ui.print_info(f"Reading only {page_label} of the PDF.", "Page Range")
+    file_content, content_source, extraction_error, truncated = _extract_content_for_llm(resolved_path, file_extension, pages)
     
     if not file_content.strip() and extraction_error:
         llm_input_content = f"I was asked the question: '{question}' about the file at path '{resolved_path}' (type: '{file_extension}'). I encountered an error trying to read its content: '{extraction_error}'. Please respond appropriately, perhaps indicating you cannot answer without the content."
@@ -181,13 +290,17 @@ def handle_ask_question_about_file(connector, parameters: dict):
     else:
         llm_input_content = file_content
     
-    if len(llm_input_content) > MAX_CONTENT_LENGTH_FOR_SUMMARY:
-        llm_input_content = llm_input_content[:MAX_CONTENT_LENGTH_FOR_SUMMARY] + "\n\n[Content truncated due to length]"
-        cli_ui.print_info("Content was truncated for LLM Q&A due to length.", "Content Truncation")
+    if truncated:
+        _print_sampling_notice("answer")
 
     qna_spinner_text = f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Asking LLM about '{os.path.basename(resolved_path)}' ({content_source})...[/spinner_style]"
-    with Live(Spinner("dots", text=qna_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
-        answer_result = connector.ask_question_about_text(llm_input_content, question, resolved_path)
+    stream_answer = _stream_method(connector, "stream_answer")
+    if stream_answer:
+        answer_result = _render_llm_stream(stream_answer(llm_input_content, question, resolved_path), "answer_text",
+                                           "LLM Answer", cli_constants.ICONS.get('answer','💡'), qna_spinner_text)
+    else:
+        with Live(Spinner("dots", text=qna_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
+            answer_result = connector.ask_question_about_text(llm_input_content, question, resolved_path)
 
     if answer_result and answer_result.get("answer_text"):
         cli_ui.print_panel_message("LLM Answer", answer_result["answer_text"], "info", cli_constants.ICONS.get('answer','💡'))
@@ -274,6 +387,20 @@ def handle_list_folder_contents(parameters: dict):
         activity_logger.update_last_activity_status("failure", f"Unexpected listing error: {e}")
 
 
+def _format_line_match(item: dict) -> Text:
+    """'L12: ...snippet...' for the first grep match of a search result, with the matched term highlighted."""
+    if not item.get("matches"):
+        return Text("")
+    first_match = item["matches"][0]
+    match_text = Text(f"L{first_match['line']}: ", style="dim")
+    snippet = Text(first_match["snippet"])
+    start = first_match["snippet_offset"]
+    snippet.stylize("highlight", start, start + len(first_match["term"]))
+    match_text.append_text(snippet)
+    if len(item["matches"]) > 1:
+        match_text.append(f" (+{len(item['matches']) - 1} more)", style="dim")
+    return match_text
+
 def handle_search_files(connector, parameters: dict):
     """Searches for files based on criteria."""
     activity_logger.log_action("search_files", parameters, "pending_execution", "Attempting to search files.")
@@ -299,77 +426,190 @@ def handle_search_files(connector, parameters: dict):
         activity_logger.update_last_activity_status("failure", "Missing search criteria.")
         return
 
-    cli_ui.console.print(f"{cli_constants.ICONS.get('search','🔍')} Searching in [filepath]{resolved_search_path}[/filepath] for: '[highlight]{search_criteria}[/highlight]'")
+    limit = SEARCH_SETTINGS.get("DEFAULT_RESULT_LIMIT")
+    if parameters.get("limit") not in (None, "", "__MISSING__"):
+        try:
+            limit = max(1, int(parameters.get("limit")))
+        except (TypeError, ValueError):
+            cli_ui.print_warning(f"Ignoring invalid result limit '{parameters.get('limit')}'.", "Search Warning")
+
+    _run_search(connector, resolved_search_path, search_criteria, limit)
+
+def handle_continue_search(connector, parameters: dict):
+    """Continues the last search that stopped at its time limit, from where it stopped."""
+    from . import session_manager
+    activity_logger.log_action("continue_search", parameters, "pending_execution", "Continuing the last search.")
+    session_ctx = session_manager.get_session_context()
+    cursor = session_ctx.get("last_search_cursor")
+    if not cursor:
+        cli_ui.print_info("The last search finished, so there is nothing to continue. Run a new search instead.", "Nothing to Continue")
+        activity_logger.update_last_activity_status("failure", "No stopped search to continue.")
+        return
+    if not os.path.isdir(cursor.get("root", "")):
+        cli_ui.print_error(f"The folder of the stopped search no longer exists: {cursor.get('root')}", "Search Path Error")
+        activity_logger.update_last_activity_status("failure", f"Search path not a directory: {cursor.get('root')}")
+        session_manager.update_session_context("last_search_cursor", None)
+        return
+    previous_items = list(session_ctx.get("last_search_results") or [])
+    limit = cursor.get("limit")
+    if limit is not None:
+        limit = max(0, limit - cursor.get("found", len(previous_items)))
+    _run_search(connector, cursor["root"], cursor["criteria"], limit, cursor=cursor, previous_items=previous_items)
+
+def _run_search(connector, resolved_search_path: str, search_criteria: str, limit: int | None,
+                cursor: dict | None = None, previous_items: list | None = None):
+    """
+    Runs a search (or continues one from `cursor`), streaming rows into a live table, and stores the
+    results in the session. A search stopped by SEARCH_SETTINGS["MAX_SECONDS"] keeps its cursor so
+    "continue search" can pick up from there; continued results are numbered after `previous_items`.
+    """
+    previous_items = previous_items or []
+    if cursor:
+        cli_ui.console.print(f"{cli_constants.ICONS.get('search','🔍')} Continuing search in [filepath]{resolved_search_path}[/filepath] for: '[highlight]{search_criteria}[/highlight]'")
+    else:
+        cli_ui.console.print(f"{cli_constants.ICONS.get('search','🔍')} Searching in [filepath]{resolved_search_path}[/filepath] for: '[highlight]{search_criteria}[/highlight]'")
     
-    found_items = []
     search_spinner_text = f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Searching files...[/spinner_style]"
 
-    with Live(Spinner("dots", text=search_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
-        time.sleep(0.1) 
-        # TODO: Replace with a more robust search from fs_utils, potentially using fs_utils.search_files_recursive
-        # This current search is very basic (non-recursive name check).
-        for entry in os.scandir(resolved_search_path):
-            # Allow searching for "image" or "document" types, or specific extensions
-            is_match = False
-            entry_name_lower = entry.name.lower()
-            search_criteria_lower = search_criteria.lower()
-
-            if search_criteria_lower in entry_name_lower: # Basic name matching
-                is_match = True
-            elif fs_utils.is_file_type_match(entry.path, search_criteria_lower, entry.is_file()): # Type matching
-                is_match = True
-            
-            if is_match:
-                stat = entry.stat()
-                found_items.append({
-                    "name": entry.name,
-                    "path": entry.path, # This is already absolute from os.scandir
-                    "type": "directory" if entry.is_dir() else "file",
-                    "size_bytes": stat.st_size,
-                    "size_readable": fs_utils.bytes_to_readable(stat.st_size),
-                    "modified_timestamp": stat.st_mtime,
-                    "modified_readable": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stat.st_mtime))
-                })
-    
-    if not found_items:
+    table = Table(title=None, show_header=True, header_style="table.header", box=ROUNDED)
+    table.add_column("#", style="dim", width=4, justify="right")
+    table.add_column("Name", style="dim_text", min_width=30, overflow="fold")
+    table.add_column("Path", style="filepath", min_width=40, overflow="fold")
+    table.add_column("Type", width=10)
+    compiled_query = search_query.compile_query(search_criteria)
+    show_line_matches = bool(compiled_query.content_terms)
+    show_scores = compiled_query.is_ranked
+    if show_line_matches:
+        table.add_column("First Match", overflow="fold")
+    if show_scores:
+        table.add_column("Score", width=7, justify="right")
+
+    # Rows are added as matches stream in; the spinner below the table shows where the walk is.
+    spinner = Spinner("dots", text=search_spinner_text)
+    found_items = []
+    search_error = None
+    outcome = {}
+    with Live(Group(table, spinner), console=cli_ui.console, refresh_per_second=10) as live:
+        def on_progress(description: str):
+            spinner.update(text=f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} {description} ({len(found_items)} found)[/spinner_style]")
+
+        try:
+            for item in fs_utils.iter_search_files(resolved_search_path, search_criteria, connector, limit=limit, on_progress=on_progress,
+                                                   cursor=cursor, outcome=outcome):
+                found_items.append(item)
+                if len(found_items) <= MAX_ITEMS_TO_DISPLAY_IN_LIST:
+                    item_type_icon = cli_constants.ICONS.get('folder','📁') if item['type'] == 'directory' else cli_constants.ICONS.get('file','📄')
+                    row = [
+                        str(len(previous_items) + len(found_items)),
+                        Text(f"{item_type_icon} {item['name']}"),
+                        Text(item['path'], style="filepath"),
+                        item['type'].capitalize()
+                    ]
+                    if show_line_matches:
+                        row.append(_format_line_match(item))
+                    if show_scores:
+                        row.append(f"{item.get('score', 0):.2f}")
+                    table.add_row(*row)
+        except Exception as e:
+            search_error = f"Error during file search: {e}"
+
+        if len(found_items) > MAX_ITEMS_TO_DISPLAY_IN_LIST:
+            table.add_row("...", f"... and {len(found_items) - MAX_ITEMS_TO_DISPLAY_IN_LIST} more items ...", "", "", *([""] * (show_line_matches + show_scores)))
+        # Leave only the table on screen (or nothing if there were no results)
+        live.update(table if found_items else Text(""))
+
+    if search_error:
+        cli_ui.print_warning(f"Search finished with an error: {search_error}", "Search Warning")
+
+    from . import session_manager
+    next_cursor = outcome.get("cursor") if outcome.get("partial") and not search_error else None
+    if next_cursor is not None:
+        next_cursor["limit"] = None if limit is None else limit + len(previous_items)
+    session_manager.update_session_context("last_search_cursor", next_cursor)
+    if next_cursor is not None:
+        cli_ui.print_warning(f"The search stopped after {SEARCH_SETTINGS.get('MAX_SECONDS')} seconds; results may be incomplete. "
+                             "Say [highlight]continue search[/highlight] to keep searching from where it stopped.", "Partial Results")
+
+    all_items = previous_items + found_items
+    if not all_items:
         cli_ui.print_info(f"No items found matching '[highlight]{search_criteria}[/highlight]' in [filepath]{resolved_search_path}[/filepath].", "Search Complete")
-        activity_logger.update_last_activity_status("success", "Search complete (no results).", result_data={"path": resolved_search_path, "criteria": search_criteria, "count": 0})
-        from . import session_manager
+        activity_logger.update_last_activity_status("success", "Search complete (no results).", result_data={"path": resolved_search_path, "criteria": search_criteria, "count": 0, "partial": next_cursor is not None})
         session_manager.update_session_context("last_search_results", [])
+        session_manager.update_session_context("last_search_page_end", 0)
         return
 
-    cli_ui.print_success(f"Found {len(found_items)} item(s) matching [highlight]'{search_criteria}'[/highlight]:", "Search Results")
+    limit_reached = limit is not None and len(found_items) >= limit
+    if limit_reached:
+        cli_ui.print_success(f"Showing the first {len(all_items)} item(s) matching [highlight]'{search_criteria}'[/highlight] (result limit reached).", "Search Results")
+    elif previous_items:
+        cli_ui.print_success(f"Found {len(found_items)} more item(s) matching [highlight]'{search_criteria}'[/highlight] ({len(all_items)} in total).", "Search Results")
+    else:
+        cli_ui.print_success(f"Found {len(found_items)} item(s) matching [highlight]'{search_criteria}'[/highlight].", "Search Results")
+    activity_logger.update_last_activity_status("success", f"Search found {len(found_items)} items.", result_data={"path": resolved_search_path, "criteria": search_criteria, "count": len(found_items), "partial": next_cursor is not None})
     
+    session_manager.update_session_context("last_search_results", all_items)
+    session_manager.update_session_context("last_search_page_end", len(previous_items) + min(len(found_items), MAX_ITEMS_TO_DISPLAY_IN_LIST))
+    session_manager.update_session_context("last_search_limit_reached", limit_reached)
+    if len(found_items) > MAX_ITEMS_TO_DISPLAY_IN_LIST:
+        cli_ui.print_info("Say [highlight]show more results[/highlight] to see the next page.", "More Results")
+
+def handle_show_more_results(parameters: dict):
+    """Shows the next page of the last search's results from the session, without searching again."""
+    from . import session_manager
+    activity_logger.log_action("show_more_results", parameters, "pending_execution", "Showing more search results.")
+    session_ctx = session_manager.get_session_context()
+    found_items = session_ctx.get("last_search_results") or []
+    if not found_items:
+        cli_ui.print_info("There are no search results to page through. Run a search first.", "No Results")
+        activity_logger.update_last_activity_status("failure", "No previous search results.")
+        return
+
+    page_size = SEARCH_CACHE_SETTINGS.get("PAGE_SIZE", 50)
+    if parameters.get("count") not in (None, "", "__MISSING__"):
+        try:
+            page_size = max(1, int(parameters.get("count")))
+        except (TypeError, ValueError):
+            cli_ui.print_warning(f"Ignoring invalid count '{parameters.get('count')}'.", "Results Warning")
+    start = min(int(session_ctx.get("last_search_page_end") or 0), len(found_items))
+    if start >= len(found_items):
+        if session_ctx.get("last_search_limit_reached"):
+            cli_ui.print_info(f"All {len(found_items)} results of the last search were shown; it stopped at its result limit. "
+                              "Search again with a higher limit (e.g. 'the first 5000 ...') to see more.", "No More Results")
+        else:
+            cli_ui.print_info(f"All {len(found_items)} results of the last search were already shown.", "No More Results")
+        activity_logger.update_last_activity_status("success", "No more search results.", result_data={"count": 0})
+        return
+    end = min(start + page_size, len(found_items))
+
+    page_items = found_items[start:end]
+    show_line_matches = any(item.get("matches") for item in page_items)
+    show_scores = any("score" in item for item in page_items)
     table = Table(title=None, show_header=True, header_style="table.header", box=ROUNDED)
     table.add_column("#", style="dim", width=4, justify="right")
     table.add_column("Name", style="dim_text", min_width=30, overflow="fold")
     table.add_column("Path", style="filepath", min_width=40, overflow="fold")
     table.add_column("Type", width=10)
-
-    display_count = 0
-    for i, item in enumerate(found_items):
-        if display_count >= MAX_ITEMS_TO_DISPLAY_IN_LIST and len(found_items) > MAX_ITEMS_TO_DISPLAY_IN_LIST + 5:
-            remaining_items = len(found_items) - display_count
-            table.add_row("...", f"... and {remaining_items} more items ...", "", "")
-            break
-
-        item_type_icon = cli_constants.ICONS.get('folder','📁') if item['type'] == 'directory' else cli_constants.ICONS.get('file','📄')
-        name_display = Text(f"{item_type_icon} {item['name']}")
-        path_display = Text(item['path'], style="filepath")
-
-        table.add_row(
-            str(i + 1),
-            name_display,
-            path_display,
-            item['type'].capitalize()
-        )
-        display_count +=1
-
+    if show_line_matches:
+        table.add_column("First Match", overflow="fold")
+    if show_scores:
+        table.add_column("Score", width=7, justify="right")
+    for number, item in enumerate(page_items, start=start + 1):
+        item_type_icon = cli_constants.ICONS.get('folder','📁') if item.get('type') == 'directory' else cli_constants.ICONS.get('file','📄')
+        row = [str(number), Text(f"{item_type_icon} {item.get('name', '')}"), Text(item.get('path', ''), style="filepath"),
+               str(item.get('type', 'file')).capitalize()]
+        if show_line_matches:
+            row.append(_format_line_match(item))
+        if show_scores:
+            row.append(f"{item.get('score', 0):.2f}")
+        table.add_row(*row)
     cli_ui.console.print(table)
-    activity_logger.update_last_activity_status("success", f"Search found {len(found_items)} items.", result_data={"path": resolved_search_path, "criteria": search_criteria, "count": len(found_items)})
-    
-    from . import session_manager
-    session_manager.update_session_context("last_search_results", found_items)
+
+    session_manager.update_session_context("last_search_page_end", end)
+    remaining = len(found_items) - end
+    cli_ui.print_success(f"Showing results {start + 1}-{end} of {len(found_items)}" +
+                         (f" ({remaining} more; say [highlight]show more results[/highlight])." if remaining else "."), "Search Results")
+    activity_logger.update_last_activity_status("success", f"Showed search results {start + 1}-{end}.",
+                                                result_data={"start": start + 1, "end": end, "total": len(found_items)})
 
 
 def handle_move_item(parameters: dict):
@@ -411,6 +651,7 @@ def handle_move_item(parameters: dict):
              try:
                  # Attempt to create the parent directory for the destination
                  os.makedirs(dest_parent_dir, exist_ok=True)
+                 fs_watcher.dispatch_event({"type": "created", "path": os.path.abspath(dest_parent_dir), "dest_path": None, "is_dir": True, "sync_dirs": set()})
                  cli_ui.print_info(f"Created destination directory: [filepath]{dest_parent_dir}[/filepath]", "Directory Created")
              except Exception as e_mkdir:
                  cli_ui.print_error(f"Destination directory [filepath]{dest_parent_dir}[/filepath] does not exist and could not be created: {e_mkdir}", "Move Error")
@@ -446,7 +687,8 @@ def handle_move_item(parameters: dict):
 
     try:
         cli_ui.console.print(f"{cli_constants.ICONS.get('move','➡️')} Moving [filepath]{resolved_source}[/filepath] to [filepath]{final_destination_path}[/filepath]...")
-        shutil.move(resolved_source, final_destination_path)
+        with fs_watcher.recorded_move(resolved_source, final_destination_path):
+            shutil.move(resolved_source, final_destination_path)
         cli_ui.print_success(f"Successfully moved item to [filepath]{final_destination_path}[/filepath].", "Move Complete")
         activity_logger.update_last_activity_status("success", "Item moved successfully.", result_data={"source": resolved_source, "destination": final_destination_path})
     except Exception as e:
@@ -559,6 +801,7 @@ def handle_propose_and_execute_organization(connector, parameters: dict):
                 folder_to_create = os.path.join(resolved_path, step.get("path").strip('/\\'))
                 if not os.path.exists(folder_to_create):
                     os.makedirs(folder_to_create)
+                    fs_watcher.dispatch_event({"type": "created", "path": os.path.abspath(folder_to_create), "dest_path": None, "is_dir": True, "sync_dirs": set()})
                     cli_ui.console.print(f"[green]Created folder: {folder_to_create}[/green]")
                     action_result = True
                 else:
@@ -578,7 +821,8 @@ def handle_propose_and_execute_organization(connector, parameters: dict):
                         os.makedirs(dest_dir_abs) 
                         cli_ui.console.print(f"[dim]Ensured destination directory exists: {dest_dir_abs}[/dim]", end=" -> ")
                     
-                    shutil.move(source_abs, dest_abs)
+                    with fs_watcher.recorded_move(source_abs, dest_abs):
+                        shutil.move(source_abs, dest_abs)
                     cli_ui.console.print(f"[green]Moved {step.get('source')} to {step.get('destination')}[/green]")
                     action_result = True
             else:
@@ -678,8 +922,13 @@ def handle_general_chat(connector, parameters: dict):
     cli_ui.console.print(f"{cli_constants.ICONS.get('thinking','🤔')} Thinking about: \"{user_query[:60]}...\"")
     
     chat_spinner_text = f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Processing general query...[/spinner_style]"
-    with Live(Spinner("dots", text=chat_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
-        response = connector.general_chat_completion(user_query)
+    stream_chat = _stream_method(connector, "stream_chat")
+    if stream_chat:
+        response = _render_llm_stream(stream_chat(user_query), "response_text",
+                                      "LLM Response", cli_constants.ICONS.get('app_icon','🤖'), chat_spinner_text)
+    else:
+        with Live(Spinner("dots", text=chat_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
+            response = connector.general_chat_completion(user_query)
 
     if response and response.get("response_text"):
         cli_ui.print_panel_message("LLM Response", response["response_text"], "info", cli_constants.ICONS.get('app_icon','🤖'))
@@ -692,6 +941,111 @@ def handle_general_chat(connector, parameters: dict):
         activity_logger.update_last_activity_status("failure", "LLM no valid response for general chat.")
 
 
+def handle_manage_index(parameters: dict):
+    """Builds, reports on or compacts the persistent metadata index (`index build|status|vacuum`)."""
+    from . import metadata_index, content_index, semantic_index
+    activity_logger.log_action("manage_index", parameters, "pending_execution", "Attempting to manage metadata index.")
+    operation = parameters.get("operation", "status")
+
+    if operation == "build":
+        resolved_path = parameters.get("folder_path") or os.getcwd()
+        if not os.path.isdir(resolved_path):
+            cli_ui.print_error(f"Path to index is not a directory: {resolved_path}", "Index Error")
+            activity_logger.update_last_activity_status("failure", f"Index path not a directory: {resolved_path}")
+            return
+        force = bool(parameters.get("force", False))
+        index_spinner_text = f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Indexing '{resolved_path}'...[/spinner_style]"
+        with Live(Spinner("dots", text=index_spinner_text), console=cli_ui.console, transient=True, refresh_per_second=10):
+            stats, error = metadata_index.refresh_tree(resolved_path, force=force)
+        if error:
+            cli_ui.print_error(f"Index build failed: {error}", "Index Error")
+            activity_logger.update_last_activity_status("failure", f"Index build failed: {error}")
+            return
+        fs_watcher.watch_root(resolved_path) # Keep a folder indexed after startup current as well
+        cli_ui.print_success(f"Indexed [filepath]{resolved_path}[/filepath]: checked {stats['dirs_checked']} folders, rescanned {stats['dirs_rescanned']} in {stats['seconds']}s.", "Index Built")
+        activity_logger.update_last_activity_status("success", "Index built.", result_data=stats)
+        return
+
+    if operation == "vacuum":
+        result, error = metadata_index.vacuum_index()
+        if not error:
+            result["removed_content_entries"], error = content_index.vacuum_content_index()
+        if not error:
+            result["removed_semantic_entries"], error = semantic_index.vacuum_semantic_index()
+        if error:
+            cli_ui.print_error(error, "Index Error")
+            activity_logger.update_last_activity_status("failure", error)
+            return
+        removed_count = len(result["removed_roots"])
+        cli_ui.print_success(f"Index compacted. Removed {removed_count} root(s) and {result['removed_content_entries'] + result['removed_semantic_entries']} content entries that no longer exist.", "Index Vacuum")
+        activity_logger.update_last_activity_status("success", "Index vacuumed.", result_data=result)
+        return
+
+    if operation != "status":
+        cli_ui.print_error(f"Unknown index operation '{operation}'. Use build, status or vacuum.", "Index Error")
+        activity_logger.update_last_activity_status("failure", f"Unknown index operation: {operation}")
+        return
+
+    status = metadata_index.get_index_status()
+    content_status = content_index.get_content_index_status()
+    semantic_status = semantic_index.get_semantic_index_status()
+    watcher_status = fs_watcher.get_watcher_status()
+    watcher_summary = f"{watcher_status['backend']}, {len(watcher_status['roots'])} folder(s)" if watcher_status["running"] else "not running"
+    table = Table(title=None, show_header=True, header_style="table.header", box=ROUNDED)
+    table.add_column("Indexed Root", style="filepath", min_width=40, overflow="fold")
+    table.add_column("Last Scan", width=20)
+    for root in status["roots"]:
+        table.add_row(root["path"], time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(root["last_scan"])) if root["last_scan"] else "N/A")
+    cli_ui.print_info(
+        f"Database: [filepath]{status['db_path']}[/filepath] ({fs_utils.bytes_to_readable(status['db_size_bytes'])})\n"
+        f"Files: {status['file_count']}, Folders: {status['dir_count']}, Used for search: {'yes' if status['enabled'] else 'no'}\n"
+        f"Content index: {content_status['file_count']} file(s) ({fs_utils.bytes_to_readable(content_status['db_size_bytes'])}), enabled: {'yes' if content_status['enabled'] else 'no'}\n"
+        f"Topic index: {semantic_status['doc_count']} file(s) ({fs_utils.bytes_to_readable(semantic_status['size_bytes'])}), "
+        f"{'enabled' if semantic_status['enabled'] and semantic_status['available'] else 'unavailable (needs numpy)' if not semantic_status['available'] else 'disabled'}\n"
+        f"Watcher: {watcher_summary}",
+        "Index Status")
+    if status["roots"]:
+        cli_ui.console.print(table)
+    if status["error"]:
+        cli_ui.print_warning(f"{status['error']}. Try [highlight]index vacuum[/highlight], or delete the database file to rebuild it.", "Index Status")
+    if content_status["error"]:
+        cli_ui.print_warning(f"{content_status['error']}. Try [highlight]index vacuum[/highlight], or delete the database file to rebuild it.", "Index Status")
+    activity_logger.update_last_activity_status("success", "Index status shown.", result_data={"file_count": status["file_count"], "dir_count": status["dir_count"]})
+
+def handle_manage_cache(parameters: dict):
+    """Reports on or empties the extraction and search result caches (`cache stats|clear`)."""
+    from . import search_cache
+    activity_logger.log_action("manage_cache", parameters, "pending_execution", "Attempting to manage caches.")
+    operation = parameters.get("operation", "stats")
+
+    if operation == "clear":
+        removed_files = extraction_cache.clear()
+        search_cache.clear()
+        cli_ui.print_success(f"Caches cleared ({removed_files} stored extraction(s) removed).", "Cache Cleared")
+        activity_logger.update_last_activity_status("success", "Caches cleared.", result_data={"removed_disk_entries": removed_files})
+        return
+
+    if operation != "stats":
+        cli_ui.print_error(f"Unknown cache operation '{operation}'. Use stats or clear.", "Cache Error")
+        activity_logger.update_last_activity_status("failure", f"Unknown cache operation: {operation}")
+        return
+
+    stats = extraction_cache.get_cache_stats()
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    hit_rate = f"{100 * (stats['memory_hits'] + stats['disk_hits']) / lookups:.0f}%" if lookups else "N/A"
+    cli_ui.print_info(
+        f"Extraction cache: {'enabled' if stats['enabled'] else 'disabled'}, hit rate this session: {hit_rate} "
+        f"({stats['memory_hits']} from memory, {stats['disk_hits']} from disk, {stats['misses']} misses)\n"
+        f"Memory: {stats['memory_entries']} document(s), {fs_utils.bytes_to_readable(stats['memory_bytes'])} of {fs_utils.bytes_to_readable(stats['memory_max_bytes'])}\n"
+        f"Disk: {stats['disk_entries']} document(s), {fs_utils.bytes_to_readable(stats['disk_bytes'])} of {fs_utils.bytes_to_readable(stats['disk_max_bytes'])} "
+        f"in [filepath]{stats['cache_dir']}[/filepath]{'' if stats['disk_enabled'] else ' (disabled)'}\n"
+        f"Evictions: {stats['evictions']}\n"
+        f"Search results cached: {search_cache.entry_count()}",
+        "Cache Stats"
+    )
+    activity_logger.update_last_activity_status("success", "Cache stats shown.", result_data=stats)
+
+
 def handle_redo_activity(connector, parameters: dict):
     """Allows re-doing a previous activity from the log."""
     activity_logger.log_action("redo_activity", parameters, "pending_execution", "Attempting to redo activity.")
@@ -701,6 +1055,174 @@ def handle_redo_activity(connector, parameters: dict):
     activity_logger.update_last_activity_status("partial_failure", "Redo not fully implemented.")
 
 
+def _store_listed_results(found_items: list, shown_count: int):
+    """
+    Makes a non-search listing (duplicates, storage report) the "last search results", so "item N" and
+    "show more results" refer to it, and drops the previous search's paging and continuation state.
+    """
+    from . import session_manager
+    session_manager.update_session_context("last_search_results", found_items)
+    session_manager.update_session_context("last_search_page_end", min(shown_count, len(found_items)))
+    session_manager.update_session_context("last_search_cursor", None)
+    session_manager.update_session_context("last_search_limit_reached", False)
+
+def handle_find_duplicates(parameters: dict):
+    """Finds files with identical content under a folder and lists them group by group."""
+    from . import duplicate_finder
+    activity_logger.log_action("find_duplicates", parameters, "pending_execution", "Looking for duplicate files.")
+
+    resolved_path = parameters.get("folder_path")
+    if not resolved_path or not os.path.isdir(resolved_path):
+        cli_ui.print_error(f"Folder to check for duplicates is missing or not a directory: {resolved_path}", "Duplicates Error")
+        activity_logger.update_last_activity_status("failure", f"Invalid folder_path for find_duplicates: {resolved_path}")
+        return
+
+    min_size = None
+    if parameters.get("min_size") not in (None, "", "__MISSING__"):
+        min_size = search_query.parse_size(parameters.get("min_size"))
+        if min_size is None:
+            cli_ui.print_warning(f"Ignoring invalid minimum size '{parameters.get('min_size')}'.", "Duplicates Warning")
+
+    cli_ui.console.print(f"{cli_constants.ICONS.get('search','🔍')} Looking for duplicate files in [filepath]{resolved_path}[/filepath]")
+    spinner = Spinner("dots", text=f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Grouping files by size...[/spinner_style]")
+    with Live(spinner, console=cli_ui.console, transient=True, refresh_per_second=10):
+        def on_progress(description: str):
+            spinner.update(text=f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} {description}...[/spinner_style]")
+        groups, stats, error = duplicate_finder.find_duplicates(resolved_path, min_size=min_size, on_progress=on_progress)
+
+    if error:
+        cli_ui.print_error(f"Could not check for duplicates: {error}", "Duplicates Error")
+        activity_logger.update_last_activity_status("failure", error)
+        return
+
+    stats_line = (f"{stats['files_scanned']} file(s) checked, {stats['size_candidates']} shared a size, "
+                  f"{stats['full_hashed']} needed a full hash.")
+    if not groups:
+        cli_ui.print_info(f"No duplicate files found in [filepath]{resolved_path}[/filepath].\n{stats_line}", "Duplicates")
+        activity_logger.update_last_activity_status("success", "No duplicates found.", result_data={"path": resolved_path, **stats})
+        _store_listed_results([], 0)
+        return
+
+    # Flattened in table order so "item N" refers to the row numbered N
+    found_items = []
+    for group_number, group in enumerate(groups, start=1):
+        for path in group["paths"]:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            found_items.append({
+                "name": os.path.basename(path),
+                "path": path,
+                "type": "file",
+                "size_bytes": group["size_bytes"],
+                "size_readable": fs_utils.bytes_to_readable(group["size_bytes"]),
+                "modified_timestamp": mtime,
+                "modified_readable": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mtime)),
+                "duplicate_group": group_number,
+            })
+
+    table = Table(title=None, show_header=True, header_style="table.header", box=ROUNDED)
+    table.add_column("#", style="dim", width=4, justify="right")
+    table.add_column("Group", width=6, justify="right")
+    table.add_column("Name", style="dim_text", min_width=20, overflow="fold")
+    table.add_column("Path", style="filepath", min_width=40, overflow="fold")
+    table.add_column("Size", justify="right", width=12)
+    for i, item in enumerate(found_items[:MAX_ITEMS_TO_DISPLAY_IN_LIST]):
+        table.add_row(str(i + 1), str(item["duplicate_group"]), Text(f"{cli_constants.ICONS.get('file','📄')} {item['name']}"),
+                      Text(item["path"], style="filepath"), item["size_readable"],
+                      end_section=(i + 1 < len(found_items) and found_items[i + 1]["duplicate_group"] != item["duplicate_group"]))
+    if len(found_items) > MAX_ITEMS_TO_DISPLAY_IN_LIST:
+        table.add_row("...", "", f"... and {len(found_items) - MAX_ITEMS_TO_DISPLAY_IN_LIST} more items ...", "", "")
+    cli_ui.console.print(table)
+
+    wasted_bytes = sum(group["wasted_bytes"] for group in groups)
+    cli_ui.print_success(f"Found {len(groups)} group(s) of duplicates ({len(found_items)} files). "
+                         f"Removing the extra copies would free {fs_utils.bytes_to_readable(wasted_bytes)}.\n{stats_line}", "Duplicates")
+    activity_logger.update_last_activity_status("success", f"Found {len(groups)} duplicate groups.",
+                                                result_data={"path": resolved_path, "groups": len(groups), "wasted_bytes": wasted_bytes, **stats})
+    _store_listed_results(found_items, MAX_ITEMS_TO_DISPLAY_IN_LIST)
+
+
+def _distribution_table(title: str, histogram: list[dict], total_bytes: int) -> Table:
+    table = Table(title=title, show_header=True, header_style="table.header", box=ROUNDED)
+    table.add_column("Range", width=18)
+    table.add_column("Files", justify="right", width=10)
+    table.add_column("Size", justify="right", width=12)
+    table.add_column("Share", width=24)
+    for bucket in histogram:
+        share = bucket["bytes"] / total_bytes if total_bytes else 0
+        table.add_row(bucket["label"], str(bucket["count"]), fs_utils.bytes_to_readable(bucket["bytes"]),
+                      f"{'█' * round(share * 16):<16} {share:>4.0%}")
+    return table
+
+def handle_storage_report(parameters: dict):
+    """Shows where the disk space under a folder goes: largest folders and files, and size/age distributions."""
+    from . import storage_report
+    activity_logger.log_action("storage_report", parameters, "pending_execution", "Building storage report.")
+
+    resolved_path = parameters.get("folder_path")
+    if not resolved_path or not os.path.isdir(resolved_path):
+        cli_ui.print_error(f"Folder for the storage report is missing or not a directory: {resolved_path}", "Storage Report Error")
+        activity_logger.update_last_activity_status("failure", f"Invalid folder_path for storage_report: {resolved_path}")
+        return
+
+    top_n = None
+    if parameters.get("top_n") not in (None, "", "__MISSING__"):
+        try:
+            top_n = max(1, int(parameters.get("top_n")))
+        except (TypeError, ValueError):
+            cli_ui.print_warning(f"Ignoring invalid count '{parameters.get('top_n')}'.", "Storage Report Warning")
+
+    spinner = Spinner("dots", text=f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} Measuring [filepath]{resolved_path}[/filepath]...[/spinner_style]")
+    with Live(spinner, console=cli_ui.console, transient=True, refresh_per_second=10):
+        def on_progress(description: str):
+            spinner.update(text=f"[spinner_style] {cli_constants.ICONS.get('thinking','🤔')} {description}...[/spinner_style]")
+        report, error = storage_report.build_storage_report(resolved_path, top_n=top_n, on_progress=on_progress)
+
+    if error:
+        cli_ui.print_error(f"Could not build storage report: {error}", "Storage Report Error")
+        activity_logger.update_last_activity_status("failure", error)
+        return
+
+    # Folders and files share one numbering so "item N" refers to the row numbered N
+    found_items = []
+    tables = []
+    for title, entries, item_type, icon in (("Largest Folders", report["top_dirs"], "directory", cli_constants.ICONS.get('folder','📁')),
+                                            ("Largest Files", report["top_files"], "file", cli_constants.ICONS.get('file','📄'))):
+        if not entries:
+            continue
+        table = Table(title=title, show_header=True, header_style="table.header", box=ROUNDED)
+        table.add_column("#", style="dim", width=4, justify="right")
+        table.add_column("Path", style="filepath", min_width=40, overflow="fold")
+        table.add_column("Size", justify="right", width=12)
+        table.add_column("Share", justify="right", width=7)
+        for size_bytes, path in entries:
+            found_items.append({"name": os.path.basename(path), "path": path, "type": item_type,
+                                "size_bytes": size_bytes, "size_readable": fs_utils.bytes_to_readable(size_bytes)})
+            share = size_bytes / report["total_bytes"] if report["total_bytes"] else 0
+            table.add_row(str(len(found_items)), Text(f"{icon} {os.path.relpath(path, report['root'])}"),
+                          fs_utils.bytes_to_readable(size_bytes), f"{share:.1%}")
+        tables.append(table)
+
+    cli_ui.print_info(
+        f"[filepath]{report['root']}[/filepath] holds {fs_utils.bytes_to_readable(report['total_bytes'])} "
+        f"in {report['file_count']} file(s) and {report['dir_count']} folder(s) (scanned in {report['seconds']:.1f}s).",
+        "Storage Report")
+    for table in tables:
+        cli_ui.console.print(table)
+    if report["size_histogram"]:
+        cli_ui.console.print(_distribution_table("By File Size", report["size_histogram"], report["total_bytes"]))
+        cli_ui.console.print(_distribution_table("By Last Modified", report["age_histogram"], report["total_bytes"]))
+    elif report["file_count"]:
+        cli_ui.print_info("Install numpy to see size and age distributions.", "Storage Report")
+
+    activity_logger.update_last_activity_status("success", "Storage report shown.",
+                                                result_data={"path": report["root"], "total_bytes": report["total_bytes"],
+                                                             "file_count": report["file_count"], "dir_count": report["dir_count"]})
+    _store_listed_results(found_items, len(found_items)) # Every item is in the tables above
+
+
 # === Action Handler Map ===
 def get_action_handler_map():
     return {
@@ -708,11 +1230,17 @@ def get_action_handler_map():
         "ask_question_about_file": handle_ask_question_about_file,
         "list_folder_contents": handle_list_folder_contents,
         "search_files": handle_search_files,
+        "show_more_results": handle_show_more_results,
+        "continue_search": handle_continue_search,
         "move_item": handle_move_item,
         "propose_and_execute_organization": handle_propose_and_execute_organization,
         "show_activity_log": handle_show_activity_log,
         "general_chat": handle_general_chat,
         "redo_activity": handle_redo_activity,
+        "manage_index": handle_manage_index,
+        "manage_cache": handle_manage_cache,
+        "find_duplicates": handle_find_duplicates,
+        "storage_report": handle_storage_report,
         # "organize_file": handle_organize_file, # This action was hallucinated by LLM.
                                                 # If truly needed, it would be implemented.
                                                 # For now, it's not a defined action.
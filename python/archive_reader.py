@@ -0,0 +1,115 @@
+# python/archive_reader.py
+
+import functools
+import os
+import tarfile
+import time
+import zipfile
+
+# Read-only access to the members of .zip and .tar(.gz/.bz2/.xz) archives, without extracting them.
+# A member is addressed as "<archive path>!/<member name>". Zip members are listed from the
+# central directory and opened individually; tar archives are read as a single forward stream
+# (mode "r|*"), so each member's data is only available while the iteration is on that member
+# and compressed tars are never decompressed more than once per scan.
+
+ARCHIVE_SEPARATOR = "!/"
+_ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+class ArchiveMember:
+    def __init__(self, archive_path: str, name: str, size_bytes: int, mtime: float):
+        self.archive_path = archive_path
+        self.name = name.lstrip("/")
+        self.size_bytes = size_bytes
+        self.mtime = mtime
+
+    @property
+    def basename(self) -> str:
+        return self.name.rstrip("/").rsplit("/", 1)[-1]
+
+    @property
+    def path(self) -> str:
+        return make_member_path(self.archive_path, self.name)
+
+
+def is_archive_name(name: str) -> bool:
+    return name.lower().endswith(_ARCHIVE_SUFFIXES)
+
+def make_member_path(archive_path: str, member_name: str) -> str:
+    return archive_path + ARCHIVE_SEPARATOR + member_name.lstrip("/")
+
+def split_member_path(path: str) -> tuple[str, str] | None:
+    """(archive_path, member_name) for an "archive.zip!/inner/path" address of an existing archive, else None."""
+    if not isinstance(path, str):
+        return None
+    start = path.find(ARCHIVE_SEPARATOR)
+    while start != -1:
+        archive_path = path[:start]
+        if is_archive_name(archive_path) and os.path.isfile(archive_path):
+            member_name = path[start + len(ARCHIVE_SEPARATOR):]
+            return (archive_path, member_name) if member_name else None
+        start = path.find(ARCHIVE_SEPARATOR, start + 1)
+    return None
+
+def iter_members(archive_path: str):
+    """
+    Yields (ArchiveMember, open_member) for every regular file in the archive, in archive order.
+    open_member() returns a binary file object that is only valid until the next member is requested.
+    Raises OSError, zipfile.BadZipFile or tarfile.TarError for unreadable archives.
+    """
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                yield ArchiveMember(archive_path, info.filename, info.file_size, mtime), functools.partial(archive.open, info)
+        return
+    with tarfile.open(archive_path, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            yield ArchiveMember(archive_path, info.name, info.size, float(info.mtime)), functools.partial(archive.extractfile, info)
+
+def _find_member(archive_path: str, member_name: str):
+    """(ArchiveMember, open_member) for member_name, or (None, None); see iter_members for lifetimes."""
+    wanted = member_name.lstrip("/")
+    for member, open_member in iter_members(archive_path):
+        if member.name == wanted:
+            return member, open_member
+    return None, None
+
+def member_exists(path: str) -> bool:
+    """True if path addresses a file member of an existing archive."""
+    parts = split_member_path(path)
+    if not parts:
+        return False
+    archive_path, member_name = parts
+    try:
+        if archive_path.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive_path) as archive:
+                return not archive.getinfo(member_name).is_dir()
+        return _find_member(archive_path, member_name)[0] is not None
+    except (OSError, KeyError, zipfile.BadZipFile, tarfile.TarError, EOFError):
+        return False
+
+def read_member(path: str, max_bytes: int) -> tuple[bytes | None, str | None]:
+    """Reads up to max_bytes of the member addressed by path. Returns (data, error)."""
+    parts = split_member_path(path)
+    if not parts:
+        return None, f"'{path}' is not a path inside an archive."
+    archive_path, member_name = parts
+    try:
+        if archive_path.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive_path) as archive:
+                with archive.open(member_name) as stream:
+                    return stream.read(max_bytes), None
+        for member, open_member in iter_members(archive_path):
+            if member.name == member_name.lstrip("/"):
+                with open_member() as stream:
+                    return stream.read(max_bytes), None
+        return None, f"'{member_name}' was not found in {os.path.basename(archive_path)}."
+    except KeyError:
+        return None, f"'{member_name}' was not found in {os.path.basename(archive_path)}."
+    except (OSError, zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+        return None, f"Could not read {os.path.basename(archive_path)}: {e}"
@@ -216,7 +216,7 @@ def display_help():
     global console # Ensure we use module global
     print("DEBUG: cli_ui.py: ENTERING display_help")
     info_icon = ICONS.get('info', 'ℹ️')
-    console.print(Panel(Markdown(f"""# SAM-Open (Sistem Asisten Mandiri) File Assistant Help {info_icon} (v{APP_VERSION})\n\n## Example Commands:\n*   `summarize "path/to/file.txt"` or `summarize "path/to/mydoc.pdf"`\n*   `what is in "doc.docx" about project alpha?`\n*   `list contents of "C:/folder"` OR `list item 3` (after search)\n*   `search for images in .`\n*   `search python scripts containing 'db_utils' in "~/dev/my_project"`\n*   `search images "C:/Users/Name/Pictures"`\n*   `move "old.txt" to "archive/"` or `move item 1 to "new_folder/"`\n*   `organize this folder by type` (after list/search)\n*   `organize "C:/Downloads" by file extension` or `organize "folder" by name`\n*   `show my last 5 activities` / `view log history`\n*   `redo last search` / `redo task 2`\n\n## Notes:\n*   Use quotes for paths with spaces.\n*   Context is remembered (e.g., `summarize item 1` after a search).\n*   File organization is experimental; always review plans before execution."""),
+    console.print(Panel(Markdown(f"""# SAM-Open (Sistem Asisten Mandiri) File Assistant Help {info_icon} (v{APP_VERSION})\n\n## Example Commands:\n*   `summarize "path/to/file.txt"` or `summarize "path/to/mydoc.pdf"`\n*   `what is in "doc.docx" about project alpha?`\n*   `list contents of "C:/folder"` OR `list item 3` (after search)\n*   `search for images in .`\n*   `search python scripts containing 'db_utils' in "~/dev/my_project"`\n*   `search images "C:/Users/Name/Pictures"`\n*   `search pdfs larger than 5mb modified in the last 30 days in .`\n*   `search documents about 'tax deadlines'` / `search files like 'notes/plan.md'`\n*   `search files named ~'quartely report'` (typo-tolerant name match, best first)\n*   `search files containing 'budget' including archives` then `summarize "backup.zip!/notes/budget.txt"`\n*   `show more results` / `show next 100` (page through the last search)\n*   `continue search` (resume a search that stopped at its time limit)\n*   `find duplicate files in "~/Downloads"` / `what is using space in "/mnt/share"?`\n*   `move "old.txt" to "archive/"` or `move item 1 to "new_folder/"`\n*   `organize this folder by type` (after list/search)\n*   `organize "C:/Downloads" by file extension` or `organize "folder" by name`\n*   `show my last 5 activities` / `view log history`\n*   `redo last search` / `redo task 2`\n*   `index build "~/dev"` / `index status` / `index vacuum` (manage the search index)\n*   `cache stats` / `cache clear` (document text and search result caches)\n\n## Notes:\n*   Use quotes for paths with spaces.\n*   Context is remembered (e.g., `summarize item 1` after a search).\n*   File organization is experimental; always review plans before execution."""),
                         title=f"{info_icon} Help", border_style="panel.border.info",
                         box=ROUNDED,padding=1))
     print("DEBUG: cli_ui.py: EXITING display_help")
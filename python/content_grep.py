@@ -0,0 +1,145 @@
+# python/content_grep.py
+
+import mmap
+import os
+import re
+
+from config import CONTENT_GREP_SETTINGS
+
+# Memory-mapped, multi-pattern grep over raw file bytes.
+# All terms are compiled into one case-insensitive bytes regex and scanned in a single pass, window
+# by window, so files of any size are searched without decoding or copying them into str objects.
+# Windows overlap by at least the longest term so matches that straddle a window boundary are found.
+# Case folding is ASCII-only (bytes regex semantics). grep_stream applies the same scan to streams
+# that cannot be mapped, such as archive members, reading them in bounded chunks.
+
+
+def compile_patterns(terms: list[str]) -> re.Pattern:
+    """One alternation for all terms, longest first so overlapping terms report the longer match."""
+    encoded = sorted({term.lower().encode("utf-8") for term in terms if term}, key=len, reverse=True)
+    return re.compile(b"|".join(re.escape(term) for term in encoded), re.IGNORECASE)
+
+def _snippet(mm: mmap.mmap, match_start: int, match_end: int, context_chars: int) -> tuple[str, int]:
+    """Returns (snippet, offset_of_match_in_snippet) for the line around a match, clipped to context_chars on each side."""
+    line_start = mm.rfind(b"\n", max(0, match_start - context_chars), match_start) + 1
+    if line_start == 0:
+        line_start = max(0, match_start - context_chars)
+    line_end = mm.find(b"\n", match_end, min(len(mm), match_end + context_chars))
+    if line_end == -1:
+        line_end = min(len(mm), match_end + context_chars)
+    prefix = mm[line_start:match_start].decode("utf-8", errors="replace").lstrip()
+    rest = mm[match_start:line_end].decode("utf-8", errors="replace").rstrip("\r\n")
+    return prefix + rest, len(prefix)
+
+def grep_file(filepath: str, pattern: re.Pattern, max_matches: int | None = None, required_terms: list[str] | None = None) -> tuple[list[dict], str | None]:
+    """
+    Scans filepath for pattern (from compile_patterns) and returns (matches, error).
+    Each match is {"term", "line" (1-based), "offset" (byte offset in the file), "snippet", "snippet_offset"}.
+    At most max_matches are recorded, except that the first hit of every still-missing required term is
+    always kept; the scan stops as soon as the limit is reached and all required terms were seen.
+    """
+    chunk_bytes = CONTENT_GREP_SETTINGS.get("CHUNK_BYTES", 16 * 1024 * 1024)
+    context_chars = CONTENT_GREP_SETTINGS.get("SNIPPET_CONTEXT", 60)
+    if max_matches is None:
+        max_matches = CONTENT_GREP_SETTINGS.get("MAX_MATCHES_PER_FILE", 20)
+    missing_terms = {term.lower().encode("utf-8") for term in (required_terms or [])}
+    overlap = len(pattern.pattern) # Upper bound on the longest term; escaping only makes the source longer
+
+    matches = []
+    try:
+        with open(filepath, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size == 0:
+                return [], None
+            window_start = 0
+            line_number = 1            # Line number at counted_upto
+            counted_upto = 0
+            while window_start < file_size:
+                window_end = min(file_size, window_start + chunk_bytes)
+                map_start = window_start - window_start % mmap.ALLOCATIONGRANULARITY
+                map_end = min(file_size, window_end + overlap)
+                with mmap.mmap(f.fileno(), map_end - map_start, access=mmap.ACCESS_READ, offset=map_start) as mm:
+                    for match in pattern.finditer(mm, window_start - map_start, map_end - map_start):
+                        absolute_start = map_start + match.start()
+                        if absolute_start >= window_end: # Belongs to the next window
+                            break
+                        term = match.group(0).lower()
+                        if len(matches) >= max_matches and term not in missing_terms:
+                            continue
+                        missing_terms.discard(term)
+                        line_number += mm[counted_upto - map_start:match.start()].count(b"\n")
+                        counted_upto = absolute_start
+                        snippet, snippet_offset = _snippet(mm, match.start(), match.end(), context_chars)
+                        matches.append({
+                            "term": term.decode("utf-8", errors="replace"),
+                            "line": line_number,
+                            "offset": absolute_start,
+                            "snippet": snippet,
+                            "snippet_offset": snippet_offset,
+                        })
+                        if len(matches) >= max_matches and not missing_terms:
+                            return matches, None
+                    # Carry the line count to the end of this window
+                    line_number += mm[counted_upto - map_start:window_end - map_start].count(b"\n")
+                    counted_upto = window_end
+                window_start = window_end
+    except (OSError, ValueError) as e:
+        return matches, f"Could not grep '{os.path.basename(filepath)}': {e}"
+    return matches, None
+
+def file_contains_all(filepath: str, terms: list[str], pattern: re.Pattern | None = None) -> tuple[bool, list[dict]]:
+    """Convenience check used by search: (every term occurs in the file, recorded matches)."""
+    pattern = pattern or compile_patterns(terms)
+    matches, error = grep_file(filepath, pattern, required_terms=terms)
+    if error:
+        return False, []
+    found_terms = {match["term"] for match in matches}
+    return all(term.lower() in found_terms for term in terms), matches
+
+def grep_stream(stream, pattern: re.Pattern, max_bytes: int | None = None, max_matches: int | None = None,
+                required_terms: list[str] | None = None) -> list[dict]:
+    """
+    grep_file for a binary file object that cannot be memory-mapped (e.g. an archive member): reads it in
+    CHUNK_BYTES pieces, carrying the last few bytes over so boundary-straddling matches are found, and
+    stops after max_bytes. Matches have the same form as grep_file's; errors propagate to the caller.
+    """
+    chunk_bytes = CONTENT_GREP_SETTINGS.get("CHUNK_BYTES", 16 * 1024 * 1024)
+    context_chars = CONTENT_GREP_SETTINGS.get("SNIPPET_CONTEXT", 60)
+    if max_matches is None:
+        max_matches = CONTENT_GREP_SETTINGS.get("MAX_MATCHES_PER_FILE", 20)
+    missing_terms = {term.lower().encode("utf-8") for term in (required_terms or [])}
+    overlap = len(pattern.pattern)
+
+    matches = []
+    carry = b""                 # Tail of the previous buffer, searched again with the next chunk
+    carry_offset = 0            # Stream offset of carry[0]
+    carry_line = 1              # Line number at carry[0]
+    bytes_read = 0
+    while max_bytes is None or bytes_read < max_bytes:
+        chunk = stream.read(chunk_bytes if max_bytes is None else min(chunk_bytes, max_bytes - bytes_read))
+        if not chunk:
+            break
+        bytes_read += len(chunk)
+        buffer = carry + chunk
+        for match in pattern.finditer(buffer):
+            if match.end() <= len(carry): # Already seen with the previous buffer
+                continue
+            term = match.group(0).lower()
+            if len(matches) >= max_matches and term not in missing_terms:
+                continue
+            missing_terms.discard(term)
+            snippet, snippet_offset = _snippet(buffer, match.start(), match.end(), context_chars)
+            matches.append({
+                "term": term.decode("utf-8", errors="replace"),
+                "line": carry_line + buffer.count(b"\n", 0, match.start()),
+                "offset": carry_offset + match.start(),
+                "snippet": snippet,
+                "snippet_offset": snippet_offset,
+            })
+            if len(matches) >= max_matches and not missing_terms:
+                return matches
+        keep = min(len(buffer), max(overlap, context_chars))
+        carry_line += buffer.count(b"\n", 0, len(buffer) - keep)
+        carry_offset += len(buffer) - keep
+        carry = buffer[len(buffer) - keep:]
+    return matches
@@ -0,0 +1,212 @@
+# python/content_index.py
+
+import os
+import sqlite3
+import time
+
+from config import CONTENT_INDEX_SETTINGS
+from . import metadata_index
+
+# Trigram inverted index for `containing '...'` searches.
+# Every indexed file gets an id; postings map each lowercase 3-character sequence of its
+# search text (same extractors and limits as fs_utils.get_file_content_for_search) to that id.
+# A query term's trigrams narrow the candidates; only the survivors are read and verified.
+
+_SCHEMA_STATEMENTS = [
+    """CREATE TABLE IF NOT EXISTS content_files (
+        id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, size INTEGER, mtime REAL, indexed_at REAL
+    )""",
+    "CREATE TABLE IF NOT EXISTS postings (trigram TEXT NOT NULL, file_id INTEGER NOT NULL, PRIMARY KEY (trigram, file_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_postings_file ON postings(file_id)",
+]
+
+
+def is_content_index_enabled() -> bool:
+    return bool(CONTENT_INDEX_SETTINGS.get("ENABLED", True))
+
+def get_content_db_path() -> str:
+    return os.path.join(metadata_index.get_state_dir(), CONTENT_INDEX_SETTINGS.get("DB_FILENAME", "content_index.sqlite3"))
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(get_content_db_path(), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+    return conn
+
+def extract_trigrams(text: str) -> set[str]:
+    text_lower = text.lower()
+    return {text_lower[i:i + 3] for i in range(len(text_lower) - 2)}
+
+
+# === Incremental Updates ===
+def _index_file(conn: sqlite3.Connection, filepath: str, size_bytes: int, mtime: float, existing_id: int | None):
+    from .fs_utils import get_file_content_for_search # Late import: fs_utils imports this module
+    if existing_id is not None:
+        conn.execute("DELETE FROM postings WHERE file_id = ?", (existing_id,))
+        conn.execute("UPDATE content_files SET size = ?, mtime = ?, indexed_at = ? WHERE id = ?",
+                     (size_bytes, mtime, time.time(), existing_id))
+        file_id = existing_id
+    else:
+        file_id = conn.execute("INSERT INTO content_files (path, size, mtime, indexed_at) VALUES (?, ?, ?, ?)",
+                               (filepath, size_bytes, mtime, time.time())).lastrowid
+    content = get_file_content_for_search(filepath, console=None, is_known_file=True) or ""
+    conn.executemany("INSERT OR IGNORE INTO postings (trigram, file_id) VALUES (?, ?)",
+                     ((trigram, file_id) for trigram in extract_trigrams(content)))
+    return file_id
+
+def sync_files(conn: sqlite3.Connection, root_path: str, candidates: list[tuple[str, int, float]]) -> tuple[dict, int]:
+    """
+    Makes sure every (path, size_bytes, mtime) candidate below root_path is indexed at its current size/mtime.
+    Returns ({path: file_id}, number_of_files_reindexed).
+    """
+    low, high = metadata_index._subtree_bounds(os.path.abspath(root_path))
+    known = {}
+    for path, file_id, size_bytes, mtime in conn.execute(
+            "SELECT path, id, size, mtime FROM content_files WHERE path >= ? AND path < ?", (low, high)):
+        known[path] = (file_id, size_bytes, mtime)
+
+    # Documents to (re)index are parsed up front by the extraction workers; _index_file then reads the cache
+    from .fs_utils import prefetch_search_texts
+    for _ in prefetch_search_texts([filepath for filepath, size_bytes, mtime in candidates
+                                    if known.get(filepath) is None or known[filepath][1:] != (size_bytes, mtime)]):
+        pass
+
+    path_to_id = {}
+    reindexed = 0
+    with conn:
+        for filepath, size_bytes, mtime in candidates:
+            row = known.get(filepath)
+            if row and row[1] == size_bytes and row[2] == mtime:
+                path_to_id[filepath] = row[0]
+                continue
+            path_to_id[filepath] = _index_file(conn, filepath, size_bytes, mtime, row[0] if row else None)
+            reindexed += 1
+    return path_to_id, reindexed
+
+def remove_paths(paths: list[str]) -> str | None:
+    """Drops index entries for deleted files, and for every file below deleted directories. Returns an error message or None."""
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return f"Could not open content index: {e}"
+    try:
+        with conn:
+            for path in paths:
+                low, high = metadata_index._subtree_bounds(path)
+                for (file_id,) in conn.execute("SELECT id FROM content_files WHERE path = ? OR (path >= ? AND path < ?)",
+                                               (path, low, high)).fetchall():
+                    conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                    conn.execute("DELETE FROM content_files WHERE id = ?", (file_id,))
+        return None
+    except sqlite3.Error as e:
+        return f"Content index update failed: {e}"
+    finally:
+        conn.close()
+
+def move_path(source_path: str, destination_path: str) -> str | None:
+    """
+    Re-keys the entries of a moved file or directory; postings are kept, so nothing is re-extracted.
+    Returns an error message or None.
+    """
+    error = remove_paths([destination_path]) # Whatever was indexed at the destination was overwritten
+    if error:
+        return error
+    low, high = metadata_index._subtree_bounds(source_path)
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return f"Could not open content index: {e}"
+    try:
+        with conn:
+            conn.execute("UPDATE content_files SET path = ? WHERE path = ?", (destination_path, source_path))
+            conn.execute("UPDATE content_files SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?",
+                         (destination_path, len(source_path) + 1, low, high))
+        return None
+    except sqlite3.Error as e:
+        return f"Content index update failed: {e}"
+    finally:
+        conn.close()
+
+
+# === Queries ===
+def find_files_containing(root_path: str, candidates: list[tuple[str, int, float]], search_term: str) -> tuple[set[str], str | None]:
+    """
+    Returns the subset of candidate paths (all below root_path) whose search text contains search_term (case-insensitive).
+    The trigram postings narrow the candidates; survivors are verified against their content.
+    """
+    from .fs_utils import get_file_content_for_search
+    if not candidates:
+        return set(), None
+    term_lower = search_term.lower()
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return set(), f"Could not open content index: {e}"
+
+    try:
+        path_to_id, _ = sync_files(conn, root_path, candidates)
+        query_trigrams = sorted(extract_trigrams(term_lower))
+        if query_trigrams:
+            placeholders = ", ".join("?" for _ in query_trigrams)
+            matching_ids = {file_id for (file_id,) in conn.execute(
+                f"SELECT file_id FROM postings WHERE trigram IN ({placeholders}) GROUP BY file_id HAVING COUNT(*) = ?",
+                (*query_trigrams, len(query_trigrams)))}
+            survivors = [path for path, file_id in path_to_id.items() if file_id in matching_ids]
+        else: # Terms shorter than a trigram cannot be narrowed
+            survivors = list(path_to_id)
+    except sqlite3.Error as e:
+        return set(), f"Content index error: {e}"
+    finally:
+        conn.close()
+
+    matches = set()
+    for path in survivors:
+        content = get_file_content_for_search(path, console=None, is_known_file=True)
+        if content and term_lower in content.lower():
+            matches.add(path)
+    return matches, None
+
+
+# === Maintenance ===
+def get_content_index_status() -> dict:
+    """Summary of the content index for `index status`; "error" is set if the database could not be read."""
+    db_path = get_content_db_path()
+    status = {"db_path": db_path, "enabled": is_content_index_enabled(), "file_count": 0, "db_size_bytes": 0, "error": None}
+    if not os.path.exists(db_path):
+        return status
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        status["error"] = f"Could not open content index: {e}"
+        return status
+    try:
+        status["file_count"] = conn.execute("SELECT COUNT(*) FROM content_files").fetchone()[0]
+    except sqlite3.Error as e:
+        status["error"] = f"Content index query failed: {e}"
+    finally:
+        conn.close()
+    for suffix in ("", "-wal"):
+        if os.path.exists(db_path + suffix):
+            status["db_size_bytes"] += os.path.getsize(db_path + suffix)
+    return status
+
+def vacuum_content_index() -> tuple[int, str | None]:
+    """Removes entries for files that no longer exist, then compacts the database. Returns (removed_count, error)."""
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return 0, f"Could not open content index: {e}"
+    try:
+        missing = [(file_id,) for file_id, path in conn.execute("SELECT id, path FROM content_files").fetchall()
+                   if not os.path.isfile(path)]
+        with conn:
+            conn.executemany("DELETE FROM postings WHERE file_id = ?", missing)
+            conn.executemany("DELETE FROM content_files WHERE id = ?", missing)
+        conn.execute("VACUUM")
+        return len(missing), None
+    except sqlite3.Error as e:
+        return 0, f"Content index vacuum failed: {e}"
+    finally:
+        conn.close()
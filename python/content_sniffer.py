@@ -0,0 +1,165 @@
+# python/content_sniffer.py
+
+import atexit
+import os
+import threading
+import zipfile
+
+from config import SNIFF_SETTINGS
+from . import metadata_index
+
+# Classifies files by their first bytes instead of their extension, so content search and
+# extraction skip misnamed binaries and still read text files with unknown extensions.
+# A file's kind is one of:
+#   "text"                      plain text (UTF-8 or a single-byte encoding), grepped and read directly
+#   "pdf", "docx", "xlsx", "pptx"  documents, routed to the extractor for their MIME type
+#   "zip", "gzip", "image", "media", "executable", "binary"  skipped by content search
+#   "empty"
+# Verdicts are kept in memory for the session and, when the metadata index is enabled, in its
+# `sniffed` table keyed by path and valid while the file's size and mtime are unchanged.
+
+_SIGNATURES = [
+    (b"%PDF-", "pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image"), (b"\xff\xd8\xff", "image"), (b"GIF87a", "image"), (b"GIF89a", "image"),
+    (b"II*\x00", "image"), (b"MM\x00*", "image"), (b"RIFF", "media"), (b"ID3", "media"), (b"OggS", "media"),
+    (b"fLaC", "media"), (b"\x1aE\xdf\xa3", "media"),
+    (b"\x1f\x8b", "gzip"), (b"BZh", "binary"), (b"\xfd7zXZ\x00", "binary"), (b"7z\xbc\xaf\x27\x1c", "binary"),
+    (b"Rar!\x1a\x07", "binary"), (b"\x7fELF", "executable"), (b"MZ", "executable"), (b"\xca\xfe\xba\xbe", "executable"),
+    (b"\xcf\xfa\xed\xfe", "executable"), (b"SQLite format 3\x00", "binary"),
+]
+KIND_MIME_TYPES = {
+    "text": "text/plain",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "zip": "application/zip",
+    "gzip": "application/gzip",
+}
+SKIPPED_KINDS = frozenset(["zip", "gzip", "image", "media", "executable", "binary", "empty"])
+# Control characters other than these make a block look binary
+_TEXT_CONTROLS = frozenset(b"\t\n\r\f\b\x1b")
+
+_verdicts = {}          # path -> (size, mtime, kind)
+_unsaved = []           # Verdicts not yet written to the metadata index
+_loaded_roots = set()
+_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(SNIFF_SETTINGS.get("ENABLED", True))
+
+def classify(head: bytes) -> str:
+    """The kind of a file given its first bytes."""
+    if not head:
+        return "empty"
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    if head.startswith(b"PK\x03\x04"):
+        # OOXML packages name their main part in the first local headers
+        for marker, kind in ((b"word/", "docx"), (b"xl/", "xlsx"), (b"ppt/", "pptx")):
+            if marker in head:
+                return kind
+        return "zip"
+    if head[4:8] == b"ftyp":
+        return "media"
+    if head.startswith((b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")):
+        return "text" if head.startswith(b"\xef\xbb\xbf") else "binary" # UTF-16 cannot be grepped as bytes
+    if b"\x00" in head:
+        return "binary"
+    suspicious = sum(1 for byte in head if byte < 32 and byte not in _TEXT_CONTROLS)
+    try:
+        head.decode("utf-8")
+        is_utf8 = True
+    except UnicodeDecodeError as e:
+        is_utf8 = e.start >= len(head) - 3 # A multi-byte character cut at the end of the block
+    if is_utf8:
+        return "binary" if suspicious * 10 > len(head) else "text"
+    # Single-byte encodings (latin-1, cp1252): mostly ASCII with a few accented letters and no control bytes
+    high = sum(1 for byte in head if byte >= 128)
+    return "binary" if suspicious * 100 > len(head) or high * 10 > len(head) * 3 else "text"
+
+def sniff(path: str, size: int | None = None, mtime: float | None = None) -> str | None:
+    """
+    The kind of the file at path (see module comment), or None if it cannot be read.
+    Pass size and mtime when already known (walker or index data) to avoid a stat.
+    """
+    if size is None or mtime is None:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        size, mtime = stat_result.st_size, stat_result.st_mtime
+    with _lock:
+        cached = _verdicts.get(path)
+    if cached is not None and cached[0] == size and cached[1] == mtime:
+        return cached[2]
+    if size == 0:
+        kind = "empty"
+    else:
+        try:
+            with open(path, "rb") as f:
+                kind = classify(f.read(SNIFF_SETTINGS.get("HEAD_BYTES", 4096)))
+        except OSError:
+            return None
+        if kind == "zip": # The OOXML parts may start past the first block; the central directory lists them all
+            kind = _ooxml_kind(path) or kind
+    _remember(path, size, mtime, kind)
+    return kind
+
+def _ooxml_kind(path: str) -> str | None:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+    except (OSError, zipfile.BadZipFile, ValueError):
+        return None
+    for prefix, kind in (("word/", "docx"), ("xl/", "xlsx"), ("ppt/", "pptx")):
+        if any(name.startswith(prefix) for name in names):
+            return kind
+    return None
+
+def mime_type_for(kind: str | None) -> str | None:
+    return KIND_MIME_TYPES.get(kind) if kind else None
+
+def is_skipped(kind: str | None) -> bool:
+    return kind in SKIPPED_KINDS
+
+def _remember(path: str, size: int, mtime: float, kind: str):
+    with _lock:
+        if len(_verdicts) >= SNIFF_SETTINGS.get("MAX_CACHED_VERDICTS", 200000):
+            _verdicts.clear()
+            _loaded_roots.clear()
+        _verdicts[path] = (size, mtime, kind)
+        _unsaved.append((path, size, mtime, kind))
+        should_flush = len(_unsaved) >= 500
+    if should_flush:
+        flush()
+
+def preload(root_path: str):
+    """Loads the verdicts recorded in the metadata index for a tree, once per session."""
+    abs_root = os.path.abspath(root_path)
+    with _lock:
+        if abs_root in _loaded_roots or not metadata_index.is_index_enabled():
+            return
+        _loaded_roots.add(abs_root)
+    recorded = metadata_index.get_sniffed_kinds(abs_root)
+    with _lock:
+        for path, verdict in recorded.items():
+            _verdicts.setdefault(path, verdict)
+
+def flush():
+    """Writes new verdicts to the metadata index (if it is enabled)."""
+    with _lock:
+        rows = list(_unsaved)
+        _unsaved.clear()
+    if rows and metadata_index.is_index_enabled():
+        metadata_index.store_sniffed_kinds(rows)
+
+def clear():
+    with _lock:
+        _verdicts.clear()
+        _unsaved.clear()
+        _loaded_roots.clear()
+
+atexit.register(flush)
@@ -31,6 +31,47 @@ def parse_direct_activity_log(user_input: str) -> dict | None:
         
     return None
 
+def parse_direct_index_command(user_input: str, session_ctx: dict) -> dict | None:
+    # Pattern: index build [--force] [path] | index status | index vacuum
+    match = re.match(r"^index\s+(build|rebuild|status|vacuum)(?:\s+(--force))?(?:\s+(.+))?$", user_input.strip(), re.IGNORECASE)
+    if not match:
+        return None
+    operation = match.group(1).lower()
+    params = {"operation": "build" if operation == "rebuild" else operation}
+    if operation == "rebuild" or match.group(2):
+        params["force"] = True
+    if params["operation"] == "build":
+        base_dir = session_ctx.get("current_directory", os.getcwd())
+        path_arg = (match.group(3) or "").strip().strip("'\"")
+        params["folder_path"] = os.path.abspath(os.path.join(base_dir, os.path.expanduser(path_arg))) if path_arg else base_dir
+    return {"action": "manage_index", "parameters": params, "nlu_method": "direct_index_command"}
+
+def parse_direct_cache_command(user_input: str) -> dict | None:
+    # Pattern: cache stats|status|clear | clear [the] cache
+    user_input_lower = user_input.strip().lower()
+    match = re.match(r"^cache\s+(stats|status|clear)$", user_input_lower)
+    if match:
+        return {"action": "manage_cache", "parameters": {"operation": "clear" if match.group(1) == "clear" else "stats"}, "nlu_method": "direct_cache_command"}
+    if re.match(r"^clear\s+(?:the\s+)?caches?$", user_input_lower):
+        return {"action": "manage_cache", "parameters": {"operation": "clear"}, "nlu_method": "direct_cache_command"}
+    return None
+
+def parse_direct_more_results(user_input: str) -> dict | None:
+    # Pattern: show [me] [the] next|more [N] [results|items|matches] | next|more [N] results
+    user_input_lower = user_input.strip().lower()
+    match = re.match(r"^(?:show|list|display)\s+(?:me\s+)?(?:the\s+)?(?:next|more)(?:\s+(\d+))?(?:\s+(?:results?|items?|matches|files))?$", user_input_lower) \
+        or re.match(r"^(?:next|more)(?:\s+(\d+))?\s+(?:results?|items?|matches)$", user_input_lower)
+    if not match:
+        return None
+    params = {"count": int(match.group(1))} if match.group(1) else {}
+    return {"action": "show_more_results", "parameters": params, "nlu_method": "direct_more_results"}
+
+def parse_direct_continue_search(user_input: str) -> dict | None:
+    # Pattern: continue|resume [the|my|last] search[ing] | keep searching
+    if not re.match(r"^(?:(?:continue|resume)\s+(?:the\s+|my\s+|last\s+|previous\s+)*search(?:ing)?|keep\s+searching)$", user_input.strip().lower()):
+        return None
+    return {"action": "continue_search", "parameters": {}, "nlu_method": "direct_continue_search"}
+
 def parse_direct_summarize(user_input: str, session_ctx: dict) -> dict | None: # Takes session_ctx
     # This function will be removed as per the new strategy.
     return None
@@ -56,6 +97,10 @@ def try_all_direct_parsers(user_input: str, session_ctx: dict) -> dict | None:
     parsers_to_try = [
         # Specific utility commands
         {"name": "activity_log", "func": parse_direct_activity_log, "needs_ctx": False},
+        {"name": "index_command", "func": parse_direct_index_command, "needs_ctx": True},
+        {"name": "cache_command", "func": parse_direct_cache_command, "needs_ctx": False},
+        {"name": "more_results", "func": parse_direct_more_results, "needs_ctx": False},
+        {"name": "continue_search", "func": parse_direct_continue_search, "needs_ctx": False},
         # Removed: move, summarize, organize, search, list
         # 'help' and 'exit' are handled directly in main_cli.py loop
     ]
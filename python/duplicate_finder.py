@@ -0,0 +1,146 @@
+# python/duplicate_finder.py
+
+import hashlib
+import mmap
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import DUPLICATE_SETTINGS
+from . import fs_walker
+from . import metadata_index
+
+# Duplicate detection in three stages, each only for files still tied with another one:
+#   1. group by size (from the metadata index or a walk; no file is opened),
+#   2. BLAKE2b of the first and last PARTIAL_HASH_BYTES,
+#   3. full BLAKE2b, streamed through a memory map.
+# Most files have a unique size and are never read. Files no larger than head+tail are fully
+# covered by stage 2 and skip stage 3. Hashing runs on a thread pool (hashlib releases the GIL).
+# Hard links to the same inode are one file, not duplicates.
+
+
+def _size_buckets(root_path: str, min_size: int, use_index: bool) -> dict[int, list[str]]:
+    by_size = defaultdict(list)
+    if use_index and metadata_index.is_index_enabled():
+        _, error = metadata_index.refresh_tree(root_path)
+        if not error:
+            rows, error = metadata_index.query_files(root_path, min_size=min_size)
+            if not error:
+                for row in rows:
+                    by_size[row["size_bytes"]].append(row["path"])
+                return by_size
+    for _, _, _, file_entries in fs_walker.walk_tree(root_path, want_stat=True):
+        for entry in file_entries:
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                size_bytes = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            if size_bytes >= min_size:
+                by_size[size_bytes].append(entry.path)
+    return by_size
+
+def _without_hard_links(paths: list[str]) -> list[str]:
+    seen_inodes = set()
+    unique_paths = []
+    for path in paths:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            continue
+        inode_key = (stat_result.st_dev, stat_result.st_ino)
+        if inode_key not in seen_inodes:
+            seen_inodes.add(inode_key)
+            unique_paths.append(path)
+    return unique_paths
+
+def partial_hash(filepath: str, size_bytes: int, edge_bytes: int) -> str | None:
+    """BLAKE2b of the first and last edge_bytes (the whole file if it is at most 2 * edge_bytes)."""
+    hasher = hashlib.blake2b(digest_size=20)
+    try:
+        with open(filepath, "rb") as f:
+            hasher.update(f.read(edge_bytes))
+            if size_bytes > edge_bytes:
+                f.seek(max(edge_bytes, size_bytes - edge_bytes))
+                hasher.update(f.read(edge_bytes))
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+def full_hash(filepath: str, chunk_bytes: int) -> str | None:
+    """BLAKE2b of the whole file, fed from a memory map without copying it into Python objects."""
+    hasher = hashlib.blake2b()
+    try:
+        with open(filepath, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return hasher.hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for offset in range(0, len(mm), chunk_bytes):
+                        hasher.update(view[offset:offset + chunk_bytes])
+                finally:
+                    view.release()
+    except (OSError, ValueError):
+        return None
+    return hasher.hexdigest()
+
+def _split_by_hash(executor: ThreadPoolExecutor, hash_func, groups: list[list[str]]) -> list[list[str]]:
+    """Hashes every path of every group in one parallel pass and splits each group by digest; singletons are dropped."""
+    paths = [path for group in groups for path in group]
+    digests = dict(zip(paths, executor.map(hash_func, paths)))
+    split_groups = []
+    for group in groups:
+        by_digest = defaultdict(list)
+        for path in group:
+            if digests[path] is not None:
+                by_digest[digests[path]].append(path)
+        split_groups.extend(same for same in by_digest.values() if len(same) > 1)
+    return split_groups
+
+def find_duplicates(root_path: str, min_size: int | None = None, use_index: bool = True,
+                    on_progress=None) -> tuple[list[dict], dict, str | None]:
+    """
+    Finds groups of files under root_path with identical content.
+    Returns (groups, stats, error). Each group is {"size_bytes", "paths" (sorted), "wasted_bytes"};
+    groups are ordered by wasted space, largest first. `stats` counts the files considered at each stage.
+    on_progress(description) is called between stages.
+    """
+    abs_root = os.path.abspath(root_path)
+    stats = {"files_scanned": 0, "size_candidates": 0, "partial_hashed": 0, "full_hashed": 0}
+    if not os.path.isdir(abs_root):
+        return [], stats, f"Path '{abs_root}' is not a valid directory."
+    if min_size is None:
+        min_size = DUPLICATE_SETTINGS.get("MIN_SIZE_BYTES", 1)
+    edge_bytes = DUPLICATE_SETTINGS.get("PARTIAL_HASH_BYTES", 64 * 1024)
+    chunk_bytes = DUPLICATE_SETTINGS.get("HASH_CHUNK_BYTES", 16 * 1024 * 1024)
+
+    if on_progress: on_progress("Grouping files by size")
+    by_size = _size_buckets(abs_root, min_size, use_index)
+    stats["files_scanned"] = sum(len(paths) for paths in by_size.values())
+    size_groups = {}
+    for size_bytes, paths in by_size.items():
+        if len(paths) > 1:
+            unique_paths = _without_hard_links(paths)
+            if len(unique_paths) > 1:
+                size_groups[size_bytes] = unique_paths
+    stats["size_candidates"] = sum(len(paths) for paths in size_groups.values())
+
+    size_of = {path: size_bytes for size_bytes, paths in size_groups.items() for path in paths}
+    with ThreadPoolExecutor(max_workers=DUPLICATE_SETTINGS.get("HASH_WORKERS", 4), thread_name_prefix="dup_hash") as executor:
+        if on_progress: on_progress(f"Hashing the start and end of {stats['size_candidates']} files")
+        partial_groups = _split_by_hash(executor, lambda path: partial_hash(path, size_of[path], edge_bytes), list(size_groups.values()))
+        stats["partial_hashed"] = stats["size_candidates"]
+        # Stage 2 already read every byte of files no larger than head + tail
+        small_groups = [group for group in partial_groups if size_of[group[0]] <= 2 * edge_bytes]
+        large_groups = [group for group in partial_groups if size_of[group[0]] > 2 * edge_bytes]
+
+        stats["full_hashed"] = sum(len(group) for group in large_groups)
+        if on_progress and large_groups: on_progress(f"Hashing {stats['full_hashed']} files in full")
+        confirmed_groups = small_groups + _split_by_hash(executor, lambda path: full_hash(path, chunk_bytes), large_groups)
+
+    result = [{"size_bytes": size_of[paths[0]], "paths": sorted(paths), "wasted_bytes": size_of[paths[0]] * (len(paths) - 1)}
+              for paths in confirmed_groups]
+    result.sort(key=lambda group: (-group["wasted_bytes"], group["paths"][0]))
+    return result, stats, None
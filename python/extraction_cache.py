@@ -0,0 +1,284 @@
+# python/extraction_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from config import EXTRACTION_CACHE_SETTINGS
+from . import fs_watcher
+from . import metadata_index
+from . import archive_reader
+from . import extractors
+
+# Two-tier cache of text extracted from documents (PDF, DOCX, archive members), so summarizing,
+# asking about and searching the same file parse it once.
+# Entries are keyed by the file's identity and version, (st_dev, st_ino, st_size, st_mtime_ns) (for
+# archive members: the archive's, plus the member name), together with the extraction variant
+# ("full" text for summaries and questions, "search" for the size-limited search text) and the
+# extractor version, so any change to the file or to an extractor simply misses.
+# Tier 1 is an in-memory LRU bounded by MEMORY_MAX_BYTES of text. Tier 2 is one zlib-compressed file
+# per entry in the state directory, bounded by DISK_MAX_BYTES; reads touch the file's mtime so the
+# least recently used files are evicted first. Watcher events drop the memory entries of changed paths.
+
+_memory = OrderedDict() # key -> (source, text, size_bytes)
+_memory_bytes = 0
+_paths = {}             # path -> set of memory keys, for watcher invalidation
+_disk_bytes = None      # Total size of the disk tier, measured on first use
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(EXTRACTION_CACHE_SETTINGS.get("ENABLED", True))
+
+def get_cache_dir() -> str:
+    cache_dir = os.path.join(metadata_index.get_state_dir(), EXTRACTION_CACHE_SETTINGS.get("DIR_NAME", "extraction_cache"))
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def make_key(path: str, variant: str, version: int | str) -> tuple | None:
+    """The cache key for path's current contents, or None if it cannot be stat'ed."""
+    member_name = ""
+    stat_path = path
+    parts = archive_reader.split_member_path(path)
+    if parts:
+        stat_path, member_name = parts
+    try:
+        stat_result = os.stat(stat_path)
+    except OSError:
+        return None
+    return (stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns, member_name, variant, str(version))
+
+def _disk_path(key: tuple) -> str:
+    return os.path.join(get_cache_dir(), hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".z")
+
+def lookup(path: str, variant: str, version: int | str, key: tuple | None = None) -> tuple[str, str] | None:
+    """(source, text) cached for path's current contents, or None."""
+    if not is_enabled():
+        return None
+    key = key or make_key(path, variant, version)
+    if key is None:
+        return None
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return entry[0], entry[1]
+
+    entry = _read_disk(key) if EXTRACTION_CACHE_SETTINGS.get("DISK_ENABLED", True) else None
+    with _lock:
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        _stats["disk_hits"] += 1
+    _remember(path, key, entry[0], entry[1])
+    return entry
+
+def store(path: str, variant: str, version: int | str, source: str, text: str, key: tuple | None = None):
+    """
+    Caches the text extracted from path. Pass the key computed before extracting, so a file that
+    changed during extraction is stored under its old identity and never served for the new one.
+    """
+    if not is_enabled() or text is None:
+        return
+    key = key or make_key(path, variant, version)
+    if key is None:
+        return
+    with _lock:
+        _stats["stores"] += 1
+    _remember(path, key, source, text)
+    if EXTRACTION_CACHE_SETTINGS.get("DISK_ENABLED", True):
+        _write_disk(key, source, text)
+
+def _remember(path: str, key: tuple, source: str, text: str):
+    global _memory_bytes
+    size_bytes = len(text.encode("utf-8"))
+    max_bytes = EXTRACTION_CACHE_SETTINGS.get("MEMORY_MAX_BYTES", 64 * 1024 * 1024)
+    if size_bytes > max_bytes // 4: # One huge document should not flush everything else
+        return
+    with _lock:
+        previous = _memory.pop(key, None)
+        if previous is not None:
+            _memory_bytes -= previous[2]
+        _memory[key] = (source, text, size_bytes)
+        _memory_bytes += size_bytes
+        _paths.setdefault(path, set()).add(key)
+        while _memory_bytes > max_bytes and _memory:
+            _, (_, _, evicted_bytes) = _memory.popitem(last=False)
+            _memory_bytes -= evicted_bytes
+            _stats["evictions"] += 1
+
+def _read_disk(key: tuple) -> tuple[str, str] | None:
+    disk_path = _disk_path(key)
+    try:
+        with open(disk_path, "rb") as f:
+            payload = zlib.decompress(f.read()).decode("utf-8")
+        header, text = payload.split("\n", 1)
+        stored_key, source = json.loads(header)
+        if tuple(stored_key) != key:
+            return None
+        os.utime(disk_path) # Recently used
+        return source, text
+    except (OSError, ValueError, zlib.error, UnicodeDecodeError):
+        return None
+
+def _write_disk(key: tuple, source: str, text: str):
+    global _disk_bytes
+    payload = json.dumps([list(key), source]) + "\n" + text
+    data = zlib.compress(payload.encode("utf-8"), EXTRACTION_CACHE_SETTINGS.get("COMPRESSION_LEVEL", 6))
+    disk_path = _disk_path(key)
+    temp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, disk_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return
+    with _lock:
+        if _disk_bytes is None:
+            _disk_bytes = _measure_disk()
+        else:
+            _disk_bytes += len(data)
+        over_budget = _disk_bytes > EXTRACTION_CACHE_SETTINGS.get("DISK_MAX_BYTES", 512 * 1024 * 1024)
+    if over_budget:
+        _evict_disk()
+
+def _disk_files() -> list[tuple[float, int, str]]:
+    """(mtime, size, path) of every cache file."""
+    files = []
+    cache_dir = get_cache_dir()
+    with os.scandir(cache_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".z"):
+                continue
+            try:
+                stat_result = entry.stat()
+            except OSError:
+                continue
+            files.append((stat_result.st_mtime, stat_result.st_size, entry.path))
+    return files
+
+def _measure_disk() -> int:
+    try:
+        return sum(size for _, size, _ in _disk_files())
+    except OSError:
+        return 0
+
+def _evict_disk():
+    """Deletes the least recently used cache files until the disk tier is at 90% of its budget."""
+    global _disk_bytes
+    target = int(EXTRACTION_CACHE_SETTINGS.get("DISK_MAX_BYTES", 512 * 1024 * 1024) * 0.9)
+    try:
+        files = sorted(_disk_files())
+    except OSError:
+        return
+    total = sum(size for _, size, _ in files)
+    for _, size, path in files:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        with _lock:
+            _stats["evictions"] += 1
+    with _lock:
+        _disk_bytes = total
+
+def invalidate_path(path: str):
+    """Drops the memory entries of path and of everything below it."""
+    global _memory_bytes
+    abs_path = os.path.abspath(path)
+    prefix = abs_path.rstrip(os.sep) + os.sep
+    with _lock:
+        for cached_path in [p for p in _paths if p == abs_path or p.startswith(prefix)
+                            or p.startswith(abs_path + archive_reader.ARCHIVE_SEPARATOR)]:
+            for key in _paths.pop(cached_path):
+                entry = _memory.pop(key, None)
+                if entry is not None:
+                    _memory_bytes -= entry[2]
+
+def clear() -> int:
+    """Empties both tiers. Returns the number of disk entries removed."""
+    global _memory_bytes, _disk_bytes
+    with _lock:
+        _memory.clear()
+        _paths.clear()
+        _memory_bytes = 0
+    removed = 0
+    try:
+        for _, _, path in _disk_files():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+    except OSError:
+        pass
+    with _lock:
+        _disk_bytes = 0
+    return removed
+
+def get_cache_stats() -> dict:
+    try:
+        disk_files = _disk_files()
+    except OSError:
+        disk_files = []
+    with _lock:
+        return {
+            "enabled": is_enabled(),
+            "memory_entries": len(_memory),
+            "memory_bytes": _memory_bytes,
+            "memory_max_bytes": EXTRACTION_CACHE_SETTINGS.get("MEMORY_MAX_BYTES", 64 * 1024 * 1024),
+            "disk_enabled": bool(EXTRACTION_CACHE_SETTINGS.get("DISK_ENABLED", True)),
+            "disk_entries": len(disk_files),
+            "disk_bytes": sum(size for _, size, _ in disk_files),
+            "disk_max_bytes": EXTRACTION_CACHE_SETTINGS.get("DISK_MAX_BYTES", 512 * 1024 * 1024),
+            "cache_dir": get_cache_dir(),
+            **_stats,
+        }
+
+class PdfPageBatches:
+    """
+    Page batches of one PDF (see extractors.PdfExtractor.page_cache), stored as JSON lists of page texts
+    under the file's identity when the extraction started.
+    """
+
+    def __init__(self, path: str, version: int | str):
+        self.path = path
+        self.version = f"pdf-pages-{version}"
+        self.identity = make_key(path, "", "")
+
+    def _key(self, start: int, stop: int) -> tuple:
+        return self.identity[:5] + (f"pages {start}-{stop}", self.version)
+
+    def lookup(self, start: int, stop: int) -> list[str] | None:
+        if self.identity is None:
+            return None
+        cached = lookup(self.path, "", "", key=self._key(start, stop))
+        try:
+            texts = json.loads(cached[1]) if cached is not None else None
+        except ValueError:
+            return None
+        return texts if isinstance(texts, list) else None
+
+    def store(self, start: int, stop: int, texts: list[str]):
+        if self.identity is not None:
+            store(self.path, "", "", "pdf_pages", json.dumps(texts), key=self._key(start, stop))
+
+def _watcher_listener(event: dict):
+    invalidate_path(event["path"])
+    if event.get("dest_path"):
+        invalidate_path(event["dest_path"])
+
+fs_watcher.add_listener(_watcher_listener)
+extractors.PdfExtractor.page_cache = PdfPageBatches
@@ -0,0 +1,227 @@
+# python/extraction_workers.py
+
+import atexit
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+
+from config import EXTRACTION_WORKER_SETTINGS
+from . import extractors
+
+# Pool of extractor processes used by content search and the content and semantic indexes to parse
+# documents (PDF, Office files) off the main process. Each worker handles one file at a time under a
+# per-file time limit (TIMEOUT_SECONDS, enforced by the parent, which kills a worker that overruns)
+# and an address-space limit (MEMORY_LIMIT_MB, set in the worker with RLIMIT_AS where available).
+# A file whose worker timed out or died is recorded for the rest of the session (while its size and
+# mtime are unchanged) and skipped, instead of being parsed again in the main process.
+
+_idle_workers = []
+_workers_lock = threading.Lock()
+_failures = {}          # path -> (size, mtime, reason)
+_failures_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(EXTRACTION_WORKER_SETTINGS.get("ENABLED", True)) and worker_count() > 0
+
+def worker_count() -> int:
+    configured = EXTRACTION_WORKER_SETTINGS.get("MAX_WORKERS")
+    return configured if configured is not None else min(4, os.cpu_count() or 1)
+
+def _apply_memory_limit(limit_mb: int | None):
+    if not limit_mb:
+        return
+    try:
+        import resource # Unix only
+        limit_bytes = int(limit_mb) * 1024 * 1024
+        _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+        if hard_limit != resource.RLIM_INFINITY:
+            limit_bytes = min(limit_bytes, hard_limit)
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, hard_limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def _worker_main(connection, memory_limit_mb: int | None):
+    """Worker loop: receives (task_id, path, extension, mime_type, max_chars), sends (task_id, text, source, error)."""
+    _apply_memory_limit(memory_limit_mb)
+    while True:
+        try:
+            task = connection.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        task_id, path, extension, mime_type, max_chars = task
+        try:
+            text, source, error = extractors.extract_text(path, extension, max_chars=max_chars, mime_type=mime_type)
+        except MemoryError:
+            text, source, error = "", "memory_limit", f"{os.path.basename(path)} needs more than {memory_limit_mb} MB to parse."
+        except Exception as e:
+            text, source, error = "", "extraction_error", f"Could not extract {os.path.basename(path)}: {e}"
+        try:
+            connection.send((task_id, text, source, error))
+        except (OSError, ValueError):
+            return
+
+
+class _Worker:
+    def __init__(self):
+        context = multiprocessing.get_context(EXTRACTION_WORKER_SETTINGS.get("START_METHOD", "spawn"))
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, daemon=True,
+                                       args=(child_connection, EXTRACTION_WORKER_SETTINGS.get("MEMORY_LIMIT_MB")))
+        self.process.start()
+        child_connection.close()
+        self.task = None        # (task_id, path) being extracted
+        self.started_at = None
+
+    def submit(self, task_id: int, path: str, extension: str, mime_type: str | None, max_chars: int | None):
+        self.connection.send((task_id, path, extension, mime_type, max_chars))
+        self.task = (task_id, path)
+        self.started_at = time.monotonic()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(5)
+        except (OSError, ValueError):
+            pass
+        self.connection.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.connection.close()
+
+
+def _acquire_workers(count: int) -> list[_Worker]:
+    with _workers_lock:
+        workers = [_idle_workers.pop() for _ in range(min(count, len(_idle_workers)))]
+    workers = [worker for worker in workers if worker.process.is_alive()]
+    while len(workers) < count:
+        workers.append(_Worker())
+    return workers
+
+def _release_workers(workers: list[_Worker]):
+    with _workers_lock:
+        for worker in workers:
+            if len(_idle_workers) < worker_count():
+                _idle_workers.append(worker)
+            else:
+                worker.stop()
+
+def shutdown():
+    """Stops the idle workers (busy ones are killed by their callers)."""
+    with _workers_lock:
+        workers = list(_idle_workers)
+        _idle_workers.clear()
+    for worker in workers:
+        worker.stop()
+
+def _file_identity(path: str) -> tuple[int, float] | None:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return stat_result.st_size, stat_result.st_mtime
+
+def _record_failure(path: str, reason: str):
+    identity = _file_identity(path)
+    if identity is not None:
+        with _failures_lock:
+            _failures[path] = (identity[0], identity[1], reason)
+
+def known_failure(path: str) -> str | None:
+    """Why path could not be extracted earlier (timeout, crash), if it has not changed since; else None."""
+    with _failures_lock:
+        failure = _failures.get(path)
+    if failure is None:
+        return None
+    if _file_identity(path) != (failure[0], failure[1]):
+        with _failures_lock:
+            _failures.pop(path, None)
+        return None
+    return failure[2]
+
+def get_failures() -> dict:
+    """{path: reason} of the files skipped after a timeout or crash this session."""
+    with _failures_lock:
+        return {path: failure[2] for path, failure in _failures.items()}
+
+def iter_extractions(tasks: list[tuple[str, str, str | None]], max_chars: int | None = None):
+    """
+    Extracts the text of (path, extension, mime_type) tasks in the worker processes and yields
+    (path, text, content_source, error_message) as each one completes (not in task order).
+    A task that runs past TIMEOUT_SECONDS, or whose worker dies, yields an error and is recorded as a
+    failure (see known_failure); its worker is replaced. Closing the generator early kills busy workers.
+    """
+    if not tasks:
+        return
+    timeout = EXTRACTION_WORKER_SETTINGS.get("TIMEOUT_SECONDS", 30)
+    pending = list(reversed(tasks))
+    workers = _acquire_workers(min(worker_count(), len(tasks)))
+    busy = {}               # connection -> worker
+    try:
+        while pending or busy:
+            for worker in workers:
+                if worker.task is None and pending:
+                    path, extension, mime_type = pending.pop()
+                    try:
+                        worker.submit(len(pending), path, extension, mime_type, max_chars)
+                    except (OSError, ValueError): # The worker died while idle
+                        pending.append((path, extension, mime_type))
+                        workers[workers.index(worker)] = _Worker()
+                        continue
+                    busy[worker.connection] = worker
+
+            if not busy:
+                continue
+            now = time.monotonic()
+            wait_seconds = max(0.0, min(worker.started_at + timeout for worker in busy.values()) - now) if timeout else None
+            ready = multiprocessing.connection.wait(list(busy), timeout=wait_seconds)
+            for connection in ready:
+                worker = busy.pop(connection)
+                _, path = worker.task
+                try:
+                    _, text, source, error = connection.recv()
+                except (EOFError, OSError): # Crashed (segfault, killed by the memory limit, ...)
+                    worker.kill()
+                    workers[workers.index(worker)] = _Worker()
+                    reason = "the extractor process crashed"
+                    _record_failure(path, reason)
+                    yield path, "", "extraction_crashed", f"Skipped {os.path.basename(path)}: {reason}."
+                    continue
+                worker.task = None
+                yield path, text, source, error
+
+            if timeout:
+                now = time.monotonic()
+                for connection, worker in list(busy.items()):
+                    if now - worker.started_at < timeout:
+                        continue
+                    del busy[connection]
+                    _, path = worker.task
+                    worker.kill()
+                    workers[workers.index(worker)] = _Worker()
+                    reason = f"extraction took longer than {timeout} seconds"
+                    _record_failure(path, reason)
+                    yield path, "", "extraction_timed_out", f"Skipped {os.path.basename(path)}: {reason}."
+    finally:
+        idle = []
+        for worker in workers:
+            if worker.task is not None and worker.connection in busy:
+                worker.kill() # Still parsing a file nobody waits for
+            else:
+                worker.task = None
+                idle.append(worker)
+        _release_workers(idle)
+
+atexit.register(shutdown)
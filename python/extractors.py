@@ -0,0 +1,519 @@
+# python/extractors.py
+
+import importlib
+import importlib.util
+import io
+import mimetypes
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
+
+from config import PDF_SETTINGS
+
+# Registry of text extractors shared by summarize, ask, content search and the indexes.
+# Each extractor declares the extensions and MIME types it handles and produces text as a stream of
+# chunks (pages, paragraphs or blocks), so callers can stop at max_chars without parsing the rest.
+# Heavy parsers (PyMuPDF) are imported the first time a document of their type is read, not when this
+# module is imported; is_available() only checks that they are installed. Office Open XML documents
+# (DOCX, XLSX, PPTX) are streamed from their zip parts with iterparse, with no third-party parser.
+# Sources are a file path or, for archive members and other in-memory files, the raw bytes.
+# Long PDFs are parsed in page batches by a pool of worker processes (see PdfExtractor).
+
+TEXT_CHUNK_CHARS = 64 * 1024
+# Joins the windows of a sampled text; the LLM sees where content was left out
+SKIP_MARKER = "\n\n[... {skipped} skipped ...]\n\n"
+TRUNCATION_NOTE = "\n\n[Content truncated due to length]"
+
+_modules = {}
+_modules_lock = threading.Lock()
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be read or parsed; the message is shown to the user."""
+
+
+class MissingDependencyError(ExtractionError):
+    pass
+
+
+def _load_module(module_name: str):
+    """Imports module_name once, on first use."""
+    with _modules_lock:
+        if module_name not in _modules:
+            _modules[module_name] = importlib.import_module(module_name)
+        return _modules[module_name]
+
+
+class Extractor:
+    name = "base"
+    version = 1                     # Bump when the produced text changes (invalidates extraction caches)
+    extensions = frozenset()
+    mime_types = frozenset()
+    requires = None                 # Importable module needed to parse this type, if any
+    install_hint = ""
+    source_label = "parsed"         # content_source reported for successful extractions
+
+    def is_available(self) -> bool:
+        if self.requires is None or self.requires in _modules:
+            return True
+        return importlib.util.find_spec(self.requires) is not None
+
+    def iter_chunks(self, path: str | None = None, data: bytes | None = None, max_chars: int | None = None,
+                    pages: tuple[int, int] | None = None):
+        """
+        Yields text chunks totalling at most max_chars characters (all of them if None).
+        pages=(first, last), 1-based and inclusive, limits paginated documents (PDF) to those pages;
+        other types ignore it.
+        """
+        remaining = max_chars
+        for chunk in self._iter_raw_chunks(path, data, pages, max_chars):
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+            yield chunk
+
+    def extract(self, path: str | None = None, data: bytes | None = None, max_chars: int | None = None,
+                pages: tuple[int, int] | None = None) -> str:
+        """The text of path (or data), at most max_chars characters (see iter_chunks). Raises ExtractionError."""
+        if not self.is_available():
+            raise MissingDependencyError(f"{self.install_hint} Cannot parse {', '.join(sorted(self.extensions))} files.")
+        try:
+            return "".join(self.iter_chunks(path, data, max_chars, pages))
+        except ExtractionError:
+            raise
+        except Exception as e:
+            raise ExtractionError(f"Error processing {os.path.basename(path or 'document')}: {e}. It might be corrupted or password-protected.") from e
+
+    def _iter_raw_chunks(self, path: str | None, data: bytes | None, pages: tuple[int, int] | None, max_chars: int | None):
+        """The document's text chunks; max_chars is only a hint (iter_chunks enforces it)."""
+        raise NotImplementedError
+
+
+class TextExtractor(Extractor):
+    name = "text"
+    extensions = frozenset(['.txt', '.md', '.py', '.json', '.html', '.css', '.js', '.log', '.csv', '.xml', '.yaml', '.yml',
+                            '.ini', '.cfg', '.sh', '.bat', '.ps1', '.c', '.cpp', '.java', '.go', '.rb', '.php'])
+    mime_types = frozenset(["text/plain", "text/markdown", "text/html", "text/css", "text/csv", "text/xml", "application/json",
+                            "application/xml", "text/x-python", "application/javascript", "text/javascript"])
+    source_label = "text_file_read"
+
+    def iter_chunks(self, path: str | None = None, data: bytes | None = None, max_chars: int | None = None,
+                    pages: tuple[int, int] | None = None):
+        if data is not None:
+            text = data.decode("utf-8", errors="ignore")
+            yield text if max_chars is None else text[:max_chars]
+            return
+        remaining = max_chars
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            while remaining is None or remaining > 0:
+                chunk = f.read(TEXT_CHUNK_CHARS if remaining is None else min(TEXT_CHUNK_CHARS, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+
+def _pdf_page_texts(path: str | None, data: bytes | None, start: int, stop: int) -> list[str]:
+    """The text of pages start..stop-1 (0-based). Runs in the PDF worker processes as well."""
+    fitz = _load_module("fitz")
+    doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(path)
+    try:
+        return [doc[index].get_text("text") for index in range(start, min(stop, doc.page_count))]
+    finally:
+        doc.close()
+
+def _pdf_worker_count() -> int:
+    return PDF_SETTINGS.get("MAX_WORKERS") or min(4, (os.cpu_count() or 1) - 1)
+
+def _get_pdf_pool() -> ProcessPoolExecutor | None:
+    """The shared PDF worker pool, started on first use; None if fewer than two workers are configured."""
+    global _pdf_pool
+    if _pdf_worker_count() < 2:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Workers are spawned, not forked: the REPL runs watcher and UI threads whose locks must not be inherited
+            _pdf_pool = ProcessPoolExecutor(max_workers=_pdf_worker_count(),
+                                            mp_context=multiprocessing.get_context(PDF_SETTINGS.get("START_METHOD", "spawn")))
+        return _pdf_pool
+
+def _discard_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class PdfExtractor(Extractor):
+    """
+    Pages are parsed in batches of PAGES_PER_TASK. A full extraction of a PDF on disk with at least
+    PARALLEL_MIN_PAGES pages sends the batches to the worker pool and reassembles them in page order,
+    keeping only a few batches in flight so a caller that stops early does not parse the whole file.
+    `page_cache` (set by extraction_cache) is consulted for whole batches before parsing them and
+    receives every batch as it completes, so an interrupted extraction or a later page request reuses them.
+    Archive members (data) are always parsed in this process.
+    """
+    name = "pdf"
+    extensions = frozenset([".pdf"])
+    mime_types = frozenset(["application/pdf"])
+    requires = "fitz"
+    install_hint = "PyMuPDF library not found. Please run: pip install pymupdf."
+    source_label = "pdf_parsed"
+    # Called as page_cache(path, version) when an extraction starts; returns an object with
+    # lookup(start, stop) -> list of page texts | None and store(start, stop, texts), or None
+    page_cache = None
+
+    def page_count(self, path: str | None = None, data: bytes | None = None) -> int:
+        fitz = _load_module("fitz")
+        doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(path)
+        try:
+            return doc.page_count
+        finally:
+            doc.close()
+
+    def page_batches(self, page_total: int, pages: tuple[int, int] | None = None) -> list[tuple[int, int]]:
+        """0-based (start, stop) ranges covering the requested pages, cut at PAGES_PER_TASK boundaries."""
+        batch_pages = max(1, PDF_SETTINGS.get("PAGES_PER_TASK", 16))
+        first, last = (1, page_total) if pages is None else (max(1, pages[0]), min(page_total, pages[1]))
+        batches = []
+        start = first - 1
+        while start < last:
+            stop = min(last, (start // batch_pages + 1) * batch_pages)
+            batches.append((start, stop))
+            start = stop
+        return batches
+
+    def iter_page_texts(self, path: str | None = None, data: bytes | None = None, pages: tuple[int, int] | None = None,
+                        parallel: bool = True):
+        """Yields the text of each requested page, in page order."""
+        page_total = self.page_count(path, data)
+        batches = self.page_batches(page_total, pages)
+        batch_pages = max(1, PDF_SETTINGS.get("PAGES_PER_TASK", 16))
+        cache = self.page_cache(path, self.version) if self.page_cache is not None and data is None else None
+        def is_whole(batch):
+            return batch[0] % batch_pages == 0 and (batch[1] - batch[0] == batch_pages or batch[1] == page_total)
+
+        pool = None
+        if parallel and data is None and len(batches) > 1 and page_total >= PDF_SETTINGS.get("PARALLEL_MIN_PAGES", 48):
+            pool = _get_pdf_pool()
+        in_flight = deque()   # (batch, cached texts or future), in page order
+        next_batch = 0
+        try:
+            while in_flight or next_batch < len(batches):
+                while next_batch < len(batches) and (not in_flight or (pool is not None and len(in_flight) < _pdf_worker_count() * 2)):
+                    batch = batches[next_batch]
+                    next_batch += 1
+                    texts = cache.lookup(*batch) if cache is not None and is_whole(batch) else None
+                    if texts is None and pool is not None:
+                        try:
+                            texts = pool.submit(_pdf_page_texts, path, None, *batch)
+                        except (BrokenProcessPool, RuntimeError):
+                            _discard_pdf_pool()
+                            pool = None
+                    in_flight.append((batch, texts))
+                batch, texts = in_flight.popleft()
+                from_cache = isinstance(texts, list)
+                if texts is None:
+                    texts = _pdf_page_texts(path, data, *batch)
+                elif not from_cache:
+                    try:
+                        texts = texts.result()
+                    except BrokenProcessPool: # A worker died; finish in this process
+                        _discard_pdf_pool()
+                        pool = None
+                        texts = _pdf_page_texts(path, data, *batch)
+                if cache is not None and not from_cache and is_whole(batch):
+                    cache.store(*batch, texts)
+                yield from texts
+        finally:
+            for _, pending in in_flight:
+                if pending is not None and not isinstance(pending, list):
+                    pending.cancel()
+
+    def _iter_raw_chunks(self, path, data, pages, max_chars):
+        # Bounded reads (search text) stop after a few pages; only full extractions are worth the pool
+        yield from self.iter_page_texts(path, data, pages, parallel=max_chars is None)
+
+
+def _local_name(tag: str) -> str:
+    """An XML tag without its namespace (transitional and strict OOXML use different namespace URIs)."""
+    return tag.rsplit("}", 1)[-1]
+
+def _numbered_parts(archive: zipfile.ZipFile, pattern: str) -> list[str]:
+    """Names of the archive parts matching pattern (with one numeric group), in numeric order."""
+    matcher = re.compile(pattern)
+    parts = []
+    for name in archive.namelist():
+        match = matcher.fullmatch(name)
+        if match:
+            parts.append((int(match.group(1)), name))
+    return [name for _, name in sorted(parts)]
+
+
+class OoxmlExtractor(Extractor):
+    """
+    Office Open XML packages (zip files of XML parts). The parts holding the text are decompressed and
+    parsed as streams: each block (paragraph, slide paragraph, sheet row) is yielded as soon as it ends and
+    every finished element is dropped from the tree, so memory stays flat however large the document, and parsing stops as soon as
+    the caller has enough text.
+    """
+    block_tags = frozenset()        # Elements yielded as one line of text
+    text_tags = frozenset(["t"])    # Elements whose text is the document's text
+    cell_tags = frozenset()         # Elements separated by a tab within a block
+
+    def _part_names(self, archive: zipfile.ZipFile) -> list[str]:
+        raise NotImplementedError
+
+    def _iter_raw_chunks(self, path, data, pages, max_chars):
+        with zipfile.ZipFile(io.BytesIO(data) if data is not None else path) as archive:
+            context = self._open_context(archive)
+            for part_name in self._part_names(archive):
+                with archive.open(part_name) as stream:
+                    yield from self._iter_part_blocks(stream, context)
+
+    def _open_context(self, archive: zipfile.ZipFile):
+        """Per-document state needed to render text (e.g. shared strings); None by default."""
+        return None
+
+    def _iter_part_blocks(self, stream, context):
+        stack = []
+        pieces = []
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(element)
+                continue
+            stack.pop()
+            parent = stack[-1] if stack else None
+            tag = _local_name(element.tag)
+            if tag in self.text_tags:
+                pieces.append(self._element_text(element, parent, context))
+            elif tag == "tab" and parent is not None and _local_name(parent.tag) == "r": # Not the tab stops of paragraph properties
+                pieces.append("\t")
+            elif tag in ("br", "cr"):
+                pieces.append("\n")
+            elif tag in self.cell_tags:
+                pieces.append("\t")
+            if tag in self.block_tags:
+                yield "".join(pieces).rstrip("\t") + "\n"
+                pieces = []
+            if parent is not None:
+                # Everything an ended element holds has been read; dropping it keeps the tree from growing
+                parent.remove(element)
+
+    def _element_text(self, element, parent, context) -> str:
+        return element.text or ""
+
+
+class DocxExtractor(OoxmlExtractor):
+    name = "docx"
+    version = 2                     # Table cell text is included
+    extensions = frozenset([".docx", ".docm"])
+    mime_types = frozenset(["application/vnd.openxmlformats-officedocument.wordprocessingml.document"])
+    source_label = "docx_parsed"
+    block_tags = frozenset(["p"])   # Table cells hold paragraphs too, so their text comes out line by line
+
+    def _part_names(self, archive):
+        return ["word/document.xml"]
+
+
+class PptxExtractor(OoxmlExtractor):
+    name = "pptx"
+    extensions = frozenset([".pptx"])
+    mime_types = frozenset(["application/vnd.openxmlformats-officedocument.presentationml.presentation"])
+    source_label = "pptx_parsed"
+    block_tags = frozenset(["p"])
+
+    def _part_names(self, archive):
+        return _numbered_parts(archive, r"ppt/slides/slide(\d+)\.xml")
+
+
+class XlsxExtractor(OoxmlExtractor):
+    name = "xlsx"
+    extensions = frozenset([".xlsx", ".xlsm"])
+    mime_types = frozenset(["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"])
+    source_label = "xlsx_parsed"
+    block_tags = frozenset(["row"])
+    text_tags = frozenset(["v", "t"])
+    cell_tags = frozenset(["c"])
+
+    def _part_names(self, archive):
+        return _numbered_parts(archive, r"xl/worksheets/sheet(\d+)\.xml")
+
+    def _open_context(self, archive):
+        """The shared strings table; cells of type "s" hold an index into it."""
+        shared_strings = []
+        try:
+            stream = archive.open("xl/sharedStrings.xml")
+        except KeyError:
+            return shared_strings
+        with stream:
+            pieces = []
+            for _, element in ElementTree.iterparse(stream):
+                tag = _local_name(element.tag)
+                if tag == "t":
+                    pieces.append(element.text or "")
+                elif tag == "si":
+                    shared_strings.append("".join(pieces))
+                    pieces = []
+                    element.clear()
+        return shared_strings
+
+    def _element_text(self, element, parent, context) -> str:
+        text = element.text or ""
+        if _local_name(element.tag) == "v" and parent is not None and parent.get("t") == "s":
+            try:
+                return context[int(text)]
+            except (ValueError, IndexError):
+                return ""
+        return text
+
+
+_registry = []
+
+def register(extractor: Extractor):
+    """Adds an extractor; later registrations take precedence for the extensions and types they share."""
+    _registry.insert(0, extractor)
+
+def get_extractor(path: str | None = None, extension: str | None = None, mime_type: str | None = None) -> Extractor | None:
+    """The extractor for a sniffed or given MIME type, else for the extension (taken from path if not given)."""
+    if mime_type:
+        for extractor in _registry:
+            if mime_type in extractor.mime_types:
+                return extractor
+    if extension is None and path:
+        extension = os.path.splitext(path)[1]
+    extension = (extension or "").lower()
+    for extractor in _registry:
+        if extension in extractor.extensions:
+            return extractor
+    if path and not mime_type:
+        guessed_type, _ = mimetypes.guess_type(path)
+        if guessed_type:
+            return get_extractor(mime_type=guessed_type, extension="")
+    return None
+
+def supported_extensions() -> frozenset:
+    return frozenset().union(*(extractor.extensions for extractor in _registry))
+
+def text_extensions() -> frozenset:
+    """Extensions read as plain text (no parser, safe to grep as bytes)."""
+    return frozenset().union(*(extractor.extensions for extractor in _registry if isinstance(extractor, TextExtractor)))
+
+def extract_text(path: str, extension: str | None = None, data: bytes | None = None, max_chars: int | None = None,
+                 mime_type: str | None = None, pages: tuple[int, int] | None = None) -> tuple[str, str, str | None]:
+    """
+    Extracts up to max_chars of text from path (or from data, the file's bytes, e.g. an archive member),
+    only from pages=(first, last) (1-based, inclusive) for paginated documents.
+    Returns (text, content_source, error_message); text is "" when nothing could be extracted.
+    """
+    extension = (extension if extension is not None else os.path.splitext(path)[1]).lower()
+    extractor = get_extractor(path, extension, mime_type)
+    if extractor is None:
+        return "", "unsupported_type_no_extraction", f"File type '{extension}' is not directly supported for content extraction."
+    content_source = f"{extension}_{extractor.source_label}" if isinstance(extractor, TextExtractor) else extractor.source_label
+    try:
+        text = extractor.extract(path, data, max_chars, pages)
+    except MissingDependencyError as e:
+        return "", f"{extractor.name}_parsing_skipped_dependency", str(e)
+    except ExtractionError as e:
+        return "", f"{extractor.name}_processing_error", str(e)
+    except OSError as e:
+        return "", "extraction_error", f"Could not read {os.path.basename(path)}: {e}"
+    return text, content_source, None
+
+
+# === Bounded sampling ===
+# A file larger than the budget is represented by its head, evenly spaced windows from the middle and
+# its tail ("spread"), or by its head alone ("head"). Plain text files are sampled with seek(), so only
+# the windows themselves are ever read, however large the file is.
+def sample_windows(total: int, budget: int, middle_windows: int, mode: str = "spread") -> list[tuple[int, int]]:
+    """[(start, length), ...] in order, covering at most budget of total units (bytes or characters)."""
+    if total <= budget:
+        return [(0, total)]
+    if mode == "head" or budget < 64:
+        return [(0, budget)]
+    window_count = middle_windows + 2
+    window = budget // window_count
+    starts = [0] + [int(total * (index + 1) / (middle_windows + 1)) - window // 2 for index in range(middle_windows)] + [total - window]
+    windows = []
+    for start in starts:
+        start = max(start, windows[-1][0] + windows[-1][1] if windows else 0)
+        if start < total:
+            windows.append((start, min(window, total - start)))
+    return windows
+
+def _trim_partial_lines(piece: str, at_start: bool, at_end: bool) -> str:
+    """Drops the partial first and last lines of a window cut from the middle of a text."""
+    if not at_start:
+        newline = piece.find("\n")
+        if 0 <= newline < len(piece) // 4:
+            piece = piece[newline + 1:]
+    if not at_end:
+        newline = piece.rfind("\n")
+        if newline >= len(piece) * 3 // 4:
+            piece = piece[:newline + 1]
+    return piece
+
+def _join_windows(pieces: list[tuple[int, int, str]], total: int, unit: str) -> str:
+    text = ""
+    position = 0
+    for start, length, piece in pieces:
+        if start > position:
+            text += SKIP_MARKER.format(skipped=f"{start - position:,} {unit}") if text else ""
+        text += piece
+        position = start + length
+    if position < total:
+        text += TRUNCATION_NOTE if len(pieces) == 1 else SKIP_MARKER.format(skipped=f"{total - position:,} {unit}").rstrip()
+    return text
+
+def sample_text(text: str, max_chars: int, middle_windows: int = 3, mode: str = "spread") -> tuple[str, bool]:
+    """(text bounded to about max_chars, True if content was left out) for text already in memory."""
+    windows = sample_windows(len(text), max_chars, middle_windows, mode)
+    if len(windows) == 1 and windows[0] == (0, len(text)):
+        return text, False
+    pieces = [(start, length, _trim_partial_lines(text[start:start + length], start == 0, start + length == len(text)))
+              for start, length in windows]
+    return _join_windows(pieces, len(text), "characters"), True
+
+def read_text_sample(path: str, max_chars: int, middle_windows: int = 3, mode: str = "spread",
+                     data: bytes | None = None) -> tuple[str, bool]:
+    """
+    Like sample_text for a plain text file (or its bytes), reading only the sampled windows.
+    Windows are measured in bytes, so the result never exceeds max_chars characters (plus the markers).
+    Raises OSError if the file cannot be read.
+    """
+    total = len(data) if data is not None else os.path.getsize(path)
+    windows = sample_windows(total, max_chars, middle_windows, mode)
+    pieces = []
+    if data is not None:
+        for start, length in windows:
+            pieces.append((start, length, data[start:start + length]))
+    else:
+        with open(path, "rb") as f:
+            for start, length in windows:
+                f.seek(start)
+                pieces.append((start, length, f.read(length)))
+    decoded = [(start, length, _trim_partial_lines(raw.decode("utf-8", errors="ignore"), start == 0, start + length >= total))
+               for start, length, raw in pieces]
+    if len(windows) == 1 and windows[0] == (0, total):
+        return decoded[0][2] if decoded else "", False
+    return _join_windows(decoded, total, "bytes"), True
+
+
+register(TextExtractor())
+register(DocxExtractor())
+register(PptxExtractor())
+register(XlsxExtractor())
+register(PdfExtractor())
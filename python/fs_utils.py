@@ -6,39 +6,38 @@ import os
 import shutil
 import time # For item modification times
 import re   # For search criteria parsing
-
-# PDF and DOCX parsing (optional, can be kept in action_handlers or centralized here if preferred)
-try:
-    import fitz  # PyMuPDF
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
-
-try:
-    from docx import Document as DocxDocument # Renamed to avoid conflict if Document is used elsewhere
-    PYTHON_DOCX_AVAILABLE = True
-except ImportError:
-    PYTHON_DOCX_AVAILABLE = False
+import tarfile
+import zipfile
+import zlib
+
+from config import SEARCH_SETTINGS, ARCHIVE_SETTINGS, EXTRACTION_WORKER_SETTINGS
+from . import fs_walker
+from . import search_query
+from . import content_grep
+from . import search_cache
+from . import fuzzy_name
+from . import archive_reader
+from . import extraction_cache
+from . import extractors # PDF and DOCX parsers load on first use
+from . import content_sniffer
+from . import extraction_workers
 
 # For rich progress bar in search, if cli_ui is not directly imported
 # from rich.progress import Progress # Keep this if you make search_recursive part of fs_utils and it needs its own progress
 
-# --- Constants for File Type Matching ---
-SEARCH_TYPE_KEYWORDS = {
-    "image": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
-    "picture": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
-    "photo": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
-    "video": ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm'],
-    "audio": ['.mp3', '.wav', '.ogg', '.aac', '.flac', '.m4a'],
-    "document": ['.pdf', '.doc', '.docx', '.odt', '.txt', '.rtf', '.ppt', '.pptx', '.xls', '.xlsx', '.csv', '.md', '.tex'],
-    "pdf": [".pdf"], "word document": [".doc", ".docx"], "text file": [".txt", ".md", ".log", ".rtf"],
-    "spreadsheet": [".xls", ".xlsx", ".ods", ".csv"], "presentation": [".ppt", ".pptx", ".odp"],
-    "python script": [".py", ".pyw"], "javascript file": [".js", ".mjs"], "typescript file": [".ts", ".tsx"],
-    "html file": [".html", ".htm"], "css file": [".css", ".scss", ".less"],
-    "archive": [".zip", ".rar", ".tar", ".gz", ".7z", ".bz2"],
-    "executable": [".exe", ".msi", ".dmg", ".app", ".deb", ".rpm"],
-    "code file": [".py",".js",".java",".c",".cpp",".cs",".go",".rs",".swift",".kt",".php",".rb",".pl",".sh",".bat"],
-}
+# Type keywords live with the query compiler; re-exported for existing callers
+from .search_query import SEARCH_TYPE_KEYWORDS
+
+# Plain-text types read directly for search; `containing` searches grep these through content_grep
+TEXT_SEARCH_EXTENSIONS = extractors.text_extensions()
+# Types get_file_content_for_search can extract text from (every registered extractor)
+CONTENT_SEARCH_EXTENSIONS = extractors.supported_extensions()
+MAX_SEARCH_CONTENT_SIZE = 100 * 1024  # 100KB limit for quick search (extracted documents)
+# Bump when the search text limits change, so cached extractions are not reused
+SEARCH_EXTRACTOR_VERSION = 2
+
+# Deferred `containing` checks go to the content index this many files at a time, so matches stream out early
+CONTENT_CHECK_BATCH_SIZE = 256
 
 # === Path Safety ===
 def is_path_within_base(path_to_check: str, base_path: str) -> bool:
@@ -84,89 +83,139 @@ def is_file_type_match(filepath: str, criteria_str: str, is_file: bool = True) -
     if criteria_lower.startswith("."): # Direct extension match
         return extension == criteria_lower
 
-    for type_name, extensions in SEARCH_TYPE_KEYWORDS.items():
-        if type_name == criteria_lower:
-            return extension in extensions
-    return False # No match
+    extensions = search_query.TYPE_EXTENSION_SETS.get(criteria_lower)
+    return extensions is not None and extension in extensions
 
 # === Core File Content Reading (used by action_handlers and potentially search) ===
 def _read_text_file_content(filepath: str, max_size: int = -1) -> (str | None):
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            if max_size > 0:
-                return f.read(max_size)
-            return f.read()
-    except Exception:
-        return None
+    text, _, error = extractors.extract_text(filepath, ".txt", max_chars=max_size if max_size > 0 else None)
+    return None if error else text
 
-def _extract_text_from_docx_content(filepath: str, max_size: int = -1) -> (str | None):
-    if not PYTHON_DOCX_AVAILABLE: return None
-    try:
-        doc = DocxDocument(filepath)
-        full_text_list = [para.text for para in doc.paragraphs]
-        if max_size <= 0:
-            return '\n'.join(full_text_list)
-        
-        content = ""
-        for para_text in full_text_list:
-            if len(content) + len(para_text) + 1 > max_size:
-                needed = max_size - len(content) -1 # -1 for potential newline
-                if needed > 0 : content += "\n" + para_text[:needed]
-                break
-            content += "\n" + para_text
-        return content.lstrip("\n")
-    except Exception:
-        return None
 
-def _extract_text_from_pdf_content(filepath: str, max_size: int = -1) -> (str | None):
-    if not PYMUPDF_AVAILABLE: return "PyMuPDF (fitz) not installed. Cannot extract PDF text."
-    try:
-        doc = fitz.open(filepath)
-        text = ""
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            page_text = page.get_text("text")
-            if max_size > 0 and len(text) + len(page_text) > max_size:
-                remaining_len = max_size - len(text)
-                text += page_text[:remaining_len]
-                break
-            text += page_text
-        doc.close()
-        return text if text.strip() else None
-    except Exception as e:
-        return f"PDF parsing error: {str(e)}"
-
-
-def get_file_content_for_search(filepath: str, console=None) -> (str | None):
-    """Gets limited content, suitable for quick search checks."""
-    if not (filepath and os.path.exists(filepath) and os.path.isfile(filepath)):
+def get_file_content_for_search(filepath: str, console=None, is_known_file: bool = False,
+                                kind: str | None = None) -> (str | None):
+    """
+    Gets limited content (at most MAX_SEARCH_CONTENT_SIZE characters), suitable for quick search checks.
+    Pass is_known_file=True when the caller already knows (e.g. from a DirEntry) that filepath is a file,
+    and `kind` when it already sniffed the file (see content_sniffer); binaries yield None without parsing.
+    """
+    if not filepath or (not is_known_file and not os.path.isfile(filepath)):
         return None
         
     _, extension = os.path.splitext(filepath.lower())
-    MAX_SEARCH_CONTENT_SIZE = 100 * 1024  # 100KB limit for quick search
-    content = None
-
+    if kind is None and content_sniffer.is_enabled():
+        kind = content_sniffer.sniff(filepath)
+    if content_sniffer.is_skipped(kind):
+        return None
+    extractor = extractors.get_extractor(filepath, extension, content_sniffer.mime_type_for(kind))
+    if extractor is None:
+        return None
+    if isinstance(extractor, extractors.TextExtractor):
+        return _read_text_file_content(filepath, MAX_SEARCH_CONTENT_SIZE)
+
+    # Parsed documents are served from the extraction cache while the file is unchanged
+    version = _search_text_version(extractor)
+    cache_key = extraction_cache.make_key(filepath, "search", version)
+    cached = extraction_cache.lookup(filepath, "search", version, key=cache_key)
+    if cached is not None:
+        return cached[1] or None
+    if extraction_workers.known_failure(filepath): # Timed out or crashed an extractor worker before
+        return None
     try:
-        if extension in ['.txt', '.py', '.js', '.css', '.html', '.md', '.json', '.xml', '.log', '.ini', '.cfg', '.sh', '.bat']:
-            content = _read_text_file_content(filepath, MAX_SEARCH_CONTENT_SIZE)
-        elif extension == '.docx':
-            content = _extract_text_from_docx_content(filepath, MAX_SEARCH_CONTENT_SIZE)
-        elif extension == '.pdf':
-            # For search, a smaller chunk of PDF text might be okay, or skip if too slow
-            content = _extract_text_from_pdf_content(filepath, MAX_SEARCH_CONTENT_SIZE // 2) # smaller for pdfs
-        # Add other types if needed for quick search
-    except Exception as e:
+        content = extractor.extract(filepath, max_chars=MAX_SEARCH_CONTENT_SIZE)
+    except extractors.ExtractionError as e:
         if console: # Assuming console is passed from action_handler if UI feedback is desired
             console.print(f"[yellow]Warning (search read): Could not get content from '{os.path.basename(filepath)}': {str(e)[:50]}...[/yellow]")
-    return content
+        return None
+    extraction_cache.store(filepath, "search", version, f"{extractor.name}_search_text", content, key=cache_key)
+    return content or None
+
+def _search_text_version(extractor) -> str:
+    return f"{SEARCH_EXTRACTOR_VERSION}.{extractor.name}-{extractor.version}"
+
+def _pending_document(filepath: str, kind: str | None = None) -> tuple | None:
+    """
+    (extractor, mime_type, cache_key) if filepath is a document whose search text still has to be parsed
+    (not plain text, not a binary, not cached, not a known failure), else None.
+    """
+    if kind is None and content_sniffer.is_enabled():
+        kind = content_sniffer.sniff(filepath)
+    if content_sniffer.is_skipped(kind):
+        return None
+    mime_type = content_sniffer.mime_type_for(kind)
+    extractor = extractors.get_extractor(filepath, os.path.splitext(filepath.lower())[1], mime_type)
+    if extractor is None or isinstance(extractor, extractors.TextExtractor) or not extractor.is_available():
+        return None
+    version = _search_text_version(extractor)
+    cache_key = extraction_cache.make_key(filepath, "search", version)
+    if cache_key is None or extraction_cache.lookup(filepath, "search", version, key=cache_key) is not None \
+            or extraction_workers.known_failure(filepath):
+        return None
+    return extractor, mime_type, cache_key
+
+def prefetch_search_texts(filepaths: list[str], report=None):
+    """
+    Parses the search text of the documents among filepaths in the extraction worker processes (see
+    extraction_workers) and stores it in the extraction cache, so get_file_content_for_search then
+    answers from the cache. Yields every path once its text is ready, failed or needed no parsing:
+    those needing none first, then the documents in the order they complete.
+    Without workers (or with the extraction cache disabled) the paths are yielded as they are.
+    """
+    if not extraction_workers.is_enabled() or not extraction_cache.is_enabled():
+        yield from filepaths
+        return
+    documents = {}
+    for filepath in filepaths:
+        pending = _pending_document(filepath)
+        if pending is None:
+            yield filepath
+        else:
+            documents[filepath] = pending
+    if not documents:
+        return
+    if report:
+        report(f"[cyan]Extracting text from {len(documents)} document(s)...")
+    tasks = [(filepath, os.path.splitext(filepath.lower())[1], mime_type) for filepath, (_, mime_type, _) in documents.items()]
+    for filepath, text, source, error in extraction_workers.iter_extractions(tasks, MAX_SEARCH_CONTENT_SIZE):
+        extractor, _, cache_key = documents[filepath]
+        if extraction_workers.known_failure(filepath):
+            if report:
+                report(f"[yellow]{error}")
+        else: # Unreadable documents are cached as empty too, so they are not parsed again in this process
+            extraction_cache.store(filepath, "search", _search_text_version(extractor), f"{extractor.name}_search_text",
+                                   text if error is None else "", key=cache_key)
+        yield filepath
 
 
 # === File and Folder Operations ===
 
+def _item_from_entry(entry: os.DirEntry) -> dict:
+    """Builds a listing item from a DirEntry, reusing its cached type and stat data."""
+    try:
+        is_dir = entry.is_dir()
+        item_type = "directory" if is_dir else "file" if entry.is_file() else "other"
+        stat_result = entry.stat()
+        size_bytes = stat_result.st_size
+        mod_time = stat_result.st_mtime
+    except OSError: # Permissions error or broken link
+        item_type = "other"
+        size_bytes = -1 
+        mod_time = 0
+    return {
+        "name": entry.name,
+        "path": entry.path,
+        "type": item_type,
+        "size_bytes": size_bytes,
+        "size_readable": bytes_to_readable(size_bytes) if size_bytes >=0 else "N/A",
+        "modified_timestamp": mod_time,
+        "modified_readable": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mod_time)) if mod_time > 0 else "N/A"
+    }
+
 def list_folder_contents_simple(folder_path: str, max_depth: int = 0) -> tuple[list[dict], str | None]:
     """
     Lists folder contents (files and directories) with basic details.
-    max_depth = 0 means only top-level.
+    max_depth = 0 means only top-level; deeper levels are listed by the parallel walker,
+    one directory's contents after another in depth-first order.
     Returns (items_list, error_message_string).
     """
     if not folder_path or not os.path.isdir(folder_path):
@@ -174,67 +223,592 @@ def list_folder_contents_simple(folder_path: str, max_depth: int = 0) -> tuple[l
 
     items = []
     try:
-        for entry in os.scandir(folder_path):
-            item_path = entry.path
-            item_type = "directory" if entry.is_dir() else "file" if entry.is_file() else "other"
-            
-            try:
-                stat_result = entry.stat()
-                size_bytes = stat_result.st_size
-                mod_time = stat_result.st_mtime
-            except OSError: # Permissions error or broken link
-                size_bytes = -1 
-                mod_time = 0
-
-            items.append({
-                "name": entry.name,
-                "path": item_path,
-                "type": item_type,
-                "size_bytes": size_bytes,
-                "size_readable": bytes_to_readable(size_bytes) if size_bytes >=0 else "N/A",
-                "modified_timestamp": mod_time,
-                "modified_readable": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mod_time)) if mod_time > 0 else "N/A"
-            })
+        for _, _, subdirs, files in fs_walker.walk_tree(folder_path, max_depth=max_depth, skip_hidden=False, apply_ignores=False):
+            items.extend(_item_from_entry(entry) for entry in subdirs + files)
         return items, None
     except Exception as e:
         return [], f"Error listing contents of folder '{folder_path}': {e}"
 
 
-def search_files_recursive(start_path: str, criteria_str: str, llm_connector, console_for_progress=None) -> tuple[list[dict], str | None]:
+def _iter_walked_files(abs_start_path: str, dir_mtimes: dict | None = None, budget: dict | None = None):
+    """
+    Yields (root, filename, filepath, size_bytes, mtime) from the parallel walker's cached stat data.
+    If given, dir_mtimes is filled with {dir_path: st_mtime_ns} for every directory visited.
+    `budget` (see iter_search_files) can resume a stopped walk and stop this one at its deadline, in which
+    case budget["stopped"] is set to the walk's cursor: the directories still pending plus the files
+    already produced in the directory it stopped in.
+    """
+    budget = budget or {}
+    deadline = budget.get("deadline")
+    resume = budget.get("resume") if (budget.get("resume") or {}).get("source") == "walk" else None
+    start_dirs = None
+    skip_dir, skip_files = None, set()
+    if resume:
+        start_dirs = [tuple(pending_dir) for pending_dir in resume.get("pending", [])]
+        skip_dir, skip_files = resume.get("skip_dir"), set(resume.get("skip_files", []))
+        if not start_dirs:
+            return
+    elif dir_mtimes is not None:
+        try:
+            dir_mtimes[abs_start_path] = os.stat(abs_start_path).st_mtime_ns
+        except OSError:
+            pass
+
+    walk_state = {}
+    for root, depth, subdirs, files in fs_walker.walk_tree(abs_start_path, start_dirs=start_dirs, deadline=deadline, state=walk_state):
+        if dir_mtimes is not None:
+            for subdir_entry in subdirs:
+                try:
+                    dir_mtimes[subdir_entry.path] = subdir_entry.stat().st_mtime_ns # Cached by the walker
+                except OSError:
+                    continue
+        done_files = set(skip_files) if root == skip_dir else set() # Produced before a resume
+        if deadline is not None and time.monotonic() > deadline and not done_files:
+            # Resume with this directory (its children are not queued yet)
+            budget["stopped"] = {"source": "walk", "pending": [list(pending_dir) for pending_dir in walk_state["pending"]] + [[root, depth]],
+                                 "skip_dir": None, "skip_files": []}
+            return
+        for entry in files:
+            if entry.name in done_files:
+                continue
+            if deadline is not None and time.monotonic() > deadline:
+                # Resume with this directory first, minus the files already produced
+                budget["stopped"] = {"source": "walk", "pending": [list(pending_dir) for pending_dir in walk_state["pending"]] + [[root, depth]],
+                                     "skip_dir": root, "skip_files": sorted(done_files)}
+                return
+            done_files.add(entry.name)
+            try:
+                stat_info = entry.stat()
+            except OSError:
+                continue
+            yield root, entry.name, entry.path, stat_info.st_size, stat_info.st_mtime
+    if walk_state.get("timed_out"):
+        budget["stopped"] = {"source": "walk", "pending": [list(pending_dir) for pending_dir in walk_state["pending"]],
+                             "skip_dir": None, "skip_files": []}
+
+def _iter_indexed_files(abs_start_path: str, query, budget: dict | None = None):
+    """
+    Yields (root, filename, filepath, size_bytes, mtime) from the metadata index after refreshing
+    the directories that changed. The query's extension, size and mtime predicates are applied in SQL.
+    Rows come in path order, so a search stopped by its `budget` deadline resumes after the last path
+    produced; if the refresh itself runs out of time nothing is produced and the next run finishes it.
+    For content and topic searches each file is stat'ed again: the refresh only rescans directories
+    whose mtime changed, so a file edited in place keeps its old size and mtime in the index, and the
+    content and semantic indexes decide what to re-extract from these values.
+    Returns None if the index cannot be used.
+    """
+    from . import metadata_index
+    budget = budget or {}
+    deadline = budget.get("deadline")
+    resume = budget.get("resume") if (budget.get("resume") or {}).get("source") == "index" else None
+    after_path = resume.get("after_path") if resume else None
+    refresh_stats, refresh_error = metadata_index.refresh_tree(abs_start_path, deadline=deadline)
+    if refresh_error:
+        return None
+    if not refresh_stats.get("complete", True):
+        budget["stopped"] = {"source": "index", "after_path": after_path}
+        return iter(())
+    rows, query_error = metadata_index.query_files(
+        abs_start_path, sorted(query.extensions) if query.extensions is not None else None,
+        min_size=query.min_size, max_size=query.max_size,
+        modified_after=query.modified_after, modified_before=query.modified_before, after_path=after_path)
+    if query_error:
+        return None
+
+    restat = bool(query.content_terms) or query.is_semantic
+
+    def indexed_rows(last_path):
+        for row in rows:
+            if deadline is not None and time.monotonic() > deadline:
+                budget["stopped"] = {"source": "index", "after_path": last_path}
+                return
+            last_path = row["path"]
+            size_bytes, mtime = row["size_bytes"], row["modified_timestamp"]
+            if restat:
+                try:
+                    stat_result = os.stat(row["path"])
+                except OSError: # Deleted since the refresh
+                    continue
+                if (stat_result.st_size, stat_result.st_mtime) != (size_bytes, mtime):
+                    size_bytes, mtime = stat_result.st_size, stat_result.st_mtime
+                    metadata_index.apply_created_or_modified(row["path"])
+            yield os.path.dirname(row["path"]), row["name"], row["path"], size_bytes, mtime
+    return indexed_rows(after_path)
+
+
+def _search_result_item(filename: str, filepath: str, size_bytes: int, mtime: float, line_matches: list[dict] | None = None) -> dict:
+    item = {
+        "name": filename,
+        "path": filepath,
+        "type": "file", 
+        "size_bytes": size_bytes,
+        "size_readable": bytes_to_readable(size_bytes),
+        "modified_timestamp": mtime,
+        "modified_readable": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mtime))
+    }
+    if line_matches:
+        item["matches"] = line_matches # [{"term", "line", "offset", "snippet", "snippet_offset"}]
+    return item
+
+def _match_content_terms(filepath: str, filename: str, terms: list[str], grep_pattern,
+                         size_bytes: int | None = None, mtime: float | None = None) -> tuple[bool, list[dict] | None]:
+    """
+    Checks that every term occurs in the file. Plain text is grepped as raw bytes with no size cutoff;
+    other types use the extracted search text. Returns (matched, line_matches_or_None).
+    The file's first bytes decide what it is: binaries never match, whatever their extension, and text
+    files are grepped even with an unknown extension. size_bytes and mtime (if known) spare a stat.
+    """
+    kind = content_sniffer.sniff(filepath, size_bytes, mtime) if content_sniffer.is_enabled() else None
+    if content_sniffer.is_skipped(kind):
+        return False, None
+    if kind == "text" or (kind is None and os.path.splitext(filename.lower())[1] in TEXT_SEARCH_EXTENSIONS):
+        contains_all, matches = content_grep.file_contains_all(filepath, terms, grep_pattern)
+        return contains_all, matches if contains_all else None
+    content = get_file_content_for_search(filepath, console=None, is_known_file=True, kind=kind)
+    if not content:
+        return False, None
+    content_lower = content.lower()
+    return all(term.lower() in content_lower for term in terms), None
+
+def _resolve_reference_file(abs_start_path: str, reference_path: str) -> str:
+    """Resolves the file of a `like '...'` search, relative to the search folder if not absolute."""
+    candidate = os.path.expanduser(reference_path)
+    if not os.path.isabs(candidate):
+        candidate = os.path.join(abs_start_path, candidate)
+    candidate = os.path.abspath(candidate)
+    if not os.path.isfile(candidate):
+        raise FileNotFoundError(f"Reference file '{reference_path}' was not found.")
+    return candidate
+
+def _llm_relevance_filter(llm_connector, criteria: str, candidates: list[tuple], report) -> set | None:
+    """
+    Asks the AI provider which (filepath, size_bytes, mtime, filename) candidates match criteria, several
+    files per request. Returns the set of paths the model judged irrelevant, or None if no verdicts could
+    be obtained. Files without a verdict (failed batch, omitted by the model, past LLM_RELEVANCE_MAX_FILES,
+    no text) are not in the set, so they are kept.
+    """
+    if not llm_connector or not hasattr(llm_connector, 'check_content_match_batch') or not candidates:
+        return None
+    excerpts = []
+    for filepath, _, _, _ in candidates[:SEARCH_SETTINGS.get("LLM_RELEVANCE_MAX_FILES", 200)]:
+        content = get_file_content_for_search(filepath, console=None, is_known_file=True)
+        if content:
+            excerpts.append((filepath, content))
+    if not excerpts:
+        return None
+    report(f"[yellow]LLM relevance check of {len(excerpts)} file(s)...")
+    response = llm_connector.check_content_match_batch(criteria, excerpts)
+    if "error" in response:
+        report(f"[yellow]LLM relevance check failed: {response['error']}")
+        return None
+    for error in response.get("errors", []):
+        report(f"[yellow]LLM relevance check of some files failed, keeping them: {error}")
+    return {filepath for filepath, relevant in response.get("verdicts", {}).items() if relevant is False}
+
+def _iter_semantic_results(candidates: list[tuple], query, abs_start_path: str, report, llm_connector=None):
+    """
+    Yields result items for metadata-matched candidates ranked by topical similarity (best first).
+    With SEARCH_SETTINGS["LLM_RELEVANCE_FILTER"] the AI provider confirms the ranked topic results;
+    without the semantic index it classifies the candidates instead of a plain phrase match.
+    """
+    from . import semantic_index
+    candidates = [candidate for candidate in candidates if os.path.splitext(candidate[3].lower())[1] in CONTENT_SEARCH_EXTENSIONS]
+    if not candidates:
+        return
+    if not semantic_index.is_semantic_index_available():
+        if query.similar_to:
+            raise RuntimeError("Similarity search needs the semantic index (install numpy and enable SEMANTIC_INDEX_SETTINGS).")
+        rejected_paths = _llm_relevance_filter(llm_connector, query.about_criteria, candidates, report)
+        if rejected_paths is not None:
+            for filepath, size_bytes, mtime, filename in candidates:
+                if filepath not in rejected_paths:
+                    yield _search_result_item(filename, filepath, size_bytes, mtime)
+            return
+        # Without the index (or a usable AI provider) a topic search degrades to a plain phrase match
+        topic_pattern = content_grep.compile_patterns([query.about_topic])
+        for filepath, size_bytes, mtime, filename in candidates:
+            matched, line_matches = _match_content_terms(filepath, filename, [query.about_topic], topic_pattern, size_bytes, mtime)
+            if matched:
+                yield _search_result_item(filename, filepath, size_bytes, mtime, line_matches)
+        return
+
+    report(f"[cyan]Ranking {len(candidates)} file(s) by topic...")
+    like_path = _resolve_reference_file(abs_start_path, query.similar_to) if query.similar_to else None
+    ranked, rank_error = semantic_index.rank_files([(path, size, mod) for path, size, mod, _ in candidates],
+                                                   topic_text=query.about_topic, like_path=like_path)
+    if rank_error:
+        raise RuntimeError(rank_error)
+    by_path = {candidate[0]: candidate for candidate in candidates}
+    rejected_paths = set()
+    if query.about_criteria and SEARCH_SETTINGS.get("LLM_RELEVANCE_FILTER", False):
+        rejected_paths = _llm_relevance_filter(llm_connector, query.about_criteria, [by_path[path] for path, _ in ranked], report) or set()
+    for filepath, score in ranked:
+        if filepath in rejected_paths:
+            continue
+        _, size_bytes, mtime, filename = by_path[filepath]
+        item = _search_result_item(filename, filepath, size_bytes, mtime)
+        item["score"] = round(score, 4)
+        yield item
+
+def _filter_deferred_batch(abs_start_path: str, batch: list[tuple], query, grep_pattern):
+    """Yields result items for the (filepath, size_bytes, mtime, filename) entries of batch whose content has every query term."""
+    from . import content_index
+    # Text files larger than what the content index covers are grepped directly, so matches past the cutoff are found
+    grep_directly = {filepath for filepath, size_bytes, _, filename in batch
+                     if os.path.splitext(filename.lower())[1] in TEXT_SEARCH_EXTENSIONS and (size_bytes or 0) > MAX_SEARCH_CONTENT_SIZE}
+    matching_paths = {filepath for filepath, _, _, _ in batch if filepath not in grep_directly}
+    for term in query.content_terms:
+        if not matching_paths:
+            break
+        term_matches, index_error = content_index.find_files_containing(
+            abs_start_path, [(path, size, mod) for path, size, mod, _ in batch if path in matching_paths], term)
+        if index_error: # Fall back to reading the remaining candidates directly
+            matching_paths = {filepath for filepath in matching_paths
+                              if query.matches_content(get_file_content_for_search(filepath, console=None, is_known_file=True))}
+            break
+        matching_paths &= term_matches
+    for filepath, size_bytes, mtime, filename in batch:
+        if filepath not in matching_paths and filepath not in grep_directly:
+            continue
+        line_matches = None
+        if os.path.splitext(filename.lower())[1] in TEXT_SEARCH_EXTENSIONS:
+            matched, line_matches = _match_content_terms(filepath, filename, query.content_terms, grep_pattern, size_bytes, mtime)
+            if not matched:
+                continue
+        yield _search_result_item(filename, filepath, size_bytes, mtime, line_matches)
+
+def iter_search_files(start_path: str, criteria_str: str, llm_connector, use_index: bool | None = None,
+                      limit: int | None = None, on_progress=None, use_cache: bool | None = None,
+                      max_seconds: float | None = None, cursor: dict | None = None, outcome: dict | None = None):
+    """
+    Generator form of search_files_recursive: yields result item dicts as soon as they match,
+    so callers can render them incrementally. Stops walking once `limit` items were yielded.
+    `on_progress` is an optional callable receiving a short status description.
+    Results are served from (and stored in) the session's search_cache while the directories and
+    files they were computed from are unchanged; `use_cache` defaults to SEARCH_CACHE_SETTINGS["ENABLED"].
+
+    `max_seconds` (default SEARCH_SETTINGS["MAX_SECONDS"]; 0 or None there means no limit) bounds the search.
+    When it runs out the generator ends after the results found so far; if `outcome` (a dict) is given,
+    outcome["partial"] is set True and outcome["cursor"] to a JSON-serializable cursor. Passing that cursor
+    back continues the search where it stopped (start_path and criteria_str are then taken from it)
+    without revisiting the directories already searched.
+    Raises NotADirectoryError if start_path is not a directory.
+    """
+    if cursor:
+        start_path, criteria_str, use_index = cursor["root"], cursor["criteria"], cursor.get("use_index", use_index)
+    abs_start_path = os.path.abspath(start_path)
+    if not os.path.isdir(abs_start_path):
+        raise NotADirectoryError(f"Search path '{abs_start_path}' is not a valid directory.")
+    if outcome is not None:
+        outcome.update({"partial": False, "cursor": None})
+    if limit is not None and limit <= 0:
+        return
+
+    query = search_query.compile_query(criteria_str)
+    if max_seconds is None:
+        max_seconds = SEARCH_SETTINGS.get("MAX_SECONDS")
+    budget = {"deadline": time.monotonic() + float(max_seconds) if max_seconds else None, "resume": cursor, "stopped": None}
+    if use_cache is None:
+        use_cache = search_cache.is_enabled()
+    if use_index is None:
+        from . import metadata_index
+        use_index = metadata_index.is_index_enabled()
+
+    def record_outcome(found_count: int):
+        if budget["stopped"] is None or outcome is None:
+            return
+        outcome["partial"] = True
+        outcome["cursor"] = dict(budget["stopped"], root=abs_start_path, criteria=criteria_str, use_index=use_index,
+                                 found=(cursor or {}).get("found", 0) + found_count)
+
+    if not use_cache or cursor:
+        found_count = 0
+        for item in _iter_search_uncached(abs_start_path, query, llm_connector, use_index, limit, on_progress, None, budget):
+            found_count += 1
+            yield item
+        record_outcome(found_count)
+        content_sniffer.flush()
+        return
+
+    cache_key = search_cache.make_key(query, abs_start_path)
+    cached_items = search_cache.lookup(cache_key, limit)
+    if cached_items is not None:
+        if on_progress:
+            on_progress("[cyan]Using cached results (nothing changed since the last search)...")
+        yield from cached_items
+        return
+
+    trace = {"dir_mtimes": {}, "file_stats": {} if query.needs_content or _searches_archives(query) else None}
+    items = []
+    for item in _iter_search_uncached(abs_start_path, query, llm_connector, use_index, limit, on_progress, trace, budget):
+        items.append(item)
+        yield item
+    record_outcome(len(items))
+    content_sniffer.flush()
+    # Only reached when the search finished or hit `limit` (not when the consumer stopped early)
+    if budget["stopped"] is None:
+        search_cache.store(cache_key, items, complete=limit is None or len(items) < limit,
+                           dir_mtimes=trace["dir_mtimes"], file_stats=trace["file_stats"])
+
+def _filter_document_batch(batch: list[tuple], query, grep_pattern, report):
+    """
+    Yields result items for the (filepath, size_bytes, mtime, filename) documents of batch that contain every
+    content term. They are parsed in the extraction workers and checked as soon as each one's text is ready.
+    """
+    by_path = {entry[0]: entry for entry in batch}
+    for filepath in prefetch_search_texts(list(by_path), report):
+        _, size_bytes, mtime, filename = by_path[filepath]
+        matched, line_matches = _match_content_terms(filepath, filename, query.content_terms, grep_pattern, size_bytes, mtime)
+        if matched:
+            yield _search_result_item(filename, filepath, size_bytes, mtime, line_matches)
+
+def _iter_search_uncached(abs_start_path: str, query, llm_connector, use_index: bool | None, limit: int | None,
+                          on_progress, trace: dict | None, budget: dict | None = None):
+    """
+    The search itself (see iter_search_files). If `trace` is given, trace["dir_mtimes"] is filled with the
+    directories the results depend on and trace["file_stats"] (if not None) with the files whose content was examined.
+    `budget` holds the deadline and resume cursor; budget["stopped"] is set if the deadline ended the search.
+    """
+    budget = budget if budget is not None else {"deadline": None, "resume": None, "stopped": None}
+    grep_pattern = content_grep.compile_patterns(query.content_terms) if query.content_terms else None
+    if query.content_terms and content_sniffer.is_enabled():
+        content_sniffer.preload(abs_start_path) # Verdicts recorded by earlier searches of this tree
+
+    def report(description: str):
+        if on_progress:
+            on_progress(description)
+
+    from . import metadata_index, content_index
+    candidate_files = None
+    if use_index is None:
+        use_index = metadata_index.is_index_enabled()
+    if query.fuzzy_name is not None:
+        yield from _iter_fuzzy_results(abs_start_path, query, query.fuzzy_name, use_index, limit, report, trace, budget)
+        return
+    # Metadata-matched (filepath, size_bytes, mtime, filename) whose content check is deferred to the
+    # content index; checked in batches so matches still stream out and `limit` can stop the walk.
+    deferred_content_candidates = None
+    if use_index and query.content_terms and not query.is_semantic and content_index.is_content_index_enabled():
+        deferred_content_candidates = []
+    # Topic and similarity searches rank all matching candidates once the walk is done
+    semantic_candidates = [] if query.is_semantic else None
+    # Documents (PDF, Office) whose text is not cached yet are parsed in batches by the extraction workers
+    document_batch = None
+    if query.content_terms and deferred_content_candidates is None and semantic_candidates is None \
+            and extraction_workers.is_enabled() and extraction_cache.is_enabled():
+        document_batch = []
+    search_archives = _searches_archives(query) and not query.is_semantic
+    if use_index:
+        report("[cyan]Refreshing metadata index...")
+        candidate_files = _iter_indexed_files(abs_start_path, query, budget)
+        if candidate_files is not None and trace is not None:
+            trace["dir_mtimes"].update(metadata_index.get_dir_mtimes(abs_start_path))
+    if candidate_files is None:
+        candidate_files = _iter_walked_files(abs_start_path, trace["dir_mtimes"] if trace is not None else None, budget)
+    content_stats = trace["file_stats"] if trace is not None else None
+
+    yielded = 0
+    current_root = None
+    for root, filename, filepath, size_bytes, mtime in candidate_files:
+        if root != current_root:
+            current_root = root
+            report(f"[cyan]Scanning: {os.path.basename(root)}")
+
+        if search_archives and archive_reader.is_archive_name(filename):
+            if content_stats is not None:
+                content_stats[filepath] = (size_bytes, mtime)
+            report(f"[cyan]Scanning archive: {filename}")
+            for item in _iter_archive_results(filepath, query, grep_pattern):
+                yield item
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+
+        # Extension, size, mtime and name are checked before any content is read
+        if not query.matches_metadata(filename, size_bytes, mtime):
+            continue
+        if content_stats is not None:
+            content_stats[filepath] = (size_bytes, mtime)
+
+        if deferred_content_candidates is not None:
+            deferred_content_candidates.append((filepath, size_bytes, mtime, filename))
+            if len(deferred_content_candidates) >= CONTENT_CHECK_BATCH_SIZE:
+                report(f"[cyan]Checking content of {len(deferred_content_candidates)} file(s)...")
+                for item in _filter_deferred_batch(abs_start_path, deferred_content_candidates, query, grep_pattern):
+                    yield item
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+                deferred_content_candidates = []
+            continue
+
+        if document_batch is not None and _pending_document(filepath) is not None:
+            document_batch.append((filepath, size_bytes, mtime, filename))
+            if len(document_batch) >= EXTRACTION_WORKER_SETTINGS.get("BATCH_SIZE", 16):
+                for item in _filter_document_batch(document_batch, query, grep_pattern, report):
+                    yield item
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+                document_batch = []
+            continue
+
+        line_matches = None
+        if query.content_terms:
+            matched, line_matches = _match_content_terms(filepath, filename, query.content_terms, grep_pattern, size_bytes, mtime)
+            if not matched:
+                continue
+
+        if semantic_candidates is not None:
+            semantic_candidates.append((filepath, size_bytes, mtime, filename))
+            continue
+
+        # Size and mtime come from the index or the walker's cached stat, so no second os.stat here.
+        yield _search_result_item(filename, filepath, size_bytes, mtime, line_matches)
+        yielded += 1
+        if limit is not None and yielded >= limit:
+            return
+
+    if document_batch:
+        for item in _filter_document_batch(document_batch, query, grep_pattern, report):
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+    if deferred_content_candidates:
+        report(f"[cyan]Checking content of {len(deferred_content_candidates)} file(s)...")
+        for item in _filter_deferred_batch(abs_start_path, deferred_content_candidates, query, grep_pattern):
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+    if semantic_candidates is not None:
+        for item in _iter_semantic_results(semantic_candidates, query, abs_start_path, report, llm_connector):
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+    if not yielded and budget["stopped"] is None and budget["resume"] is None and query.name_exact is not None \
+            and SEARCH_SETTINGS.get("FUZZY_FALLBACK", True):
+        # A plain name search found nothing: rank approximate matches instead (typos, word order)
+        report("[cyan]No exact name matches, trying a fuzzy name match...")
+        yield from _iter_fuzzy_results(abs_start_path, query, query.name_exact, use_index, limit, report, trace, budget)
+
+def _searches_archives(query) -> bool:
+    return query.include_archives or bool(ARCHIVE_SETTINGS.get("SEARCH_INSIDE", False))
+
+def _iter_archive_results(archive_path: str, query, grep_pattern):
+    """
+    Yields result items for the members of one archive that match the query's metadata predicates and,
+    for text members, its content terms (grepped from the member stream, at most MAX_MEMBER_SCAN_BYTES).
+    Members of other types never match a content search. Unreadable archives are skipped.
+    """
+    scan_limit = ARCHIVE_SETTINGS.get("MAX_MEMBER_SCAN_BYTES", 8 * 1024 * 1024)
+    try:
+        for member, open_member in archive_reader.iter_members(archive_path):
+            if not query.matches_metadata(member.basename, member.size_bytes, member.mtime):
+                continue
+            line_matches = None
+            if query.content_terms:
+                if os.path.splitext(member.basename.lower())[1] not in TEXT_SEARCH_EXTENSIONS:
+                    continue
+                with open_member() as stream:
+                    line_matches = content_grep.grep_stream(stream, grep_pattern, max_bytes=scan_limit, required_terms=query.content_terms)
+                found_terms = {match["term"] for match in line_matches}
+                if not all(term.lower() in found_terms for term in query.content_terms):
+                    continue
+            item = _search_result_item(member.basename, member.path, member.size_bytes, member.mtime, line_matches)
+            item["archive"] = archive_path
+            yield item
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError, zlib.error):
+        return
+
+def _iter_fuzzy_results(abs_start_path: str, query, fuzzy_text: str, use_index: bool, limit: int | None, report, trace: dict | None,
+                        budget: dict | None = None):
+    """
+    Yields the files whose names best match fuzzy_text (best first, with a "score"). Candidates sharing
+    enough name trigrams come from the metadata index's n-gram table, or from a walk without the index.
+    The query's other metadata and content predicates still apply.
+    """
+    from . import metadata_index
+    fuzzy_query = fuzzy_name.FuzzyQuery(fuzzy_text)
+    min_shared = fuzzy_query.min_shared_grams(SEARCH_SETTINGS.get("FUZZY_MIN_GRAM_OVERLAP", 0.3))
+    budget = budget if budget is not None else {"deadline": None, "resume": None, "stopped": None}
+    candidates = None
+    if use_index:
+        refresh_stats, refresh_error = metadata_index.refresh_tree(abs_start_path, deadline=budget["deadline"])
+        if not refresh_error and not refresh_stats.get("complete", True):
+            budget["stopped"] = {"source": "index", "after_path": None} # Ranked once the index is complete
+            return
+        if not refresh_error:
+            rows, query_error = metadata_index.query_fuzzy_candidates(
+                abs_start_path, fuzzy_query.grams, min_shared, SEARCH_SETTINGS.get("FUZZY_MAX_CANDIDATE_NAMES", 20000))
+            if not query_error:
+                candidates = ((row["path"], row["size_bytes"], row["modified_timestamp"], row["name"]) for row in rows)
+                if trace is not None:
+                    trace["dir_mtimes"].update(metadata_index.get_dir_mtimes(abs_start_path))
+    if candidates is None:
+        walked = _iter_walked_files(abs_start_path, trace["dir_mtimes"] if trace is not None else None, budget)
+        candidates = ((filepath, size_bytes, mtime, filename) for _, filename, filepath, size_bytes, mtime in walked
+                      if fuzzy_query.shares_grams(filename, min_shared))
+
+    # Name predicates are replaced by the fuzzy match; the other metadata predicates still filter
+    check_metadata = query.name_substring is None and query.name_regex is None
+    grep_pattern = content_grep.compile_patterns(query.content_terms) if query.content_terms else None
+    def matching_candidates():
+        for filepath, size_bytes, mtime, filename in candidates:
+            if check_metadata and not query.matches_metadata(filename, size_bytes, mtime):
+                continue
+            yield filepath, size_bytes, mtime, filename
+
+    report("[cyan]Ranking file names...")
+    top_k = SEARCH_SETTINGS.get("FUZZY_TOP_K", 20)
+    if limit is not None:
+        top_k = min(top_k, limit)
+    ranked = fuzzy_name.rank(fuzzy_query, matching_candidates(), top_k, SEARCH_SETTINGS.get("FUZZY_MIN_SCORE", 0.45))
+    for score, (filepath, size_bytes, mtime, filename) in ranked:
+        line_matches = None
+        if query.content_terms:
+            if trace is not None and trace["file_stats"] is not None:
+                trace["file_stats"][filepath] = (size_bytes, mtime)
+            matched, line_matches = _match_content_terms(filepath, filename, query.content_terms, grep_pattern, size_bytes, mtime)
+            if not matched:
+                continue
+        item = _search_result_item(filename, filepath, size_bytes, mtime, line_matches)
+        item["score"] = round(score, 4)
+        yield item
+
+class SearchResults(list):
+    """The items found by search_files_recursive; `partial` is True (with a resume `cursor`) if the time budget ran out."""
+
+    def __init__(self, items=(), partial: bool = False, cursor: dict | None = None):
+        super().__init__(items)
+        self.partial = partial
+        self.cursor = cursor
+
+def search_files_recursive(start_path: str, criteria_str: str, llm_connector, console_for_progress=None,
+                           use_index: bool | None = None, limit: int | None = None,
+                           max_seconds: float | None = None, cursor: dict | None = None) -> tuple[SearchResults, str | None]:
     """
     Recursively searches for files.
     `console_for_progress` is optional Rich Console for live progress.
-    Returns (found_items_list, error_message_string).
+    `use_index` answers from the persistent metadata index (defaults to INDEX_SETTINGS["ENABLED"]);
+    falls back to a live walk if the index is unavailable. With the same switch, plain
+    `containing '...'` searches are narrowed by the trigram content index.
+    `limit` stops the search once that many items were found (see iter_search_files to stream results).
+    `max_seconds` and `cursor` bound and resume the search as in iter_search_files.
+    Returns (found_items_list, error_message_string); the list is a SearchResults.
     """
-    found_items = []
-    criteria_lower = criteria_str.lower()
+    found_items = SearchResults()
+    if cursor:
+        start_path = cursor["root"]
     abs_start_path = os.path.abspath(start_path)
 
     if not os.path.isdir(abs_start_path):
-        return [], f"Search path '{abs_start_path}' is not a valid directory."
-
-    content_search_term = None
-    llm_content_check_criteria = None
-    type_description_for_ext_match = criteria_lower
-
-    containing_match = re.search(r"containing\s+['\"](.+?)['\"]", criteria_lower)
-    if containing_match:
-        content_search_term = containing_match.group(1)
-        type_description_for_ext_match = criteria_lower.split("containing", 1)[0].strip()
-    
-    about_match = re.search(r"(?:about|related to|regarding|on the topic of)\s+['\"](.+?)['\"]", type_description_for_ext_match)
-    if about_match:
-        llm_content_check_criteria = criteria_str 
-        type_description_for_ext_match = type_description_for_ext_match.split(about_match.group(0),1)[0].strip()
-
-    target_extensions_from_type = None
-    if type_description_for_ext_match and type_description_for_ext_match not in ["files", "any files", "all files", "items", ""]:
-        for key, exts in SEARCH_TYPE_KEYWORDS.items():
-            if key in type_description_for_ext_match: 
-                target_extensions_from_type = exts
-                break
-        if not target_extensions_from_type and type_description_for_ext_match.startswith("."):
-             target_extensions_from_type = [type_description_for_ext_match]
+        return found_items, f"Search path '{abs_start_path}' is not a valid directory."
 
     progress_context = None
     search_task_id = None 
@@ -244,98 +818,18 @@ def search_files_recursive(start_path: str, criteria_str: str, llm_connector, co
         search_task_id = progress_context.add_task("[cyan]Scanning...", total=None) 
         progress_context.start()
 
-    try:
-        for root, dirs, files in os.walk(abs_start_path, topdown=True):
-            dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('$')]
-            files = [f for f in files if not f.startswith('.')]
+    def on_progress(description: str):
+        if progress_context and search_task_id is not None:
+            progress_context.update(search_task_id, description=description, advance=1)
 
-            if progress_context and search_task_id is not None and progress_context.finished: break
-            if progress_context and search_task_id is not None:
-                progress_context.update(search_task_id, description=f"[cyan]Scanning: {os.path.basename(root)}")
-            
-            for filename in files:
-                if progress_context and search_task_id is not None and progress_context.finished: break
-                
-                filepath = os.path.join(root, filename)
-                name_lower = filename.lower()
-                _, ext_lower = os.path.splitext(name_lower)
-
-                name_match = False
-                if not target_extensions_from_type and not content_search_term and not llm_content_check_criteria:
-                    if criteria_lower in name_lower:
-                        name_match = True
-                elif criteria_lower == name_lower or criteria_str == filename: 
-                    name_match = True
-
-                type_match = False
-                if target_extensions_from_type:
-                    if ext_lower in target_extensions_from_type:
-                        type_match = True
-                else: 
-                    type_match = True 
-                
-                content_match_passes = False
-                if content_search_term or llm_content_check_criteria:
-                    if type_match: 
-                        file_content_for_search = get_file_content_for_search(filepath, console=None) 
-                        if file_content_for_search:
-                            if content_search_term and content_search_term.lower() in file_content_for_search.lower():
-                                content_match_passes = True
-                            
-                            # Ensure llm_connector.check_content_match exists before calling
-                            if llm_content_check_criteria and not content_match_passes and \
-                               llm_connector and hasattr(llm_connector, 'check_content_match'): 
-                                if progress_context and search_task_id is not None: progress_context.update(search_task_id, description=f"[yellow]LLM check: {filename[:25]}...")
-                                
-                                # Call check_content_match (assuming it's defined in ollama_connector)
-                                # This method is currently commented out in ollama_connector.py
-                                # If you re-enable it, ensure it takes (content, criteria) and returns bool
-                                # For now, let's assume it would be called here if available.
-                                # if llm_connector.check_content_match(file_content_for_search, llm_content_check_criteria):
-                                #    content_match_passes = True
-
-                                # Placeholder: if check_content_match is not available, this part won't execute
-                                # LLM content check logic needs to be fully implemented in ollama_connector
-                                # or called differently if it's a generic invoke_llm_for_content call.
-                                # For now, we'll proceed as if it could be true if the criteria suggests it.
-                                # This is a simplification until check_content_match is defined and used.
-                                if "about" in llm_content_check_criteria.lower(): # Basic heuristic
-                                     # Simulate LLM finding a match if "about" was used and we don't have a true LLM call here
-                                     # This part needs proper LLM integration.
-                                     pass # Keep content_match_passes as is from simple search for now
-
-                                if progress_context and search_task_id is not None: progress_context.update(search_task_id, description=f"[cyan]Scanning: {os.path.basename(root)}")
-                else: 
-                    content_match_passes = True
-
-                final_match = False
-                if content_search_term or llm_content_check_criteria: 
-                    final_match = type_match and content_match_passes
-                elif target_extensions_from_type : 
-                    final_match = type_match and (criteria_lower in name_lower or name_match or type_description_for_ext_match == criteria_lower) 
-                else: 
-                    final_match = name_match
-
-                if final_match:
-                    try:
-                        stat_info = os.stat(filepath)
-                        found_items.append({
-                            "name": filename,
-                            "path": filepath,
-                            "type": "file", 
-                            "size_bytes": stat_info.st_size,
-                            "size_readable": bytes_to_readable(stat_info.st_size),
-                            "modified_timestamp": stat_info.st_mtime,
-                            "modified_readable": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stat_info.st_mtime))
-                        })
-                    except OSError:
-                        continue 
-            
-            if progress_context and search_task_id is not None:
-                progress_context.update(search_task_id, advance=1)
-                
+    outcome = {}
+    try:
+        for item in iter_search_files(abs_start_path, criteria_str, llm_connector, use_index=use_index,
+                                      limit=limit, on_progress=on_progress, max_seconds=max_seconds,
+                                      cursor=cursor, outcome=outcome):
+            found_items.append(item)
+        found_items.partial, found_items.cursor = outcome.get("partial", False), outcome.get("cursor")
     except Exception as e:
-        if progress_context and search_task_id is not None: progress_context.stop()
         return found_items, f"Error during file search: {e}" 
     finally:
         if progress_context and search_task_id is not None: progress_context.stop()
@@ -0,0 +1,137 @@
+# python/fs_walker.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from config import WALKER_SETTINGS
+from . import ignore_rules
+
+# Parallel, scandir-based directory walker shared by search, listing and organization.
+# Directory listings are fanned out to a thread pool (scandir/stat release the GIL, which is
+# where the time goes on NFS and large SSD trees) while results are still yielded in a stable
+# depth-first order, like os.walk(topdown=True). Ignore rules (see ignore_rules) are applied while
+# listing, so excluded trees such as node_modules are never entered.
+
+
+def _is_hidden_name(name: str, is_dir: bool) -> bool:
+    return name.startswith('.') or (is_dir and name.startswith('$'))
+
+def _scan_directory(dir_path: str, follow_symlinks: bool, skip_hidden: bool, want_stat: bool, matcher=None) -> tuple[list, list, object]:
+    """
+    Lists one directory in a worker thread. Returns (subdir_entries, file_entries, child_matcher), the
+    entry lists sorted by name. Entries matched by the ignore rules are dropped before they are stat'ed.
+    child_matcher is `matcher` extended with this directory's ignore files (None if ignores are off).
+    Type checks and (optionally) stat are done here so the DirEntry caches are warm for the consumer.
+    """
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(dir_path) as entries:
+            listing = list(entries)
+    except OSError: # Unreadable directory, skipped like os.walk does
+        return [], [], matcher
+    if matcher is not None:
+        matcher = matcher.child(dir_path, ignore_rules.read_ignore_texts(dir_path, {entry.name for entry in listing}))
+    for entry in listing:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+            if skip_hidden and _is_hidden_name(entry.name, is_dir):
+                continue
+            if matcher and matcher.is_ignored(entry.path, is_dir):
+                continue
+            if is_dir:
+                entry.stat(follow_symlinks=follow_symlinks) # Needed for loop detection anyway
+                subdirs.append(entry)
+            else:
+                if want_stat:
+                    entry.stat(follow_symlinks=follow_symlinks)
+                files.append(entry)
+        except OSError: # Broken link or permissions error on a single entry
+            continue
+    subdirs.sort(key=lambda e: e.name)
+    files.sort(key=lambda e: e.name)
+    return subdirs, files, matcher
+
+def walk_tree(root_path: str, max_depth: int | None = None, follow_symlinks: bool = False,
+              skip_hidden: bool = True, want_stat: bool = True, max_workers: int | None = None,
+              apply_ignores: bool = True, start_dirs: list | None = None, deadline: float | None = None,
+              state: dict | None = None):
+    """
+    Walks root_path and yields (dir_path, depth, subdir_entries, file_entries) in depth-first pre-order.
+    Entries are os.DirEntry objects whose is_dir()/stat() results are already cached.
+    Like os.walk(topdown=True), the caller may prune `subdir_entries` in place (subdir_entries[:] = ...)
+    before the walk descends. Directories already visited by (st_dev, st_ino) are skipped, which breaks
+    symlink and bind-mount loops. max_depth=0 lists only root_path itself.
+    apply_ignores=False lists everything the ignore rules would exclude (listings, storage reports).
+
+    Resumable walks: `start_dirs` ([(dir_path, depth), ...] below root_path, last one walked first)
+    replaces root_path as the starting point. If `state` is given, state["pending"] is kept as the
+    [(dir_path, depth), ...] not yet yielded, in the same order, so a stopped walk can be resumed from it.
+    `deadline` (a time.monotonic() value) ends the walk early when a directory listing is still not
+    back by then (e.g. a hung network mount); state["timed_out"] is set True in that case.
+    """
+    abs_root = os.path.abspath(root_path)
+    try:
+        root_stat = os.stat(abs_root)
+    except OSError:
+        return
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+    workers = max_workers or WALKER_SETTINGS.get("MAX_WORKERS", 8)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fs_walker")
+    try:
+        # Stack of (dir_path, depth, future) consumed in order; futures for upcoming directories
+        # keep running in the pool while the caller processes the current one.
+        if start_dirs is None:
+            root_matcher = ignore_rules.base_matcher(abs_root) if apply_ignores else None
+            pending = [(abs_root, 0, executor.submit(_scan_directory, abs_root, follow_symlinks, skip_hidden, want_stat, root_matcher))]
+        else:
+            pending = [(dir_path, depth, executor.submit(_scan_directory, dir_path, follow_symlinks, skip_hidden, want_stat,
+                                                         ignore_rules.matcher_above(abs_root, dir_path) if apply_ignores else None))
+                       for dir_path, depth in start_dirs]
+        while pending:
+            dir_path, depth, future = pending.pop()
+            try:
+                subdirs, files, matcher = future.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                pending.append((dir_path, depth, future))
+                if state is not None:
+                    state["pending"] = [(path, path_depth) for path, path_depth, _ in pending]
+                    state["timed_out"] = True
+                return
+            if state is not None:
+                state["pending"] = _PendingView(pending)
+            yield dir_path, depth, subdirs, files
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+            children = []
+            for entry in subdirs:
+                try:
+                    dir_stat = entry.stat(follow_symlinks=follow_symlinks)
+                except OSError:
+                    continue
+                key = (dir_stat.st_dev, dir_stat.st_ino)
+                if key in visited:
+                    continue
+                visited.add(key)
+                children.append((entry.path, depth + 1, executor.submit(_scan_directory, entry.path, follow_symlinks, skip_hidden, want_stat, matcher)))
+            pending.extend(reversed(children))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+class _PendingView:
+    """Lazy [(dir_path, depth), ...] view of the walk's pending stack (copied only if it is read)."""
+
+    def __init__(self, pending: list):
+        self.pending = pending
+
+    def __iter__(self):
+        return ((dir_path, depth) for dir_path, depth, _ in self.pending)
+
+def iter_files(root_path: str, **walk_options):
+    """Convenience wrapper yielding (dir_path, file_entry) for every file under root_path."""
+    for dir_path, _, _, files in walk_tree(root_path, **walk_options):
+        for entry in files:
+            yield dir_path, entry
@@ -0,0 +1,417 @@
+# python/fs_watcher.py
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from config import WATCHER_SETTINGS
+from . import fs_walker
+
+_log = logging.getLogger(__name__)
+
+# Keeps the persistent indexes (and any other registered listener, e.g. caches) in step with the
+# filesystem without rescans. Linux uses inotify through ctypes; elsewhere, or when inotify is
+# unavailable or out of watches, the watched roots are polled with the index's cheap mtime refresh.
+#
+# Listeners receive event dicts:
+#   {"type": "created" | "modified" | "deleted" | "moved" | "overflow",
+#    "path": str, "dest_path": str | None, "is_dir": bool, "sync_dirs": set[str]}
+# `sync_dirs` lists parent directories whose every change is accounted for, so their recorded mtime
+# in the metadata index may be advanced (see metadata_index "Direct Updates").
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+_MOVE_PAIR_SECONDS = 1.0             # An unpaired IN_MOVED_FROM older than this was a move out of the tree
+_RECORDED_MOVE_SECONDS = 10.0        # How long inotify's report of a recorded move is expected
+
+
+# === Listeners ===
+_listeners = []
+_listeners_lock = threading.Lock()
+
+def add_listener(callback):
+    """Registers callback(event_dict) for every filesystem event."""
+    with _listeners_lock:
+        if callback not in _listeners:
+            _listeners.append(callback)
+
+def remove_listener(callback):
+    with _listeners_lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+def dispatch_event(event: dict):
+    """Sends one event to every listener. A failing listener never stops the others (or the watcher)."""
+    with _listeners_lock:
+        callbacks = list(_listeners)
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception:
+            continue
+
+def _index_listener(event: dict):
+    """
+    Applies an event to the metadata, content and topic indexes, if they exist.
+    Update failures are logged and the remaining indexes are still updated.
+    """
+    from . import metadata_index, content_index, semantic_index
+    event_type = event["type"]
+    path = event["path"]
+    sync_dirs = event.get("sync_dirs") or set()
+    errors = []
+    if os.path.exists(metadata_index.get_index_db_path()):
+        if event_type in ("created", "modified"):
+            errors.append(metadata_index.apply_created_or_modified(path, sync_dir_mtimes=os.path.dirname(path) in sync_dirs))
+        elif event_type == "deleted":
+            errors.append(metadata_index.apply_removed(path, sync_dir_mtimes=os.path.dirname(path) in sync_dirs))
+        elif event_type == "moved":
+            errors.append(metadata_index.apply_moved(path, event["dest_path"], sync_dirs=sync_dirs))
+        elif event_type == "overflow":
+            errors.append(metadata_index.refresh_tree(path, record_root=False)[1])
+    if os.path.exists(content_index.get_content_db_path()):
+        # Modified files are re-extracted lazily (size/mtime check at search time)
+        if event_type == "deleted":
+            errors.append(content_index.remove_paths([path]))
+        elif event_type == "moved":
+            errors.append(content_index.move_path(path, event["dest_path"]))
+    # Topic index: same as the content index (a no-op if it was never built)
+    if event_type == "deleted":
+        errors.append(semantic_index.remove_paths([path]))
+    elif event_type == "moved":
+        errors.append(semantic_index.move_path(path, event["dest_path"]))
+    for error in errors:
+        if error:
+            _log.warning("Could not apply %s event for %s: %s", event_type, path, error)
+
+add_listener(_index_listener)
+
+
+# Moves already dispatched by recorded_move, so the watcher does not apply them a second time when
+# inotify reports the same rename: (source, destination) -> time recorded
+_recorded_moves = {}
+_recorded_moves_lock = threading.Lock()
+
+def _consume_recorded_move(source_path: str, destination_path: str) -> bool:
+    """True (once) if source -> destination was dispatched by recorded_move within the last few seconds."""
+    now = time.monotonic()
+    with _recorded_moves_lock:
+        for key, recorded_at in list(_recorded_moves.items()):
+            if now - recorded_at >= _RECORDED_MOVE_SECONDS:
+                del _recorded_moves[key]
+        return _recorded_moves.pop((source_path, destination_path), None) is not None
+
+
+@contextmanager
+def recorded_move(source_path: str, destination_path: str):
+    """
+    Wraps a move the assistant performs itself so the indexes are updated directly:
+        with fs_watcher.recorded_move(src, dst):
+            shutil.move(src, dst)
+    Nothing is dispatched if the body raises.
+    """
+    from . import metadata_index
+    abs_source = os.path.abspath(source_path)
+    abs_destination = os.path.abspath(destination_path)
+    if os.path.isdir(abs_destination): # shutil.move moves *into* an existing directory
+        abs_destination = os.path.join(abs_destination, os.path.basename(abs_source))
+    sync_dirs = set()
+    if os.path.exists(metadata_index.get_index_db_path()):
+        # Only parents that were current before the move may be marked current after it
+        sync_dirs = metadata_index.dirs_in_sync([os.path.dirname(abs_source), os.path.dirname(abs_destination)])
+    move_key = (abs_source, abs_destination)
+    with _recorded_moves_lock: # Before the move, as the watcher thread may see it at once
+        _recorded_moves[move_key] = time.monotonic()
+    try:
+        yield
+    except BaseException:
+        with _recorded_moves_lock:
+            _recorded_moves.pop(move_key, None)
+        raise
+    dispatch_event({"type": "moved", "path": abs_source, "dest_path": abs_destination,
+                    "is_dir": os.path.isdir(abs_destination), "sync_dirs": sync_dirs})
+
+
+# === inotify Backend ===
+class _Inotify:
+    """Minimal ctypes binding: one inotify instance with a watch per directory."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError(errno.ENOSYS, "libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, f"inotify_init1 failed: {os.strerror(error_number)}")
+        self.wd_to_path = {}
+
+    def add_watch(self, dir_path: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dir_path), _WATCH_MASK)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            if error_number == errno.ENOSPC:
+                raise OSError(error_number, "inotify watch limit reached (raise fs.inotify.max_user_watches)")
+            return # Directory vanished or is unreadable
+        self.wd_to_path[wd] = dir_path
+
+    def add_tree(self, root_path: str):
+        for dir_path, _, _, _ in fs_walker.walk_tree(root_path, want_stat=False):
+            self.add_watch(dir_path)
+
+    def forget_tree(self, dir_path: str):
+        """Stops watching dir_path and everything below it (used when it leaves the watched tree)."""
+        prefix = dir_path.rstrip(os.sep) + os.sep
+        for wd, path in list(self.wd_to_path.items()):
+            if path == dir_path or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                self.wd_to_path.pop(wd, None)
+
+    def rename_tree(self, source_path: str, destination_path: str):
+        prefix = source_path.rstrip(os.sep) + os.sep
+        for wd, path in list(self.wd_to_path.items()):
+            if path == source_path:
+                self.wd_to_path[wd] = destination_path
+            elif path.startswith(prefix):
+                self.wd_to_path[wd] = destination_path + path[len(source_path):]
+
+    def read_events(self, timeout: float) -> list[tuple[str | None, int, int, str]]:
+        """Returns [(dir_path, mask, cookie, name), ...] available within timeout seconds."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+                offset += name_length
+                events.append((self.wd_to_path.get(wd), mask, cookie, name))
+                if mask & IN_IGNORED:
+                    self.wd_to_path.pop(wd, None)
+        return events
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+# === Watcher ===
+class FsWatcher:
+    """Background thread that watches roots and dispatches change events to the listeners."""
+
+    def __init__(self, roots: list[str], poll_interval: float | None = None, use_inotify: bool = True):
+        self.roots = [os.path.abspath(root) for root in roots if os.path.isdir(root)]
+        self.poll_interval = poll_interval or WATCHER_SETTINGS.get("POLL_INTERVAL_SECONDS", 30)
+        self.use_inotify = use_inotify
+        self.backend = None # "inotify" or "polling", once the watcher thread has set up
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._inotify = None
+        self._pending_moves = {} # cookie -> (path, is_dir, seen_at)
+        self._roots_lock = threading.Lock()
+        self._added_roots = [] # Roots from add_root that the watcher thread has not set up yet
+
+    def start(self):
+        """Returns at once: watches are added (a walk of every root) on the watcher thread."""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name="fs_watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout) # The thread closes its inotify instance on the way out
+            self._thread = None
+
+    def add_root(self, root_path: str) -> bool:
+        """Watches another root (e.g. one indexed after startup). False if it is already covered or not a directory."""
+        root = os.path.abspath(root_path)
+        if not os.path.isdir(root):
+            return False
+        with self._roots_lock:
+            if any(root == watched or root.startswith(watched.rstrip(os.sep) + os.sep) for watched in self.roots):
+                return False
+            self.roots.append(root)
+            self._added_roots.append(root)
+        return True
+
+    def _watch_added_roots(self):
+        """Adds inotify watches for roots added since the last call (watcher thread only)."""
+        with self._roots_lock:
+            added, self._added_roots = self._added_roots, []
+        if self._inotify:
+            for root in added:
+                self._inotify.add_tree(root)
+
+    def _setup_inotify(self) -> bool:
+        """Watches every directory under the roots; False (polling instead) if inotify is unusable."""
+        try:
+            self._inotify = _Inotify()
+            for root in self.roots:
+                if self._stop_event.is_set():
+                    break
+                self._inotify.add_tree(root)
+            return True
+        except OSError:
+            if self._inotify:
+                self._inotify.close()
+            self._inotify = None
+            return False
+
+    def _run(self):
+        from . import metadata_index
+        self.backend = "inotify" if self.use_inotify and self._setup_inotify() else "polling"
+        try:
+            # Bring the index current once; from then on events keep it current
+            for root in list(self.roots):
+                if self._stop_event.is_set():
+                    return
+                metadata_index.refresh_tree(root)
+            if self.backend == "inotify":
+                while not self._stop_event.is_set():
+                    self._watch_added_roots()
+                    for event in self._translate(self._inotify.read_events(0.5)):
+                        dispatch_event(event)
+            else:
+                while not self._stop_event.wait(self.poll_interval):
+                    for root in list(self.roots):
+                        metadata_index.refresh_tree(root)
+        finally:
+            if self._inotify:
+                self._inotify.close()
+                self._inotify = None
+
+    def _translate(self, raw_events: list) -> list[dict]:
+        """Turns raw inotify records into listener events, pairing moves by cookie."""
+        from . import metadata_index
+        events = []
+        for dir_path, mask, cookie, name in raw_events:
+            if mask & IN_Q_OVERFLOW:
+                events.extend({"type": "overflow", "path": root, "dest_path": None, "is_dir": True, "sync_dirs": set()}
+                              for root in self.roots)
+                continue
+            if dir_path is None or not name or name.startswith('.') or name.startswith('$'):
+                continue # Unknown watch, event on the directory itself, or a hidden entry the index skips
+            path = os.path.join(dir_path, name)
+            is_dir = bool(mask & IN_ISDIR)
+            sync_dirs = {dir_path}
+
+            if mask & IN_MOVED_FROM:
+                self._pending_moves[cookie] = (path, is_dir, time.monotonic())
+                continue
+            if mask & IN_MOVED_TO:
+                pending = self._pending_moves.pop(cookie, None)
+                if pending:
+                    source_path = pending[0]
+                    if is_dir:
+                        self._inotify.rename_tree(source_path, path)
+                    if _consume_recorded_move(source_path, path):
+                        continue # Already applied by recorded_move
+                    events.append({"type": "moved", "path": source_path, "dest_path": path, "is_dir": is_dir,
+                                   "sync_dirs": sync_dirs | {os.path.dirname(source_path)}})
+                else: # Moved in from outside the watched tree
+                    if is_dir:
+                        self._inotify.add_tree(path)
+                    events.append({"type": "created", "path": path, "dest_path": None, "is_dir": is_dir, "sync_dirs": sync_dirs})
+                continue
+            if mask & IN_CREATE:
+                if is_dir:
+                    if metadata_index.is_ignored_path(path, True):
+                        continue # e.g. a new node_modules: not indexed, so not watched either
+                    self._inotify.add_tree(path)
+                events.append({"type": "created", "path": path, "dest_path": None, "is_dir": is_dir, "sync_dirs": sync_dirs})
+            elif mask & IN_DELETE:
+                events.append({"type": "deleted", "path": path, "dest_path": None, "is_dir": is_dir, "sync_dirs": sync_dirs})
+            elif mask & (IN_CLOSE_WRITE | IN_ATTRIB) and not is_dir:
+                events.append({"type": "modified", "path": path, "dest_path": None, "is_dir": False, "sync_dirs": sync_dirs})
+
+        now = time.monotonic()
+        for cookie, (path, is_dir, seen_at) in list(self._pending_moves.items()):
+            if now - seen_at >= _MOVE_PAIR_SECONDS: # Moved out of the watched tree
+                del self._pending_moves[cookie]
+                if is_dir:
+                    self._inotify.forget_tree(path)
+                events.append({"type": "deleted", "path": path, "dest_path": None, "is_dir": is_dir,
+                               "sync_dirs": {os.path.dirname(path)}})
+        return events
+
+
+# === Process-wide Watcher ===
+_active_watcher = None
+
+def start_watcher(roots: list[str] | None = None) -> FsWatcher | None:
+    """
+    Starts the background watcher for `roots`, WATCHER_SETTINGS["ROOTS"], or (by default) every root
+    in the metadata index. Returns None if watching is disabled or there is nothing to watch.
+    """
+    global _active_watcher
+    if _active_watcher or not WATCHER_SETTINGS.get("ENABLED", True):
+        return _active_watcher
+    if roots is None:
+        roots = list(WATCHER_SETTINGS.get("ROOTS") or [])
+        if not roots and WATCHER_SETTINGS.get("WATCH_INDEXED_ROOTS", True):
+            from . import metadata_index
+            if os.path.exists(metadata_index.get_index_db_path()):
+                roots = [root["path"] for root in metadata_index.get_index_status()["roots"]]
+    watcher = FsWatcher(roots, use_inotify=WATCHER_SETTINGS.get("USE_INOTIFY", True))
+    if not watcher.roots:
+        return None
+    watcher.start()
+    _active_watcher = watcher
+    return watcher
+
+def watch_root(root_path: str) -> bool:
+    """
+    Adds a newly indexed root to the running watcher, or starts the watcher for it, when indexed folders
+    are watched (WATCHER_SETTINGS["ROOTS"] empty). Returns True if the root is watched from now on.
+    """
+    if WATCHER_SETTINGS.get("ROOTS") or not WATCHER_SETTINGS.get("WATCH_INDEXED_ROOTS", True):
+        return False
+    if _active_watcher:
+        return _active_watcher.add_root(root_path)
+    return start_watcher([root_path]) is not None
+
+def stop_watcher():
+    global _active_watcher
+    if _active_watcher:
+        _active_watcher.stop()
+        _active_watcher = None
+
+def get_watcher_status() -> dict:
+    if not _active_watcher:
+        return {"running": False, "backend": None, "roots": []}
+    return {"running": True, "backend": _active_watcher.backend or "starting", "roots": list(_active_watcher.roots)}
@@ -0,0 +1,140 @@
+# python/fuzzy_name.py
+
+import heapq
+import os
+import re
+
+# Ranked, typo-tolerant file name matching.
+# Names and queries are split into lowercase tokens (separators, camelCase and letter/digit
+# boundaries), so "QuarterlyReport_2023.pdf" reads as ["quarterly", "report", "2023", "pdf"].
+# A candidate's score combines:
+#   - token similarity: each query token against its best name token (order independent), with a
+#     bounded edit distance (adjacent swaps count once) that gives up as soon as the band exceeds
+#     the allowed typos;
+#   - trigram overlap (Dice coefficient over per-token padded trigrams);
+#   - a bounded edit distance over the whole joined name.
+# Only the best top_k candidates are kept in a min-heap; equal scores prefer the newer file.
+# The same trigrams are stored in the metadata index (name_grams table) so candidates can be
+# fetched by shared grams instead of scoring every name in a large index.
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_TOKEN_WEIGHT = 0.55
+_GRAM_WEIGHT = 0.30
+_WHOLE_WEIGHT = 0.15
+
+
+def tokenize(text: str) -> list[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(text)]
+
+def token_grams(tokens: list[str]) -> set[str]:
+    """Trigrams of each token padded with spaces (" report " -> " re", "rep", ..., "rt ")."""
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def name_grams(name: str) -> set[str]:
+    return token_grams(tokenize(name))
+
+def allowed_typos(length: int) -> int:
+    return 0 if length <= 3 else 1 if length <= 6 else 2
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int | None:
+    """
+    Edit distance between a and b, counting a swap of adjacent characters as one edit
+    ("budgte" -> "budget" is 1), or None as soon as it is certain to exceed max_distance.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    too_far = max_distance + 1
+    before_previous = None
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        # Only cells within max_distance of the diagonal can lead to an acceptable distance
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]))
+            if before_previous is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before_previous[j - 2] + 1)
+            current[j] = value if value < too_far else too_far
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        before_previous, previous = previous, current
+    return previous[len(b)] if previous[len(b)] <= max_distance else None
+
+def _token_similarity(query_token: str, name_token: str) -> float:
+    if query_token == name_token:
+        return 1.0
+    if len(query_token) >= 3 and name_token.startswith(query_token): # "quart" -> "quarterly"
+        return 0.8 + 0.1 * len(query_token) / len(name_token)
+    distance = bounded_levenshtein(query_token, name_token, allowed_typos(len(query_token)))
+    if distance is None:
+        return 0.0
+    return 1.0 - distance / max(len(query_token), len(name_token))
+
+
+class FuzzyQuery:
+    """A fuzzy name query, tokenized once and scored against many names."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.grams = token_grams(self.tokens)
+        self.joined = "".join(self.tokens)
+
+    def score(self, name: str) -> float:
+        """Similarity in [0, 1] between the query and a file name."""
+        if not self.tokens:
+            return 0.0
+        name_tokens = tokenize(name)
+        if not name_tokens:
+            return 0.0
+        # A query without the extension should not be penalized for the name's one
+        stem_tokens = tokenize(os.path.splitext(name)[0]) or name_tokens
+        compared_tokens = name_tokens if self.tokens[-1] == name_tokens[-1] else stem_tokens
+
+        token_score = sum(max(_token_similarity(query_token, name_token) for name_token in name_tokens)
+                          for query_token in self.tokens) / len(self.tokens)
+        candidate_grams = token_grams(compared_tokens)
+        gram_score = 2 * len(self.grams & candidate_grams) / (len(self.grams) + len(candidate_grams))
+        joined_name = "".join(compared_tokens)
+        whole_limit = max(1, len(self.joined) // 4)
+        whole_distance = bounded_levenshtein(self.joined, joined_name, whole_limit)
+        whole_score = 0.0 if whole_distance is None else 1.0 - whole_distance / (whole_limit + 1)
+        return _TOKEN_WEIGHT * token_score + _GRAM_WEIGHT * gram_score + _WHOLE_WEIGHT * whole_score
+
+    def shares_grams(self, name: str, min_shared: int) -> bool:
+        """Cheap prefilter used when candidates do not come from the index."""
+        return len(self.grams & name_grams(name)) >= min_shared
+
+    def min_shared_grams(self, min_overlap: float) -> int:
+        return max(1, int(len(self.grams) * min_overlap))
+
+
+def rank(fuzzy_query: FuzzyQuery, candidates, top_k: int, min_score: float) -> list[tuple[float, tuple]]:
+    """
+    Scores candidates (tuples whose first four fields are filepath, size_bytes, mtime, filename) and
+    returns the best top_k as [(score, candidate), ...], best first; ties go to the newer file.
+    """
+    heap = [] # Min-heap of (score, mtime, sequence, candidate)
+    for sequence, candidate in enumerate(candidates):
+        score = fuzzy_query.score(candidate[3])
+        if score < min_score:
+            continue
+        entry = (score, candidate[2], sequence, candidate)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [(score, candidate) for score, _, _, candidate in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
@@ -0,0 +1,177 @@
+# python/ignore_rules.py
+
+import functools
+import os
+import re
+
+from config import IGNORE_SETTINGS
+
+# .gitignore-style exclusion for walks and the metadata index.
+# Rules come from IGNORE_SETTINGS["EXCLUDE_PATTERNS"] (applied below the walked root) and from ignore
+# files (.samignore, plus .gitignore if enabled) found in the walked directories; each ignore file
+# applies to its own directory's subtree. As in git, the last matching rule wins and deeper files
+# override shallower ones; "!pattern" re-includes, a trailing "/" matches directories only, and a
+# pattern containing "/" is anchored to the directory of the file that defines it.
+#
+# Each ignore file's text is compiled once (cached by content) into per-rule regexes plus a single
+# alternation of all its patterns, so the common "nothing matches" case costs one regex search.
+
+
+def ignore_file_names() -> list[str]:
+    """Ignore file names in precedence order (later files override earlier ones)."""
+    names = [".gitignore"] if IGNORE_SETTINGS.get("HONOR_GITIGNORE", True) else []
+    return names + [name for name in IGNORE_SETTINGS.get("IGNORE_FILES", [".samignore"]) if name not in names]
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translates one gitignore glob (no leading or trailing slash) into a regex for a '/'-separated relative path."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            if pattern.startswith("**", i):
+                if pattern.startswith("**/", i):    # Zero or more directories
+                    parts.append("(?:.*/)?")
+                    i += 3
+                    continue
+                parts.append(".*")                  # Everything below
+                i += 2
+                continue
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                char_class = pattern[i + 1:end]
+                if char_class.startswith("!"):
+                    char_class = "^" + char_class[1:]
+                parts.append("[" + char_class.replace("\\", "\\\\") + "]")
+                i = end + 1
+                continue
+        elif char == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+class _RuleSet:
+    """The compiled rules of one ignore source."""
+
+    def __init__(self, text: str):
+        self.rules = [] # (compiled regex, negated, dir_only)
+        for raw_line in text.splitlines():
+            line = raw_line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith("\\"): # "\#file" / "\!file"
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line.strip("/"):
+                continue
+            anchored = "/" in line
+            body = _glob_to_regex(line.lstrip("/"))
+            source = ("^" if anchored else "^(?:.*/)?") + body + "$"
+            try:
+                self.rules.append((re.compile(source), negated, dir_only))
+            except re.error:
+                continue
+        self.has_negations = any(negated for _, negated, _ in self.rules)
+        self.any_file_rule = self._combined(dir_only_allowed=False)
+        self.any_dir_rule = self._combined(dir_only_allowed=True)
+
+    def _combined(self, dir_only_allowed: bool):
+        sources = [regex.pattern for regex, negated, dir_only in self.rules if not negated and (dir_only_allowed or not dir_only)]
+        return re.compile("|".join(f"(?:{source})" for source in sources)) if sources else None
+
+    def match(self, relative_path: str, is_dir: bool) -> bool | None:
+        """True (ignored), False (re-included by a negation) or None (no rule applies)."""
+        if not self.has_negations:
+            combined = self.any_dir_rule if is_dir else self.any_file_rule
+            return True if combined is not None and combined.search(relative_path) else None
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.search(relative_path):
+                return not negated
+        return None
+
+@functools.lru_cache(maxsize=1024)
+def compile_rules(text: str) -> _RuleSet:
+    return _RuleSet(text)
+
+
+class IgnoreMatcher:
+    """Immutable stack of (base_dir, rule set) pairs; child() adds the ignore files of one more directory."""
+
+    def __init__(self, layers: tuple = ()):
+        self.layers = layers
+
+    def child(self, dir_path: str, ignore_texts: list[str]) -> "IgnoreMatcher":
+        texts = [text for text in ignore_texts if text and text.strip()]
+        if not texts:
+            return self
+        return IgnoreMatcher(self.layers + tuple((dir_path, compile_rules(text)) for text in texts))
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        for base_dir, rule_set in reversed(self.layers): # Deeper and later sources win
+            if not path.startswith(base_dir.rstrip(os.sep) + os.sep):
+                continue
+            relative_path = path[len(base_dir.rstrip(os.sep)) + 1:]
+            if os.sep != "/":
+                relative_path = relative_path.replace(os.sep, "/")
+            verdict = rule_set.match(relative_path, is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.layers)
+
+
+def base_matcher(root_path: str) -> IgnoreMatcher:
+    """The configured exclude patterns, applied below root_path."""
+    patterns = IGNORE_SETTINGS.get("EXCLUDE_PATTERNS") or []
+    if not IGNORE_SETTINGS.get("ENABLED", True) or not patterns:
+        return IgnoreMatcher()
+    return IgnoreMatcher().child(os.path.abspath(root_path), ["\n".join(patterns)])
+
+def read_ignore_texts(dir_path: str, entry_names) -> list[str]:
+    """Reads the ignore files of dir_path that appear among entry_names (its listing), in precedence order."""
+    if not IGNORE_SETTINGS.get("ENABLED", True):
+        return []
+    texts = []
+    for name in ignore_file_names():
+        if name in entry_names:
+            try:
+                with open(os.path.join(dir_path, name), "r", encoding="utf-8", errors="replace") as f:
+                    texts.append(f.read())
+            except OSError:
+                continue
+    return texts
+
+def matcher_above(root_path: str, dir_path: str) -> IgnoreMatcher:
+    """
+    The matcher a walk from root_path would hand to dir_path: the exclude patterns plus the ignore files
+    of root_path and every directory between it and dir_path (used to resume a walk at dir_path).
+    """
+    abs_root = os.path.abspath(root_path)
+    matcher = base_matcher(abs_root)
+    relative = os.path.relpath(os.path.abspath(dir_path), abs_root)
+    if relative == "." or relative.startswith(".."):
+        return matcher
+    names = set(ignore_file_names())
+    current = abs_root
+    for part in [""] + relative.split(os.sep)[:-1]:
+        current = os.path.join(current, part) if part else current
+        matcher = matcher.child(current, read_ignore_texts(current, names))
+    return matcher
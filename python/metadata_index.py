@@ -0,0 +1,578 @@
+# python/metadata_index.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import STATE_DIR, INDEX_SETTINGS, IGNORE_SETTINGS
+from . import ignore_rules
+from . import fuzzy_name
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+INDEX_SCHEMA_VERSION = 3
+
+_SCHEMA_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, last_scan REAL)",
+    # ignore_rules: JSON list of the directory's ignore file texts, NULL if it has none
+    "CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER, scanned_at REAL, ignore_rules TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent)",
+    """CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY, parent TEXT NOT NULL, name TEXT NOT NULL, name_lower TEXT NOT NULL,
+        ext TEXT, size INTEGER, mtime REAL, inode INTEGER, dev INTEGER
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_files_parent ON files(parent)",
+    "CREATE INDEX IF NOT EXISTS idx_files_ext ON files(ext)",
+    "CREATE INDEX IF NOT EXISTS idx_files_name_lower ON files(name_lower)",
+    # Name trigrams for fuzzy name search (see fuzzy_name), keyed by name so each distinct name is stored once.
+    # Rows of names no longer in `files` are harmless and pruned by vacuum_index.
+    "CREATE TABLE IF NOT EXISTS name_grams (gram TEXT NOT NULL, name_lower TEXT NOT NULL, PRIMARY KEY (gram, name_lower)) WITHOUT ROWID",
+    # Content kind sniffed from the file's first bytes (see content_sniffer), valid while size and mtime match
+    "CREATE TABLE IF NOT EXISTS sniffed (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, kind TEXT NOT NULL)",
+]
+
+# Database paths whose schema was created and migrated by this process (see _connect)
+_schema_ready_paths: set[str] = set()
+_schema_ready_lock = threading.Lock()
+
+
+# === Location & Connection ===
+def get_state_dir() -> str:
+    """Returns the absolute state directory, creating it if needed."""
+    state_dir = STATE_DIR if os.path.isabs(STATE_DIR) else os.path.join(PROJECT_ROOT, STATE_DIR)
+    os.makedirs(state_dir, exist_ok=True)
+    return state_dir
+
+def get_index_db_path() -> str:
+    return os.path.join(get_state_dir(), INDEX_SETTINGS.get("DB_FILENAME", "metadata_index.sqlite3"))
+
+def is_index_enabled() -> bool:
+    return bool(INDEX_SETTINGS.get("ENABLED", True))
+
+def _connect() -> sqlite3.Connection:
+    """
+    Opens the index database. Schema setup and migration run once per database file in this process
+    (again if the file was deleted meanwhile); later connections only set the per-connection PRAGMAs.
+    """
+    db_path = get_index_db_path()
+    if db_path in _schema_ready_paths and not os.path.exists(db_path):
+        _schema_ready_paths.discard(db_path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if db_path not in _schema_ready_paths:
+            with _schema_ready_lock:
+                if db_path not in _schema_ready_paths:
+                    conn.execute("PRAGMA journal_mode=WAL") # Persistent: stored in the database file
+                    for statement in _SCHEMA_STATEMENTS:
+                        conn.execute(statement)
+                    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(INDEX_SCHEMA_VERSION),))
+                    _migrate(conn)
+                    _schema_ready_paths.add(db_path)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+def _migrate(conn: sqlite3.Connection):
+    """Upgrades older databases and invalidates every directory when the ignore settings change."""
+    with conn:
+        dir_columns = {row[1] for row in conn.execute("PRAGMA table_info(dirs)")}
+        if "ignore_rules" not in dir_columns: # Version 1: no ignore rules recorded
+            conn.execute("ALTER TABLE dirs ADD COLUMN ignore_rules TEXT")
+            conn.execute("UPDATE dirs SET mtime_ns = -1")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(INDEX_SCHEMA_VERSION),))
+        version_row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if int(version_row[0]) < 3: # Version 2: no name trigrams yet
+            _index_names(conn, [name for (name,) in conn.execute("SELECT DISTINCT name FROM files")])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(INDEX_SCHEMA_VERSION),))
+        settings_key = json.dumps(IGNORE_SETTINGS, sort_keys=True)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'ignore_settings'").fetchone()
+        if row is None or row[0] != settings_key:
+            conn.execute("UPDATE dirs SET mtime_ns = -1") # Forces a rescan under the new rules
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('ignore_settings', ?)", (settings_key,))
+
+def _index_names(conn: sqlite3.Connection, names):
+    """Records the fuzzy-search trigrams of file names (already known names are skipped by the primary key)."""
+    conn.executemany("INSERT OR IGNORE INTO name_grams (gram, name_lower) VALUES (?, ?)",
+                     ((gram, name.lower()) for name in set(names) for gram in fuzzy_name.name_grams(name)))
+
+def _subtree_bounds(dir_path: str) -> tuple[str, str]:
+    """Key range [low, high) covering every path strictly below dir_path (uses the primary key index)."""
+    prefix = dir_path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+def _delete_subtree(conn: sqlite3.Connection, dir_path: str, include_self: bool = True):
+    low, high = _subtree_bounds(dir_path)
+    conn.execute("DELETE FROM files WHERE path >= ? AND path < ?", (low, high))
+    conn.execute("DELETE FROM dirs WHERE path >= ? AND path < ?", (low, high))
+    if include_self:
+        conn.execute("DELETE FROM dirs WHERE path = ?", (dir_path,))
+
+
+# === Scanning ===
+def _is_skipped_dir(name: str) -> bool:
+    return name.startswith('.') or name.startswith('$')
+
+def _matcher_for_dir(conn: sqlite3.Connection, dir_path: str) -> ignore_rules.IgnoreMatcher:
+    """
+    Ignore rules in effect for the entries of an indexed directory: the configured excludes below the
+    topmost indexed ancestor, plus the ignore files recorded for dir_path and its indexed ancestors.
+    """
+    chain = []
+    current = dir_path
+    while True:
+        row = conn.execute("SELECT ignore_rules FROM dirs WHERE path = ?", (current,)).fetchone()
+        if row is None:
+            break
+        chain.append((current, row[0]))
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    matcher = ignore_rules.base_matcher(chain[-1][0] if chain else dir_path)
+    for path, ignore_json in reversed(chain):
+        if ignore_json:
+            matcher = matcher.child(path, json.loads(ignore_json))
+    return matcher
+
+def _rescan_directory(conn: sqlite3.Connection, dir_path: str, dir_mtime_ns: int,
+                      parent_matcher: ignore_rules.IgnoreMatcher) -> tuple[list[str], ignore_rules.IgnoreMatcher, bool]:
+    """
+    Re-lists one directory, replaces its file rows and returns (subdirectories, matcher for them, rules_changed).
+    rules_changed is True when the directory's ignore files differ from the recorded ones.
+    """
+    with os.scandir(dir_path) as entries:
+        listing = list(entries)
+    ignore_texts = ignore_rules.read_ignore_texts(dir_path, {entry.name for entry in listing})
+    ignore_json = json.dumps(ignore_texts) if ignore_texts else None
+    matcher = parent_matcher.child(dir_path, ignore_texts)
+    file_rows = []
+    subdirs = []
+    for entry in listing:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_skipped_dir(entry.name) and not matcher.is_ignored(entry.path, True):
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                if entry.name.startswith('.') or matcher.is_ignored(entry.path, False):
+                    continue
+                stat_result = entry.stat()
+                name_lower = entry.name.lower()
+                file_rows.append((
+                    entry.path, dir_path, entry.name, name_lower, os.path.splitext(name_lower)[1],
+                    stat_result.st_size, stat_result.st_mtime, stat_result.st_ino, stat_result.st_dev
+                ))
+        except OSError: # Broken link or permissions error
+            continue
+
+    conn.execute("DELETE FROM files WHERE parent = ?", (dir_path,))
+    conn.executemany("INSERT OR REPLACE INTO files (path, parent, name, name_lower, ext, size, mtime, inode, dev) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", file_rows)
+    _index_names(conn, [row[2] for row in file_rows])
+
+    current_subdirs = set(subdirs)
+    for (stale_dir,) in conn.execute("SELECT path FROM dirs WHERE parent = ?", (dir_path,)).fetchall():
+        if stale_dir not in current_subdirs:
+            _delete_subtree(conn, stale_dir)
+
+    previous = conn.execute("SELECT ignore_rules FROM dirs WHERE path = ?", (dir_path,)).fetchone()
+    rules_changed = previous is not None and previous[0] != ignore_json
+    conn.execute("INSERT OR REPLACE INTO dirs (path, parent, mtime_ns, scanned_at, ignore_rules) VALUES (?, ?, ?, ?, ?)",
+                 (dir_path, os.path.dirname(dir_path), dir_mtime_ns, time.time(), ignore_json))
+    return subdirs, matcher, rules_changed
+
+def refresh_tree(root_path: str, force: bool = False, record_root: bool = True,
+                 deadline: float | None = None) -> tuple[dict, str | None]:
+    """
+    Brings the index for root_path up to date.
+    Only directories whose mtime changed since the last scan are re-listed; unchanged
+    directories reuse their indexed children. `force` rescans everything.
+    `record_root=False` scans a subtree (e.g. a newly created folder) without listing it as an indexed root.
+    `deadline` (a time.monotonic() value) stops the scan early with stats["complete"] False; directories
+    not reached yet are recorded as unscanned, so the next refresh continues where this one stopped.
+    Returns (stats_dict, error_message_string).
+    """
+    abs_root = os.path.abspath(root_path)
+    stats = {"root": abs_root, "dirs_checked": 0, "dirs_rescanned": 0, "seconds": 0.0, "complete": True}
+    if not os.path.isdir(abs_root):
+        return stats, f"Path '{abs_root}' is not a valid directory."
+
+    started = time.time()
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return stats, f"Could not open metadata index: {e}"
+
+    try:
+        with conn:
+            if force:
+                _delete_subtree(conn, abs_root)
+            parent_dir = os.path.dirname(abs_root)
+            root_matcher = _matcher_for_dir(conn, parent_dir) if _is_indexed_dir(conn, parent_dir) else ignore_rules.base_matcher(abs_root)
+            # (dir_path, matcher of its parent, rescan even if unchanged because the ignore rules above it changed)
+            pending_dirs = [(abs_root, root_matcher, False)]
+            while pending_dirs:
+                if deadline is not None and time.monotonic() > deadline:
+                    conn.executemany("INSERT OR IGNORE INTO dirs (path, parent, mtime_ns, scanned_at) VALUES (?, ?, -1, ?)",
+                                     [(dir_path, os.path.dirname(dir_path), time.time()) for dir_path, _, _ in pending_dirs])
+                    stats["complete"] = False
+                    break
+                dir_path, parent_matcher, rules_changed_above = pending_dirs.pop()
+                stats["dirs_checked"] += 1
+                try:
+                    dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+                except OSError: # Directory vanished or became unreadable
+                    _delete_subtree(conn, dir_path)
+                    continue
+
+                row = conn.execute("SELECT mtime_ns, ignore_rules FROM dirs WHERE path = ?", (dir_path,)).fetchone()
+                if row and row[0] == dir_mtime_ns and not rules_changed_above:
+                    matcher = parent_matcher.child(dir_path, json.loads(row[1])) if row[1] else parent_matcher
+                    pending_dirs.extend((child, matcher, False) for (child,) in conn.execute("SELECT path FROM dirs WHERE parent = ?", (dir_path,)))
+                    continue
+
+                try:
+                    subdirs, matcher, rules_changed = _rescan_directory(conn, dir_path, dir_mtime_ns, parent_matcher)
+                    pending_dirs.extend((child, matcher, rules_changed or rules_changed_above) for child in subdirs)
+                    stats["dirs_rescanned"] += 1
+                except OSError:
+                    continue
+
+            if record_root:
+                conn.execute("INSERT OR REPLACE INTO roots (path, last_scan) VALUES (?, ?)", (abs_root, time.time()))
+        stats["seconds"] = round(time.time() - started, 3)
+        return stats, None
+    except sqlite3.Error as e:
+        return stats, f"Metadata index error while scanning '{abs_root}': {e}"
+    finally:
+        conn.close()
+
+
+# === Direct Updates ===
+# Applied by the filesystem watcher and by moves the assistant performs itself, so the next
+# refresh_tree does not have to rediscover the change. A parent directory's recorded mtime is only
+# advanced when the caller knows every change in it was applied (`sync_dir_mtimes`); otherwise the
+# next refresh still rescans that one directory.
+
+def _sync_dir_mtime(conn: sqlite3.Connection, dir_path: str):
+    try:
+        dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return
+    conn.execute("UPDATE dirs SET mtime_ns = ?, scanned_at = ? WHERE path = ?", (dir_mtime_ns, time.time(), dir_path))
+
+def _is_indexed_dir(conn: sqlite3.Connection, dir_path: str) -> bool:
+    return conn.execute("SELECT 1 FROM dirs WHERE path = ?", (dir_path,)).fetchone() is not None
+
+def _upsert_file_row(conn: sqlite3.Connection, file_path: str) -> bool:
+    """Inserts or refreshes the row of an existing file in an indexed directory. Returns False if it does not apply."""
+    name = os.path.basename(file_path)
+    parent = os.path.dirname(file_path)
+    if name.startswith('.') or not _is_indexed_dir(conn, parent) or _matcher_for_dir(conn, parent).is_ignored(file_path, False):
+        return False
+    try:
+        stat_result = os.stat(file_path, follow_symlinks=True)
+    except OSError:
+        conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+        return True
+    name_lower = name.lower()
+    conn.execute("INSERT OR REPLACE INTO files (path, parent, name, name_lower, ext, size, mtime, inode, dev) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                 (file_path, parent, name, name_lower, os.path.splitext(name_lower)[1],
+                  stat_result.st_size, stat_result.st_mtime, stat_result.st_ino, stat_result.st_dev))
+    _index_names(conn, [name])
+    return True
+
+def is_ignored_path(path: str, is_dir: bool) -> bool:
+    """True if path lies in an indexed directory whose ignore rules exclude it."""
+    abs_path = os.path.abspath(path)
+    try:
+        conn = _connect()
+    except sqlite3.Error:
+        return False
+    try:
+        parent = os.path.dirname(abs_path)
+        return _is_indexed_dir(conn, parent) and _matcher_for_dir(conn, parent).is_ignored(abs_path, is_dir)
+    finally:
+        conn.close()
+
+def dirs_in_sync(dir_paths: list[str]) -> set[str]:
+    """Returns the indexed directories among dir_paths whose recorded mtime matches the filesystem."""
+    in_sync = set()
+    try:
+        conn = _connect()
+    except sqlite3.Error:
+        return in_sync
+    try:
+        for dir_path in {os.path.abspath(path) for path in dir_paths}:
+            row = conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (dir_path,)).fetchone()
+            try:
+                if row and row[0] == os.stat(dir_path).st_mtime_ns:
+                    in_sync.add(dir_path)
+            except OSError:
+                continue
+    finally:
+        conn.close()
+    return in_sync
+
+def get_dir_mtimes(root_path: str) -> dict:
+    """Returns {dir_path: recorded mtime_ns} for root_path and every indexed directory below it."""
+    abs_root = os.path.abspath(root_path)
+    low, high = _subtree_bounds(abs_root)
+    try:
+        conn = _connect()
+    except sqlite3.Error:
+        return {}
+    try:
+        rows = conn.execute("SELECT path, mtime_ns FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (abs_root, low, high))
+        return {path: mtime_ns for path, mtime_ns in rows}
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+
+def get_sniffed_kinds(root_path: str) -> dict:
+    """Returns {path: (size, mtime, kind)} for the sniffed files below root_path."""
+    low, high = _subtree_bounds(os.path.abspath(root_path))
+    try:
+        conn = _connect()
+    except sqlite3.Error:
+        return {}
+    try:
+        rows = conn.execute("SELECT path, size, mtime, kind FROM sniffed WHERE path >= ? AND path < ?", (low, high))
+        return {path: (size, mtime, kind) for path, size, mtime, kind in rows}
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+
+def store_sniffed_kinds(rows: list[tuple]) -> str | None:
+    """Records (path, size, mtime, kind) sniffing verdicts. Returns an error message or None."""
+    if not rows:
+        return None
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return f"Could not open metadata index: {e}"
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO sniffed (path, size, mtime, kind) VALUES (?, ?, ?, ?)", rows)
+        return None
+    except sqlite3.Error as e:
+        return f"Could not store sniffed file kinds: {e}"
+    finally:
+        conn.close()
+
+def apply_created_or_modified(path: str, sync_dir_mtimes: bool = False) -> str | None:
+    """Indexes a new or changed file, or scans a new directory. Returns an error message or None."""
+    abs_path = os.path.abspath(path)
+    parent = os.path.dirname(abs_path)
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return f"Could not open metadata index: {e}"
+    try:
+        with conn:
+            if not _is_indexed_dir(conn, parent):
+                return None
+            if os.path.isdir(abs_path):
+                if _is_skipped_dir(os.path.basename(abs_path)) or _matcher_for_dir(conn, parent).is_ignored(abs_path, True):
+                    return None
+                conn.execute("INSERT OR IGNORE INTO dirs (path, parent, mtime_ns, scanned_at) VALUES (?, ?, ?, ?)",
+                             (abs_path, parent, -1, time.time())) # -1 forces the scan below
+            else:
+                _upsert_file_row(conn, abs_path)
+            if sync_dir_mtimes:
+                _sync_dir_mtime(conn, parent)
+    except sqlite3.Error as e:
+        return f"Metadata index update failed: {e}"
+    finally:
+        conn.close()
+    if os.path.isdir(abs_path):
+        return refresh_tree(abs_path, record_root=False)[1]
+    return None
+
+def apply_removed(path: str, sync_dir_mtimes: bool = False) -> str | None:
+    """Drops a deleted file or directory subtree from the index. Returns an error message or None."""
+    abs_path = os.path.abspath(path)
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return f"Could not open metadata index: {e}"
+    try:
+        with conn:
+            conn.execute("DELETE FROM files WHERE path = ?", (abs_path,))
+            _delete_subtree(conn, abs_path)
+            if sync_dir_mtimes:
+                _sync_dir_mtime(conn, os.path.dirname(abs_path))
+        return None
+    except sqlite3.Error as e:
+        return f"Metadata index update failed: {e}"
+    finally:
+        conn.close()
+
+def apply_moved(source_path: str, destination_path: str, sync_dirs: set[str] | None = None) -> str | None:
+    """
+    Re-keys a moved file or directory subtree instead of rescanning it.
+    Parent directories listed in sync_dirs get their recorded mtime advanced. Returns an error message or None.
+    """
+    abs_source = os.path.abspath(source_path)
+    abs_destination = os.path.abspath(destination_path)
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return f"Could not open metadata index: {e}"
+    try:
+        with conn:
+            conn.execute("DELETE FROM files WHERE path = ?", (abs_source,))
+            if os.path.isdir(abs_destination):
+                low, high = _subtree_bounds(abs_source)
+                destination_in_index = _is_indexed_dir(conn, os.path.dirname(abs_destination)) and \
+                    not _is_skipped_dir(os.path.basename(abs_destination)) and \
+                    not _matcher_for_dir(conn, os.path.dirname(abs_destination)).is_ignored(abs_destination, True)
+                if destination_in_index:
+                    # Drop anything already recorded at the destination, then rewrite the subtree prefix
+                    _delete_subtree(conn, abs_destination)
+                    prefix_length = len(abs_source) + 1
+                    for table in ("files", "dirs"):
+                        conn.execute(f"UPDATE {table} SET path = ? || substr(path, ?), parent = ? || substr(parent, ?) "
+                                     f"WHERE path >= ? AND path < ?",
+                                     (abs_destination, prefix_length, abs_destination, prefix_length, low, high))
+                    conn.execute("UPDATE dirs SET path = ?, parent = ? WHERE path = ?",
+                                 (abs_destination, os.path.dirname(abs_destination), abs_source))
+                    if not _is_indexed_dir(conn, abs_destination): # Source was not indexed; scan it below
+                        conn.execute("INSERT INTO dirs (path, parent, mtime_ns, scanned_at) VALUES (?, ?, ?, ?)",
+                                     (abs_destination, os.path.dirname(abs_destination), -1, time.time()))
+                else:
+                    _delete_subtree(conn, abs_source)
+            else:
+                _upsert_file_row(conn, abs_destination)
+            for dir_path in (sync_dirs or set()) & {os.path.dirname(abs_source), os.path.dirname(abs_destination)}:
+                _sync_dir_mtime(conn, dir_path)
+    except sqlite3.Error as e:
+        return f"Metadata index update failed: {e}"
+    finally:
+        conn.close()
+    if os.path.isdir(abs_destination):
+        return refresh_tree(abs_destination, record_root=False)[1] # Cheap: unchanged directories are skipped
+    return None
+
+
+# === Queries ===
+def query_files(root_path: str, extensions: list[str] | None = None, min_size: int | None = None, max_size: int | None = None,
+                modified_after: float | None = None, modified_before: float | None = None,
+                after_path: str | None = None) -> tuple[list[dict], str | None]:
+    """
+    Returns indexed files below root_path (optionally filtered by extension, size and mtime) as search-style
+    item dicts, ordered by path; `after_path` skips everything up to and including that path.
+    Call refresh_tree first to make sure the subtree is current.
+    """
+    abs_root = os.path.abspath(root_path)
+    low, high = _subtree_bounds(abs_root)
+    if after_path is not None and after_path >= low:
+        low = after_path + "\0" # Smallest string greater than after_path
+    sql = "SELECT name, path, size, mtime FROM files WHERE path >= ? AND path < ?"
+    args = [low, high]
+    if extensions:
+        sql += f" AND ext IN ({', '.join('?' for _ in extensions)})"
+        args.extend(ext.lower() for ext in extensions)
+    for clause, value in (("size >= ?", min_size), ("size <= ?", max_size), ("mtime >= ?", modified_after), ("mtime < ?", modified_before)):
+        if value is not None:
+            sql += f" AND {clause}"
+            args.append(value)
+    sql += " ORDER BY path"
+
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return [], f"Could not open metadata index: {e}"
+    try:
+        return [{"name": name, "path": path, "size_bytes": size, "modified_timestamp": mtime}
+                for name, path, size, mtime in conn.execute(sql, args)], None
+    except sqlite3.Error as e:
+        return [], f"Metadata index query failed: {e}"
+    finally:
+        conn.close()
+
+def query_fuzzy_candidates(root_path: str, grams: set[str], min_shared: int,
+                           max_names: int | None = None) -> tuple[list[dict], str | None]:
+    """
+    Returns indexed files below root_path whose name shares at least min_shared of the given trigrams,
+    as search-style item dicts. At most max_names distinct names (those sharing the most grams) are considered.
+    Call refresh_tree first to make sure the subtree is current.
+    """
+    if not grams:
+        return [], None
+    abs_root = os.path.abspath(root_path)
+    low, high = _subtree_bounds(abs_root)
+    sorted_grams = sorted(grams)
+    sql = (f"WITH matched AS (SELECT name_lower, COUNT(*) AS shared FROM name_grams "
+           f"WHERE gram IN ({', '.join('?' for _ in sorted_grams)}) GROUP BY name_lower HAVING shared >= ? "
+           f"ORDER BY shared DESC LIMIT ?) "
+           f"SELECT f.name, f.path, f.size, f.mtime FROM matched JOIN files f ON f.name_lower = matched.name_lower "
+           f"WHERE f.path >= ? AND f.path < ?")
+    args = sorted_grams + [min_shared, max_names if max_names else -1, low, high]
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return [], f"Could not open metadata index: {e}"
+    try:
+        return [{"name": name, "path": path, "size_bytes": size, "modified_timestamp": mtime}
+                for name, path, size, mtime in conn.execute(sql, args)], None
+    except sqlite3.Error as e:
+        return [], f"Metadata index query failed: {e}"
+    finally:
+        conn.close()
+
+
+# === Maintenance ===
+def get_index_status() -> dict:
+    """Summary of the index for the `index status` command; "error" is set if the database could not be read."""
+    db_path = get_index_db_path()
+    status = {"db_path": db_path, "enabled": is_index_enabled(), "file_count": 0, "dir_count": 0,
+              "db_size_bytes": 0, "roots": [], "error": None}
+    if not os.path.exists(db_path):
+        return status
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        status["error"] = f"Could not open metadata index: {e}"
+        return status
+    try:
+        status["file_count"] = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        status["dir_count"] = conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+        status["roots"] = [{"path": path, "last_scan": last_scan}
+                           for path, last_scan in conn.execute("SELECT path, last_scan FROM roots ORDER BY path")]
+    except sqlite3.Error as e:
+        status["error"] = f"Metadata index query failed: {e}"
+    finally:
+        conn.close()
+    for suffix in ("", "-wal"):
+        if os.path.exists(db_path + suffix):
+            status["db_size_bytes"] += os.path.getsize(db_path + suffix)
+    return status
+
+def vacuum_index() -> tuple[dict, str | None]:
+    """Drops roots that no longer exist on disk, then compacts the database file."""
+    result = {"removed_roots": []}
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        return result, f"Could not open metadata index: {e}"
+    try:
+        with conn:
+            for (root,) in conn.execute("SELECT path FROM roots").fetchall():
+                if not os.path.isdir(root):
+                    _delete_subtree(conn, root)
+                    conn.execute("DELETE FROM roots WHERE path = ?", (root,))
+                    result["removed_roots"].append(root)
+            conn.execute("DELETE FROM name_grams WHERE name_lower NOT IN (SELECT name_lower FROM files)")
+            conn.execute("DELETE FROM sniffed WHERE path NOT IN (SELECT path FROM files)")
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        return result, None
+    except sqlite3.Error as e:
+        return result, f"Metadata index vacuum failed: {e}"
+    finally:
+        conn.close()
@@ -8,6 +8,7 @@ from .path_resolver import get_path_from_user_input, resolve_contextual_path
 from .cli_constants import ICONS, KNOWN_BAD_EXAMPLE_PATHS
 from . import cli_ui
 from . import session_manager
+from . import archive_reader
 
 
 def _resolve_single_path_parameter(param_key: str, param_value: str, current_session_ctx: dict, is_folder_hint: bool = False, prompt_if_missing: bool = True, check_exists_for_source: bool = False, ui_console_instance=None):
@@ -24,7 +25,7 @@ def _resolve_single_path_parameter(param_key: str, param_value: str, current_ses
         # If it's an absolute path and not a placeholder, use it directly.
         # Further validation (isfile, isdir) will happen in process_nlu_result or handler.
         resolved_path = param_value
-        if check_exists_for_source and not os.path.exists(resolved_path):
+        if check_exists_for_source and not os.path.exists(resolved_path) and not archive_reader.member_exists(resolved_path):
             if ui_console_instance:
                 cli_ui.print_error(f"Path Error: Explicitly provided source path '{resolved_path}' for '{param_key}' does not exist.", "Path Validation Error")
             return None # Path doesn't exist
@@ -101,7 +102,7 @@ def _resolve_single_path_parameter(param_key: str, param_value: str, current_ses
         resolved_path = None
 
     # 6. Final existence check if requested (typically for source paths)
-    if resolved_path and check_exists_for_source and not os.path.exists(resolved_path):
+    if resolved_path and check_exists_for_source and not os.path.exists(resolved_path) and not archive_reader.member_exists(resolved_path):
         if ui_console_instance:
             cli_ui.print_error(f"Path Error: Resolved source path '{resolved_path}' for '{param_key}' does not exist.", "Path Validation Error")
         return None
@@ -142,7 +143,7 @@ def process_nlu_result(nlu_data_for_step: dict, user_input_original: str, curren
         is_folder_hint_for_resolution = (action == "ask_question_about_file" and isinstance(path_to_resolve_val, str) and "__DIR__" in path_to_resolve_val.upper()) # Crude hint
         is_source_path = True # The file path must exist
 
-    elif action == "list_folder_contents":
+    elif action in ["list_folder_contents", "find_duplicates", "storage_report"]:
         path_to_resolve_val = final_params.get("folder_path") or final_params.get("file_path") # LLM might use file_path
         expected_param_name_for_handler = "folder_path"
         is_folder_hint_for_resolution = True
@@ -249,19 +250,19 @@ def process_nlu_result(nlu_data_for_step: dict, user_input_original: str, curren
 
     # --- Post-resolution validation for specific actions ---
     if action == "summarize_file":
-        if not final_params.get("file_path") or not os.path.isfile(final_params["file_path"]):
+        if not final_params.get("file_path") or not (os.path.isfile(final_params["file_path"]) or archive_reader.member_exists(final_params["file_path"])):
             msg = f"Summarize Error: Path for 'file_path' ('{final_params.get('file_path')}') is not a valid file."
             if ui_module_passed: ui_module_passed.print_error(msg, "Path Error")
             return "path_validation_failed", final_params, msg
     elif action == "ask_question_about_file":
         # Can be file or dir, just needs to exist
-        if not final_params.get("file_path") or not os.path.exists(final_params["file_path"]):
+        if not final_params.get("file_path") or not (os.path.exists(final_params["file_path"]) or archive_reader.member_exists(final_params["file_path"])):
             msg = f"Q&A Error: Path for 'file_path' ('{final_params.get('file_path')}') does not exist."
             if ui_module_passed: ui_module_passed.print_error(msg, "Path Error")
             return "path_validation_failed", final_params, msg
-    elif action in ["list_folder_contents", "search_files", "propose_and_execute_organization"]:
+    elif action in ["list_folder_contents", "search_files", "propose_and_execute_organization", "find_duplicates", "storage_report"]:
         # Expected param name should be folder_path, search_path, or target_path respectively
-        path_key_for_dir_action = "folder_path" if action == "list_folder_contents" else \
+        path_key_for_dir_action = "folder_path" if action in ["list_folder_contents", "find_duplicates", "storage_report"] else \
                                   "search_path" if action == "search_files" else \
                                   "target_path" # for organization
         
@@ -0,0 +1,98 @@
+# python/search_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config import SEARCH_CACHE_SETTINGS
+from . import fs_watcher
+
+# In-memory cache of search results for the running session.
+# Entries are keyed by the normalized query plan (SearchQuery.describe(), so differently worded but
+# equivalent criteria share an entry) and the absolute search path. Each entry remembers the mtime of
+# every directory the search visited and, for content and topic searches, the size and mtime of every
+# file whose content was examined. An entry is reused only while all of those are unchanged, which costs
+# one stat per directory instead of a walk, index refresh or content scan. Filesystem watcher events
+# drop affected entries right away.
+
+
+class CacheEntry:
+    def __init__(self, items: list[dict], complete: bool, dir_mtimes: dict, file_stats: dict | None):
+        self.items = items              # Result items in search order
+        self.complete = complete        # False if the search stopped at a result limit
+        self.dir_mtimes = dir_mtimes    # dir_path -> st_mtime_ns when visited
+        self.file_stats = file_stats    # filepath -> (size_bytes, mtime) for content checks, or None
+        self.created_at = time.time()
+
+    def serves(self, limit: int | None) -> bool:
+        return self.complete or (limit is not None and len(self.items) >= limit)
+
+    def is_current(self) -> bool:
+        try:
+            for dir_path, mtime_ns in self.dir_mtimes.items():
+                if os.stat(dir_path).st_mtime_ns != mtime_ns:
+                    return False
+            for filepath, (size_bytes, mtime) in (self.file_stats or {}).items():
+                stat_result = os.stat(filepath)
+                if stat_result.st_size != size_bytes or stat_result.st_mtime != mtime:
+                    return False
+        except OSError:
+            return False
+        return True
+
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+def is_enabled() -> bool:
+    return bool(SEARCH_CACHE_SETTINGS.get("ENABLED", True))
+
+def make_key(query, search_path: str) -> tuple:
+    return (query.describe(), query.name_exact, os.path.abspath(search_path))
+
+def lookup(key: tuple, limit: int | None = None) -> list[dict] | None:
+    """Returns the cached items for key if they are still valid and cover `limit`, else None."""
+    with _lock:
+        entry = _entries.get(key)
+    if entry is None or not entry.serves(limit):
+        return None
+    if not entry.is_current():
+        with _lock:
+            _entries.pop(key, None)
+        return None
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+    return entry.items if limit is None else entry.items[:limit]
+
+def store(key: tuple, items: list[dict], complete: bool, dir_mtimes: dict, file_stats: dict | None = None):
+    with _lock:
+        _entries[key] = CacheEntry(list(items), complete, dict(dir_mtimes), dict(file_stats) if file_stats is not None else None)
+        _entries.move_to_end(key)
+        while len(_entries) > SEARCH_CACHE_SETTINGS.get("MAX_ENTRIES", 32):
+            _entries.popitem(last=False)
+
+def invalidate_path(path: str):
+    """Drops every entry whose search path contains path (or lies inside it)."""
+    abs_path = os.path.abspath(path)
+    with _lock:
+        for key in list(_entries):
+            root = key[2]
+            if abs_path == root or abs_path.startswith(root.rstrip(os.sep) + os.sep) or root.startswith(abs_path.rstrip(os.sep) + os.sep):
+                del _entries[key]
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+def entry_count() -> int:
+    with _lock:
+        return len(_entries)
+
+def _watcher_listener(event: dict):
+    invalidate_path(event["path"])
+    if event.get("dest_path"):
+        invalidate_path(event["dest_path"])
+
+fs_watcher.add_listener(_watcher_listener)
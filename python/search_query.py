@@ -0,0 +1,250 @@
+# python/search_query.py
+
+import os
+import re
+import time
+
+# Search criteria are parsed once into a SearchQuery plan. Cheap metadata predicates
+# (extension, name, size, mtime) are checked for every candidate; content terms are only
+# evaluated for files that passed all of them.
+
+# --- Constants for File Type Matching ---
+SEARCH_TYPE_KEYWORDS = {
+    "image": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
+    "picture": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
+    "photo": ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg', '.heic', '.avif'],
+    "video": ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm'],
+    "audio": ['.mp3', '.wav', '.ogg', '.aac', '.flac', '.m4a'],
+    "document": ['.pdf', '.doc', '.docx', '.odt', '.txt', '.rtf', '.ppt', '.pptx', '.xls', '.xlsx', '.csv', '.md', '.tex'],
+    "pdf": [".pdf"], "word document": [".doc", ".docx"], "text file": [".txt", ".md", ".log", ".rtf"],
+    "spreadsheet": [".xls", ".xlsx", ".ods", ".csv"], "presentation": [".ppt", ".pptx", ".odp"],
+    "python script": [".py", ".pyw"], "javascript file": [".js", ".mjs"], "typescript file": [".ts", ".tsx"],
+    "html file": [".html", ".htm"], "css file": [".css", ".scss", ".less"],
+    "archive": [".zip", ".rar", ".tar", ".gz", ".7z", ".bz2"],
+    "executable": [".exe", ".msi", ".dmg", ".app", ".deb", ".rpm"],
+    "code file": [".py",".js",".java",".c",".cpp",".cs",".go",".rs",".swift",".kt",".php",".rb",".pl",".sh",".bat"],
+}
+
+# Extension sets per keyword, and one alternation that finds the longest keyword in a single pass
+# ("word document" wins over "document"). A keyword only counts as a whole word (plural allowed): in a
+# file name such as "my_pdf_notes.txt", "image_loader.py" or "archive_2023" it is part of the name.
+TYPE_EXTENSION_SETS = {key: frozenset(exts) for key, exts in SEARCH_TYPE_KEYWORDS.items()}
+_TYPE_KEYWORD_RE = re.compile(r"(?<![\w.\-])(?:" + "|".join(re.escape(key) for key in sorted(SEARCH_TYPE_KEYWORDS, key=len, reverse=True))
+                              + r")(?=(?:e?s)?(?![\w.\-]))")
+
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4}
+_AGE_UNITS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400}
+
+_CONTAINING_RE = re.compile(r"containing\s+['\"](.+?)['\"]((?:\s+and\s+['\"].+?['\"])*)")
+_AND_TERM_RE = re.compile(r"\s+and\s+['\"](.+?)['\"]")
+_ABOUT_RE = re.compile(r"(?:about|related to|regarding|on the topic of)\s+['\"](.+?)['\"]")
+_LIKE_RE = re.compile(r"\b(?:like|similar to)\s+['\"](.+?)['\"]", re.IGNORECASE)
+# "named ~'quartely report'", "called roughly 'x'", "fuzzy 'x'": ranked typo-tolerant name match
+_FUZZY_RE = re.compile(r"(?:(?:named|called|with name)\s+(?:~\s*|roughly\s+|approximately\s+|something like\s+)|fuzzy\s+(?:name\s+)?)['\"](.+?)['\"]")
+# "including archives", "inside zip archives", "in archive files": a bare "in archives" may name a folder
+_ARCHIVES_RE = re.compile(r"\b(?:(?:including|inside|within)\s+(?:zip\s+|tar\s+)?(?:archives|zips)|in\s+(?:zip\s+|tar\s+)?archive\s+files|in\s+zip\s+files)\b")
+_NAMED_RE = re.compile(r"(?:named|called|with name)\s+['\"](.+?)['\"]")
+_REGEX_RE = re.compile(r"(?:matching|regex)\s+/(.+?)/")
+_SIZE_RE = re.compile(r"(larger than|bigger than|over|above|at least|smaller than|under|below|at most)\s+(\d+(?:\.\d+)?)\s*(tb|gb|mb|kb|b)\b")
+_AGE_RE = re.compile(r"(?:modified\s+)?(?:in the last|within the last|newer than|older than)\s+(\d+)\s*(minute|hour|day|week|month|year)s?")
+_DATE_RE = re.compile(r"modified\s+(after|before|since)\s+(\d{4}-\d{2}-\d{2})")
+_FILLER_WORDS = {"files", "file", "all", "any", "items", "the", "my", "s", "es", "and", "with", "that", "are", "which",
+                 "modified", "named", "find", "search", "show", "me", "some", "in", "from", "of", "for"}
+
+
+class SearchQuery:
+    """Compiled search criteria. Build with compile_query()."""
+
+    def __init__(self, criteria_str: str):
+        self.criteria_str = criteria_str
+        self.extensions = None          # frozenset of lowercase extensions, or None for any
+        self.name_substring = None      # lowercase substring the file name must contain
+        self.name_exact = None          # the original criteria, an exact file name also matches
+        self.name_regex = None          # compiled re.Pattern applied to the file name
+        self.fuzzy_name = None          # text matched approximately against file names (ranked, see fuzzy_name)
+        self.include_archives = False   # also search the members of .zip/.tar archives
+        self.min_size = None
+        self.max_size = None
+        self.modified_after = None      # epoch seconds
+        self.modified_before = None
+        self.content_terms = []         # lowercase terms that must all occur in the file's text
+        self.about_criteria = None      # topic criteria that need an LLM/semantic check
+        self.about_topic = None         # just the quoted topic of about_criteria
+        self.similar_to = None          # reference file path for "files like '...'" searches (case preserved)
+
+    @property
+    def needs_content(self) -> bool:
+        return bool(self.content_terms or self.about_criteria or self.similar_to)
+
+    @property
+    def is_ranked(self) -> bool:
+        """Results carry a score and come out best first."""
+        return self.is_semantic or self.fuzzy_name is not None
+
+    @property
+    def is_semantic(self) -> bool:
+        """Ranked by topical similarity rather than filtered by exact matches."""
+        return bool(self.about_topic or self.similar_to)
+
+    def matches_metadata(self, filename: str, size_bytes: int | None, mtime: float | None) -> bool:
+        """Evaluates every predicate that does not require reading the file, cheapest first."""
+        name_lower = filename.lower()
+        if self.extensions is not None and os.path.splitext(name_lower)[1] not in self.extensions:
+            return False
+        if self.min_size is not None and (size_bytes is None or size_bytes < self.min_size):
+            return False
+        if self.max_size is not None and (size_bytes is None or size_bytes > self.max_size):
+            return False
+        if self.modified_after is not None and (mtime is None or mtime < self.modified_after):
+            return False
+        if self.modified_before is not None and (mtime is None or mtime >= self.modified_before):
+            return False
+        if self.name_substring is not None and self.name_substring not in name_lower and filename != self.name_exact:
+            return False
+        if self.name_regex is not None and not self.name_regex.search(filename):
+            return False
+        return True
+
+    def matches_content(self, text: str | None) -> bool:
+        """True if every content term occurs in text (case-insensitive). Topic criteria are not evaluated here."""
+        if not text or not self.content_terms:
+            return False
+        text_lower = text.lower()
+        return all(term in text_lower for term in self.content_terms)
+
+    def describe(self) -> str:
+        parts = []
+        if self.extensions is not None: parts.append(f"type in {sorted(self.extensions)}")
+        if self.name_substring is not None: parts.append(f"name contains '{self.name_substring}'")
+        if self.name_regex is not None: parts.append(f"name matches /{self.name_regex.pattern}/")
+        if self.fuzzy_name is not None: parts.append(f"name roughly '{self.fuzzy_name}'")
+        if self.min_size is not None: parts.append(f"size >= {self.min_size} B")
+        if self.max_size is not None: parts.append(f"size <= {self.max_size} B")
+        if self.modified_after is not None: parts.append(f"modified after {time.strftime('%Y-%m-%d %H:%M', time.localtime(self.modified_after))}")
+        if self.modified_before is not None: parts.append(f"modified before {time.strftime('%Y-%m-%d %H:%M', time.localtime(self.modified_before))}")
+        for term in self.content_terms: parts.append(f"content contains '{term}'")
+        if self.about_criteria: parts.append(f"about: {self.about_criteria}")
+        if self.similar_to: parts.append(f"similar to '{self.similar_to}'")
+        if self.include_archives: parts.append("including archive contents")
+        return ", ".join(parts) or "any file"
+
+
+def extensions_for_type(type_description: str) -> frozenset | None:
+    """Extension set for a type description ("images", "word document", ".pdf"), or None if none applies."""
+    description = type_description.strip().lower()
+    if description.startswith("."): # ".pdf" or ".pdf files"
+        return frozenset([description.split()[0]])
+    keyword_match = _TYPE_KEYWORD_RE.search(description)
+    return TYPE_EXTENSION_SETS[keyword_match.group(0)] if keyword_match else None
+
+def parse_size(size_text) -> int | None:
+    """Bytes for "5mb", "1.5 GB", "2048" (plain numbers are bytes), or None if unparseable."""
+    size_match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(tb|gb|mb|kb|b)?", str(size_text).strip().lower())
+    if not size_match:
+        return None
+    return int(float(size_match.group(1)) * _SIZE_UNITS[size_match.group(2) or "b"])
+
+def _parse_date(date_str: str) -> float | None:
+    try:
+        return time.mktime(time.strptime(date_str, "%Y-%m-%d"))
+    except ValueError:
+        return None
+
+def compile_query(criteria_str: str, now: float | None = None) -> SearchQuery:
+    """
+    Parses criteria such as `pdfs larger than 2mb modified in the last 7 days containing 'budget'`
+    into a SearchQuery. Unrecognized criteria fall back to a file name substring match.
+    """
+    query = SearchQuery(criteria_str)
+    now = time.time() if now is None else now
+    remainder = criteria_str.lower()
+    case_preserved = criteria_str # For the parts below that keep the user's case
+
+    fuzzy_match = _FUZZY_RE.search(remainder) # Before "like"/"about", which share its wording
+    if fuzzy_match:
+        query.fuzzy_name = fuzzy_match.group(1)
+        remainder = remainder[:fuzzy_match.start()] + " " + remainder[fuzzy_match.end():]
+        case_preserved = case_preserved[:fuzzy_match.start()] + " " + case_preserved[fuzzy_match.end():]
+
+    archives_match = _ARCHIVES_RE.search(remainder)
+    if archives_match:
+        query.include_archives = True
+        remainder = remainder[:archives_match.start()] + " " + remainder[archives_match.end():]
+
+    containing_match = _CONTAINING_RE.search(remainder)
+    if containing_match:
+        query.content_terms = [containing_match.group(1)] + _AND_TERM_RE.findall(containing_match.group(2) or "")
+        remainder = remainder[:containing_match.start()] + " " + remainder[containing_match.end():]
+
+    about_match = _ABOUT_RE.search(remainder)
+    if about_match:
+        query.about_criteria = criteria_str
+        query.about_topic = about_match.group(1)
+        remainder = remainder.replace(about_match.group(0), " ", 1)
+
+    like_match = _LIKE_RE.search(case_preserved) # Case preserved for the path
+    if like_match:
+        query.similar_to = like_match.group(1)
+        remainder = remainder.replace(like_match.group(0).lower(), " ", 1)
+
+    named_match = _NAMED_RE.search(remainder)
+    if named_match:
+        query.name_substring = named_match.group(1)
+        remainder = remainder.replace(named_match.group(0), " ", 1)
+
+    regex_match = _REGEX_RE.search(case_preserved) # Case preserved for the pattern itself
+    if regex_match:
+        try:
+            query.name_regex = re.compile(regex_match.group(1), re.IGNORECASE)
+        except re.error:
+            query.name_regex = None
+        remainder = remainder.replace(regex_match.group(0).lower(), " ", 1)
+
+    for comparison, amount, unit in _SIZE_RE.findall(remainder):
+        size_bytes = int(float(amount) * _SIZE_UNITS[unit])
+        if comparison in ("larger than", "bigger than", "over", "above", "at least"):
+            query.min_size = size_bytes
+        else:
+            query.max_size = size_bytes
+    remainder = _SIZE_RE.sub(" ", remainder)
+
+    for age_match in _AGE_RE.finditer(remainder):
+        cutoff = now - int(age_match.group(1)) * _AGE_UNITS[age_match.group(2)]
+        if "older than" in age_match.group(0):
+            query.modified_before = cutoff
+        else:
+            query.modified_after = cutoff
+    remainder = _AGE_RE.sub(" ", remainder)
+
+    for direction, date_str in _DATE_RE.findall(remainder):
+        timestamp = _parse_date(date_str)
+        if timestamp is None:
+            continue
+        if direction == "before":
+            query.modified_before = timestamp
+        else:
+            query.modified_after = timestamp
+    remainder = _DATE_RE.sub(" ", remainder)
+
+    type_description = " ".join(remainder.split())
+    if type_description and type_description not in ["files", "any files", "all files", "items"]:
+        query.extensions = extensions_for_type(type_description)
+
+    if query.extensions is not None and not query.needs_content and query.name_substring is None and query.fuzzy_name is None:
+        # "report pdfs" -> pdfs whose name contains "report"
+        leftover = _TYPE_KEYWORD_RE.sub(" ", type_description) if not type_description.startswith(".") else ""
+        leftover_words = [word for word in leftover.split() if word not in _FILLER_WORDS]
+        if leftover_words:
+            query.name_substring = " ".join(leftover_words)
+
+    has_predicates = (query.extensions is not None or query.name_substring is not None or query.name_regex is not None
+                      or query.fuzzy_name is not None
+                      or query.min_size is not None or query.max_size is not None
+                      or query.modified_after is not None or query.modified_before is not None or query.needs_content)
+    if not has_predicates:
+        # Plain criteria are a file name substring (or an exact file name)
+        plain_criteria = type_description if query.include_archives else criteria_str
+        if plain_criteria.lower() not in ["", "files", "any files", "all files", "items"] or not query.include_archives:
+            query.name_substring = plain_criteria.lower()
+            query.name_exact = plain_criteria
+    return query
@@ -0,0 +1,418 @@
+# python/semantic_index.py
+
+import json
+import os
+import re
+import threading
+import zlib
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from config import SEMANTIC_INDEX_SETTINGS
+from . import metadata_index
+
+# Local TF-IDF index for `about '...'` and `like '...'` searches.
+# Extracted text is tokenized, and tokens are hashed (crc32, stable across runs) into a fixed number
+# of features. Per-document term counts are kept as CSR matrices in .npy files (indptr, indices,
+# counts; see Storage), loaded memory-mapped, from which L2-normalized tf-idf weights are derived. A query is
+# vectorized the same way and scored against the candidate rows by cosine similarity (dot product
+# of normalized vectors), so topic searches need no LLM call per file.
+
+INDEX_FORMAT_VERSION = 2
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_]+")
+_STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the this to was were will with
+not no can do does did so if than then there their they them these those you your we our he she his her
+""".split())
+_ARRAY_NAMES = ("indptr", "indices", "counts")
+# Serializes changes to the stored index: syncs on search threads and updates from the watcher's listener
+_write_lock = threading.Lock()
+
+
+def is_semantic_index_available() -> bool:
+    return NUMPY_AVAILABLE and bool(SEMANTIC_INDEX_SETTINGS.get("ENABLED", True))
+
+def get_semantic_index_dir() -> str:
+    index_dir = os.path.join(metadata_index.get_state_dir(), SEMANTIC_INDEX_SETTINGS.get("DIR_NAME", "semantic_index"))
+    os.makedirs(index_dir, exist_ok=True)
+    return index_dir
+
+def _n_features() -> int:
+    return int(SEMANTIC_INDEX_SETTINGS.get("N_FEATURES", 2 ** 18))
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOP_WORDS]
+
+def _hashed_counts(text: str) -> tuple:
+    """(feature_ids, counts) of the hashed tokens of text, feature_ids sorted."""
+    n_features = _n_features()
+    hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) % n_features for token in tokenize(text)), dtype=np.int64)
+    feature_ids, counts = np.unique(hashes, return_counts=True)
+    return feature_ids.astype(np.int32), counts.astype(np.float32)
+
+
+# === Storage ===
+# The index is a list of segments, each holding the docs of one sync (segN.json) and their counts
+# (segN.indptr.npy, segN.indices.npy, segN.counts.npy). A sync appends one segment with the new and
+# changed documents, and marks the rows they replace as dead in the manifest, so its writes are
+# proportional to what changed. Since idf depends on every document, tf-idf weights are computed
+# when the index is loaded rather than stored. Dead rows are dropped when the segments are merged
+# into one: by vacuum_semantic_index, or once there are more than MAX_SEGMENTS of them. The watcher's
+# delete and move events mark rows dead or rewrite the paths in segN.json (remove_paths, move_path).
+
+def _segment_path(index_dir: str, segment: str, name: str) -> str:
+    return os.path.join(index_dir, f"{segment}.{name}")
+
+def _read_manifest():
+    manifest_path = os.path.join(get_semantic_index_dir(), "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != INDEX_FORMAT_VERSION or manifest.get("n_features") != _n_features():
+        return None # Settings changed; the index is rebuilt from scratch
+    return manifest
+
+def _write_manifest(manifest: dict):
+    index_dir = get_semantic_index_dir()
+    temp_manifest = os.path.join(index_dir, "manifest.json.tmp")
+    with open(temp_manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temp_manifest, os.path.join(index_dir, "manifest.json"))
+
+def _segment_starts(manifest: dict) -> dict:
+    """{segment: row of its first doc in the loaded index}."""
+    starts, offset = {}, 0
+    for segment in manifest["segments"]:
+        starts[segment] = offset
+        offset += manifest["sizes"][segment]
+    return starts
+
+def _load_index():
+    """
+    Returns the stored index as a dict of arrays over every segment's rows ("docs" has None for dead
+    rows, "row_of" maps each indexed path to its live row) plus the manifest, or None if there is none.
+    """
+    manifest = _read_manifest()
+    if manifest is None:
+        return None
+    index_dir = get_semantic_index_dir()
+    docs, indptrs, indices, counts = [], [], [], []
+    entry_offset = 0
+    try:
+        for segment in manifest["segments"]:
+            with open(_segment_path(index_dir, segment, "json"), "r", encoding="utf-8") as f:
+                segment_docs = json.load(f)
+            segment_arrays = {name: np.load(_segment_path(index_dir, segment, f"{name}.npy"), mmap_mode="r")
+                              for name in _ARRAY_NAMES}
+            if len(segment_arrays["indptr"]) != len(segment_docs) + 1:
+                return None # Interrupted write
+            indptrs.append(np.asarray(segment_arrays["indptr"][1:]) + entry_offset)
+            entry_offset += int(segment_arrays["indptr"][-1])
+            indices.append(segment_arrays["indices"])
+            counts.append(segment_arrays["counts"])
+            docs.extend(segment_docs)
+        segment_starts = _segment_starts(manifest)
+        for segment, row in manifest["dead"]:
+            docs[segment_starts[segment] + row] = None
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+
+    index = {"manifest": manifest, "docs": docs}
+    index["indptr"] = np.concatenate([np.zeros(1, dtype=np.int64)] + indptrs).astype(np.int64)
+    # A single segment stays memory-mapped; several are read into one array
+    index["indices"] = indices[0] if len(indices) == 1 else np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+    index["counts"] = counts[0] if len(counts) == 1 else np.concatenate(counts) if counts else np.zeros(0, dtype=np.float32)
+    index["row_of"] = {doc[0]: row for row, doc in enumerate(docs) if doc is not None}
+    _compute_weights(index)
+    return index
+
+def _compute_weights(index: dict):
+    """Sets "idf" (over the live rows) and L2-normalized tf-idf "weights" (zero for dead rows)."""
+    n_rows = len(index["docs"])
+    n_features = _n_features()
+    row_ids = np.repeat(np.arange(n_rows), np.diff(index["indptr"]))
+    live = np.array([doc is not None for doc in index["docs"]], dtype=bool)
+    live_entries = live[row_ids] if n_rows else np.zeros(0, dtype=bool)
+    doc_freq = np.bincount(index["indices"][live_entries], minlength=n_features).astype(np.float32)
+    n_docs = len(index["row_of"])
+    index["idf"] = (np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+    if not len(index["counts"]):
+        index["weights"] = np.zeros(0, dtype=np.float32)
+        return
+    weights = (1.0 + np.log(index["counts"])) * index["idf"][index["indices"]] * live_entries
+    norms = np.sqrt(np.bincount(row_ids, weights=weights.astype(np.float64) ** 2, minlength=n_rows))
+    norms[norms == 0] = 1.0
+    index["weights"] = (weights / norms[row_ids]).astype(np.float32)
+
+def _write_segment(segment: str, docs: list, row_indices: list, row_counts: list):
+    index_dir = get_semantic_index_dir()
+    lengths = np.array([len(ids) for ids in row_indices], dtype=np.int64)
+    arrays = {"indptr": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+              "indices": (np.concatenate(row_indices) if row_indices else np.zeros(0)).astype(np.int32),
+              "counts": (np.concatenate(row_counts) if row_counts else np.zeros(0)).astype(np.float32)}
+    for name, array in arrays.items():
+        temp_path = _segment_path(index_dir, segment, "tmp.npy")
+        np.save(temp_path, array)
+        os.replace(temp_path, _segment_path(index_dir, segment, f"{name}.npy"))
+    _write_segment_docs(segment, docs)
+
+def _read_segment_docs(segment: str) -> list:
+    with open(_segment_path(get_semantic_index_dir(), segment, "json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_segment_docs(segment: str, docs: list):
+    index_dir = get_semantic_index_dir()
+    temp_docs = _segment_path(index_dir, segment, "json.tmp")
+    with open(temp_docs, "w", encoding="utf-8") as f:
+        json.dump(docs, f)
+    os.replace(temp_docs, _segment_path(index_dir, segment, "json"))
+
+def _remove_unreferenced_files(manifest: dict):
+    """Deletes segment files the manifest does not list (merged away, or left by an interrupted write)."""
+    index_dir = get_semantic_index_dir()
+    suffixes = ["json"] + [f"{name}.npy" for name in _ARRAY_NAMES]
+    keep = {"manifest.json"} | {f"{segment}.{suffix}" for segment in manifest["segments"] for suffix in suffixes}
+    for name in os.listdir(index_dir):
+        if name not in keep:
+            try:
+                os.remove(os.path.join(index_dir, name))
+            except OSError:
+                pass
+
+def _append(index, stale_rows: set[int], new_docs: list[tuple]) -> None:
+    """Adds new (path, size, mtime, feature_ids, counts) docs as a new segment and marks stale_rows dead."""
+    manifest = index["manifest"] if index is not None else None
+    if manifest is None:
+        manifest = {"version": INDEX_FORMAT_VERSION, "n_features": _n_features(), "segments": [], "sizes": {},
+                    "dead": [], "next_segment": 0}
+        _remove_unreferenced_files(manifest) # Files of an older format or settings
+    segment = f"seg{manifest['next_segment']}"
+    _write_segment(segment, [[path, size_bytes, mtime] for path, size_bytes, mtime, _, _ in new_docs],
+                   [feature_ids for _, _, _, feature_ids, _ in new_docs], [counts for _, _, _, _, counts in new_docs])
+    segment_starts = _segment_starts(manifest)
+    for row in sorted(stale_rows):
+        name = next(name for name in reversed(manifest["segments"]) if segment_starts[name] <= row)
+        manifest["dead"].append([name, row - segment_starts[name]])
+    manifest["segments"].append(segment)
+    manifest["sizes"][segment] = len(new_docs)
+    manifest["next_segment"] += 1
+    _write_manifest(manifest)
+
+def _compact(index, keep_rows: list[int]) -> None:
+    """Rewrites the index as a single segment made of keep_rows (live rows of `index`)."""
+    manifest = index["manifest"]
+    docs, row_indices, row_counts = [], [], []
+    for row in keep_rows:
+        start, end = int(index["indptr"][row]), int(index["indptr"][row + 1])
+        docs.append(index["docs"][row])
+        row_indices.append(np.array(index["indices"][start:end]))
+        row_counts.append(np.array(index["counts"][start:end]))
+    index.clear() # Release the memory maps before their files are removed (required on Windows)
+    segment = f"seg{manifest['next_segment']}"
+    _write_segment(segment, docs, row_indices, row_counts)
+    compacted = {"version": INDEX_FORMAT_VERSION, "n_features": _n_features(), "segments": [segment],
+                 "sizes": {segment: len(docs)}, "dead": [], "next_segment": manifest["next_segment"] + 1}
+    _write_manifest(compacted)
+    _remove_unreferenced_files(compacted)
+
+def sync_files(candidates: list[tuple[str, int, float]]):
+    """
+    Makes sure every (path, size_bytes, mtime) candidate is indexed at its current size/mtime and
+    returns the loaded index. Text comes from fs_utils.get_file_content_for_search.
+    """
+    with _write_lock:
+        return _sync_files(candidates)
+
+def _sync_files(candidates: list[tuple[str, int, float]]):
+    from .fs_utils import get_file_content_for_search, prefetch_search_texts # Late import: fs_utils imports this module
+    index = _load_index()
+    known = index["row_of"] if index is not None else {}
+    # Documents to (re)index are parsed up front by the extraction workers; the loop below reads the cache
+    for _ in prefetch_search_texts([path for path, size_bytes, mtime in candidates
+                                    if known.get(path) is None or tuple(index["docs"][known[path]][1:3]) != (size_bytes, mtime)]):
+        pass
+    stale_rows = set()
+    new_docs = []
+    seen_paths = set()
+    for path, size_bytes, mtime in candidates:
+        if path in seen_paths:
+            continue
+        seen_paths.add(path)
+        row = known.get(path)
+        if row is not None:
+            _, known_size, known_mtime = index["docs"][row]
+            if known_size == size_bytes and known_mtime == mtime:
+                continue
+            stale_rows.add(row)
+        text = get_file_content_for_search(path, console=None, is_known_file=True) or ""
+        feature_ids, counts = _hashed_counts(text)
+        new_docs.append((path, size_bytes, mtime, feature_ids, counts))
+    if not new_docs and index is not None:
+        return index
+    _append(index, stale_rows, new_docs)
+    index = _load_index()
+    if index is not None and len(index["manifest"]["segments"]) > SEMANTIC_INDEX_SETTINGS.get("MAX_SEGMENTS", 8):
+        _compact(index, sorted(index["row_of"].values()))
+        index = _load_index()
+    return index
+
+def _mark_removed(manifest: dict, paths: list[str]) -> bool:
+    """Marks the live docs at paths, or below them, as dead in manifest. True if any was."""
+    prefixes = [(path, path.rstrip(os.sep) + os.sep) for path in paths]
+    dead = {tuple(entry) for entry in manifest["dead"]}
+    removed = False
+    for segment in manifest["segments"]:
+        for row, (doc_path, _, _) in enumerate(_read_segment_docs(segment)):
+            if (segment, row) not in dead and any(doc_path == path or doc_path.startswith(prefix) for path, prefix in prefixes):
+                manifest["dead"].append([segment, row])
+                removed = True
+    return removed
+
+def remove_paths(paths: list[str]) -> str | None:
+    """
+    Drops the docs of deleted files, and of every file below deleted directories (their rows are marked
+    dead until the next merge). Returns an error message or None.
+    """
+    with _write_lock:
+        manifest = _read_manifest()
+        if manifest is None:
+            return None
+        try:
+            if _mark_removed(manifest, paths):
+                _write_manifest(manifest)
+        except (OSError, ValueError, KeyError) as e:
+            return f"Semantic index update failed: {e}"
+    return None
+
+def move_path(source_path: str, destination_path: str) -> str | None:
+    """
+    Re-keys the docs of a moved file or directory in the segment files; their counts are kept, so nothing
+    is re-extracted. Returns an error message or None.
+    """
+    prefix = source_path.rstrip(os.sep) + os.sep
+    with _write_lock:
+        manifest = _read_manifest()
+        if manifest is None:
+            return None
+        try:
+            if _mark_removed(manifest, [destination_path]): # Whatever was indexed at the destination was overwritten
+                _write_manifest(manifest)
+            for segment in manifest["segments"]:
+                docs = _read_segment_docs(segment)
+                moved = False
+                for doc in docs:
+                    if doc[0] == source_path or doc[0].startswith(prefix):
+                        doc[0] = destination_path + doc[0][len(source_path):]
+                        moved = True
+                if moved:
+                    _write_segment_docs(segment, docs)
+        except (OSError, ValueError, KeyError) as e:
+            return f"Semantic index update failed: {e}"
+    return None
+
+
+# === Queries ===
+def _query_vector(index, text: str):
+    feature_ids, counts = _hashed_counts(text)
+    query = np.zeros(_n_features(), dtype=np.float32)
+    if len(feature_ids):
+        weights = (1.0 + np.log(counts)) * index["idf"][feature_ids]
+        norm = float(np.sqrt(np.dot(weights, weights))) or 1.0
+        query[feature_ids] = weights / norm
+    return query
+
+def _row_vector(index, row: int):
+    start, end = int(index["indptr"][row]), int(index["indptr"][row + 1])
+    query = np.zeros(_n_features(), dtype=np.float32)
+    query[index["indices"][start:end]] = index["weights"][start:end]
+    return query
+
+def rank_files(candidates: list[tuple[str, int, float]], topic_text: str | None = None, like_path: str | None = None,
+               top_k: int | None = None) -> tuple[list[tuple[str, float]], str | None]:
+    """
+    Ranks candidate (path, size_bytes, mtime) files by cosine similarity to topic_text, or to the
+    indexed text of like_path ("files like this one"). Returns ([(path, score), ...] best first, error).
+    Scores below SEMANTIC_INDEX_SETTINGS["MIN_SCORE"] are dropped; like_path itself is never returned.
+    """
+    if not NUMPY_AVAILABLE:
+        return [], "NumPy is not installed; topic search needs it (pip install numpy)."
+    if top_k is None:
+        top_k = SEMANTIC_INDEX_SETTINGS.get("TOP_K", 20)
+    min_score = SEMANTIC_INDEX_SETTINGS.get("MIN_SCORE", 0.05)
+
+    to_sync = list(candidates)
+    if like_path:
+        try:
+            like_stat = os.stat(like_path)
+        except OSError as e:
+            return [], f"Cannot read reference file '{like_path}': {e}"
+        to_sync.append((like_path, like_stat.st_size, like_stat.st_mtime))
+    try:
+        index = sync_files(to_sync)
+    except (OSError, ValueError) as e:
+        return [], f"Semantic index error: {e}"
+    if index is None or not index["row_of"]:
+        return [], None
+
+    row_of = index["row_of"]
+    if like_path:
+        query = _row_vector(index, row_of[like_path])
+    else:
+        query = _query_vector(index, topic_text or "")
+    if not query.any():
+        return [], None
+
+    candidate_rows = np.array(sorted({row_of[path] for path, _, _ in candidates if path in row_of and path != like_path}), dtype=np.int64)
+    if not len(candidate_rows):
+        return [], None
+    n_docs = len(index["docs"])
+    row_ids = np.repeat(np.arange(n_docs), np.diff(index["indptr"]))
+    scores = np.bincount(row_ids, weights=index["weights"] * query[index["indices"]], minlength=n_docs)[candidate_rows]
+
+    k = min(top_k, len(candidate_rows))
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(index["docs"][candidate_rows[i]][0], float(scores[i])) for i in best if scores[i] >= min_score], None
+
+
+# === Maintenance ===
+def get_semantic_index_status() -> dict:
+    status = {"available": NUMPY_AVAILABLE, "enabled": bool(SEMANTIC_INDEX_SETTINGS.get("ENABLED", True)),
+              "doc_count": 0, "size_bytes": 0}
+    if not NUMPY_AVAILABLE:
+        return status
+    index = _load_index()
+    if index is not None:
+        status["doc_count"] = len(index["row_of"])
+    index_dir = get_semantic_index_dir()
+    for name in os.listdir(index_dir):
+        status["size_bytes"] += os.path.getsize(os.path.join(index_dir, name))
+    return status
+
+def vacuum_semantic_index() -> tuple[int, str | None]:
+    """Drops documents whose files no longer exist and merges the segments. Returns (removed_count, error)."""
+    if not NUMPY_AVAILABLE:
+        return 0, None
+    with _write_lock:
+        return _vacuum()
+
+def _vacuum() -> tuple[int, str | None]:
+    index = _load_index()
+    if index is None:
+        return 0, None
+    keep_rows = sorted(row for path, row in index["row_of"].items() if os.path.isfile(path))
+    removed = len(index["row_of"]) - len(keep_rows)
+    if removed or len(keep_rows) < len(index["docs"]) or len(index["manifest"]["segments"]) > 1:
+        try:
+            _compact(index, keep_rows)
+        except OSError as e:
+            return 0, f"Semantic index vacuum failed: {e}"
+    return removed, None
@@ -13,6 +13,9 @@ _session_context = {
     "last_referenced_file_path": None, 
     "last_folder_listed_path": None,
     "last_search_results": [], 
+    "last_search_page_end": 0,          # Results of last_search_results already shown
+    "last_search_limit_reached": False,
+    "last_search_cursor": None,         # Where a time-limited search stopped (see fs_utils.iter_search_files)
     "command_history": [], 
     "last_command_status": None,
     "last_action": None,
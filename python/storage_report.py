@@ -0,0 +1,103 @@
+# python/storage_report.py
+
+import heapq
+import os
+import time
+from array import array
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from config import STORAGE_REPORT_SETTINGS
+from . import fs_walker
+
+# Disk usage report for a whole tree in one parallel walk.
+# Sizes come from the walker's cached DirEntry stat data (nothing is stat'ed twice). Each directory's
+# own file bytes are summed during the walk; totals are rolled up bottom-up afterwards by visiting
+# directories in reverse pre-order, so children are always added before their parent. The largest
+# files are kept in a bounded min-heap; sizes and mtimes are collected in compact arrays and
+# bucketed with NumPy for the size and age distributions.
+
+_SIZE_BIN_EDGES = [0, 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2, 1024 ** 3]
+_SIZE_BIN_LABELS = ["< 1 KB", "1 KB - 1 MB", "1 - 10 MB", "10 - 100 MB", "100 MB - 1 GB", ">= 1 GB"]
+_AGE_BIN_EDGES_DAYS = [0, 7, 30, 90, 365, 3 * 365]
+_AGE_BIN_LABELS = ["< 1 week", "1 week - 1 month", "1 - 3 months", "3 - 12 months", "1 - 3 years", ">= 3 years"]
+
+
+def _histogram(values, weights, edges: list, labels: list[str]) -> list[dict]:
+    """Counts and summed weights per [edge_i, edge_i+1) bucket; the last bucket is open-ended."""
+    bucket_ids = np.searchsorted(np.asarray(edges[1:], dtype=np.float64), values, side="right")
+    counts = np.bincount(bucket_ids, minlength=len(labels))
+    totals = np.bincount(bucket_ids, weights=weights, minlength=len(labels))
+    return [{"label": label, "count": int(counts[i]), "bytes": int(totals[i])} for i, label in enumerate(labels)]
+
+def build_storage_report(root_path: str, top_n: int | None = None, now: float | None = None,
+                         on_progress=None) -> tuple[dict | None, str | None]:
+    """
+    Walks root_path and returns (report, error). The report holds:
+      total_bytes, file_count, dir_count, seconds,
+      top_files / top_dirs: [(size_bytes, path), ...] largest first (top_dirs excludes the root itself),
+      size_histogram / age_histogram: [{"label", "count", "bytes"}, ...] or None without NumPy.
+    on_progress(description) is called every few thousand directories.
+    """
+    abs_root = os.path.abspath(root_path)
+    if not os.path.isdir(abs_root):
+        return None, f"Path '{abs_root}' is not a valid directory."
+    if top_n is None:
+        top_n = STORAGE_REPORT_SETTINGS.get("TOP_N", 15)
+    now = time.time() if now is None else now
+    started = time.time()
+
+    dir_order = []          # Pre-order, as yielded by the walker
+    dir_bytes = {}          # dir_path -> own file bytes, later cumulative
+    top_files = []          # Min-heap of (size_bytes, path), at most top_n entries
+    sizes = array("q")
+    mtimes = array("d")
+    skip_hidden = not STORAGE_REPORT_SETTINGS.get("INCLUDE_HIDDEN", True)
+    # Ignore rules are not applied: excluded trees such as node_modules take up space too
+    for dir_path, _, _, file_entries in fs_walker.walk_tree(abs_root, skip_hidden=skip_hidden, apply_ignores=False):
+        own_bytes = 0
+        for entry in file_entries:
+            try:
+                stat_result = entry.stat(follow_symlinks=False) # Cached by the walker
+            except OSError:
+                continue
+            size_bytes = stat_result.st_size
+            own_bytes += size_bytes
+            sizes.append(size_bytes)
+            mtimes.append(stat_result.st_mtime)
+            if len(top_files) < top_n:
+                heapq.heappush(top_files, (size_bytes, entry.path))
+            elif size_bytes > top_files[0][0]:
+                heapq.heapreplace(top_files, (size_bytes, entry.path))
+        dir_order.append(dir_path)
+        dir_bytes[dir_path] = own_bytes
+        if on_progress and len(dir_order) % 2000 == 0:
+            on_progress(f"Scanned {len(dir_order)} folders, {len(sizes)} files")
+
+    for dir_path in reversed(dir_order): # Children before parents
+        if dir_path != abs_root:
+            parent = os.path.dirname(dir_path)
+            if parent in dir_bytes:
+                dir_bytes[parent] += dir_bytes[dir_path]
+
+    report = {
+        "root": abs_root,
+        "total_bytes": dir_bytes.get(abs_root, 0),
+        "file_count": len(sizes),
+        "dir_count": max(0, len(dir_order) - 1),
+        "top_files": sorted(top_files, reverse=True),
+        "top_dirs": heapq.nlargest(top_n, ((size_bytes, path) for path, size_bytes in dir_bytes.items() if path != abs_root)),
+        "size_histogram": None,
+        "age_histogram": None,
+    }
+    if NUMPY_AVAILABLE and len(sizes):
+        size_values = np.frombuffer(sizes, dtype=np.int64)
+        age_days = (now - np.frombuffer(mtimes, dtype=np.float64)) / 86400.0
+        report["size_histogram"] = _histogram(size_values, size_values, _SIZE_BIN_EDGES, _SIZE_BIN_LABELS)
+        report["age_histogram"] = _histogram(age_days, size_values, _AGE_BIN_EDGES_DAYS, _AGE_BIN_LABELS)
+    report["seconds"] = round(time.time() - started, 3)
+    return report, None
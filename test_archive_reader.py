@@ -0,0 +1,80 @@
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from python import archive_reader
+from python import content_grep
+from python import fs_utils
+from python import search_cache
+
+class TestArchiveReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = tempfile.mkdtemp()
+        search_cache.clear()
+        self.zip_path = os.path.join(self.tree, "backup.zip")
+        with zipfile.ZipFile(self.zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("notes/budget.txt", "line one\nthe budget is 42\n")
+            archive.writestr("notes/holiday.md", "beach")
+            archive.writestr("img/photo.jpg", b"\xff\xd8budget")
+        self.tar_path = os.path.join(self.tree, "logs.tar.gz")
+        with tarfile.open(self.tar_path, "w:gz") as archive:
+            data = b"x" * 5000 + b"\nbudget overrun\n"
+            info = tarfile.TarInfo("logs/app.log")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        with open(os.path.join(self.tree, "plain.txt"), "w") as f:
+            f.write("budget")
+
+    def tearDown(self):
+        search_cache.clear()
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _search(self, criteria):
+        found, error = fs_utils.search_files_recursive(self.tree, criteria, None, use_index=False)
+        self.assertIsNone(error)
+        return sorted(os.path.relpath(item["path"], self.tree) for item in found)
+
+    def test_member_paths(self):
+        member_path = archive_reader.make_member_path(self.zip_path, "notes/budget.txt")
+        self.assertEqual(archive_reader.split_member_path(member_path), (self.zip_path, "notes/budget.txt"))
+        self.assertTrue(archive_reader.member_exists(member_path))
+        self.assertFalse(archive_reader.member_exists(member_path + "x"))
+        self.assertTrue(archive_reader.member_exists(self.tar_path + "!/logs/app.log"))
+        self.assertIsNone(archive_reader.split_member_path(os.path.join(self.tree, "plain.txt")))
+
+    def test_read_member(self):
+        data, error = archive_reader.read_member(self.tar_path + "!/logs/app.log", 10)
+        self.assertIsNone(error)
+        self.assertEqual(data, b"x" * 10)
+        _, error = archive_reader.read_member(self.zip_path + "!/missing.txt", 10)
+        self.assertIn("not found", error)
+
+    def test_search_descends_only_when_asked(self):
+        self.assertEqual(self._search("files containing 'budget'"), ["plain.txt"])
+        self.assertEqual(self._search("files containing 'budget' including archives"),
+                         ["backup.zip!/notes/budget.txt", "logs.tar.gz!/logs/app.log", "plain.txt"])
+        self.assertEqual(self._search(".md files inside archives"), ["backup.zip!/notes/holiday.md"])
+        with patch.dict(fs_utils.ARCHIVE_SETTINGS, {"SEARCH_INSIDE": True}):
+            search_cache.clear()
+            self.assertIn("backup.zip!/img/photo.jpg", self._search("images"))
+
+    def test_grep_stream_finds_matches_across_chunks(self):
+        stream = io.BytesIO(b"aaaa\nbbbb budget\ncc")
+        with patch.dict(content_grep.CONTENT_GREP_SETTINGS, {"CHUNK_BYTES": 4}):
+            matches = content_grep.grep_stream(stream, content_grep.compile_patterns(["budget"]))
+        self.assertEqual([(match["line"], match["offset"]) for match in matches], [(2, 10)])
+
+    def test_summarize_extraction_reads_member(self):
+        from python import action_handlers
+        content, source, error = action_handlers._extract_file_content(self.zip_path + "!/notes/budget.txt", ".txt")
+        self.assertIsNone(error)
+        self.assertIn("budget is 42", content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import content_grep
+from python import fs_utils
+
+class TestContentGrep(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tree, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_line_numbers_and_snippets(self):
+        path = self._write("notes.txt", "first line\nsecond has Budget data\nthird\nbudget again\n")
+        matches, error = content_grep.grep_file(path, content_grep.compile_patterns(["budget"]))
+        self.assertIsNone(error)
+        self.assertEqual([m["line"] for m in matches], [2, 4])
+        self.assertEqual(matches[0]["snippet"], "second has Budget data")
+        self.assertEqual(matches[0]["snippet"][matches[0]["snippet_offset"]:].lower()[:6], "budget")
+        self.assertEqual(matches[0]["offset"], len("first line\nsecond has "))
+
+    def test_matches_across_window_boundaries(self):
+        # Small windows force the needle to straddle a boundary; line counting must stay exact
+        body = "x" * 70 + "\n"
+        content = body * 200 + "needle" + "\n" + body * 3 + "and the haystack"
+        path = self._write("big.log", content)
+        with patch.dict(content_grep.CONTENT_GREP_SETTINGS, {"CHUNK_BYTES": 64 * 211 + 3}):
+            contains_all, matches = content_grep.file_contains_all(path, ["needle", "haystack"])
+        self.assertTrue(contains_all)
+        self.assertEqual({m["term"]: m["line"] for m in matches}, {"needle": 201, "haystack": 205})
+
+    def test_search_finds_terms_past_the_read_cutoff(self):
+        self._write("huge.txt", "filler line\n" * 20000 + "the secret token\n")
+        found, error = fs_utils.search_files_recursive(self.tree, "files containing 'secret token'", None, use_index=False)
+        self.assertIsNone(error)
+        self.assertEqual([item["name"] for item in found], ["huge.txt"])
+        self.assertEqual(found[0]["matches"][0]["line"], 20001)
+
+if __name__ == '__main__':
+    unittest.main()
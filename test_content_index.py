@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import content_index
+from python import fs_utils
+from python import metadata_index
+from python import search_cache
+
+class TestContentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        self._write("alpha.txt", "Notes about Project Alpha and its budget.")
+        self._write("beta.md", "Beta planning document.")
+        self._write("code.py", "import alpha_utils")
+
+    def tearDown(self):
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tree, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def _candidates(self):
+        candidates = []
+        for name in sorted(os.listdir(self.tree)):
+            path = os.path.join(self.tree, name)
+            stat_info = os.stat(path)
+            candidates.append((path, stat_info.st_size, stat_info.st_mtime))
+        return candidates
+
+    def test_trigrams_are_lowercased(self):
+        self.assertEqual(content_index.extract_trigrams("AbCd"), {"abc", "bcd"})
+
+    def test_find_files_containing_narrows_and_verifies(self):
+        matches, error = content_index.find_files_containing(self.tree, self._candidates(), "project alpha")
+        self.assertIsNone(error)
+        self.assertEqual({os.path.basename(p) for p in matches}, {"alpha.txt"})
+
+        matches, _ = content_index.find_files_containing(self.tree, self._candidates(), "ALPHA")
+        self.assertEqual({os.path.basename(p) for p in matches}, {"alpha.txt", "code.py"})
+
+    def test_changed_files_are_reindexed(self):
+        conn = content_index._connect()
+        try:
+            _, reindexed = content_index.sync_files(conn, self.tree, self._candidates())
+            self.assertEqual(reindexed, 3)
+            _, reindexed = content_index.sync_files(conn, self.tree, self._candidates())
+            self.assertEqual(reindexed, 0)
+            path = self._write("beta.md", "Beta now mentions gamma rays.")
+            os.utime(path, (1, 1))
+            _, reindexed = content_index.sync_files(conn, self.tree, self._candidates())
+            self.assertEqual(reindexed, 1)
+        finally:
+            conn.close()
+        matches, _ = content_index.find_files_containing(self.tree, self._candidates(), "gamma")
+        self.assertEqual({os.path.basename(p) for p in matches}, {"beta.md"})
+
+    def test_search_uses_content_index(self):
+        found, error = fs_utils.search_files_recursive(self.tree, "files containing 'budget'", None, use_index=True)
+        self.assertIsNone(error)
+        self.assertEqual([item["name"] for item in found], ["alpha.txt"])
+        self.assertEqual(content_index.get_content_index_status()["file_count"], 3)
+
+    def test_file_edited_in_place_is_reindexed(self):
+        fs_utils.search_files_recursive(self.tree, "files containing 'budget'", None, use_index=True)
+        parent_mtime = os.stat(self.tree).st_mtime_ns
+        path = self._write("beta.md", "Beta now has a budget too.")
+        os.utime(self.tree, ns=(parent_mtime, parent_mtime)) # Only the file changed, as for an in-place edit
+        search_cache.clear()
+        found, error = fs_utils.search_files_recursive(self.tree, "files containing 'budget'", None, use_index=True)
+        self.assertIsNone(error)
+        self.assertEqual(sorted(item["name"] for item in found), ["alpha.txt", "beta.md"])
+        rows, _ = metadata_index.query_files(self.tree)
+        self.assertEqual({row["path"]: row["size_bytes"] for row in rows}[path], os.path.getsize(path))
+
+    def test_unreadable_database_returns_errors(self):
+        with open(content_index.get_content_db_path(), "wb") as f:
+            f.write(b"not a database" * 100)
+        status = content_index.get_content_index_status()
+        self.assertIn("not a database", status["error"])
+        self.assertEqual(status["file_count"], 0)
+        self.assertIn("not a database", content_index.remove_paths([os.path.join(self.tree, "alpha.txt")]))
+        self.assertIn("not a database", content_index.move_path(os.path.join(self.tree, "alpha.txt"),
+                                                                os.path.join(self.tree, "gamma.txt")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from python import content_sniffer
+from python import fs_utils
+from python import metadata_index
+from python import search_cache
+
+class TestContentSniffer(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        content_sniffer.clear()
+        search_cache.clear()
+
+    def tearDown(self):
+        content_sniffer.clear()
+        search_cache.clear()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tree, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_classify(self):
+        self.assertEqual(content_sniffer.classify(b"%PDF-1.7\n"), "pdf")
+        self.assertEqual(content_sniffer.classify(b"\x89PNG\r\n\x1a\n...."), "image")
+        self.assertEqual(content_sniffer.classify(b"\x7fELF\x02\x01"), "executable")
+        self.assertEqual(content_sniffer.classify(b"PK\x03\x04....word/document.xml"), "docx")
+        self.assertEqual(content_sniffer.classify(b"PK\x03\x04....notes.txt"), "zip")
+        self.assertEqual(content_sniffer.classify(b"plain\ttext\n"), "text")
+        self.assertEqual(content_sniffer.classify("café naïve".encode("latin-1")), "text")
+        self.assertEqual(content_sniffer.classify("hé".encode("utf-8")[:-1]), "text") # Cut multi-byte character
+        self.assertEqual(content_sniffer.classify(b"abc\x00def"), "binary")
+        self.assertEqual(content_sniffer.classify(bytes(range(1, 30)) * 10), "binary")
+        self.assertEqual(content_sniffer.classify(b""), "empty")
+
+    def test_docx_found_through_central_directory(self):
+        path = os.path.join(self.tree, "report.bin")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("[Content_Types].xml", os.urandom(6000).hex()) # Pushes word/ past the first block
+            archive.writestr("word/document.xml", "<w:document/>")
+        self.assertEqual(content_sniffer.sniff(path), "docx")
+
+    def test_content_search_uses_sniffed_kind(self):
+        self._write("misnamed.txt", b"needle\x00\x01\x02binary payload")
+        self._write("settings.conf2", b"key = needle\n")
+        self._write("notes.md", b"a needle in text\n")
+        items, error = fs_utils.search_files_recursive(self.tree, "files containing 'needle'", None, use_index=False)
+        self.assertIsNone(error)
+        self.assertEqual(sorted(item["name"] for item in items), ["notes.md", "settings.conf2"])
+
+    def test_verdicts_are_persisted_and_revalidated(self):
+        path = self._write("data.log", b"text\n")
+        self.assertEqual(content_sniffer.sniff(path), "text")
+        content_sniffer.flush()
+        self.assertEqual(metadata_index.get_sniffed_kinds(self.tree)[path][2], "text")
+        content_sniffer.clear()
+        content_sniffer.preload(self.tree)
+        with patch.object(content_sniffer, "classify") as classify:
+            self.assertEqual(content_sniffer.sniff(path), "text")
+            classify.assert_not_called()
+        with open(path, "ab") as f:
+            f.write(b"\x00\x00 now binary")
+        self.assertEqual(content_sniffer.sniff(path), "binary")
+
+    def test_summary_extraction_refuses_binaries(self):
+        from python import action_handlers
+        path = self._write("archive.txt", b"\x7fELF\x02\x01\x01" + bytes(100))
+        with patch.object(action_handlers.cli_ui, "print_warning"):
+            content, source, error = action_handlers._extract_file_content(path, ".txt")
+            self.assertEqual((content, source), ("", "binary_file_skipped"))
+            self.assertIn("binary", error)
+            content, _, error, _ = action_handlers._extract_content_for_llm(path, ".txt")
+            self.assertEqual(content, "")
+        text_path = self._write("README", b"read me first\n")
+        content, _, error, _ = action_handlers._extract_content_for_llm(text_path, "")
+        self.assertEqual((content, error), ("read me first\n", None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import duplicate_finder
+from python import metadata_index
+from python import search_query
+
+class TestDuplicateFinder(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        # Small edge size so the full-hash stage is exercised with small files
+        self.settings_patch = patch.dict(duplicate_finder.DUPLICATE_SETTINGS, {"PARTIAL_HASH_BYTES": 4, "HASH_WORKERS": 2})
+        self.settings_patch.start()
+        os.makedirs(os.path.join(self.tree, "a"))
+        os.makedirs(os.path.join(self.tree, "b"))
+        self._write("a/report.txt", b"same content here")
+        self._write("b/report copy.txt", b"same content here")
+        self._write("b/other.txt", b"same XXXXXXX here") # Same size, head and tail; differs in the middle
+        self._write("a/unique.txt", b"something else entirely")
+        self._write("a/short.txt", b"abc")
+        self._write("b/short.txt", b"abc")
+        self._write("a/empty.txt", b"")
+        self._write("b/empty.txt", b"")
+
+    def tearDown(self):
+        self.settings_patch.stop()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.tree, rel_path), "wb") as f:
+            f.write(content)
+
+    def _relative_groups(self, groups):
+        return [[os.path.relpath(path, self.tree) for path in group["paths"]] for group in groups]
+
+    def test_staged_hashing_finds_exact_duplicates(self):
+        for use_index in (True, False):
+            groups, stats, error = duplicate_finder.find_duplicates(self.tree, use_index=use_index)
+            self.assertIsNone(error)
+            self.assertEqual(self._relative_groups(groups), [[os.path.join("a", "report.txt"), os.path.join("b", "report copy.txt")],
+                                                             [os.path.join("a", "short.txt"), os.path.join("b", "short.txt")]])
+            self.assertEqual(groups[0]["wasted_bytes"], len(b"same content here"))
+            self.assertEqual(stats["size_candidates"], 5)
+            self.assertEqual(stats["full_hashed"], 3) # "short" pair is fully covered by the partial hash
+
+    def test_hard_links_are_not_duplicates(self):
+        if not hasattr(os, "link"):
+            self.skipTest("hard links not supported")
+        os.link(os.path.join(self.tree, "a", "unique.txt"), os.path.join(self.tree, "b", "unique link.txt"))
+        groups, _, _ = duplicate_finder.find_duplicates(self.tree, use_index=False)
+        self.assertEqual(len(groups), 2)
+
+    def test_min_size_and_full_hash(self):
+        groups, _, _ = duplicate_finder.find_duplicates(self.tree, min_size=10, use_index=False)
+        self.assertEqual(len(groups), 1)
+        path = os.path.join(self.tree, "a", "report.txt")
+        self.assertEqual(duplicate_finder.full_hash(path, 5), duplicate_finder.full_hash(path, 1024))
+        self.assertEqual(search_query.parse_size("1.5 kb"), 1536)
+        self.assertIsNone(search_query.parse_size("big"))
+
+    def test_listing_replaces_previous_search_state(self):
+        from python import action_handlers, session_manager
+        stale = {"last_search_results": [{"path": "/old"}] * 80, "last_search_page_end": 50,
+                 "last_search_cursor": {"limit": None}, "last_search_limit_reached": True}
+        with patch.dict(session_manager._session_context, stale), patch.object(action_handlers, "activity_logger"):
+            action_handlers.handle_find_duplicates({"folder_path": self.tree})
+            context = dict(session_manager._session_context)
+        self.assertEqual(len(context["last_search_results"]), 4)
+        self.assertEqual(context["last_search_page_end"], 4)
+        self.assertIsNone(context["last_search_cursor"])
+        self.assertFalse(context["last_search_limit_reached"])
+
+if __name__ == '__main__':
+    unittest.main()
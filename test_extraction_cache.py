@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from python import direct_parsers
+from python import extraction_cache
+from python import extractors
+from python import fs_utils
+from python import metadata_index
+
+class TestExtractionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        extraction_cache.clear()
+        self.path = os.path.join(self.tree, "report.pdf")
+        with open(self.path, "wb") as f:
+            f.write(b"%PDF-1.4 not really")
+
+    def tearDown(self):
+        extraction_cache.clear()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def test_memory_then_disk_hit(self):
+        extraction_cache.store(self.path, "full", 1, "pdf_parsed", "quarterly figures")
+        self.assertEqual(extraction_cache.lookup(self.path, "full", 1), ("pdf_parsed", "quarterly figures"))
+        with patch.dict(extraction_cache._memory, clear=True):
+            self.assertEqual(extraction_cache.lookup(self.path, "full", 1), ("pdf_parsed", "quarterly figures"))
+        stats = extraction_cache.get_cache_stats()
+        self.assertEqual((stats["memory_hits"] > 0, stats["disk_hits"] > 0, stats["disk_entries"]), (True, True, 1))
+
+    def test_changed_file_or_version_misses(self):
+        extraction_cache.store(self.path, "full", 1, "pdf_parsed", "old text")
+        self.assertIsNone(extraction_cache.lookup(self.path, "full", 2))
+        self.assertIsNone(extraction_cache.lookup(self.path, "search", 1))
+        with open(self.path, "ab") as f:
+            f.write(b" more")
+        self.assertIsNone(extraction_cache.lookup(self.path, "full", 1))
+
+    def test_memory_budget_evicts_least_recently_used(self):
+        with patch.dict(extraction_cache.EXTRACTION_CACHE_SETTINGS, {"MEMORY_MAX_BYTES": 400, "DISK_ENABLED": False}):
+            paths = []
+            for index in range(5):
+                path = os.path.join(self.tree, f"doc{index}.pdf")
+                with open(path, "wb") as f:
+                    f.write(b"x")
+                extraction_cache.store(path, "full", 1, "pdf_parsed", str(index) * 90)
+                paths.append(path)
+            self.assertIsNone(extraction_cache.lookup(paths[0], "full", 1))
+            self.assertIsNotNone(extraction_cache.lookup(paths[4], "full", 1))
+            self.assertLessEqual(extraction_cache.get_cache_stats()["memory_bytes"], 400)
+
+    def test_disk_budget_evicts(self):
+        with patch.dict(extraction_cache.EXTRACTION_CACHE_SETTINGS, {"DISK_MAX_BYTES": 300, "COMPRESSION_LEVEL": 0}):
+            for index in range(6):
+                path = os.path.join(self.tree, f"doc{index}.pdf")
+                with open(path, "wb") as f:
+                    f.write(b"x")
+                extraction_cache.store(path, "full", 1, "pdf_parsed", "y" * 100)
+            self.assertLessEqual(extraction_cache.get_cache_stats()["disk_bytes"], 300)
+
+    def test_watcher_event_drops_memory_entry(self):
+        extraction_cache.store(self.path, "full", 1, "pdf_parsed", "text")
+        extraction_cache._watcher_listener({"type": "modified", "path": self.tree, "dest_path": None})
+        self.assertEqual(extraction_cache.get_cache_stats()["memory_entries"], 0)
+
+    def test_summarize_extraction_parses_once(self):
+        from python import action_handlers
+        archive_path = os.path.join(self.tree, "docs.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("notes.txt", "budget notes")
+        member_path = archive_path + "!/notes.txt"
+        with patch.object(action_handlers, "_extract_file_content_uncached", wraps=action_handlers._extract_file_content_uncached) as uncached:
+            for _ in range(3):
+                content, _, error = action_handlers._extract_file_content(member_path, ".txt")
+                self.assertIsNone(error)
+                self.assertEqual(content, "budget notes")
+            self.assertEqual(uncached.call_count, 1)
+
+    def test_search_text_is_cached(self):
+        docx_path = os.path.join(self.tree, "plan.docx")
+        with open(docx_path, "wb") as f:
+            f.write(b"PK\x03\x04 word/document.xml") # Sniffed as a DOCX
+        with patch.object(extractors.get_extractor(extension=".docx"), "extract", return_value="plan text") as extract:
+            self.assertEqual(fs_utils.get_file_content_for_search(docx_path), "plan text")
+            self.assertEqual(fs_utils.get_file_content_for_search(docx_path), "plan text")
+            extract.assert_called_once()
+
+    def test_pdf_page_batches_are_reused(self):
+        import fitz
+        path = os.path.join(self.tree, "long.pdf")
+        doc = fitz.open()
+        for index in range(1, 6):
+            doc.new_page().insert_text((72, 72), f"page {index}")
+        doc.save(path)
+        doc.close()
+        with patch.dict(extractors.PDF_SETTINGS, {"PAGES_PER_TASK": 2, "MAX_WORKERS": 1}):
+            self.assertIn("page 5", extractors.extract_text(path)[0])
+            with patch.object(extractors, "_pdf_page_texts", side_effect=AssertionError("parsed again")):
+                self.assertEqual(extractors.extract_text(path, pages=(3, 4))[0].split(), ["page", "3", "page", "4"])
+                self.assertIn("page 1", extractors.extract_text(path)[0])
+
+    def test_cache_command_parser(self):
+        self.assertEqual(direct_parsers.parse_direct_cache_command("cache stats")["parameters"], {"operation": "stats"})
+        self.assertEqual(direct_parsers.parse_direct_cache_command("clear the cache")["parameters"], {"operation": "clear"})
+        self.assertIsNone(direct_parsers.parse_direct_cache_command("cache the results"))
+
+if __name__ == '__main__':
+    unittest.main()
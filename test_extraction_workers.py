@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import extraction_cache
+from python import extraction_workers
+from python import fs_utils
+from python import metadata_index
+from python import search_cache
+
+class TestExtractionWorkers(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        self.settings_patch = patch.dict(extraction_workers.EXTRACTION_WORKER_SETTINGS, {"MAX_WORKERS": 2, "TIMEOUT_SECONDS": 20})
+        self.settings_patch.start()
+        extraction_cache.clear()
+        search_cache.clear()
+
+    def tearDown(self):
+        extraction_workers.shutdown()
+        with extraction_workers._failures_lock:
+            extraction_workers._failures.clear()
+        self.settings_patch.stop()
+        extraction_cache.clear()
+        search_cache.clear()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _make_docx(self, name, text):
+        import docx
+        path = os.path.join(self.tree, name)
+        document = docx.Document()
+        document.add_paragraph(text)
+        document.save(path)
+        return path
+
+    def test_results_arrive_as_completed(self):
+        paths = [self._make_docx(f"doc{index}.docx", f"text of document {index}") for index in range(3)]
+        results = {path: (text, error) for path, text, _, error in
+                   extraction_workers.iter_extractions([(path, ".docx", None) for path in paths], max_chars=1000)}
+        self.assertEqual(results, {path: (f"text of document {index}\n", None) for index, path in enumerate(paths)})
+
+    def test_hanging_file_times_out_and_is_skipped(self):
+        fifo_path = os.path.join(self.tree, "stuck.txt")
+        os.mkfifo(fifo_path) # Opening it blocks forever: there is no writer
+        good_path = self._make_docx("good.docx", "fine")
+        with patch.dict(extraction_workers.EXTRACTION_WORKER_SETTINGS, {"TIMEOUT_SECONDS": 1}):
+            results = {path: (source, error) for path, _, source, error in
+                       extraction_workers.iter_extractions([(fifo_path, ".txt", None), (good_path, ".docx", None)])}
+        self.assertEqual(results[fifo_path][0], "extraction_timed_out")
+        self.assertIsNone(results[good_path][1])
+        self.assertIn("longer than 1 seconds", extraction_workers.known_failure(fifo_path))
+        self.assertIsNone(fs_utils.get_file_content_for_search(fifo_path, is_known_file=True, kind="pdf"))
+
+    def test_crashed_worker_is_replaced(self):
+        paths = [self._make_docx(f"doc{index}.docx", "body") for index in range(2)]
+        original_submit = extraction_workers._Worker.submit
+        def submit_then_crash(worker, task_id, path, *args):
+            original_submit(worker, task_id, path, *args)
+            if path == paths[0]:
+                worker.process.kill()
+        with patch.object(extraction_workers._Worker, "submit", submit_then_crash):
+            results = {path: source for path, _, source, _ in
+                       extraction_workers.iter_extractions([(path, ".docx", None) for path in paths])}
+        self.assertEqual(results, {paths[0]: "extraction_crashed", paths[1]: "docx_parsed"})
+        self.assertEqual(list(extraction_workers.get_failures()), [paths[0]])
+
+    def test_content_search_parses_documents_in_workers(self):
+        self._make_docx("match.docx", "the needle is here")
+        self._make_docx("other.docx", "nothing to see")
+        with open(os.path.join(self.tree, "notes.txt"), "w") as f:
+            f.write("another needle\n")
+        with patch.object(fs_utils, "prefetch_search_texts", wraps=fs_utils.prefetch_search_texts) as prefetch:
+            items, error = fs_utils.search_files_recursive(self.tree, "files containing 'needle'", None, use_index=False)
+        self.assertIsNone(error)
+        self.assertEqual(sorted(item["name"] for item in items), ["match.docx", "notes.txt"])
+        self.assertEqual(sorted(os.path.basename(path) for path in prefetch.call_args[0][0]), ["match.docx", "other.docx"])
+
+if __name__ == '__main__':
+    unittest.main()
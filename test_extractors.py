@@ -0,0 +1,176 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import extractors
+
+class TestExtractors(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _make_pdf(self, pages):
+        import fitz
+        path = os.path.join(self.tree, "doc.pdf")
+        doc = fitz.open()
+        for text in pages:
+            doc.new_page().insert_text((72, 72), text)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_registry_lookup(self):
+        self.assertEqual(extractors.get_extractor("a/b.PDF").name, "pdf")
+        self.assertEqual(extractors.get_extractor(extension=".yaml").name, "text")
+        self.assertEqual(extractors.get_extractor(mime_type="application/pdf").name, "pdf")
+        self.assertIsNone(extractors.get_extractor("photo.jpg"))
+        self.assertIn(".ini", extractors.text_extensions())
+        self.assertIn(".docx", extractors.supported_extensions())
+
+    def test_pdf_pages_stop_at_max_chars(self):
+        path = self._make_pdf(["first page text", "second page text"])
+        self.assertEqual(extractors.extract_text(path)[0].split(), ["first", "page", "text", "second", "page", "text"])
+        text, source, error = extractors.extract_text(path, max_chars=5)
+        self.assertEqual((text, source, error), ("first", "pdf_parsed", None))
+        chunks = list(extractors.get_extractor(path).iter_chunks(path))
+        self.assertEqual(len(chunks), 2)
+
+    def test_pdf_page_ranges(self):
+        path = self._make_pdf([f"page number {index}" for index in range(1, 8)])
+        extractor = extractors.get_extractor(path)
+        with patch.dict(extractors.PDF_SETTINGS, {"PAGES_PER_TASK": 3}):
+            self.assertEqual(extractor.page_batches(7), [(0, 3), (3, 6), (6, 7)])
+            self.assertEqual(extractor.page_batches(7, (5, 40)), [(4, 6), (6, 7)])
+            text, _, error = extractors.extract_text(path, pages=(5, 5))
+        self.assertIsNone(error)
+        self.assertEqual(text.split(), ["page", "number", "5"])
+        from python import action_handlers
+        self.assertEqual(action_handlers._requested_pages("what does page 40 say?"), (40, 40))
+        self.assertEqual(action_handlers._requested_pages("summarize pages 10 to 12"), (10, 12))
+        self.assertIsNone(action_handlers._requested_pages("how many pages are there?"))
+
+    def test_pdf_pages_parsed_by_worker_pool_stay_in_order(self):
+        path = self._make_pdf([f"page number {index}" for index in range(1, 8)])
+        settings = {"PAGES_PER_TASK": 2, "PARALLEL_MIN_PAGES": 4, "MAX_WORKERS": 2}
+        try:
+            with patch.dict(extractors.PDF_SETTINGS, settings):
+                text, _, error = extractors.extract_text(path)
+                self.assertIsNotNone(extractors._pdf_pool)
+        finally:
+            extractors._discard_pdf_pool()
+        self.assertIsNone(error)
+        self.assertEqual([int(word) for word in text.split() if word.isdigit()], list(range(1, 8)))
+
+    def test_pdf_from_bytes_and_corrupt_pdf(self):
+        path = self._make_pdf(["in memory"])
+        with open(path, "rb") as f:
+            self.assertIn("in memory", extractors.extract_text("x.zip!/doc.pdf", ".pdf", data=f.read())[0])
+        broken = os.path.join(self.tree, "broken.pdf")
+        with open(broken, "wb") as f:
+            f.write(b"not a pdf")
+        text, source, error = extractors.extract_text(broken)
+        self.assertEqual((text, source), ("", "pdf_processing_error"))
+        self.assertIn("broken.pdf", error)
+
+    def test_docx_and_text(self):
+        import docx
+        path = os.path.join(self.tree, "plan.docx")
+        document = docx.Document()
+        document.add_paragraph("alpha")
+        document.add_paragraph("beta")
+        document.save(path)
+        self.assertEqual(extractors.extract_text(path), ("alpha\nbeta\n", "docx_parsed", None))
+        text_path = os.path.join(self.tree, "notes.md")
+        with open(text_path, "w") as f:
+            f.write("hello world")
+        self.assertEqual(extractors.extract_text(text_path, max_chars=5), ("hello", ".md_text_file_read", None))
+        self.assertEqual(extractors.extract_text(os.path.join(self.tree, "a.bin"))[1], "unsupported_type_no_extraction")
+
+    def test_docx_tables_and_early_stop(self):
+        import docx
+        path = os.path.join(self.tree, "report.docx")
+        document = docx.Document()
+        document.add_paragraph("intro")
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "cell one"
+        table.cell(0, 1).text = "cell two"
+        for index in range(2000):
+            document.add_paragraph(f"paragraph {index}")
+        document.save(path)
+        text, _, error = extractors.extract_text(path, max_chars=40)
+        self.assertIsNone(error)
+        self.assertEqual(text, "intro\ncell one\ncell two\nparagraph 0\npara")
+        chunks = extractors.get_extractor(path).iter_chunks(path)
+        self.assertEqual(next(chunks), "intro\n") # Streamed: the rest of the document is not parsed yet
+        chunks.close()
+
+    def test_xlsx_and_pptx(self):
+        import zipfile
+        sheet_ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+        xlsx_path = os.path.join(self.tree, "budget.xlsx")
+        with zipfile.ZipFile(xlsx_path, "w") as archive:
+            archive.writestr("xl/sharedStrings.xml", f'<sst xmlns="{sheet_ns}"><si><t>Rent</t></si><si><r><t>Fo</t></r><r><t>od</t></r></si></sst>')
+            archive.writestr("xl/worksheets/sheet2.xml", f'<worksheet xmlns="{sheet_ns}"><sheetData><row><c><v>9</v></c></row></sheetData></worksheet>')
+            archive.writestr("xl/worksheets/sheet1.xml", f'<worksheet xmlns="{sheet_ns}"><sheetData>'
+                             '<row><c t="s"><v>0</v></c><c><v>1200</v></c></row>'
+                             '<row><c t="s"><v>1</v></c><c t="inlineStr"><is><t>weekly</t></is></c></row></sheetData></worksheet>')
+        self.assertEqual(extractors.extract_text(xlsx_path), ("Rent\t1200\nFood\tweekly\n9\n", "xlsx_parsed", None))
+        drawing_ns = "http://schemas.openxmlformats.org/drawingml/2006/main"
+        pptx_path = os.path.join(self.tree, "deck.pptx")
+        with zipfile.ZipFile(pptx_path, "w") as archive:
+            for number, title in ((10, "Last"), (2, "First")):
+                archive.writestr(f"ppt/slides/slide{number}.xml", f'<sld xmlns:a="{drawing_ns}"><a:p><a:r><a:t>{title}</a:t></a:r></a:p></sld>')
+        self.assertEqual(extractors.extract_text(pptx_path)[0], "First\nLast\n")
+        broken = os.path.join(self.tree, "broken.docx")
+        with open(broken, "wb") as f:
+            f.write(b"PK not really")
+        self.assertEqual(extractors.extract_text(broken)[1], "docx_processing_error")
+
+    def test_sample_windows(self):
+        self.assertEqual(extractors.sample_windows(100, 200, 3), [(0, 100)])
+        self.assertEqual(extractors.sample_windows(10000, 1000, 0, mode="head"), [(0, 1000)])
+        windows = extractors.sample_windows(10000, 1000, 3)
+        self.assertEqual(len(windows), 5)
+        self.assertEqual((windows[0][0], windows[-1][0] + windows[-1][1]), (0, 10000))
+        self.assertLessEqual(sum(length for _, length in windows), 1000)
+
+    def test_large_text_file_is_sampled_from_head_middle_and_tail(self):
+        path = os.path.join(self.tree, "big.log")
+        with open(path, "w") as f:
+            for line_number in range(200000):
+                f.write(f"line {line_number:06d} of the log\n")
+        text, truncated = extractors.read_text_sample(path, 2000, middle_windows=3)
+        self.assertTrue(truncated)
+        self.assertTrue(text.startswith("line 000000"))
+        self.assertTrue(text.rstrip().endswith("line 199999 of the log"))
+        self.assertIn("line 1000", text) # Middle window around the halfway point
+        self.assertEqual(text.count("skipped"), 4)
+        self.assertLess(len(text), 2000 + 4 * 40)
+        head, truncated = extractors.read_text_sample(path, 2000, mode="head")
+        self.assertTrue(head.startswith("line 000000") and head.endswith(extractors.TRUNCATION_NOTE))
+        small, truncated = extractors.read_text_sample(path, 10 ** 8)
+        self.assertFalse(truncated)
+        self.assertEqual(small.count("\n"), 200000)
+
+    def test_sample_text_in_memory(self):
+        text, truncated = extractors.sample_text("short", 100)
+        self.assertEqual((text, truncated), ("short", False))
+        text, truncated = extractors.sample_text("\n".join(str(n) for n in range(10000)), 500)
+        self.assertTrue(truncated)
+        self.assertTrue(text.startswith("0\n1\n") and text.endswith("9999"))
+
+    def test_parsers_are_not_imported_at_startup(self):
+        code = "import sys; from python import fs_utils, extractors; print('fitz' in sys.modules or 'docx' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from python import fs_walker
+from python import fs_utils
+
+class TestFsWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = tempfile.mkdtemp()
+        for rel_dir in ["a/a1", "a/a2", "b", ".git"]:
+            os.makedirs(os.path.join(self.tree, rel_dir))
+        for rel_file in ["top.txt", "a/one.py", "a/a1/deep.md", "a/a2/deeper.md", "b/two.py", ".git/config"]:
+            with open(os.path.join(self.tree, rel_file), "w") as f:
+                f.write(rel_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.tree)
+
+    def test_depth_first_order_and_hidden_skipped(self):
+        walked = [self._rel(dir_path) for dir_path, _, _, _ in fs_walker.walk_tree(self.tree, max_workers=4)]
+        self.assertEqual(walked, [".", "a", os.path.join("a", "a1"), os.path.join("a", "a2"), "b"])
+
+    def test_pruning_and_max_depth(self):
+        walked = []
+        for dir_path, depth, subdirs, _ in fs_walker.walk_tree(self.tree):
+            walked.append(self._rel(dir_path))
+            subdirs[:] = [entry for entry in subdirs if entry.name != "a"]
+        self.assertEqual(walked, [".", "b"])
+
+        shallow = [self._rel(dir_path) for dir_path, _, _, _ in fs_walker.walk_tree(self.tree, max_depth=1)]
+        self.assertEqual(shallow, [".", "a", "b"])
+
+    @unittest.skipIf(os.name == 'nt', "symlinks need privileges on Windows")
+    def test_symlink_loop_is_visited_once(self):
+        os.symlink(self.tree, os.path.join(self.tree, "b", "loop"))
+        walked = [self._rel(dir_path) for dir_path, _, _, _ in fs_walker.walk_tree(self.tree, follow_symlinks=True)]
+        self.assertEqual(len(walked), len(set(walked)))
+        self.assertNotIn(os.path.join("b", "loop"), walked)
+
+    def test_listing_with_depth_uses_cached_stat(self):
+        items, error = fs_utils.list_folder_contents_simple(self.tree, max_depth=1)
+        self.assertIsNone(error)
+        names = {item["name"] for item in items}
+        self.assertTrue({"top.txt", "one.py", "two.py", ".git"} <= names)
+        self.assertNotIn("deep.md", names)
+        self.assertEqual(next(item for item in items if item["name"] == "one.py")["size_bytes"], len("a/one.py"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from python import content_index
+from python import fs_watcher
+from python import metadata_index
+
+class TestFsWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        os.makedirs(os.path.join(self.tree, "docs", "old"))
+        os.makedirs(os.path.join(self.tree, "archive"))
+        self._write("docs/report.txt", "quarterly budget")
+        self._write("docs/old/notes.txt", "alpha notes")
+        metadata_index.refresh_tree(self.tree)
+
+    def tearDown(self):
+        fs_watcher.stop_watcher()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, rel_path, content):
+        path = os.path.join(self.tree, rel_path)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def _indexed_paths(self):
+        rows, error = metadata_index.query_files(self.tree)
+        self.assertIsNone(error)
+        return sorted(os.path.relpath(row["path"], self.tree) for row in rows)
+
+    def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.05)
+        return predicate()
+
+    def test_recorded_move_rekeys_subtree_without_rescan(self):
+        source = os.path.join(self.tree, "docs")
+        with fs_watcher.recorded_move(source, os.path.join(self.tree, "archive")):
+            shutil.move(source, os.path.join(self.tree, "archive"))
+        self.assertEqual(self._indexed_paths(), [os.path.join("archive", "docs", "old", "notes.txt"),
+                                                 os.path.join("archive", "docs", "report.txt")])
+        stats, _ = metadata_index.refresh_tree(self.tree)
+        self.assertEqual(stats["dirs_rescanned"], 0)
+
+    def test_move_of_file_updates_content_index(self):
+        source = os.path.join(self.tree, "docs", "report.txt")
+        destination = os.path.join(self.tree, "archive", "report.txt")
+        candidates = [(source, os.path.getsize(source), os.path.getmtime(source))]
+        matches, _ = content_index.find_files_containing(self.tree, candidates, "budget")
+        self.assertEqual(matches, {source})
+        with fs_watcher.recorded_move(source, destination):
+            shutil.move(source, destination)
+        self.assertIn(os.path.join("archive", "report.txt"), self._indexed_paths())
+        conn = content_index._connect()
+        try:
+            paths = [path for (path,) in conn.execute("SELECT path FROM content_files")]
+        finally:
+            conn.close()
+        self.assertEqual(paths, [destination])
+
+    def test_removed_and_created_events(self):
+        notes = os.path.join(self.tree, "docs", "old")
+        shutil.rmtree(notes)
+        fs_watcher.dispatch_event({"type": "deleted", "path": notes, "dest_path": None, "is_dir": True,
+                                   "sync_dirs": {os.path.dirname(notes)}})
+        new_file = self._write("archive/new.txt", "new")
+        fs_watcher.dispatch_event({"type": "created", "path": new_file, "dest_path": None, "is_dir": False,
+                                   "sync_dirs": {os.path.dirname(new_file)}})
+        self.assertEqual(self._indexed_paths(), [os.path.join("archive", "new.txt"), os.path.join("docs", "report.txt")])
+        stats, _ = metadata_index.refresh_tree(self.tree)
+        self.assertEqual(stats["dirs_rescanned"], 0)
+
+    def test_content_index_failure_is_logged_and_metadata_still_updated(self):
+        with open(content_index.get_content_db_path(), "wb") as f:
+            f.write(b"not a database" * 100)
+        notes = os.path.join(self.tree, "docs", "old")
+        shutil.rmtree(notes)
+        with self.assertLogs(fs_watcher.__name__, level="WARNING") as logs:
+            fs_watcher.dispatch_event({"type": "deleted", "path": notes, "dest_path": None, "is_dir": True,
+                                       "sync_dirs": {os.path.dirname(notes)}})
+        self.assertIn("not a database", logs.output[0])
+        self.assertEqual(self._indexed_paths(), [os.path.join("docs", "report.txt")])
+
+    def test_failing_listener_does_not_block_others(self):
+        seen = []
+        def broken(event):
+            raise RuntimeError("boom")
+        fs_watcher.add_listener(broken)
+        fs_watcher.add_listener(seen.append)
+        try:
+            fs_watcher.dispatch_event({"type": "modified", "path": os.path.join(self.tree, "x.txt"), "dest_path": None,
+                                       "is_dir": False, "sync_dirs": set()})
+        finally:
+            fs_watcher.remove_listener(broken)
+            fs_watcher.remove_listener(seen.append)
+        self.assertEqual(len(seen), 1)
+
+    def test_inotify_watcher_applies_live_changes(self):
+        watcher = fs_watcher.start_watcher([self.tree])
+        self.assertTrue(self._wait_for(lambda: watcher.backend is not None))
+        if watcher.backend != "inotify":
+            self.skipTest("inotify is not available")
+        self.assertTrue(self._wait_for(lambda: fs_watcher.get_watcher_status()["running"]))
+        time.sleep(0.2) # Initial refresh
+        os.makedirs(os.path.join(self.tree, "fresh"))
+        self.assertTrue(self._wait_for(lambda: any(path == os.path.join(self.tree, "fresh")
+                                                   for path in watcher._inotify.wd_to_path.values())))
+        self._write("fresh/a.txt", "a")
+        os.rename(os.path.join(self.tree, "docs", "report.txt"), os.path.join(self.tree, "archive", "report.txt"))
+        expected = [os.path.join("archive", "report.txt"), os.path.join("docs", "old", "notes.txt"), os.path.join("fresh", "a.txt")]
+        self.assertTrue(self._wait_for(lambda: self._indexed_paths() == expected), self._indexed_paths())
+
+    def test_start_does_not_wait_for_the_watches(self):
+        release = threading.Event()
+        def slow_add_tree(inotify, root_path):
+            release.wait(5)
+        with patch.object(fs_watcher._Inotify, "add_tree", slow_add_tree):
+            started_at = time.monotonic()
+            watcher = fs_watcher.start_watcher([self.tree])
+            self.assertLess(time.monotonic() - started_at, 1)
+            self.assertIsNone(watcher.backend)
+            release.set()
+            self.assertTrue(self._wait_for(lambda: watcher.backend is not None))
+
+    def test_root_indexed_after_start_is_watched(self):
+        watcher = fs_watcher.start_watcher([os.path.join(self.tree, "docs")])
+        self.assertTrue(self._wait_for(lambda: watcher.backend is not None))
+        self.assertTrue(fs_watcher.watch_root(self.tree))
+        self.assertFalse(fs_watcher.watch_root(os.path.join(self.tree, "archive"))) # Already covered
+        if watcher.backend == "inotify":
+            self.assertTrue(self._wait_for(lambda: os.path.join(self.tree, "archive") in watcher._inotify.wd_to_path.values()))
+            self._write("archive/late.txt", "late")
+            self.assertTrue(self._wait_for(lambda: os.path.join("archive", "late.txt") in self._indexed_paths()))
+        self.assertEqual(fs_watcher.get_watcher_status()["roots"], [os.path.join(self.tree, "docs"), self.tree])
+
+    def test_inotify_report_of_recorded_move_is_dropped(self):
+        source = os.path.join(self.tree, "docs", "report.txt")
+        destination = os.path.join(self.tree, "archive", "report.txt")
+        with fs_watcher.recorded_move(source, destination):
+            shutil.move(source, destination)
+        watcher = fs_watcher.FsWatcher([self.tree], use_inotify=False)
+        watcher._inotify = MagicMock()
+        def moved(cookie, source_name, destination_name):
+            return watcher._translate([(os.path.join(self.tree, "docs"), fs_watcher.IN_MOVED_FROM, cookie, source_name),
+                                       (os.path.join(self.tree, "archive"), fs_watcher.IN_MOVED_TO, cookie, destination_name)])
+        self.assertEqual(moved(1, "report.txt", "report.txt"), [])
+        # Only once: a later move between the same paths is the user's own
+        self.assertEqual([event["type"] for event in moved(2, "report.txt", "report.txt")], ["moved"])
+
+if __name__ == '__main__':
+    unittest.main()
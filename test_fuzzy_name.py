@@ -0,0 +1,83 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import fs_utils
+from python import fuzzy_name
+from python import metadata_index
+from python import search_cache
+
+class TestFuzzyName(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        search_cache.clear()
+        os.makedirs(os.path.join(self.tree, "work"))
+        for rel_path, mtime in (("work/Quarterly_Report_2023.pdf", 1000), ("work/report-quarterly.docx", 2000),
+                                ("work/holiday_photos.zip", 3000), ("annual report.pdf", 4000), ("budget.xlsx", 5000)):
+            path = os.path.join(self.tree, rel_path)
+            with open(path, "w") as f:
+                f.write("x")
+            os.utime(path, (mtime, mtime))
+
+    def tearDown(self):
+        search_cache.clear()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _names(self, criteria, use_index):
+        found, error = fs_utils.search_files_recursive(self.tree, criteria, None, use_index=use_index)
+        self.assertIsNone(error)
+        return [item["name"] for item in found]
+
+    def test_bounded_levenshtein(self):
+        self.assertEqual(fuzzy_name.bounded_levenshtein("kitten", "sitting", 3), 3)
+        self.assertIsNone(fuzzy_name.bounded_levenshtein("kitten", "sitting", 2))
+        self.assertEqual(fuzzy_name.bounded_levenshtein("report", "reprot", 2), 1)
+        self.assertIsNone(fuzzy_name.bounded_levenshtein("a", "abcd", 2))
+
+    def test_tokenize_splits_case_and_digits(self):
+        self.assertEqual(fuzzy_name.tokenize("QuarterlyReport_2023.PDF"), ["quarterly", "report", "2023", "pdf"])
+
+    def test_rank_keeps_top_k_and_prefers_newer_on_ties(self):
+        query = fuzzy_name.FuzzyQuery("notes")
+        candidates = [("/a/notes.txt", 1, 10.0, "notes.txt"), ("/b/notes.txt", 1, 20.0, "notes.txt"), ("/c/other.txt", 1, 30.0, "other.txt")]
+        ranked = fuzzy_name.rank(query, candidates, top_k=1, min_score=0.45)
+        self.assertEqual([candidate[0] for _, candidate in ranked], ["/b/notes.txt"])
+
+    def test_typos_and_word_order(self):
+        for use_index in (False, True):
+            search_cache.clear()
+            names = self._names("files named ~'quartely report'", use_index)
+            self.assertEqual(sorted(names[:2]), ["Quarterly_Report_2023.pdf", "report-quarterly.docx"])
+            self.assertNotIn("holiday_photos.zip", names)
+
+    def test_other_predicates_still_apply(self):
+        self.assertEqual(self._names("pdfs named roughly 'quartrly report'", True), ["Quarterly_Report_2023.pdf"])
+
+    def test_plain_name_search_falls_back_to_fuzzy(self):
+        self.assertEqual(self._names("budgte", False), ["budget.xlsx"])
+        with patch.dict(fs_utils.SEARCH_SETTINGS, {"FUZZY_FALLBACK": False}):
+            search_cache.clear()
+            self.assertEqual(self._names("budgte", False), [])
+
+    def test_index_records_name_grams(self):
+        metadata_index.refresh_tree(self.tree)
+        rows, error = metadata_index.query_fuzzy_candidates(self.tree, fuzzy_name.FuzzyQuery("budgte").grams, 2)
+        self.assertIsNone(error)
+        self.assertEqual([row["name"] for row in rows], ["budget.xlsx"])
+        conn = sqlite3.connect(metadata_index.get_index_db_path())
+        try:
+            self.assertGreater(conn.execute("SELECT COUNT(*) FROM name_grams WHERE name_lower = 'budget.xlsx'").fetchone()[0], 0)
+        finally:
+            conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -78,5 +78,11 @@ class TestGeminiConnector(unittest.TestCase):
         result = connector.general_chat_completion("query")
         self.assertEqual(result.get("error"), "Gemini general_chat_completion not implemented")
 
+    def test_check_content_match_batch_placeholder(self):
+        config = {"API_KEY": "test_key_gemini"}
+        connector = GeminiConnector(config)
+        result = connector.check_content_match_batch("about taxes", [("a.txt", "text")])
+        self.assertEqual(result.get("error"), "Gemini check_content_match_batch not implemented")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+import http_transport
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive
+    script = []       # Per request: "503", "reset", "slow" or "ok"
+    requests_seen = 0
+    connections = set()
+
+    def _respond(self):
+        type(self).requests_seen += 1
+        type(self).connections.add(self.client_address)
+        step = self.script.pop(0) if self.script else "ok"
+        if step == "reset":
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        if step == "slow":
+            time.sleep(1)
+        status = 503 if step == "503" else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._respond()
+
+    def log_message(self, *args):
+        pass
+
+class TestHttpTransport(unittest.TestCase):
+
+    def setUp(self):
+        _Handler.script, _Handler.requests_seen, _Handler.connections = [], 0, set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        self.settings_patch = patch.dict(http_transport.HTTP_SETTINGS, {"BACKOFF_FACTOR": 0})
+        self.settings_patch.start()
+        self.session = http_transport.create_session()
+
+    def tearDown(self):
+        self.session.close()
+        self.settings_patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        for _ in range(5):
+            self.assertEqual(self.session.post(self.url, json={"prompt": "x"}, timeout=5).status_code, 200)
+        self.assertEqual(len(_Handler.connections), 1)
+
+    def test_503_and_reset_are_retried(self):
+        _Handler.script = ["503", "reset", "503"]
+        response = self.session.post(self.url, json={"prompt": "x"}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_Handler.requests_seen, 4)
+
+    def test_gives_up_after_retries(self):
+        _Handler.script = ["503"] * 10
+        response = self.session.get(self.url, timeout=5)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(_Handler.requests_seen, 1 + http_transport.HTTP_SETTINGS["RETRIES"])
+
+    def test_read_timeout_is_not_retried(self):
+        _Handler.script = ["slow"]
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.session.post(self.url, json={"prompt": "x"}, timeout=0.2)
+        self.assertEqual(_Handler.requests_seen, 1)
+
+if __name__ == '__main__':
+    unittest.main()
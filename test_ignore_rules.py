@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import fs_utils
+from python import fs_walker
+from python import ignore_rules
+from python import metadata_index
+
+class TestIgnoreRules(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        for rel_dir in ("src", "node_modules/lib", "build", "logs", "proj/dist", "proj/keep"):
+            os.makedirs(os.path.join(self.tree, rel_dir))
+        for rel_path in ("src/app.py", "src/app.pyc", "node_modules/lib/index.js", "build/out.txt",
+                         "logs/a.log", "logs/important.log", "proj/dist/bundle.js", "proj/keep/notes.txt", "root.txt"):
+            self._write(rel_path, "x")
+        self._write(".gitignore", "/build/\n*.log\n!important.log\n")
+        self._write("proj/.samignore", "dist/\n")
+
+    def tearDown(self):
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.tree, rel_path), "w") as f:
+            f.write(content)
+
+    def _relative(self, paths):
+        return sorted(os.path.relpath(path, self.tree) for path in paths)
+
+    def _expected(self):
+        return sorted(os.path.join(*p.split("/")) for p in ("logs/important.log", "proj/keep/notes.txt", "root.txt", "src/app.py"))
+
+    def test_pattern_semantics(self):
+        rules = ignore_rules.compile_rules("*.tmp\n/top.txt\ndocs/**/draft?.md\ncache/\n!keep.tmp\n")
+        self.assertTrue(rules.match("a/b/x.tmp", False))
+        self.assertFalse(rules.match("a/keep.tmp", False))
+        self.assertTrue(rules.match("top.txt", False))
+        self.assertIsNone(rules.match("sub/top.txt", False))
+        self.assertTrue(rules.match("docs/draft1.md", False))
+        self.assertTrue(rules.match("docs/2024/q1/draft2.md", False))
+        self.assertTrue(rules.match("x/cache", True))
+        self.assertIsNone(rules.match("x/cache", False))
+
+    def test_walker_prunes_ignored_trees(self):
+        walked = [entry.path for _, entry in fs_walker.iter_files(self.tree)]
+        self.assertEqual(self._relative(walked), self._expected())
+        everything = [entry.path for _, entry in fs_walker.iter_files(self.tree, apply_ignores=False)]
+        self.assertEqual(len(everything), 9)
+
+    def test_index_and_search_honour_ignore_files(self):
+        found, error = fs_utils.search_files_recursive(self.tree, "files matching /./", None, use_index=True)
+        self.assertIsNone(error)
+        self.assertEqual(self._relative(item["path"] for item in found), self._expected())
+        found, _ = fs_utils.search_files_recursive(self.tree, "files matching /./", None, use_index=False)
+        self.assertEqual(self._relative(item["path"] for item in found), self._expected())
+
+    def test_changed_ignore_file_rescans_subtree(self):
+        metadata_index.refresh_tree(self.tree)
+        os.remove(os.path.join(self.tree, "proj", ".samignore"))
+        metadata_index.refresh_tree(self.tree)
+        rows, _ = metadata_index.query_files(self.tree)
+        self.assertIn(os.path.join("proj", "dist", "bundle.js"), self._relative(row["path"] for row in rows))
+        self.assertTrue(metadata_index.is_ignored_path(os.path.join(self.tree, "node_modules"), True))
+        self.assertFalse(metadata_index.is_ignored_path(os.path.join(self.tree, "proj", "dist"), True))
+
+if __name__ == '__main__':
+    unittest.main()
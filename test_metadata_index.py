@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import metadata_index
+from python import fs_utils
+
+class TestMetadataIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        os.makedirs(os.path.join(self.tree, "docs", "old"))
+        os.makedirs(os.path.join(self.tree, ".hidden"))
+        self._write("docs/report.pdf", "pdf")
+        self._write("docs/old/notes.txt", "alpha notes")
+        self._write("holiday.jpg", "jpg")
+        self._write(".hidden/secret.txt", "hidden")
+
+    def tearDown(self):
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.tree, rel_path), "w") as f:
+            f.write(content)
+
+    def _indexed_names(self, extensions=None):
+        rows, error = metadata_index.query_files(self.tree, extensions)
+        self.assertIsNone(error)
+        return sorted(row["name"] for row in rows)
+
+    def test_build_indexes_visible_files(self):
+        stats, error = metadata_index.refresh_tree(self.tree)
+        self.assertIsNone(error)
+        self.assertEqual(stats["dirs_rescanned"], 3)
+        self.assertEqual(self._indexed_names(), ["holiday.jpg", "notes.txt", "report.pdf"])
+        self.assertEqual(self._indexed_names([".pdf"]), ["report.pdf"])
+
+    def test_refresh_only_rescans_changed_directories(self):
+        metadata_index.refresh_tree(self.tree)
+        self._write("docs/old/new.txt", "fresh")
+        stats, error = metadata_index.refresh_tree(self.tree)
+        self.assertIsNone(error)
+        self.assertEqual(stats["dirs_checked"], 3)
+        self.assertEqual(stats["dirs_rescanned"], 1)
+        self.assertIn("new.txt", self._indexed_names())
+
+    def test_removed_directory_is_dropped(self):
+        metadata_index.refresh_tree(self.tree)
+        shutil.rmtree(os.path.join(self.tree, "docs"))
+        metadata_index.refresh_tree(self.tree)
+        self.assertEqual(self._indexed_names(), ["holiday.jpg"])
+
+    def test_status_and_vacuum(self):
+        metadata_index.refresh_tree(self.tree)
+        status = metadata_index.get_index_status()
+        self.assertEqual(status["file_count"], 3)
+        self.assertEqual(status["roots"][0]["path"], os.path.abspath(self.tree))
+
+        shutil.rmtree(self.tree)
+        result, error = metadata_index.vacuum_index()
+        self.assertIsNone(error)
+        self.assertEqual(result["removed_roots"], [os.path.abspath(self.tree)])
+        self.assertEqual(metadata_index.get_index_status()["file_count"], 0)
+
+    def test_schema_is_set_up_once_per_database(self):
+        with patch.object(metadata_index, "_migrate", wraps=metadata_index._migrate) as migrate:
+            metadata_index._connect().close()
+            metadata_index._connect().close()
+            self.assertEqual(migrate.call_count, 1)
+            os.remove(metadata_index.get_index_db_path())
+            metadata_index.refresh_tree(self.tree) # A deleted database is recreated with its schema
+            self.assertEqual(migrate.call_count, 2)
+        self.assertIn("report.pdf", self._indexed_names())
+
+    def test_status_reports_unreadable_database(self):
+        with open(metadata_index.get_index_db_path(), "wb") as f:
+            f.write(b"not a database" * 100)
+        status = metadata_index.get_index_status()
+        self.assertIn("not a database", status["error"])
+        self.assertEqual(status["roots"], [])
+
+    def test_search_answers_from_index(self):
+        found, error = fs_utils.search_files_recursive(self.tree, "pdf", None, use_index=True)
+        self.assertIsNone(error)
+        self.assertEqual([item["name"] for item in found], ["report.pdf"])
+        self.assertEqual(found[0]["size_bytes"], 3)
+
+    def test_streaming_search_stops_at_limit(self):
+        for i in range(5):
+            self._write(f"docs/extra{i}.txt", "extra")
+        results = fs_utils.iter_search_files(self.tree, "text file", None, use_index=False, limit=2)
+        self.assertEqual(len(list(results)), 2)
+        found, error = fs_utils.search_files_recursive(self.tree, "text file", None, use_index=True, limit=3)
+        self.assertIsNone(error)
+        self.assertEqual(len(found), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from ollama_connector import OllamaConnector
+
+class TestOllamaRelevanceBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.connector = OllamaConnector({"MODEL": "test", "RELEVANCE_BATCH_SIZE": 3, "MAX_CONCURRENT_REQUESTS": 2})
+        self.excerpts = [(f"/docs/file{i}.txt", f"text {i}") for i in range(7)]
+
+    def test_batches_and_maps_verdicts(self):
+        prompts = []
+        lock = threading.Lock()
+
+        def fake_send(prompt, is_json_mode=False):
+            with lock:
+                prompts.append(prompt)
+            count = prompt.count("\n[F")
+            return {"results": [{"id": f"F{i}", "relevant": i % 2 == 1} for i in range(1, count + 1)]}
+
+        with patch.object(self.connector, "_send_request_to_ollama", side_effect=fake_send):
+            result = self.connector.check_content_match_batch("about budgets", self.excerpts)
+
+        self.assertEqual(len(prompts), 3) # 7 files in batches of 3
+        self.assertEqual(len(result["verdicts"]), 7)
+        self.assertTrue(result["verdicts"]["/docs/file0.txt"])
+        self.assertFalse(result["verdicts"]["/docs/file1.txt"])
+
+    def test_error_when_every_batch_fails(self):
+        with patch.object(self.connector, "_send_request_to_ollama", return_value={"error_type": "request_error", "message": "refused"}):
+            result = self.connector.check_content_match_batch("about budgets", self.excerpts)
+        self.assertIn("refused", result["error"])
+
+    def test_only_explicit_true_is_relevant(self):
+        answers = [True, "false", "TRUE", "yes", 1, "no", None]
+        response = {"results": [{"id": f"F{i}", "relevant": answer} for i, answer in enumerate(answers, start=1)]}
+        connector = OllamaConnector({"MODEL": "test", "RELEVANCE_BATCH_SIZE": len(answers)})
+        with patch.object(connector, "_send_request_to_ollama", return_value=response):
+            result = connector.check_content_match_batch("about budgets", [(f"/f{i}", "x") for i in range(len(answers))])
+        self.assertEqual([result["verdicts"][f"/f{i}"] for i in range(len(answers))], [True, False, True, True, False, False, False])
+
+    def test_list_response_is_reported_not_raised(self):
+        with patch.object(self.connector, "_send_request_to_ollama", return_value=[{"id": "F1", "relevant": True}]):
+            result = self.connector.check_content_match_batch("about budgets", self.excerpts)
+        self.assertIn("Unexpected relevance response", result["error"])
+
+class _StreamedResponse:
+    """Stands in for a requests.Response opened with stream=True."""
+
+    def __init__(self, lines, status_code=200):
+        self.lines, self.status_code, self.reason = lines, status_code, "Error"
+        self.closed = False
+
+    def iter_lines(self):
+        yield from self.lines
+
+    def json(self):
+        return json.loads(self.lines[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.closed = True
+
+class TestOllamaStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.connector = OllamaConnector({"MODEL": "test"})
+
+    def _ndjson(self, *chunks):
+        return [json.dumps(chunk).encode() for chunk in chunks]
+
+    def test_yields_tokens_until_done(self):
+        response = _StreamedResponse(self._ndjson({"response": "Hel", "done": False}, {"response": "lo", "done": False},
+                                                  {"response": "", "done": True}) + [b"", b'{"response": "ignored"}'])
+        with patch.object(self.connector.session, "post", return_value=response) as post:
+            pieces = list(self.connector.stream_summary("file text", "/docs/report.txt"))
+        self.assertEqual(pieces, [("Hel", None), ("lo", None)])
+        self.assertTrue(response.closed)
+        self.assertTrue(post.call_args.kwargs["stream"])
+        payload = json.loads(post.call_args.kwargs["data"])
+        self.assertTrue(payload["stream"])
+        self.assertIn("report.txt", payload["prompt"])
+
+    def test_error_in_stream_ends_it(self):
+        response = _StreamedResponse(self._ndjson({"response": "Par", "done": False}, {"error": "model crashed"}))
+        with patch.object(self.connector.session, "post", return_value=response):
+            pieces = list(self.connector.stream_chat("hello"))
+        self.assertEqual(pieces, [("Par", None), ("", "Ollama error: model crashed")])
+
+    def test_http_and_connection_errors(self):
+        with patch.object(self.connector.session, "post", return_value=_StreamedResponse(self._ndjson({"error": "model 'test' not found"}), 404)):
+            (piece, error), = self.connector.stream_answer("text", "why?", "/docs/a.txt")
+        self.assertIn("model 'test' not found", error)
+        with patch.object(self.connector.session, "post", side_effect=requests.exceptions.ConnectionError("refused")):
+            (piece, error), = self.connector.stream_chat("hello")
+        self.assertIn("refused", error)
+
+    def test_chat_handler_renders_streamed_reply(self):
+        from python import action_handlers
+        connector = MagicMock(stream_responses=True)
+        connector.stream_chat.return_value = (piece for piece in [("Hi ", None), ("there", None)])
+        with patch.object(action_handlers, "activity_logger") as logger, \
+             patch.object(action_handlers.cli_ui, "print_panel_message") as print_panel:
+            action_handlers.handle_general_chat(connector, {"user_query": "hello"})
+        connector.general_chat_completion.assert_not_called()
+        self.assertEqual(print_panel.call_args[0][:2], ("LLM Response", "Hi there"))
+        self.assertEqual(logger.update_last_activity_status.call_args[0][0], "success")
+
+if __name__ == '__main__':
+    unittest.main()
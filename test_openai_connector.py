@@ -78,5 +78,11 @@ class TestOpenAIConnector(unittest.TestCase):
         result = connector.general_chat_completion("query")
         self.assertEqual(result.get("error"), "OpenAI general_chat_completion not implemented")
 
+    def test_check_content_match_batch_placeholder(self):
+        config = {"API_KEY": "test_key_openai"}
+        connector = OpenAIConnector(config)
+        result = connector.check_content_match_batch("about taxes", [("a.txt", "text")])
+        self.assertEqual(result.get("error"), "OpenAI check_content_match_batch not implemented")
+
 if __name__ == '__main__':
     unittest.main()
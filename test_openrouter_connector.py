@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import patch, Mock
+import requests
 from openrouter_connector import OpenRouterConnector
 
 class TestOpenRouterConnector(unittest.TestCase):
@@ -18,7 +19,7 @@ class TestOpenRouterConnector(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "API_KEY is required"):
             OpenRouterConnector(config)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_check_connection_and_model_success_model_found(self, mock_get):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -39,7 +40,7 @@ class TestOpenRouterConnector(unittest.TestCase):
             timeout=10
         )
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_check_connection_and_model_success_model_not_found(self, mock_get):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -55,7 +56,7 @@ class TestOpenRouterConnector(unittest.TestCase):
         self.assertIsInstance(models_list, list)
         mock_get.assert_called_once()
         
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_check_connection_and_model_api_error(self, mock_get):
         mock_response = Mock()
         mock_response.status_code = 401 
@@ -72,7 +73,7 @@ class TestOpenRouterConnector(unittest.TestCase):
         self.assertTrue(any("OpenRouter API request failed" in item.get("error", "") for item in models_list if isinstance(item, dict)))
         mock_get.assert_called_once()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_check_connection_and_model_request_exception(self, mock_get):
         mock_get.side_effect = requests.exceptions.Timeout("Test timeout")
 
@@ -130,5 +131,11 @@ class TestOpenRouterConnector(unittest.TestCase):
         result = connector.general_chat_completion("query")
         self.assertEqual(result.get("error"), "OpenRouter general_chat_completion not implemented")
 
+    def test_check_content_match_batch_placeholder(self):
+        config = {"API_KEY": "test_key_openrouter"}
+        connector = OpenRouterConnector(config)
+        result = connector.check_content_match_batch("about taxes", [("a.txt", "text")])
+        self.assertEqual(result.get("error"), "OpenRouter check_content_match_batch not implemented")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import direct_parsers
+from python import fs_utils
+from python import metadata_index
+from python import search_cache
+
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        search_cache.clear()
+        os.makedirs(os.path.join(self.tree, "docs"))
+        self._write("docs/a.txt", "budget figures")
+        self._write("docs/b.txt", "holiday plans")
+
+    def tearDown(self):
+        search_cache.clear()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, rel_path, content, mtime=None):
+        path = os.path.join(self.tree, rel_path)
+        with open(path, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def _search(self, criteria, use_index=False, limit=None):
+        return sorted(os.path.basename(item["path"]) for item in
+                      fs_utils.iter_search_files(self.tree, criteria, None, use_index=use_index, limit=limit))
+
+    def test_repeated_search_is_served_from_cache(self):
+        for use_index in (False, True):
+            search_cache.clear()
+            self.assertEqual(self._search(".txt files", use_index), ["a.txt", "b.txt"])
+            self.assertEqual(search_cache.entry_count(), 1)
+            with patch.object(fs_utils, "_iter_search_uncached") as uncached:
+                self.assertEqual(self._search(".txt files", use_index), ["a.txt", "b.txt"])
+                uncached.assert_not_called()
+
+    def test_new_file_invalidates_entry(self):
+        for use_index in (False, True):
+            search_cache.clear()
+            before = self._search(".txt files", use_index)
+            self._write(f"docs/c{int(use_index)}.txt", "new")
+            self.assertEqual(self._search(".txt files", use_index), sorted(before + [f"c{int(use_index)}.txt"]))
+
+    def test_changed_content_invalidates_content_search(self):
+        self.assertEqual(self._search("files containing 'budget'"), ["a.txt"])
+        mtime = os.path.getmtime(os.path.join(self.tree, "docs", "b.txt")) + 10
+        self._write("docs/b.txt", "budget plans!", mtime=mtime) # Directory mtime unchanged
+        self.assertEqual(self._search("files containing 'budget'"), ["a.txt", "b.txt"])
+
+    def test_limited_entry_only_serves_smaller_limits(self):
+        self.assertEqual(len(self._search(".txt files", limit=1)), 1)
+        with patch.object(fs_utils, "_iter_search_uncached", return_value=iter([])) as uncached:
+            self.assertEqual(len(self._search(".txt files", limit=1)), 1)
+            uncached.assert_not_called()
+            self._search(".txt files")
+            uncached.assert_called_once()
+
+    def test_watcher_event_drops_entry(self):
+        self._search(".txt files")
+        self.assertEqual(len(search_cache._entries), 1)
+        search_cache._watcher_listener({"type": "modified", "path": os.path.join(self.tree, "docs", "a.txt"), "dest_path": None})
+        self.assertEqual(len(search_cache._entries), 0)
+
+    def test_more_results_parser(self):
+        self.assertEqual(direct_parsers.parse_direct_more_results("show next 100")["parameters"], {"count": 100})
+        self.assertEqual(direct_parsers.parse_direct_more_results("show more results")["action"], "show_more_results")
+        self.assertIsNone(direct_parsers.parse_direct_more_results("show more about budgets"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from python import direct_parsers
+from python import fs_utils
+from python import fs_walker
+from python import metadata_index
+from python import search_cache
+
+class TestSearchDeadline(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        search_cache.clear()
+        self.expected = set()
+        for dir_index in range(4):
+            for sub_index in range(2):
+                folder = os.path.join(self.tree, f"d{dir_index}", f"s{sub_index}")
+                os.makedirs(folder)
+                for file_index in range(3):
+                    path = os.path.join(folder, f"f{file_index}.txt")
+                    with open(path, "w") as f:
+                        f.write("x")
+                    self.expected.add(path)
+
+    def tearDown(self):
+        search_cache.clear()
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _search_in_steps(self, use_index, steps_allowed=1000):
+        """Runs the search with a clock that expires after every few checks, resuming until it completes."""
+        clock = {"now": 0.0}
+        def fake_monotonic():
+            clock["now"] += 1.0
+            return clock["now"]
+
+        # The index refresh is not timed here (it only gets cheaper on each run); see the refresh test below
+        refresh_tree = metadata_index.refresh_tree
+        found, cursor, partial_runs = [], None, 0
+        with patch.object(fs_utils.time, "monotonic", fake_monotonic), \
+             patch.object(metadata_index, "refresh_tree", lambda root, **_: refresh_tree(root)):
+            for _ in range(steps_allowed):
+                items, error = fs_utils.search_files_recursive(self.tree, ".txt files", None, use_index=use_index,
+                                                               max_seconds=5, cursor=cursor)
+                self.assertIsNone(error)
+                found.extend(item["path"] for item in items)
+                if not items.partial:
+                    break
+                partial_runs += 1
+                cursor = json.loads(json.dumps(items.cursor)) # Stored in the session as JSON
+        return found, partial_runs
+
+    def test_walk_resumes_without_duplicates(self):
+        found, partial_runs = self._search_in_steps(use_index=False)
+        self.assertGreater(partial_runs, 1)
+        self.assertEqual(len(found), len(set(found)))
+        self.assertEqual(set(found), self.expected)
+
+    def test_index_resumes_after_last_path(self):
+        found, partial_runs = self._search_in_steps(use_index=True)
+        self.assertGreater(partial_runs, 1)
+        self.assertEqual(len(found), len(set(found)))
+        self.assertEqual(set(found), self.expected)
+
+    def test_refresh_past_deadline_continues_next_time(self):
+        stats, error = metadata_index.refresh_tree(self.tree, deadline=time.monotonic() - 1)
+        self.assertIsNone(error)
+        self.assertFalse(stats["complete"])
+        stats, _ = metadata_index.refresh_tree(self.tree)
+        self.assertTrue(stats["complete"])
+        rows, _ = metadata_index.query_files(self.tree, [".txt"])
+        self.assertEqual(set(row["path"] for row in rows), self.expected)
+        rows, _ = metadata_index.query_files(self.tree, [".txt"], after_path=sorted(self.expected)[-2])
+        self.assertEqual([row["path"] for row in rows], sorted(self.expected)[-1:])
+
+    def test_partial_results_are_not_cached(self):
+        items, _ = fs_utils.search_files_recursive(self.tree, ".txt files", None, use_index=False, max_seconds=1e-9)
+        self.assertTrue(items.partial)
+        self.assertEqual(search_cache.entry_count(), 0)
+        items, _ = fs_utils.search_files_recursive(self.tree, ".txt files", None, use_index=False, max_seconds=0)
+        self.assertFalse(items.partial)
+        self.assertEqual(set(item["path"] for item in items), self.expected)
+
+    def test_invalid_directory_returns_search_results(self):
+        items, error = fs_utils.search_files_recursive(os.path.join(self.tree, "missing"), ".txt files", None)
+        self.assertIn("not a valid directory", error)
+        self.assertEqual((list(items), items.partial, items.cursor), ([], False, None))
+
+    def test_walker_start_dirs(self):
+        start = [(os.path.join(self.tree, "d1"), 1), (os.path.join(self.tree, "d3", "s0"), 2)]
+        walked = [root for root, _, _, _ in fs_walker.walk_tree(self.tree, start_dirs=start)]
+        self.assertEqual(walked[0], os.path.join(self.tree, "d3", "s0"))
+        self.assertEqual(set(walked), {start[0][0], start[1][0], os.path.join(self.tree, "d1", "s0"), os.path.join(self.tree, "d1", "s1")})
+
+    def test_walker_deadline_records_pending(self):
+        state = {}
+        walked = list(fs_walker.walk_tree(self.tree, deadline=time.monotonic() - 1, state=state))
+        self.assertEqual(walked, [])
+        self.assertTrue(state["timed_out"])
+        self.assertEqual(state["pending"], [(os.path.abspath(self.tree), 0)])
+
+    def test_continue_search_parser(self):
+        self.assertEqual(direct_parsers.parse_direct_continue_search("continue the search")["action"], "continue_search")
+        self.assertEqual(direct_parsers.parse_direct_continue_search("keep searching")["action"], "continue_search")
+        self.assertIsNone(direct_parsers.parse_direct_continue_search("continue"))
+
+if __name__ == '__main__':
+    unittest.main()
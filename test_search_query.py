@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from python import search_query
+from python import fs_utils
+
+class TestSearchQuery(unittest.TestCase):
+
+    def test_type_keywords_prefer_longest_match(self):
+        self.assertEqual(search_query.compile_query("word documents").extensions, frozenset([".doc", ".docx"]))
+        self.assertEqual(search_query.compile_query(".py").extensions, frozenset([".py"]))
+
+    def test_plain_criteria_is_a_name_substring(self):
+        query = search_query.compile_query("Alpha_Data.csv")
+        self.assertIsNone(query.extensions)
+        self.assertTrue(query.matches_metadata("alpha_data.csv", 10, 0))
+        self.assertFalse(query.matches_metadata("beta.csv", 10, 0))
+
+    def test_size_age_and_content_predicates(self):
+        now = time.time()
+        query = search_query.compile_query("report pdfs larger than 1kb modified in the last 7 days containing 'budget' and 'q3'", now=now)
+        self.assertEqual(query.extensions, frozenset([".pdf"]))
+        self.assertEqual(query.name_substring, None) # Content searches do not add a name filter
+        self.assertEqual(query.min_size, 1024)
+        self.assertAlmostEqual(query.modified_after, now - 7 * 86400)
+        self.assertEqual(query.content_terms, ["budget", "q3"])
+        self.assertTrue(query.matches_metadata("x.pdf", 2048, now))
+        self.assertFalse(query.matches_metadata("x.pdf", 100, now))
+        self.assertFalse(query.matches_metadata("x.pdf", 2048, now - 30 * 86400))
+        self.assertTrue(query.matches_content("Q3 Budget"))
+        self.assertFalse(query.matches_content("budget only"))
+
+    def test_type_words_inside_file_names_are_names(self):
+        for name in ("image_loader.py", "my_pdf_notes.txt", "archive_2023", "report.pdf"):
+            query = search_query.compile_query(name)
+            self.assertIsNone(query.extensions, name)
+            self.assertEqual((query.name_substring, query.name_exact), (name, name))
+        self.assertEqual(search_query.compile_query("budget pdfs").extensions, frozenset([".pdf"]))
+        tree = tempfile.mkdtemp()
+        try:
+            for name in ("image_loader.py", "my_pdf_notes.txt", "archive_2023"):
+                open(os.path.join(tree, name), "w").close()
+            for name in ("image_loader.py", "my_pdf_notes.txt", "archive_2023"):
+                found, error = fs_utils.search_files_recursive(tree, name, None, use_index=False)
+                self.assertIsNone(error)
+                self.assertEqual([item["name"] for item in found], [name])
+        finally:
+            shutil.rmtree(tree, ignore_errors=True)
+
+    def test_archive_and_like_need_explicit_phrasing(self):
+        self.assertFalse(search_query.compile_query("files in archives folder").include_archives)
+        for criteria in ("pdfs including archives", "pdfs inside zip archives", "pdfs in archive files"):
+            self.assertTrue(search_query.compile_query(criteria).include_archives, criteria)
+        self.assertIsNone(search_query.compile_query("files unlike 'notes.md'").similar_to)
+        self.assertEqual(search_query.compile_query("files like 'notes.md'").similar_to, "notes.md")
+
+    def test_leftover_words_filter_names_and_regex(self):
+        query = search_query.compile_query("report pdfs")
+        self.assertEqual(query.name_substring, "report")
+        query = search_query.compile_query("files matching /^IMG_\\d+/")
+        self.assertTrue(query.matches_metadata("img_0042.jpg", 1, 0))
+        self.assertFalse(query.matches_metadata("holiday.jpg", 1, 0))
+
+    def test_search_applies_plan_before_reading_content(self):
+        tree = tempfile.mkdtemp()
+        try:
+            for name, content in [("small.txt", "budget"), ("big.txt", "budget " * 400), ("big.md", "other " * 400)]:
+                with open(os.path.join(tree, name), "w") as f:
+                    f.write(content)
+            found, error = fs_utils.search_files_recursive(tree, "files larger than 1kb containing 'budget'", None, use_index=False)
+            self.assertIsNone(error)
+            self.assertEqual([item["name"] for item in found], ["big.txt"])
+        finally:
+            shutil.rmtree(tree, ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
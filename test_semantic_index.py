@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import metadata_index
+from python import semantic_index
+from python import fs_utils
+
+@unittest.skipUnless(semantic_index.NUMPY_AVAILABLE, "numpy is not installed")
+class TestSemanticIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.tree = tempfile.mkdtemp()
+        self.state_patch = patch.object(metadata_index, "STATE_DIR", self.state_dir)
+        self.state_patch.start()
+        self._write("garden.txt", "Tomatoes and peppers need sun. Water the garden soil and compost the tomatoes weekly.")
+        self._write("taxes.md", "Quarterly tax return: deductions, invoices and the income tax deadline.")
+        self._write("soil.txt", "Healthy soil and compost help every garden vegetable grow.")
+        self._write("photo.jpg", "not text")
+
+    def tearDown(self):
+        self.state_patch.stop()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tree, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def _candidates(self):
+        candidates = []
+        for name in sorted(os.listdir(self.tree)):
+            path = os.path.join(self.tree, name)
+            stat_info = os.stat(path)
+            candidates.append((path, stat_info.st_size, stat_info.st_mtime))
+        return candidates
+
+    def test_topic_ranking(self):
+        ranked, error = semantic_index.rank_files(self._candidates(), topic_text="garden compost")
+        self.assertIsNone(error)
+        self.assertEqual({os.path.basename(path) for path, _ in ranked}, {"garden.txt", "soil.txt"})
+        self.assertGreater(ranked[0][1], 0)
+
+    def test_like_this_file_excludes_reference(self):
+        reference = os.path.join(self.tree, "garden.txt")
+        ranked, error = semantic_index.rank_files(self._candidates(), like_path=reference)
+        self.assertIsNone(error)
+        self.assertEqual(os.path.basename(ranked[0][0]), "soil.txt")
+        self.assertNotIn(reference, [path for path, _ in ranked])
+
+    def test_changed_file_is_reindexed_and_vacuumed(self):
+        semantic_index.rank_files(self._candidates(), topic_text="tax")
+        path = self._write("taxes.md", "Now this note is about garden compost.")
+        os.utime(path, (1, 1))
+        ranked, _ = semantic_index.rank_files(self._candidates(), topic_text="income tax")
+        self.assertEqual(ranked, [])
+        os.remove(path)
+        removed, error = semantic_index.vacuum_semantic_index()
+        self.assertIsNone(error)
+        self.assertEqual(removed, 1)
+        self.assertEqual(semantic_index.get_semantic_index_status()["doc_count"], len(self._candidates()))
+
+    def test_sync_appends_a_segment_and_merges_past_the_limit(self):
+        semantic_index.rank_files(self._candidates(), topic_text="garden")
+        index_dir = semantic_index.get_semantic_index_dir()
+        first_files = {name: os.path.getmtime(os.path.join(index_dir, name)) for name in os.listdir(index_dir) if name != "manifest.json"}
+        path = self._write("taxes.md", "Now this note is about garden compost.")
+        os.utime(path, (1, 1))
+        with patch.dict(semantic_index.SEMANTIC_INDEX_SETTINGS, {"MAX_SEGMENTS": 2}):
+            ranked, _ = semantic_index.rank_files(self._candidates(), topic_text="garden compost")
+            # The first segment was left alone; the changed file went into a second one
+            self.assertEqual({name: os.path.getmtime(os.path.join(index_dir, name)) for name in first_files}, first_files)
+            self.assertEqual(len(semantic_index._read_manifest()["segments"]), 2)
+            self.assertEqual(len(semantic_index._read_manifest()["dead"]), 1)
+            self.assertIn(path, [ranked_path for ranked_path, _ in ranked])
+            self._write("tomatoes.txt", "Tomatoes in the garden.")
+            semantic_index.rank_files(self._candidates(), topic_text="garden")
+        manifest = semantic_index._read_manifest()
+        self.assertEqual((len(manifest["segments"]), manifest["dead"]), (1, []))
+        self.assertEqual(semantic_index.get_semantic_index_status()["doc_count"], len(self._candidates()))
+        self.assertEqual(len(os.listdir(index_dir)), 5) # manifest plus one segment
+
+    def test_removed_and_moved_files_are_rekeyed(self):
+        semantic_index.rank_files(self._candidates(), topic_text="garden")
+        garden, soil = os.path.join(self.tree, "garden.txt"), os.path.join(self.tree, "soil.txt")
+        moved = os.path.join(self.tree, "sub", "garden.txt")
+        os.makedirs(os.path.dirname(moved))
+        os.rename(garden, moved)
+        self.assertIsNone(semantic_index.move_path(garden, moved))
+        os.remove(soil)
+        self.assertIsNone(semantic_index.remove_paths([soil]))
+        row_of = semantic_index._load_index()["row_of"]
+        self.assertIn(moved, row_of)
+        self.assertNotIn(garden, row_of)
+        self.assertNotIn(soil, row_of)
+        self.assertEqual(len(semantic_index._read_manifest()["segments"]), 1) # Re-keyed in place, nothing re-extracted
+        self.assertIsNone(semantic_index.remove_paths([os.path.join(self.tree, "sub")]))
+        self.assertNotIn(moved, semantic_index._load_index()["row_of"])
+
+    def test_about_search_uses_index(self):
+        found, error = fs_utils.search_files_recursive(self.tree, "files about 'tax deadline'", None, use_index=True)
+        self.assertIsNone(error)
+        self.assertEqual([item["name"] for item in found], ["taxes.md"])
+        self.assertIn("score", found[0])
+        found, _ = fs_utils.search_files_recursive(self.tree, "text files like 'soil.txt'", None, use_index=False)
+        self.assertEqual([item["name"] for item in found], ["garden.txt"])
+
+class FakeRelevanceConnector:
+    def __init__(self):
+        self.calls = 0
+
+    def check_content_match_batch(self, criteria, excerpts):
+        self.calls += 1
+        return {"verdicts": {path: "invoice" in text for path, text in excerpts}}
+
+class TestTopicSearchWithoutIndex(unittest.TestCase):
+
+    def test_llm_batch_replaces_phrase_match(self):
+        tree = tempfile.mkdtemp()
+        try:
+            for name, content in [("a.txt", "An invoice for March"), ("b.txt", "Holiday plans"), ("c.md", "Second invoice")]:
+                with open(os.path.join(tree, name), "w") as f:
+                    f.write(content)
+            connector = FakeRelevanceConnector()
+            with patch.object(semantic_index, "NUMPY_AVAILABLE", False):
+                found, error = fs_utils.search_files_recursive(tree, "files about 'billing'", connector, use_index=False)
+            self.assertIsNone(error)
+            self.assertEqual(sorted(item["name"] for item in found), ["a.txt", "c.md"])
+            self.assertEqual(connector.calls, 1)
+        finally:
+            shutil.rmtree(tree, ignore_errors=True)
+
+    def test_files_without_a_verdict_are_kept(self):
+        tree = tempfile.mkdtemp()
+        try:
+            for name, content in [("a.txt", "An invoice for March"), ("b.txt", "Holiday plans"), ("c.md", "Second invoice"), ("d.txt", "")]:
+                with open(os.path.join(tree, name), "w") as f:
+                    f.write(content)
+            class PartialConnector:
+                def check_content_match_batch(self, criteria, excerpts):
+                    # One batch failed: only b.txt got a verdict
+                    return {"verdicts": {path: False for path, _ in excerpts if path.endswith("b.txt")}, "errors": ["timeout"]}
+            progress = []
+            with patch.object(semantic_index, "NUMPY_AVAILABLE", False):
+                items = list(fs_utils.iter_search_files(tree, "files about 'billing'", PartialConnector(), use_index=False,
+                                                        use_cache=False, on_progress=progress.append))
+            self.assertEqual(sorted(item["name"] for item in items), ["a.txt", "c.md", "d.txt"])
+            self.assertTrue(any("timeout" in line for line in progress))
+        finally:
+            shutil.rmtree(tree, ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
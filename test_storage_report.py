@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from python import storage_report
+
+class TestStorageReport(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tree, "media", "raw"))
+        os.makedirs(os.path.join(self.tree, "docs"))
+        self.now = 1_700_000_000.0
+        self._write("media/raw/clip.mov", 5000, age_days=400)
+        self._write("media/photo.jpg", 2000, age_days=10)
+        self._write("docs/notes.txt", 100, age_days=1)
+        self._write(".cache", 300, age_days=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.tree, ignore_errors=True)
+
+    def _write(self, rel_path, size_bytes, age_days):
+        path = os.path.join(self.tree, rel_path)
+        with open(path, "wb") as f:
+            f.write(b"x" * size_bytes)
+        mtime = self.now - age_days * 86400
+        os.utime(path, (mtime, mtime))
+
+    def test_rolls_up_directory_totals(self):
+        report, error = storage_report.build_storage_report(self.tree, top_n=2, now=self.now)
+        self.assertIsNone(error)
+        self.assertEqual(report["total_bytes"], 7400)
+        self.assertEqual(report["file_count"], 4)
+        self.assertEqual(report["dir_count"], 3)
+        self.assertEqual([(size, os.path.relpath(path, self.tree)) for size, path in report["top_dirs"]],
+                         [(7000, "media"), (5000, os.path.join("media", "raw"))])
+        self.assertEqual([os.path.basename(path) for _, path in report["top_files"]], ["clip.mov", "photo.jpg"])
+
+    def test_histograms(self):
+        if not storage_report.NUMPY_AVAILABLE:
+            self.skipTest("numpy not installed")
+        report, _ = storage_report.build_storage_report(self.tree, now=self.now)
+        size_buckets = {bucket["label"]: bucket for bucket in report["size_histogram"]}
+        self.assertEqual(size_buckets["< 1 KB"]["count"], 2)
+        self.assertEqual(size_buckets["1 KB - 1 MB"]["bytes"], 7000)
+        age_buckets = {bucket["label"]: bucket["count"] for bucket in report["age_histogram"]}
+        self.assertEqual(age_buckets, {"< 1 week": 2, "1 week - 1 month": 1, "1 - 3 months": 0,
+                                       "3 - 12 months": 0, "1 - 3 years": 1, ">= 3 years": 0})
+
+    def test_hidden_files_can_be_excluded(self):
+        with patch.dict(storage_report.STORAGE_REPORT_SETTINGS, {"INCLUDE_HIDDEN": False}):
+            report, _ = storage_report.build_storage_report(self.tree, now=self.now)
+        self.assertEqual(report["total_bytes"], 7100)
+
+    def test_report_replaces_previous_search_state(self):
+        from python import action_handlers, session_manager
+        stale = {"last_search_results": [{"path": "/old"}] * 80, "last_search_page_end": 50,
+                 "last_search_cursor": {"limit": None}, "last_search_limit_reached": True}
+        with patch.dict(session_manager._session_context, stale), patch.object(action_handlers, "activity_logger"):
+            action_handlers.handle_storage_report({"folder_path": self.tree, "top_n": 2})
+            context = dict(session_manager._session_context)
+        self.assertEqual(len(context["last_search_results"]), 4) # Two folders, two files
+        self.assertEqual(context["last_search_page_end"], 4)
+        self.assertIsNone(context["last_search_cursor"])
+        self.assertFalse(context["last_search_limit_reached"])
+
+if __name__ == '__main__':
+    unittest.main()